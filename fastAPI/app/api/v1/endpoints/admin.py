@@ -0,0 +1,178 @@
+"""
+Administration endpoints.
+Provides operational metrics, document storage usage and the activity log
+for system administrators.
+"""
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.audit_log import get_audit_log_writer
+from app.core.config import settings
+from app.core.database import get_read_db, replica_set
+from app.core.db_stats import get_checkout_wait_totals
+from app.core.deps import require_admin
+from app.core.hashing import get_password_hasher
+from app.core.notification_broker import get_notification_broker
+from app.core.numbering import get_number_allocator
+from app.core.pool_monitor import get_pool_stats
+from app.core.principals import Principal, get_principal_cache
+from app.core.rate_limiter import get_api_rate_limit_stats, get_rate_limiter
+from app.core.security import get_token_cache
+from app.core.unread_counters import get_unread_counter
+from app.core.status import ActivityAction
+from app.schemas.activity_log import ActivityLogPage
+from app.services.activity_log_service import ActivityLogService
+from app.services.document_service import DocumentService
+from app.services.notification_service import get_notification_dispatcher
+
+
+router = APIRouter()
+
+# Export lines per chunk written to the response
+EXPORT_LINES_PER_WRITE = 500
+
+
+@router.get("/metrics", status_code=status.HTTP_200_OK)
+async def get_metrics(
+    current_user: Principal = Depends(require_admin)
+):
+    """
+    Get operational metrics for this worker process.
+    
+    Includes connection pool telemetry (checkout latency histogram,
+    in-use/overflow gauges, timeouts, pre-ping failures), replica health,
+    document number allocation, activity log and notification queue
+    depth, live notification streams, password hashing pool saturation,
+    auth cache hit ratios and rate limiting counters. Requires ADMIN role.
+    """
+    return {
+        "database": {
+            "pools": get_pool_stats(),
+            "checkout_wait": get_checkout_wait_totals(),
+            "replicas": replica_set.get_stats(),
+        },
+        "document_numbers": get_number_allocator().get_stats(),
+        "audit_log": get_audit_log_writer().get_stats(),
+        "notifications": get_notification_dispatcher().get_stats(),
+        "notification_stream": get_notification_broker().get_stats(),
+        "password_hashing": get_password_hasher().get_stats(),
+        "caches": {
+            "principal": get_principal_cache().get_stats(),
+            "token": get_token_cache().get_stats(),
+            "unread_notifications": get_unread_counter().get_stats(),
+        },
+        "rate_limiting": {
+            "api": get_api_rate_limit_stats(),
+            "backend": get_rate_limiter().backend.get_stats(),
+        },
+    }
+
+
+@router.get("/storage", status_code=status.HTTP_200_OK)
+async def get_document_storage(
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get document storage usage and what deduplication saves.
+
+    `logical_bytes` is the total size of all documents and `stored_bytes`
+    what is on disk; `saved_bytes` is their difference, not counting
+    unreferenced blobs still awaiting garbage collection. Requires ADMIN
+    role.
+    """
+    return await DocumentService(db).storage_stats()
+
+
+@router.get("/activity-logs", response_model=ActivityLogPage, status_code=status.HTTP_200_OK)
+async def list_activity_logs(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    user_id: Optional[int] = None,
+    action: Optional[ActivityAction] = None,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    include_changes: bool = Query(False, description="Include old_values/new_values"),
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    List activity log entries, newest first.
+    
+    - **cursor**: Pass `next_cursor` from the previous response to get the next page
+    - **limit**: Page size (default 20, max 100)
+    - **user_id**, **action**, **entity_type**, **entity_id**: Exact-match filters
+    - **created_from** / **created_to**: Date range (inclusive / exclusive)
+    - **include_changes**: Also return old_values/new_values (null otherwise)
+    
+    Entries past AUDIT_LOG_RETENTION_DAYS are served from the archive
+    files and marked `archived`. Requires ADMIN role.
+    """
+    service = ActivityLogService(db)
+    return await service.list_activity_logs(
+        limit=limit,
+        cursor=cursor,
+        include_changes=include_changes,
+        user_id=user_id,
+        action=action,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        created_from=created_from,
+        created_to=created_to
+    )
+
+
+@router.get("/activity-logs/export", status_code=status.HTTP_200_OK)
+async def export_activity_logs(
+    cursor: Optional[str] = Query(None, description="Resume after this next_cursor"),
+    user_id: Optional[int] = None,
+    action: Optional[ActivityAction] = None,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    include_changes: bool = Query(False, description="Include old_values/new_values"),
+    current_user: Principal = Depends(require_admin),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Stream every matching activity log entry as JSON lines, newest first.
+    
+    Takes the same filters as the list endpoint; entries are written as
+    they are read, so memory use does not depend on the size of the
+    export. Requires ADMIN role.
+    """
+    service = ActivityLogService(db)
+    entries = service.stream_activity_logs(
+        cursor=cursor,
+        include_changes=include_changes,
+        user_id=user_id,
+        action=action,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        created_from=created_from,
+        created_to=created_to
+    )
+
+    async def body():
+        # Dependency teardown runs before the response streams; the session
+        # reconnects on first use, so release its connection once done
+        try:
+            lines = []
+            async for entry in entries:
+                lines.append(entry.model_dump_json() + "\n")
+                if len(lines) == EXPORT_LINES_PER_WRITE:
+                    yield "".join(lines)
+                    lines = []
+            if lines:
+                yield "".join(lines)
+        finally:
+            await db.close()
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
@@ -6,11 +6,13 @@ from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.audit_log import audit_entry, get_audit_log_writer
+from app.core.database import get_db, get_read_db
 from app.core.deps import get_current_user
+from app.core.principals import Principal, invalidate_principal
 from app.core.rate_limiter import get_rate_limiter, get_client_identifier
-from app.core.security import get_password_hash
-from app.models.user import User
+from app.core.hashing import hash_password_async, verify_password_async
+from app.core.status import ActivityAction
 from app.schemas.user import (
     UserLogin,
     TokenResponse,
@@ -25,6 +27,19 @@ from app.services.auth_service import AuthService
 router = APIRouter()
 
 
+async def _record_session_event(request: Request, action: ActivityAction, user_id: int, description: str) -> None:
+    """Queue a login/logout entry; it does not need the request's transaction."""
+    await get_audit_log_writer().record(audit_entry(
+        action,
+        "User",
+        description,
+        user_id=user_id,
+        entity_id=user_id,
+        ip_address=get_client_identifier(request),
+        user_agent=request.headers.get("User-Agent"),
+    ))
+
+
 @router.post("/login", response_model=TokenResponse, status_code=status.HTTP_200_OK)
 async def login(
     request: Request,
@@ -44,7 +59,7 @@ async def login(
     identifier = get_client_identifier(request)
     limiter = get_rate_limiter()
     
-    allowed, lockout_remaining = limiter.check_rate_limit(identifier)
+    allowed, lockout_remaining = await limiter.check_rate_limit(identifier)
     if not allowed:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
@@ -64,17 +79,18 @@ async def login(
     
     if not user:
         # Record failed attempt
-        limiter.record_attempt(identifier, success=False)
+        await limiter.record_attempt(identifier, success=False)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
     # Reset rate limit on successful login
-    limiter.reset(identifier)
+    await limiter.reset(identifier)
     
     # Create tokens
     tokens = await auth_service.create_tokens(user, identifier)
+    await _record_session_event(request, ActivityAction.LOGIN, user.id, "User logged in")
     
     return tokens
 
@@ -93,7 +109,7 @@ async def login_oauth2(
     identifier = get_client_identifier(request)
     limiter = get_rate_limiter()
     
-    allowed, lockout_remaining = limiter.check_rate_limit(identifier)
+    allowed, lockout_remaining = await limiter.check_rate_limit(identifier)
     if not allowed:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
@@ -111,22 +127,24 @@ async def login_oauth2(
     )
     
     if not user:
-        limiter.record_attempt(identifier, success=False)
+        await limiter.record_attempt(identifier, success=False)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    limiter.reset(identifier)
+    await limiter.reset(identifier)
     tokens = await auth_service.create_tokens(user, identifier)
+    await _record_session_event(request, ActivityAction.LOGIN, user.id, "User logged in")
     
     return tokens
 
 
 @router.post("/logout", status_code=status.HTTP_200_OK)
 async def logout(
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -136,6 +154,7 @@ async def logout(
     """
     auth_service = AuthService(db)
     await auth_service.logout_user(current_user.id)
+    await _record_session_event(request, ActivityAction.LOGOUT, current_user.id, "User logged out")
     
     return {
         "message": "Successfully logged out",
@@ -146,7 +165,7 @@ async def logout(
 @router.post("/refresh", response_model=TokenResponse, status_code=status.HTTP_200_OK)
 async def refresh_token(
     refresh_token: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Refresh access token using refresh token.
@@ -169,19 +188,29 @@ async def refresh_token(
 
 @router.get("/me", response_model=UserResponse, status_code=status.HTTP_200_OK)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get current authenticated user information.
     Requires valid access token.
     """
-    return UserResponse.model_validate(current_user)
+    auth_service = AuthService(db)
+    user = await auth_service.get_current_user(current_user.id)
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    return UserResponse.model_validate(user)
 
 
 @router.post("/change-password", status_code=status.HTTP_200_OK)
 async def change_password(
     password_data: PasswordChange,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -190,20 +219,29 @@ async def change_password(
     - **old_password**: Current password
     - **new_password**: New password (min 8 chars, must include uppercase, lowercase, number, special char)
     """
-    from app.core.security import verify_password
+    auth_service = AuthService(db)
+    user = await auth_service.get_current_user(current_user.id)
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
     
     # Verify old password
-    if not verify_password(password_data.old_password, current_user.password_hash):
+    if not await verify_password_async(password_data.old_password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect current password"
         )
     
     # Hash new password
-    current_user.password_hash = get_password_hash(password_data.new_password)
+    user.password_hash = await hash_password_async(password_data.new_password)
     
     await db.commit()
-    await db.refresh(current_user)
+    
+    # Cached principal must not outlive the old credentials
+    invalidate_principal(user.id)
     
     return {
         "message": "Password changed successfully",
@@ -0,0 +1,112 @@
+"""
+Document endpoints.
+Provides streaming document uploads into deduplicated storage and
+cacheable, ranged downloads.
+"""
+import os
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.blob_store import STAGING_DIR, is_blob_path
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.deps import get_current_active_user
+from app.core.downloads import file_download
+from app.core.principals import Principal
+from app.core.roles import UserRole
+from app.core.status import DocumentCategory
+from app.core.uploads import receive_upload
+from app.models.document import Document
+from app.schemas.document import DocumentResponse
+from app.services.document_service import DocumentService
+
+
+router = APIRouter()
+
+
+@router.post("", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
+async def upload_document(
+    request: Request,
+    document_type: DocumentCategory = Query(...),
+    reference_id: Optional[int] = None,
+    category: Optional[str] = Query(None, max_length=100),
+    description: Optional[str] = None,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Upload a document as multipart/form-data with the file in field `file`.
+
+    The body is streamed to disk as it arrives and never buffered whole.
+    Returns 413 as soon as the file passes MAX_FILE_SIZE_MB, and 415 for
+    types outside ALLOWED_FILE_TYPES or content that does not match the
+    file's extension. The file's SHA-256 is returned as `checksum`; a file
+    already stored for another document is shared, not stored again.
+    """
+    stored = await receive_upload(request, subdir=STAGING_DIR)
+    service = DocumentService(db)
+    return await service.create_document(
+        stored,
+        document_type=document_type,
+        uploaded_by=current_user.id,
+        reference_id=reference_id,
+        category=category,
+        description=description
+    )
+
+
+@router.api_route("/{document_id}/download", methods=["GET", "HEAD"], status_code=status.HTTP_200_OK)
+async def download_document(
+    document_id: int,
+    request: Request,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Download a document's file.
+
+    Supports a single `Range` (206), `If-None-Match` / `If-Modified-Since`
+    (304) and `If-Range`. The ETag is the file's SHA-256; deduplicated
+    files are immutable and may be cached by the browser for a year.
+    Documents the user may not download are reported as missing.
+    """
+    document = await DocumentService(db).get_download(document_id, current_user)
+    if document is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    return await file_download(
+        request,
+        os.path.join(settings.UPLOAD_DIR, document.file_path),
+        media_type=document.mime_type,
+        filename=document.original_filename,
+        checksum=document.checksum,
+        immutable=is_blob_path(document.file_path, document.checksum)
+    )
+
+
+@router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_document(
+    document_id: int,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Delete a document. Only its uploader or an ADMIN may delete it.
+    The file is removed by garbage collection once no document uses it.
+    """
+    document = await db.get(Document, document_id)
+    if document is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    if document.uploaded_by != current_user.id and current_user.role != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the uploader can delete this document"
+        )
+    await DocumentService(db).delete_document(document)
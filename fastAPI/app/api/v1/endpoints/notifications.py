@@ -0,0 +1,126 @@
+"""
+Notification endpoints.
+Provides the unread count, marking notifications read, and a
+Server-Sent Events stream that pushes new notifications to the
+signed-in user as they are created.
+"""
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.deps import get_current_active_user
+from app.core.notification_broker import RESYNC, get_notification_broker
+from app.core.principals import Principal
+from app.services.notification_service import NotificationService
+
+
+router = APIRouter()
+
+# Milliseconds a disconnected client waits before reconnecting
+RECONNECT_DELAY_MS = 3000
+
+
+@router.get("/unread-count", status_code=status.HTTP_200_OK)
+async def get_unread_count(
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Count the current user's unread notifications.
+
+    Served from the unread counter cache; the table is only counted when
+    the user's count is not cached, and then on the primary (a lagging
+    replica's count would be cached until it expires). The session only
+    takes a connection on a miss. Load this once per page and again on a
+    `resync` stream event; the stream keeps it current in between.
+    """
+    return {"unread": await NotificationService(db).unread_count(current_user.id)}
+
+
+@router.post("/read-all", status_code=status.HTTP_200_OK)
+async def mark_all_notifications_read(
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Mark every unread notification of the current user read (one UPDATE)."""
+    service = NotificationService(db)
+    marked = await service.mark_read(current_user.id)
+    return {"marked_read": marked, "unread": await service.unread_count(current_user.id)}
+
+
+@router.post("/{notification_id}/read", status_code=status.HTTP_200_OK)
+async def mark_notification_read(
+    notification_id: int,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Mark one of the current user's notifications read.
+    Marking a notification that is already read (or not theirs) changes nothing.
+    """
+    service = NotificationService(db)
+    marked = await service.mark_read(current_user.id, [notification_id])
+    return {"marked_read": marked, "unread": await service.unread_count(current_user.id)}
+
+
+def _parse_event_id(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value else None
+    except ValueError:
+        # Unknown ID: the stream opens with a resync
+        return -1
+
+
+@router.get("/stream", status_code=status.HTTP_200_OK)
+async def stream_notifications(
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+    current_user: Principal = Depends(get_current_active_user)
+):
+    """
+    Stream the current user's new notifications as Server-Sent Events.
+
+    - `notification` events carry `{"notifications": [...]}` and an `id`
+    - `resync` events mean notifications may have been missed: reload
+      the unread count and list
+    - A comment line is sent every NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+      so proxies keep idle streams open
+
+    Reconnect with the `Last-Event-ID` header set to the last `id`
+    received to get what was missed meanwhile. Returns 429 when the user
+    already has NOTIFICATION_STREAM_MAX_CONNECTIONS_PER_USER streams open.
+    """
+    connection = get_notification_broker().connect(current_user.id, _parse_event_id(last_event_id))
+
+    async def events():
+        try:
+            yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+            while True:
+                try:
+                    item = await connection.next(settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if item is None:
+                    break
+                if item == RESYNC:
+                    yield "event: resync\ndata: {}\n\n"
+                    continue
+                message_id, notifications = item
+                yield (
+                    f"id: {message_id}\nevent: notification\n"
+                    f"data: {json.dumps({'notifications': notifications})}\n\n"
+                )
+        finally:
+            connection.close()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
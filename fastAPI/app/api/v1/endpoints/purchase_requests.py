@@ -0,0 +1,195 @@
+"""
+Purchase Request endpoints.
+Provides listing and management of purchase requests.
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.deps import get_current_active_user, require_end_user, require_role
+from app.core.principals import Principal, can_view_all_purchase_requests
+from app.core.roles import UserRole
+from app.core.status import PurchaseRequestStatus, UrgencyLevel
+from app.schemas.purchase_request import (
+    PRBulkStatusResult,
+    PRBulkStatusUpdate,
+    PRStatusTransitionResult,
+    PRStatusUpdate,
+    PurchaseRequestBulkCreate,
+    PurchaseRequestBulkResult,
+    PurchaseRequestCreate,
+    PurchaseRequestDetail,
+    PurchaseRequestPage,
+    PurchaseRequestSummary,
+)
+from app.services.pr_workflow_service import PRWorkflowService
+from app.services.purchase_request_service import PurchaseRequestService
+
+
+router = APIRouter()
+
+# Planning imports are done by end users or by procurement on their behalf
+require_pr_importer = require_role(UserRole.END_USER, UserRole.PROCUREMENT_OFFICER, UserRole.ADMIN)
+
+
+@router.get("", response_model=PurchaseRequestPage, status_code=status.HTTP_200_OK)
+async def list_purchase_requests(
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    status_filter: Optional[PurchaseRequestStatus] = Query(None, alias="status"),
+    urgency_level: Optional[UrgencyLevel] = None,
+    fund_source: Optional[str] = None,
+    department: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    min_total: Optional[Decimal] = Query(None, ge=0),
+    max_total: Optional[Decimal] = Query(None, ge=0),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    List purchase requests, newest first.
+    
+    - **cursor**: Pass `next_cursor` from the previous response to get the next page
+    - **limit**: Page size (default 20, max 100)
+    - **status**, **urgency_level**, **fund_source**, **department**: Exact-match filters
+    - **created_from** / **created_to**: Creation date range (inclusive / exclusive)
+    - **min_total** / **max_total**: Total estimated cost of the items (inclusive)
+    
+    End users only see their own purchase requests.
+    """
+    service = PurchaseRequestService(db)
+    return await service.list_purchase_requests(
+        limit=limit,
+        cursor=cursor,
+        status=status_filter,
+        urgency_level=urgency_level,
+        fund_source=fund_source,
+        department=department,
+        created_from=created_from,
+        created_to=created_to,
+        min_total=min_total,
+        max_total=max_total,
+        end_user_id=None if can_view_all_purchase_requests(current_user) else current_user.id
+    )
+
+
+@router.get("/{pr_id}", response_model=PurchaseRequestDetail, status_code=status.HTTP_200_OK)
+async def get_purchase_request(
+    pr_id: int,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get a purchase request with its items, RFQ (canvasses and supplier
+    quotations), BAC documents, purchase order and approval routing.
+    
+    End users can only view their own purchase requests.
+    """
+    service = PurchaseRequestService(db)
+    purchase_request = await service.get_purchase_request_detail(pr_id)
+    
+    # Other users' PRs are reported as missing rather than forbidden
+    if purchase_request is None or (
+        not can_view_all_purchase_requests(current_user)
+        and purchase_request.end_user_id != current_user.id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Purchase request not found"
+        )
+    
+    return PurchaseRequestDetail.model_validate(purchase_request)
+
+
+@router.post("", response_model=PurchaseRequestSummary, status_code=status.HTTP_201_CREATED)
+async def create_purchase_request(
+    pr_data: PurchaseRequestCreate,
+    current_user: Principal = Depends(require_end_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create a purchase request with its items.
+    
+    The PR number (PR-YYYY-####) is assigned automatically and the PR
+    starts in PR_UNDER_REVIEW.
+    """
+    service = PurchaseRequestService(db)
+    return await service.create_purchase_request(pr_data, current_user.id)
+
+
+@router.post("/bulk", response_model=PurchaseRequestBulkResult, status_code=status.HTTP_200_OK)
+async def bulk_create_purchase_requests(
+    bulk_data: PurchaseRequestBulkCreate,
+    current_user: Principal = Depends(require_pr_importer),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Create up to 1000 purchase requests in one transaction.
+    
+    Each entry has the same shape as a single create request. Invalid
+    entries are skipped and reported with their validation errors; the
+    response lists one result per entry in request order.
+    """
+    service = PurchaseRequestService(db)
+    return await service.bulk_create_purchase_requests(bulk_data.purchase_requests, current_user.id)
+
+
+@router.post("/bulk/status", response_model=PRBulkStatusResult, status_code=status.HTTP_200_OK)
+async def bulk_update_purchase_request_status(
+    update_data: PRBulkStatusUpdate,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Move many purchase requests to one status, e.g. cancel every PR of a
+    withdrawn fund source.
+    
+    - **pr_ids** and/or **fund_source**: Which PRs to move (at least one is required)
+    - **from_statuses**: Only move PRs currently in one of these statuses
+    
+    PRs your role cannot move to the target status from their current one
+    are left alone. End users can only move their own purchase requests.
+    """
+    service = PRWorkflowService(db)
+    return await service.bulk_transition(
+        update_data.status,
+        current_user,
+        pr_ids=update_data.pr_ids,
+        fund_source=update_data.fund_source,
+        from_statuses=update_data.from_statuses,
+        notes=update_data.notes,
+        end_user_id=None if can_view_all_purchase_requests(current_user) else current_user.id
+    )
+
+
+@router.post("/{pr_id}/status", response_model=PRStatusTransitionResult, status_code=status.HTTP_200_OK)
+async def update_purchase_request_status(
+    pr_id: int,
+    update_data: PRStatusUpdate,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Move a purchase request to another status.
+    
+    - **expected_version**: The `version` you last saw; if the PR has changed
+      since, nothing is updated and 409 is returned
+    
+    Returns 403 if your role can never move a PR to the target status and
+    409 if this PR cannot move there from its current status.
+    """
+    service = PRWorkflowService(db)
+    return await service.transition(
+        pr_id,
+        update_data.status,
+        current_user,
+        expected_version=update_data.expected_version,
+        notes=update_data.notes,
+        end_user_id=None if can_view_all_purchase_requests(current_user) else current_user.id
+    )
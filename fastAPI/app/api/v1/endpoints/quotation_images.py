@@ -0,0 +1,46 @@
+"""
+Quotation image endpoints.
+Provides cacheable, ranged downloads of supplier quotation images.
+"""
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_read_db
+from app.core.deps import get_current_active_user
+from app.core.downloads import file_download
+from app.core.principals import Principal
+from app.services.document_service import DocumentService
+
+
+router = APIRouter()
+
+
+@router.api_route("/{image_id}/download", methods=["GET", "HEAD"], status_code=status.HTTP_200_OK)
+async def download_quotation_image(
+    image_id: int,
+    request: Request,
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Download a quotation image.
+
+    Supports a single `Range` (206) and `If-None-Match` /
+    `If-Modified-Since` (304). Images the user may not download are
+    reported as missing.
+    """
+    image = await DocumentService(db).get_quotation_image_download(image_id, current_user)
+    if image is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Quotation image not found"
+        )
+    return await file_download(
+        request,
+        os.path.join(settings.UPLOAD_DIR, image.image_path),
+        media_type=image.mime_type,
+        filename=image.original_filename
+    )
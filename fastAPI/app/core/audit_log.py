@@ -0,0 +1,422 @@
+"""
+Activity log writer.
+Queues audit entries in-process and writes them with multi-row INSERTs
+from a background task, so hot endpoints do not pay for an extra write in
+their own transaction. Entries that must commit or roll back with the
+caller's changes are written through the caller's session instead.
+"""
+import asyncio
+import json
+import os
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.config import settings
+from app.core.database import engine
+from app.core.status import ActivityAction
+from app.models.activity_log import ActivityLog
+
+
+# Longest wait between attempts while the database rejects a batch
+MAX_RETRY_DELAY_SECONDS = 30.0
+
+
+def audit_entry(
+    action: ActivityAction,
+    entity_type: str,
+    description: str,
+    user_id: Optional[int] = None,
+    entity_id: Optional[int] = None,
+    old_values: Optional[Dict[str, Any]] = None,
+    new_values: Optional[Dict[str, Any]] = None,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+    created_at: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Build an activity_logs row; created_at defaults to now, not to flush time."""
+    return {
+        "user_id": user_id,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "old_values": old_values,
+        "new_values": new_values,
+        "description": description,
+        "ip_address": ip_address[:45] if ip_address else ip_address,
+        "user_agent": user_agent[:500] if user_agent else user_agent,
+        "created_at": created_at or datetime.utcnow(),
+    }
+
+
+async def record_in_transaction(db: AsyncSession, entries: List[Dict[str, Any]]) -> None:
+    """
+    Write entries in the caller's transaction.
+    Use when the audit rows must commit or roll back with the change they describe.
+    """
+    if entries:
+        await db.execute(insert(ActivityLog), entries)
+
+
+def _to_json(entry: Dict[str, Any]) -> str:
+    return json.dumps({
+        **entry,
+        "action": ActivityAction(entry["action"]).value,
+        "created_at": entry["created_at"].isoformat(),
+    })
+
+
+def _from_json(line: str) -> Dict[str, Any]:
+    entry = json.loads(line)
+    entry["action"] = ActivityAction(entry["action"])
+    entry["created_at"] = datetime.fromisoformat(entry["created_at"])
+    return entry
+
+
+def _read_entries(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as spool:
+        return [_from_json(line) for line in spool if line.strip()]
+
+
+def _process_running(pid: int) -> bool:
+    """Whether a process with this id exists (POSIX only; assumed gone elsewhere)."""
+    if os.name != "posix":
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class AuditLogWriter:
+    """
+    Bounded queue of activity log entries with a batching background flusher.
+
+    A batch is written when batch_size entries are queued or
+    flush_interval_seconds after its first entry, whichever comes first.
+    When the queue is full, record() waits up to enqueue_timeout_seconds
+    for room and then writes the entry itself, so a stalled database slows
+    callers down instead of growing memory or dropping entries. Entries
+    that cannot be written on shutdown are appended to a JSON-lines spool
+    file, which start() replays (also picking up a replay cut short when
+    its worker died). An entry may be written twice if the database
+    fails mid-commit during shutdown or a replay is cut short, but is
+    never lost. Rows the
+    database rejects outright (IntegrityError, DataError) are never
+    retried: they go to a dead-letter file next to the spool
+    (<spool>.rejected) for someone to inspect.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        max_queue: int = 10000,
+        batch_size: int = 200,
+        flush_interval_seconds: float = 1.0,
+        enqueue_timeout_seconds: float = 0.5,
+        spool_path: Optional[str] = None,
+        shutdown_timeout_seconds: float = 10.0
+    ):
+        self.engine = engine
+        self.max_queue = max_queue
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = flush_interval_seconds
+        self.enqueue_timeout_seconds = enqueue_timeout_seconds
+        self.spool_path = spool_path
+        self.rejected_path = f"{spool_path}.rejected" if spool_path else None
+        self.shutdown_timeout_seconds = shutdown_timeout_seconds
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        # Batch taken off the queue but not yet written
+        self._pending: List[Dict[str, Any]] = []
+
+        # Metrics
+        self.enqueued = 0
+        self.peak_queued = 0
+        self.written = 0
+        self.batches = 0
+        self.backpressure_waits = 0
+        self.direct_writes = 0
+        self.flush_failures = 0
+        self.rejected = 0
+        self.spooled = 0
+        self.replayed = 0
+        self.recovered = 0
+        self._flush_seconds_total = 0.0
+
+    async def record(self, entry: Dict[str, Any]) -> None:
+        """Queue an entry (see audit_entry) for the background flusher."""
+        if self._task is None or self._task.done() or self._closing:
+            # Not running (scripts, tests, shutdown): write it now
+            await self._write_direct([entry])
+            return
+
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.backpressure_waits += 1
+            try:
+                await asyncio.wait_for(self._queue.put(entry), self.enqueue_timeout_seconds)
+            except asyncio.TimeoutError:
+                await self._write_direct([entry])
+                return
+
+        self.enqueued += 1
+        self.peak_queued = max(self.peak_queued, self._queue.qsize())
+
+    async def _insert(self, entries: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        async with self.engine.begin() as conn:
+            await conn.execute(insert(ActivityLog), entries)
+        self._flush_seconds_total += time.perf_counter() - started
+        self.written += len(entries)
+        self.batches += 1
+
+    async def _insert_each(self, entries: List[Dict[str, Any]]) -> int:
+        """
+        Insert rows one at a time, dead-lettering those the database
+        rejects and spooling the rest if it fails. Returns rows inserted.
+        """
+        inserted = 0
+        rejected = []
+        for index, entry in enumerate(entries):
+            try:
+                await self._insert([entry])
+                inserted += 1
+            except (IntegrityError, DataError):
+                rejected.append(entry)
+            except Exception:
+                self.flush_failures += 1
+                self._spool(entries[index:])
+                break
+        self.rejected += len(rejected)
+        self._append(self.rejected_path, rejected)
+        return inserted
+
+    async def _write_direct(self, entries: List[Dict[str, Any]]) -> None:
+        """Write entries from the caller's task, spooling them if that fails."""
+        self.direct_writes += len(entries)
+        try:
+            await self._insert(entries)
+        except (IntegrityError, DataError):
+            await self._insert_each(entries)
+        except Exception:
+            self.flush_failures += 1
+            self._spool(entries)
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        """Write a batch, retrying with backoff until it lands or shutdown begins."""
+        delay = self.flush_interval_seconds
+        while True:
+            try:
+                await self._insert(batch)
+                return
+            except (IntegrityError, DataError):
+                # One bad row (e.g. a deleted user) must not hold up the rest
+                await self._insert_each(batch)
+                return
+            except Exception:
+                self.flush_failures += 1
+                if self._closing:
+                    self._spool(batch)
+                    return
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RETRY_DELAY_SECONDS)
+
+    async def _next_batch(self) -> List[Dict[str, Any]]:
+        """Wait for an entry, then collect more until batch_size or the interval elapses."""
+        loop = asyncio.get_running_loop()
+        try:
+            batch = [await asyncio.wait_for(self._queue.get(), self.flush_interval_seconds)]
+        except asyncio.TimeoutError:
+            return []
+
+        deadline = loop.time() + self.flush_interval_seconds
+        while len(batch) < self.batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0 or self._closing:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while not (self._closing and self._queue.empty()):
+            self._pending = await self._next_batch()
+            if self._pending:
+                await self._flush(self._pending)
+                self._pending = []
+
+    def _append(self, path: Optional[str], entries: List[Dict[str, Any]]) -> None:
+        """Append entries to a JSON-lines file (one write, fsynced)."""
+        if not entries:
+            return
+        if not path:
+            raise RuntimeError(f"{len(entries)} activity log entries could not be written")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as spool:
+            spool.write("".join(_to_json(entry) + "\n" for entry in entries))
+            spool.flush()
+            os.fsync(spool.fileno())
+
+    def _spool(self, entries: List[Dict[str, Any]]) -> None:
+        """Append entries to the spool file for the next start() to replay."""
+        self._append(self.spool_path, entries)
+        self.spooled += len(entries)
+
+    def _claim_path(self, pid: int) -> str:
+        return f"{self.spool_path}.{pid}.replay"
+
+    def recover_claims(self) -> int:
+        """
+        Put the entries of replays that never finished (the worker was
+        killed mid-replay) back on the spool. Claims of a worker that is
+        still running are left alone. Entries written before the replay
+        stopped are written again. Returns the number of entries recovered.
+        """
+        directory = os.path.dirname(self.spool_path) or "."
+        pattern = re.compile(re.escape(os.path.basename(self.spool_path)) + r"\.(\d+)\.replay$")
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return 0
+        pids = [int(match.group(1)) for match in map(pattern.match, names) if match]
+
+        own_claim = self._claim_path(os.getpid())
+        recovered = 0
+        # Our own leftover first (a restart reusing the pid), so the
+        # renames below never overwrite an unrecovered claim
+        for pid in sorted(pids, key=lambda pid: pid != os.getpid()):
+            if pid != os.getpid():
+                if _process_running(pid):
+                    continue
+                try:
+                    os.rename(self._claim_path(pid), own_claim)
+                except FileNotFoundError:
+                    # Another worker recovered it first
+                    continue
+            entries = _read_entries(own_claim)
+            self._append(self.spool_path, entries)
+            os.remove(own_claim)
+            recovered += len(entries)
+        self.recovered += recovered
+        return recovered
+
+    async def replay_spool(self) -> int:
+        """
+        Write entries left in the spool file by an earlier shutdown, and
+        by replays that never finished (see recover_claims).
+        The file is claimed by renaming it, so only one worker replays it;
+        entries that still cannot be written go back to the spool, and
+        rows the database rejects to the dead-letter file. Returns the
+        number of entries inserted.
+        """
+        if not self.spool_path:
+            return 0
+        self.recover_claims()
+        claimed = self._claim_path(os.getpid())
+        try:
+            os.rename(self.spool_path, claimed)
+        except FileNotFoundError:
+            return 0
+
+        entries = _read_entries(claimed)
+        for start in range(0, len(entries), self.batch_size):
+            batch = entries[start:start + self.batch_size]
+            try:
+                await self._insert(batch)
+                inserted = len(batch)
+            except (IntegrityError, DataError):
+                inserted = await self._insert_each(batch)
+            except Exception:
+                self.flush_failures += 1
+                self._spool(entries[start:])
+                break
+            self.replayed += inserted
+        os.remove(claimed)
+        return self.replayed
+
+    async def start(self) -> None:
+        """Replay the spool file, then start the background flusher."""
+        if self._task is None:
+            self._closing = False
+            await self.replay_spool()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Flush everything queued and stop the flusher.
+        Anything still unwritten after shutdown_timeout_seconds is spooled.
+        """
+        if self._task is None:
+            return
+        self._closing = True
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), self.shutdown_timeout_seconds)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            leftover = self._pending
+            while not self._queue.empty():
+                leftover.append(self._queue.get_nowait())
+            self._pending = []
+            self._spool(leftover)
+        self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and write metrics."""
+        return {
+            "running": self._task is not None,
+            "max_queue": self.max_queue,
+            "queued": self._queue.qsize(),
+            "peak_queued": self.peak_queued,
+            "batch_size": self.batch_size,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "batches": self.batches,
+            "backpressure_waits": self.backpressure_waits,
+            "direct_writes": self.direct_writes,
+            "flush_failures": self.flush_failures,
+            "rejected": self.rejected,
+            "spooled": self.spooled,
+            "replayed": self.replayed,
+            "recovered": self.recovered,
+            "flush_seconds_avg": (
+                self._flush_seconds_total / self.batches if self.batches else 0.0
+            ),
+        }
+
+
+# Global activity log writer instance
+_audit_log_writer = AuditLogWriter(
+    engine,
+    max_queue=settings.AUDIT_LOG_QUEUE_SIZE,
+    batch_size=settings.AUDIT_LOG_BATCH_SIZE,
+    flush_interval_seconds=settings.AUDIT_LOG_FLUSH_INTERVAL_SECONDS,
+    enqueue_timeout_seconds=settings.AUDIT_LOG_ENQUEUE_TIMEOUT_SECONDS,
+    spool_path=settings.AUDIT_LOG_SPOOL_PATH,
+)
+
+
+def get_audit_log_writer() -> AuditLogWriter:
+    """Get global activity log writer instance."""
+    return _audit_log_writer
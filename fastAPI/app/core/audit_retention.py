@@ -0,0 +1,501 @@
+"""
+Activity log retention.
+On MySQL, activity_logs is range-partitioned by month on created_at
+(PARTITION BY RANGE (TO_DAYS(created_at))), so expired history is removed
+with ALTER TABLE ... DROP PARTITION instead of a row-by-row DELETE, and
+each partition's indexes stay the size of one month. Before a month is
+dropped its rows are written to a gzip-compressed JSON-lines file under
+AUDIT_LOG_ARCHIVE_DIR, newest first, where the activity log API can still
+read them. Next to each file a small JSON index records its time span
+and the users, actions and entities it holds, so a filtered history
+query opens only the files that can match. Databases without partitioning (SQLite in development and
+tests) fall back to a ranged DELETE per month.
+"""
+import gzip
+import heapq
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.engine import Connection
+
+from app.models.activity_log import ActivityLog
+
+
+TABLE = ActivityLog.__tablename__
+
+# Catch-all partition for rows past the last monthly partition
+FUTURE_PARTITION = "pfuture"
+
+# Indexes from earlier schemas, replaced by the query-path indexes on the
+# model; dropped by sync_indexes so inserts maintain fewer trees
+OBSOLETE_INDEXES = (
+    "ix_activity_logs_user_id",
+    "ix_activity_logs_entity_type",
+    "ix_activity_logs_created_at",
+    "ix_activity_logs_action",
+    "ix_activity_logs_user_action",
+    "ix_activity_logs_entity",
+)
+
+ARCHIVE_FILE_RE = re.compile(r"^activity_logs_(\d{4})_(\d{2})(?:\.(\d+))?\.jsonl\.gz$")
+ARCHIVE_SUFFIX = ".jsonl.gz"
+INDEX_SUFFIX = ".index.json"
+
+# Rows per fetch while archiving a month
+ARCHIVE_FETCH_SIZE = 1000
+
+
+def month_floor(moment: datetime) -> datetime:
+    """First instant of moment's month."""
+    return datetime(moment.year, moment.month, 1)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    """Shift a month start by count months."""
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime) -> str:
+    """Partition holding month's rows, e.g. p202401."""
+    return f"p{month.year:04d}{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    """Month of a monthly partition name; None for pfuture."""
+    match = re.fullmatch(r"p(\d{4})(\d{2})", name)
+    return datetime(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def partition_clauses(first: datetime, last: datetime) -> List[str]:
+    """PARTITION definitions for each month from first to last, then pfuture."""
+    clauses = []
+    month = first
+    while month <= last:
+        bound = add_months(month, 1).strftime("%Y-%m-%d")
+        clauses.append(f"PARTITION {partition_name(month)} VALUES LESS THAN (TO_DAYS('{bound}'))")
+        month = add_months(month, 1)
+    clauses.append(f"PARTITION {FUTURE_PARTITION} VALUES LESS THAN MAXVALUE")
+    return clauses
+
+
+def expiry_cutoff(now: datetime, retention_days: int) -> datetime:
+    """Months ending at or before this instant are past retention."""
+    return now - timedelta(days=retention_days)
+
+
+def supports_partitioning(connection: Connection) -> bool:
+    return connection.dialect.name == "mysql"
+
+
+def list_partitions(connection: Connection) -> List[str]:
+    """Partition names of activity_logs in order; empty if not partitioned."""
+    if not supports_partitioning(connection):
+        return []
+    rows = connection.execute(text(
+        "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+        "AND PARTITION_NAME IS NOT NULL ORDER BY PARTITION_ORDINAL_POSITION"
+    ), {"table": TABLE})
+    return list(rows.scalars())
+
+
+def index_alterations(connection: Connection) -> List[str]:
+    """ALTER TABLE clauses that bring activity_logs' indexes in line with the model (MySQL)."""
+    existing = set(connection.execute(text(
+        "SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+    ), {"table": TABLE}).scalars())
+    alterations = [f"ADD INDEX {index.name} ({', '.join(column.name for column in index.columns)})"
+                   for index in ActivityLog.__table__.indexes if index.name not in existing]
+    # Added first: MySQL needs some index on user_id while its foreign key exists
+    alterations += [f"DROP INDEX {name}" for name in OBSOLETE_INDEXES if name in existing]
+    return alterations
+
+
+def sync_indexes(connection: Connection) -> List[str]:
+    """Create missing and drop obsolete activity_logs indexes; returns the changes."""
+    if not supports_partitioning(connection):
+        return []
+    alterations = index_alterations(connection)
+    if alterations:
+        connection.execute(text(f"ALTER TABLE {TABLE} " + ", ".join(alterations)))
+    return alterations
+
+
+def enable_partitioning(connection: Connection, now: datetime, months_ahead: int) -> List[str]:
+    """
+    Convert activity_logs to monthly range partitions (one-time, MySQL only).
+
+    MySQL requires the partitioning column in every unique key and does
+    not allow foreign keys on partitioned tables, so the primary key
+    becomes (id, created_at) and the user_id foreign key is dropped; the
+    ORM relationship to users is unaffected. Rewrites the whole table.
+    Returns the partition names.
+    """
+    if not supports_partitioning(connection):
+        raise RuntimeError("activity_logs partitioning requires MySQL")
+    if list_partitions(connection):
+        return list_partitions(connection)
+
+    foreign_keys = connection.execute(text(
+        "SELECT CONSTRAINT_NAME FROM information_schema.TABLE_CONSTRAINTS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table "
+        "AND CONSTRAINT_TYPE = 'FOREIGN KEY'"
+    ), {"table": TABLE}).scalars().all()
+
+    alterations = [f"DROP FOREIGN KEY {name}" for name in foreign_keys]
+    alterations += index_alterations(connection)
+    alterations += ["DROP PRIMARY KEY", "ADD PRIMARY KEY (id, created_at)"]
+    connection.execute(text(f"ALTER TABLE {TABLE} " + ", ".join(alterations)))
+
+    oldest = connection.execute(select(func.min(ActivityLog.created_at))).scalar_one_or_none()
+    first = month_floor(oldest or now)
+    last = add_months(month_floor(now), months_ahead)
+    connection.execute(text(
+        f"ALTER TABLE {TABLE} PARTITION BY RANGE (TO_DAYS(created_at)) ("
+        + ", ".join(partition_clauses(first, last)) + ")"
+    ))
+    return list_partitions(connection)
+
+
+def ensure_future_partitions(connection: Connection, now: datetime, months_ahead: int) -> List[str]:
+    """Split pfuture so every month up to months_ahead has its own partition."""
+    months = [partition_month(name) for name in list_partitions(connection)]
+    months = [month for month in months if month is not None]
+    if not months:
+        return []
+
+    target = add_months(month_floor(now), months_ahead)
+    first_new = add_months(max(months), 1)
+    if first_new > target:
+        return []
+    clauses = partition_clauses(first_new, target)
+    connection.execute(text(
+        f"ALTER TABLE {TABLE} REORGANIZE PARTITION {FUTURE_PARTITION} INTO (" + ", ".join(clauses) + ")"
+    ))
+    return [clause.split()[1] for clause in clauses[:-1]]
+
+
+def expired_months(connection: Connection, now: datetime, retention_days: int) -> List[datetime]:
+    """Months, oldest first, whose rows are all older than the retention period."""
+    cutoff = expiry_cutoff(now, retention_days)
+    partitions = list_partitions(connection)
+    if partitions:
+        months = [partition_month(name) for name in partitions]
+        return [month for month in months if month is not None and add_months(month, 1) <= cutoff]
+
+    oldest = connection.execute(select(func.min(ActivityLog.created_at))).scalar_one_or_none()
+    if oldest is None:
+        return []
+    months = []
+    month = month_floor(oldest)
+    while add_months(month, 1) <= cutoff:
+        months.append(month)
+        month = add_months(month, 1)
+    return months
+
+
+def _archive_line(row: Dict[str, Any]) -> str:
+    return json.dumps({
+        key: value.isoformat() if isinstance(value, datetime)
+        else value.value if isinstance(value, Enum)
+        else value
+        for key, value in row.items()
+    }) + "\n"
+
+
+class _ArchiveIndexBuilder:
+    """Collects an archive file's index while its rows are written."""
+
+    def __init__(self):
+        self.rows = 0
+        self.oldest: Optional[datetime] = None
+        self.newest: Optional[datetime] = None
+        self.user_ids = set()
+        self.actions = set()
+        self.entities: Dict[str, set] = {}
+
+    def add(self, row: Dict[str, Any]) -> None:
+        created_at = row["created_at"]
+        self.rows += 1
+        self.oldest = created_at if self.oldest is None else min(self.oldest, created_at)
+        self.newest = created_at if self.newest is None else max(self.newest, created_at)
+        self.user_ids.add(row["user_id"])
+        action = row["action"]
+        self.actions.add(action.value if isinstance(action, Enum) else action)
+        self.entities.setdefault(row["entity_type"], set()).add(row["entity_id"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        def ordered(values):
+            # None (no user / no entity id) sorts first
+            return sorted(values, key=lambda value: (value is not None, value))
+
+        return {
+            "rows": self.rows,
+            "oldest": self.oldest.isoformat(),
+            "newest": self.newest.isoformat(),
+            "user_ids": ordered(self.user_ids),
+            "actions": sorted(self.actions),
+            "entities": {entity_type: ordered(ids) for entity_type, ids in sorted(self.entities.items())},
+        }
+
+
+def index_path(path: str) -> str:
+    """Index file of an archive file."""
+    return path[:-len(ARCHIVE_SUFFIX)] + INDEX_SUFFIX
+
+
+def _write_index(path: str, builder: _ArchiveIndexBuilder) -> None:
+    partial = index_path(path) + ".partial"
+    with open(partial, "w", encoding="utf-8") as index:
+        json.dump(builder.to_dict(), index)
+        index.flush()
+        os.fsync(index.fileno())
+    os.replace(partial, index_path(path))
+
+
+# Parsed indexes by archive path, with the index file's mtime when parsed
+_index_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+
+def read_index(path: str) -> Optional[Dict[str, Any]]:
+    """
+    An archive file's index; None if it has none (or it is unreadable).
+    Parsed once and then served from memory until the index file changes.
+    """
+    try:
+        mtime = os.stat(index_path(path)).st_mtime_ns
+        cached = _index_cache.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(index_path(path), encoding="utf-8") as index:
+            data = json.load(index)
+        data["oldest"] = datetime.fromisoformat(data["oldest"])
+        data["newest"] = datetime.fromisoformat(data["newest"])
+        data["user_ids"] = set(data["user_ids"])
+        data["actions"] = set(data["actions"])
+        data["entities"] = {entity_type: set(ids) for entity_type, ids in data["entities"].items()}
+    except (OSError, ValueError, KeyError, TypeError):
+        _index_cache.pop(path, None)
+        return None
+    _index_cache[path] = (mtime, data)
+    return data
+
+
+def index_may_match(
+    index: Dict[str, Any],
+    equals: Dict[str, Any],
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> bool:
+    """
+    Whether the file behind index can hold a row with the given
+    user_id/action/entity_type/entity_id (None: any) in [created_from, created_to).
+    """
+    if created_from is not None and index["newest"] < created_from:
+        return False
+    if created_to is not None and index["oldest"] >= created_to:
+        return False
+    user_id = equals.get("user_id")
+    if user_id is not None and user_id not in index["user_ids"]:
+        return False
+    action = equals.get("action")
+    if action is not None and (action.value if isinstance(action, Enum) else action) not in index["actions"]:
+        return False
+    entity_type, entity_id = equals.get("entity_type"), equals.get("entity_id")
+    entities = index["entities"]
+    if entity_type is not None:
+        if entity_type not in entities:
+            return False
+        entities = {entity_type: entities[entity_type]}
+    if entity_id is not None and not any(entity_id in ids for ids in entities.values()):
+        return False
+    return True
+
+
+def _archive_path(archive_dir: str, month: datetime) -> str:
+    """First unused file name for month; an earlier file is never overwritten."""
+    stem = f"activity_logs_{month.year:04d}_{month.month:02d}"
+    path = os.path.join(archive_dir, f"{stem}.jsonl.gz")
+    sequence = 0
+    while os.path.exists(path):
+        sequence += 1
+        path = os.path.join(archive_dir, f"{stem}.{sequence}.jsonl.gz")
+    return path
+
+
+def archive_month(connection: Connection, month: datetime, archive_dir: str) -> Tuple[Optional[str], int]:
+    """
+    Write every row older than the end of month to a new archive file.
+
+    On a partitioned table that is exactly the oldest partition (stragglers
+    inserted late with an old created_at land there too). Returns the
+    file path (None if there were no rows) and the row count. The file's
+    index is written before the file itself appears.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    path = _archive_path(archive_dir, month)
+    partial = path + ".partial"
+    table = ActivityLog.__table__
+    result = connection.execution_options(yield_per=ARCHIVE_FETCH_SIZE).execute(
+        select(table)
+        .where(table.c.created_at < add_months(month, 1))
+        .order_by(table.c.created_at.desc(), table.c.id.desc())
+    )
+
+    builder = _ArchiveIndexBuilder()
+    with open(partial, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as archive:
+            for row in result.mappings():
+                archive.write(_archive_line(row).encode())
+                builder.add(row)
+        raw.flush()
+        os.fsync(raw.fileno())
+
+    if builder.rows == 0:
+        os.remove(partial)
+        return None, 0
+    _write_index(path, builder)
+    os.replace(partial, path)
+    return path, builder.rows
+
+
+def drop_month(connection: Connection, month: datetime) -> None:
+    """Remove month's rows: DROP PARTITION when partitioned, else a ranged DELETE."""
+    name = partition_name(month)
+    if name in list_partitions(connection):
+        connection.execute(text(f"ALTER TABLE {TABLE} DROP PARTITION {name}"))
+    else:
+        connection.execute(delete(ActivityLog).where(ActivityLog.created_at < add_months(month, 1)))
+
+
+def archive_and_drop(connection: Connection, month: datetime, archive_dir: str) -> Tuple[Optional[str], int]:
+    """Archive month, then drop it. The file is complete before anything is removed."""
+    path, count = archive_month(connection, month, archive_dir)
+    drop_month(connection, month)
+    return path, count
+
+
+def archive_files(archive_dir: str) -> List[Tuple[datetime, str]]:
+    """(month, path) of every archive file, newest month first."""
+    if not os.path.isdir(archive_dir):
+        return []
+    files = []
+    for name in os.listdir(archive_dir):
+        match = ARCHIVE_FILE_RE.match(name)
+        if match:
+            month = datetime(int(match.group(1)), int(match.group(2)), 1)
+            files.append((month, os.path.join(archive_dir, name)))
+    return sorted(files, reverse=True)
+
+
+def _read_archive(path: str) -> Iterator[Dict[str, Any]]:
+    with gzip.open(path, "rt", encoding="utf-8") as archive:
+        for line in archive:
+            row = json.loads(line)
+            row["created_at"] = datetime.fromisoformat(row["created_at"])
+            yield row
+
+
+def index_archives(archive_dir: str) -> List[str]:
+    """Write the index of every archive file that has none (files from older releases)."""
+    written = []
+    for _, path in archive_files(archive_dir):
+        if read_index(path) is None:
+            builder = _ArchiveIndexBuilder()
+            for row in _read_archive(path):
+                builder.add(row)
+            if builder.rows:
+                _write_index(path, builder)
+                written.append(path)
+    return written
+
+
+class _Head:
+    """A file's next row in the merge heap; the newest row sorts first."""
+
+    __slots__ = ("key", "row", "rows")
+
+    def __init__(self, row: Dict[str, Any], rows: Iterator[Dict[str, Any]]):
+        self.rows = rows
+        self.set(row)
+
+    def set(self, row: Dict[str, Any]) -> None:
+        self.key = (row["created_at"], row["id"])
+        self.row = row
+
+    def __lt__(self, other: "_Head") -> bool:
+        return self.key > other.key
+
+
+def _merge_newest_first(files: List[Tuple[datetime, str]]) -> Iterator[Dict[str, Any]]:
+    """
+    Merge archive files newest row first. files are (bound, path), where
+    no row in the file is newer than bound; a file is only opened once
+    the merge reaches its bound, so a reader that stops early never
+    touches the older files.
+    """
+    files = sorted(files, reverse=True)
+    heap: List[_Head] = []
+    opened = 0
+    while True:
+        while opened < len(files) and (not heap or files[opened][0] >= heap[0].key[0]):
+            rows = _read_archive(files[opened][1])
+            opened += 1
+            row = next(rows, None)
+            if row is not None:
+                heapq.heappush(heap, _Head(row, rows))
+        if not heap:
+            return
+        head = heap[0]
+        yield head.row
+        row = next(head.rows, None)
+        if row is None:
+            heapq.heappop(heap)
+        else:
+            head.set(row)
+            heapq.heapreplace(heap, head)
+
+
+def iter_archived(
+    archive_dir: str,
+    newer_than: Optional[datetime] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    equals: Optional[Dict[str, Any]] = None,
+    until: Optional[datetime] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Archived rows, newest first by (created_at, id), across all files.
+
+    Files are merged rather than concatenated because a file may hold late
+    stragglers older than the next file's rows, and each file is opened
+    only when the merge reaches the newest row it can hold. Files that
+    can only hold rows older than newer_than, or whose index shows
+    they hold nothing matching created_from/created_to and equals
+    (user_id, action, entity_type, entity_id) or only rows newer than
+    until (a cursor's position), are never opened. Rows are not
+    filtered here. Reads files: call it, and advance the iterator, off
+    the event loop.
+    """
+    files = []
+    for month, path in archive_files(archive_dir):
+        index = read_index(path)
+        if index is None:
+            # No index: all that is known is that rows end with the month
+            bound = add_months(month, 1)
+            if (newer_than is None or bound > newer_than) and (created_from is None or bound > created_from):
+                files.append((bound, path))
+        elif (
+            (newer_than is None or index["newest"] >= newer_than)
+            and (until is None or index["oldest"] <= until)
+            and index_may_match(index, equals or {}, created_from, created_to)
+        ):
+            files.append((index["newest"], path))
+    return _merge_newest_first(files)
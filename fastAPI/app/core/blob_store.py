@@ -0,0 +1,100 @@
+"""
+Content-addressed document storage.
+Stores each distinct file once under UPLOAD_DIR/blobs, named by its
+SHA-256 and sharded into two levels of directories by the leading hex
+digits (blobs/ab/cd/abcd...), so no directory grows past a few thousand
+entries. Callers decide when a blob may be created or removed; reference
+counts live in the document_blobs table (see DocumentService).
+"""
+import asyncio
+import os
+import time
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+
+
+# Directory under UPLOAD_DIR holding blobs, and where uploads are staged
+# (same filesystem, so a staged file is moved into place by a rename)
+BLOB_DIR = "blobs"
+STAGING_DIR = f"{BLOB_DIR}/staging"
+
+# Directory levels and hex digits per level
+SHARD_LEVELS = 2
+SHARD_WIDTH = 2
+
+
+def blob_path(checksum: str) -> str:
+    """Path of a blob relative to the upload directory."""
+    shards = [checksum[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH] for i in range(SHARD_LEVELS)]
+    return "/".join([BLOB_DIR, *shards, checksum])
+
+
+def is_blob_path(file_path: str, checksum: Optional[str]) -> bool:
+    """Whether file_path is the shared (and immutable) blob for checksum."""
+    return checksum is not None and file_path == blob_path(checksum)
+
+
+class BlobStore:
+    """Blob files under an upload directory. File work runs in the executor."""
+
+    def __init__(self, upload_dir: Optional[str] = None):
+        self.upload_dir = upload_dir or settings.UPLOAD_DIR
+
+    def _abspath(self, relative_path: str) -> str:
+        return os.path.join(self.upload_dir, relative_path)
+
+    def _adopt(self, staged_path: str, checksum: str) -> bool:
+        final_path = self._abspath(blob_path(checksum))
+        if os.path.exists(final_path):
+            # Duplicate content: the existing blob is the copy that is kept
+            os.remove(staged_path)
+            return False
+        with open(staged_path, "rb+") as f:
+            os.fsync(f.fileno())
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(staged_path, final_path)
+        return True
+
+    async def adopt(self, staged_path: str, checksum: str) -> bool:
+        """
+        Make a staged upload (relative path) the blob for checksum.
+        The staged file is renamed into place if the blob does not exist
+        yet, otherwise deleted; it is never copied. Returns True if a new
+        blob was written.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._adopt, self._abspath(staged_path), checksum
+        )
+
+    def _remove(self, relative_path: str) -> bool:
+        try:
+            os.remove(self._abspath(relative_path))
+        except FileNotFoundError:
+            return False
+        return True
+
+    async def remove(self, relative_path: str) -> bool:
+        """Delete a blob or file (relative path). Returns False if it was gone."""
+        return await asyncio.get_running_loop().run_in_executor(None, self._remove, relative_path)
+
+    def _list_files(self, older_than_seconds: float) -> List[Tuple[str, int]]:
+        cutoff = time.time() - older_than_seconds
+        found = []
+        for directory, _, files in os.walk(self._abspath(BLOB_DIR)):
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if stat.st_mtime < cutoff:
+                    found.append((os.path.relpath(path, self.upload_dir).replace(os.sep, "/"), stat.st_size))
+        return found
+
+    async def list_files(self, older_than_seconds: float = 0) -> List[Tuple[str, int]]:
+        """
+        (relative path, size) of every blob and staged file last modified
+        more than older_than_seconds ago. Walks the whole blob directory.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self._list_files, older_than_seconds)
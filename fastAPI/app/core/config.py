@@ -37,6 +37,19 @@ class Settings(BaseSettings):
     DATABASE_MAX_OVERFLOW: int = 10
     DATABASE_POOL_TIMEOUT: int = 30
     DATABASE_POOL_RECYCLE: int = 3600
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_POOL_LIVENESS_INTERVAL_SECONDS: int = 30  # used when pre-ping is off
+    
+    # Read Replicas (comma-separated async URLs; empty = primary only)
+    DATABASE_REPLICA_URLS: str = ""
+    DATABASE_REPLICA_MAX_LAG_SECONDS: int = 5
+    DATABASE_REPLICA_CHECK_INTERVAL_SECONDS: int = 10
+    DATABASE_READ_YOUR_WRITES_SECONDS: int = 10
+    
+    @property
+    def DATABASE_REPLICA_URLS_LIST(self) -> List[str]:
+        """Parse replica URLs into list"""
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
     
     @property
     def DATABASE_URL(self) -> str:
@@ -73,20 +86,56 @@ class Settings(BaseSettings):
     PASSWORD_REQUIRE_NUMBERS: bool = True
     PASSWORD_REQUIRE_SPECIAL: bool = True
     PASSWORD_BCRYPT_COST: int = 12
+    PASSWORD_HASH_POOL_TYPE: str = "thread"  # thread or process
+    PASSWORD_HASH_POOL_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
     
     # Rate Limiting
+    RATE_LIMIT_ENABLED: bool = True
     RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_USER_PER_MINUTE: int = 120
+    RATE_LIMIT_BURST: int = 20
+    RATE_LIMIT_ROUTE_OVERRIDES: str = "/api/v1/auth=30"
+    RATE_LIMIT_EXEMPT_PATHS: str = "/api/v1/health,/api/docs,/api/redoc,/api/openapi.json,/metrics"
     LOGIN_RATE_LIMIT: int = 5
     LOGIN_LOCKOUT_MINUTES: int = 15
+    RATE_LIMIT_BACKEND: str = "memory"  # memory or redis
+    RATE_LIMIT_EVICTION_INTERVAL_SECONDS: int = 60
+    
+    @property
+    def RATE_LIMIT_ROUTE_OVERRIDES_MAP(self) -> dict[str, int]:
+        """Parse route group overrides (prefix=requests_per_minute) into dict"""
+        overrides = {}
+        for entry in self.RATE_LIMIT_ROUTE_OVERRIDES.split(","):
+            if "=" in entry:
+                prefix, per_minute = entry.split("=", 1)
+                overrides[prefix.strip()] = int(per_minute)
+        return overrides
+    
+    @property
+    def RATE_LIMIT_EXEMPT_PATHS_LIST(self) -> List[str]:
+        """Parse rate limit exempt path prefixes into list"""
+        return [path.strip() for path in self.RATE_LIMIT_EXEMPT_PATHS.split(",") if path.strip()]
     
     # Session Timeout
     SESSION_TIMEOUT_MINUTES: int = 120
     
+    # Authentication Caches
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_TTL_SECONDS: int = 600
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    
     # File Upload
     UPLOAD_DIR: str = "uploads"
     MAX_FILE_SIZE_MB: int = 10
     ALLOWED_FILE_TYPES: str = "pdf,doc,docx,xls,xlsx,png,jpg,jpeg"
     QUOTATION_MAX_FILE_SIZE_MB: int = 5
+    UPLOAD_CHUNK_SIZE_KB: int = 64  # block size uploads are written to disk in
+    DOCUMENT_BLOB_GC_GRACE_HOURS: int = 24  # unreferenced blobs are kept this long
+    DOWNLOAD_CHUNK_SIZE_KB: int = 256  # read size when the server cannot sendfile
     
     @property
     def ALLOWED_FILE_EXTENSIONS(self) -> List[str]:
@@ -117,6 +166,13 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "logs/app.log"
     
+    # Metrics
+    METRICS_ENABLED: bool = True
+    
+    # SQL Query Profiler (development/profiling only)
+    QUERY_PROFILER_ENABLED: bool = False
+    QUERY_PROFILER_N_PLUS_ONE_THRESHOLD: int = 5  # identical SELECT shapes per request
+    
     # Celery Configuration
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/2"
@@ -136,9 +192,29 @@ class Settings(BaseSettings):
     CANVASS_NUMBER_PREFIX: str = "CANVASS"
     BAC_DOCUMENT_NUMBER_PREFIX: str = "BAC"
     PO_NUMBER_PREFIX: str = "PO"
+    DOCUMENT_NUMBER_BLOCK_SIZE: int = 10  # numbers each worker reserves per sequence round-trip
     
     # Audit Logging
     AUDIT_LOG_RETENTION_DAYS: int = 365
+    AUDIT_LOG_QUEUE_SIZE: int = 10000  # entries buffered per worker before callers wait
+    AUDIT_LOG_BATCH_SIZE: int = 200  # rows per multi-row INSERT
+    AUDIT_LOG_FLUSH_INTERVAL_SECONDS: float = 1.0  # longest an entry waits for its batch
+    AUDIT_LOG_ENQUEUE_TIMEOUT_SECONDS: float = 0.5  # wait for room before writing inline
+    AUDIT_LOG_SPOOL_PATH: str = "logs/audit_spool.jsonl"  # unwritten entries on shutdown; rejected rows in <path>.rejected
+    AUDIT_LOG_ARCHIVE_DIR: str = "archive/activity_logs"  # gzipped JSONL per expired month
+    AUDIT_LOG_PARTITION_MONTHS_AHEAD: int = 3  # monthly partitions kept ready past the current month
+    
+    # Notifications
+    NOTIFICATION_QUEUE_SIZE: int = 1000  # events buffered per worker before callers wait
+    NOTIFICATION_COALESCE_SECONDS: int = 3600  # repeat of the same entity/type/user within this is skipped
+    NOTIFICATION_STREAM_BACKEND: str = "memory"  # memory or redis (redis shares events across workers)
+    NOTIFICATION_STREAM_MAX_CONNECTIONS_PER_USER: int = 5  # open event streams per user per worker
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS: int = 15  # comment line sent on idle streams
+    NOTIFICATION_STREAM_REPLAY_SIZE: int = 1000  # recent messages kept for Last-Event-ID resume
+    NOTIFICATION_STREAM_QUEUE_SIZE: int = 100  # unsent messages before a slow stream is closed
+    NOTIFICATION_UNREAD_CACHE_BACKEND: str = "memory"  # memory or redis (redis shares counts across workers)
+    NOTIFICATION_UNREAD_CACHE_SIZE: int = 10000  # users whose count is cached (memory backend)
+    NOTIFICATION_UNREAD_CACHE_TTL_SECONDS: int = 300  # counts are recomputed from the table this often
     
     # Feature Flags
     ENABLE_EMAIL_NOTIFICATIONS: bool = True
@@ -1,29 +1,176 @@
 """Database connection and session management"""
 
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
 from app.core.config import settings
+from app.core.db_stats import instrument_queries, record_checkout_wait
+from app.core.pool_monitor import PoolLivenessMonitor, instrument_engine
+from app.core.query_profiler import instrument_profiler
+from app.core.replicas import Replica, ReplicaSet
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        telemetry = getattr(self, "telemetry", None)
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            if telemetry is not None:
+                telemetry.timeouts += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            record_checkout_wait(elapsed)
+            if telemetry is not None:
+                telemetry.observe_checkout(elapsed)
+
+
+class WriteTrackingSession(Session):
+    """
+    Session that remembers whether it has written anything.
+    Lets get_db skip an explicit COMMIT for read-only requests.
+    """
+
+    @property
+    def has_writes(self) -> bool:
+        return bool(
+            self.info.get("has_writes")
+            or self.new
+            or self.dirty
+            or self.deleted
+        )
+
+
+@event.listens_for(WriteTrackingSession, "do_orm_execute")
+def _track_statement_writes(orm_execute_state) -> None:
+    """Flag DML and raw statements; plain SELECTs are not writes."""
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(WriteTrackingSession, "after_flush")
+def _track_flush_writes(session, flush_context) -> None:
+    session.info["has_writes"] = True
+
+
+@event.listens_for(WriteTrackingSession, "after_commit")
+def _commit_writes(session) -> None:
+    """Pin the writer's subsequent reads to the primary (read-your-writes)."""
+    if session.info.pop("has_writes", None):
+        replica_set = session.info.get("replica_set")
+        if replica_set is not None:
+            replica_set.mark_write()
+
+
+@event.listens_for(WriteTrackingSession, "after_rollback")
+def _clear_writes(session) -> None:
+    session.info.pop("has_writes", None)
+
+
+class ReadOnlySession(Session):
+    """
+    Session bound to an autocommit connection; refuses to flush changes.
+    Routed to a read replica when one is configured and healthy.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        # Choose once per session so all reads share one connection
+        bind = self.info.get("routed_bind")
+        if bind is None:
+            replica_set = self.info.get("replica_set")
+            replica = replica_set.choose_for_read() if replica_set is not None else None
+            bind = replica.sync_engine if replica is not None else super().get_bind(mapper, clause=clause, **kw)
+            self.info["routed_bind"] = bind
+        return bind
+
+    def flush(self, objects=None) -> None:
+        if self.new or self.dirty or self.deleted:
+            raise RuntimeError("Attempted to write through a read-only database session")
+        super().flush(objects)
+
 
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
+    poolclass=TimedAsyncQueuePool,
     pool_size=settings.DATABASE_POOL_SIZE,
     max_overflow=settings.DATABASE_MAX_OVERFLOW,
     pool_timeout=settings.DATABASE_POOL_TIMEOUT,
     pool_recycle=settings.DATABASE_POOL_RECYCLE,
-    pool_pre_ping=True,  # Verify connections before using
+    pool_pre_ping=settings.DATABASE_POOL_PRE_PING,  # Verify connections before using
+)
+instrument_engine(engine, "primary")
+instrument_queries(engine)
+instrument_profiler(engine)
+
+# Background ping of idle connections, used when per-checkout pre-ping is off
+POOL_LIVENESS_INTERVAL_SECONDS = (
+    0 if settings.DATABASE_POOL_PRE_PING
+    else settings.DATABASE_POOL_LIVENESS_INTERVAL_SECONDS
+)
+
+# Read replicas (optional) - used by read-only sessions
+replica_set = ReplicaSet(
+    [
+        Replica(
+            make_url(url).render_as_string(hide_password=True),
+            create_async_engine(
+                url,
+                poolclass=TimedAsyncQueuePool,
+                pool_size=settings.DATABASE_POOL_SIZE,
+                max_overflow=settings.DATABASE_MAX_OVERFLOW,
+                pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+                pool_recycle=settings.DATABASE_POOL_RECYCLE,
+                pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+                isolation_level="AUTOCOMMIT",
+            ),
+        )
+        for url in settings.DATABASE_REPLICA_URLS_LIST
+    ],
+    max_lag_seconds=settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DATABASE_REPLICA_CHECK_INTERVAL_SECONDS,
+    sticky_seconds=settings.DATABASE_READ_YOUR_WRITES_SECONDS,
 )
+for replica in replica_set.replicas:
+    instrument_engine(replica.engine, f"replica:{replica.name}")
+    instrument_queries(replica.engine)
+    instrument_profiler(replica.engine)
+
+# One monitor per pool: replicas run without pre-ping too
+pool_liveness_monitors = [
+    PoolLivenessMonitor(pool_engine, interval_seconds=POOL_LIVENESS_INTERVAL_SECONDS)
+    for pool_engine in [engine, *(replica.engine for replica in replica_set.replicas)]
+]
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=WriteTrackingSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
+    info={"replica_set": replica_set},
+)
+
+# Read-only session factory: autocommit connections, so no BEGIN/COMMIT round-trips
+ReadOnlySessionLocal = async_sessionmaker(
+    engine.execution_options(isolation_level="AUTOCOMMIT"),
+    class_=AsyncSession,
+    sync_session_class=ReadOnlySession,
+    expire_on_commit=False,
+    autoflush=False,
+    info={"replica_set": replica_set},
 )
 
 # Base class for models
@@ -32,8 +179,13 @@ Base = declarative_base()
 
 async def get_db() -> AsyncSession:
     """
-    Dependency function to get database session.
-    
+    Dependency function to get a read-write database session.
+
+    A pooled connection is only checked out when the session first
+    executes a statement, and COMMIT is only sent if something was written.
+    A read-only request still ends its transaction with one round-trip:
+    the ROLLBACK the pool sends when the connection is returned.
+
     Usage in FastAPI endpoints:
         @app.get("/items")
         async def get_items(db: AsyncSession = Depends(get_db)):
@@ -42,7 +194,8 @@ async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            await session.commit()
+            if session.sync_session.has_writes:
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
@@ -50,6 +203,21 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+async def get_read_db() -> AsyncSession:
+    """
+    Dependency function to get a read-only database session.
+
+    Statements run on an autocommit connection (a read replica when
+    configured) and the session refuses to flush, so it is only suitable
+    for handlers that never write.
+    """
+    async with ReadOnlySessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
 async def init_db():
     """Initialize database - create all tables"""
     async with engine.begin() as conn:
@@ -58,8 +226,8 @@ async def init_db():
             user, purchase_request, pr_item, rfq, supplier,
             canvass, supplier_quotation, quotation_item, quotation_image,
             bac_document, approval_routing, purchase_order,
-            document, activity_log, notification
+            document, activity_log, notification, number_sequence
         )
-        
+
         # Create all tables
         await conn.run_sync(Base.metadata.create_all)
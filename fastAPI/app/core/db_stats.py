@@ -0,0 +1,129 @@
+"""
+Per-request database usage statistics.
+Tracks connection checkouts, pool wait time and query count/time for the
+current request and reports them in a Server-Timing response header.
+"""
+import time
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class DBRequestStats:
+    """Database usage counters for a single request."""
+
+    __slots__ = ("checkouts", "checkout_wait_seconds", "queries", "query_seconds")
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checkout_wait_seconds = 0.0
+        self.queries = 0
+        self.query_seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[DBRequestStats]] = ContextVar("db_request_stats", default=None)
+
+# Process-wide checkout totals
+_totals = {
+    "checkouts": 0,
+    "checkout_wait_seconds_total": 0.0,
+    "checkout_wait_seconds_max": 0.0,
+    "queries": 0,
+    "query_seconds_total": 0.0,
+}
+
+
+def get_db_request_stats() -> DBRequestStats:
+    """Get stats for the current request, starting a new scope if needed."""
+    stats = _request_stats.get()
+    if stats is None:
+        stats = DBRequestStats()
+        _request_stats.set(stats)
+    return stats
+
+
+def record_checkout_wait(seconds: float) -> None:
+    """Record time spent waiting for a pooled connection."""
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.checkouts += 1
+        stats.checkout_wait_seconds += seconds
+
+    _totals["checkouts"] += 1
+    _totals["checkout_wait_seconds_total"] += seconds
+    _totals["checkout_wait_seconds_max"] = max(_totals["checkout_wait_seconds_max"], seconds)
+
+
+def record_query(seconds: float) -> None:
+    """Record one executed statement and its duration."""
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += seconds
+
+    _totals["queries"] += 1
+    _totals["query_seconds_total"] += seconds
+
+
+def instrument_queries(engine: AsyncEngine) -> None:
+    """Time every statement executed through engine."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        record_query(time.perf_counter() - conn.info["query_started"].pop())
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _on_error(context):
+        # Failed statements never reach after_cursor_execute
+        if context.connection is not None:
+            started = context.connection.info.get("query_started")
+            if started:
+                record_query(time.perf_counter() - started.pop())
+
+
+def get_checkout_wait_totals() -> dict[str, Any]:
+    """Get process-wide checkout wait and query totals."""
+    return dict(_totals)
+
+
+class DBStatsMiddleware:
+    """
+    ASGI middleware that opens a DBRequestStats scope per request and
+    reports checkout wait and query time in a Server-Timing header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = DBRequestStats()
+        token = _request_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start" and stats.checkouts:
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f"db-wait;dur={stats.checkout_wait_seconds * 1000:.2f};desc=\"{stats.checkouts} checkout(s)\"".encode()
+                ))
+                headers.append((
+                    b"server-timing",
+                    f"db;dur={stats.query_seconds * 1000:.2f};desc=\"{stats.queries} query(s)\"".encode()
+                ))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
@@ -1,6 +1,6 @@
 """FastAPI dependencies for authentication and authorization"""
 
-from typing import Annotated, Optional
+from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,6 +8,8 @@ from sqlalchemy import select
 
 from app.core.database import get_db
 from app.core.security import decode_token
+from app.core.principals import Principal, cache_principal, get_cached_principal
+from app.core.replicas import set_routing_key
 from app.core.roles import UserRole
 from app.models.user import User
 
@@ -19,9 +21,18 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     db: Annotated[AsyncSession, Depends(get_db)]
-) -> User:
+) -> Principal:
     """
-    Get current authenticated user from JWT token.
+    Get current authenticated principal from JWT token.
+    
+    Served from the in-process principal cache when possible; the user row
+    is only loaded from the database on a cache miss. The lookup uses the
+    request's read-write session, the one a handler depending on get_db
+    also gets, and then hands its connection back to the pool, so a miss
+    never holds a second pooled connection for the rest of the request.
+    That costs a ROLLBACK after the lookup, and the handler's first
+    statement checks a connection out again. Reading the primary also
+    keeps a lagging replica's row out of the cache.
     
     Raises:
         HTTPException: 401 if token is invalid or user not found
@@ -38,29 +49,44 @@ async def get_current_user(
         raise credentials_exception
     
     # Extract user ID
-    user_id: Optional[int] = payload.get("sub")
-    if user_id is None:
+    subject = payload.get("sub")
+    if subject is None:
+        raise credentials_exception
+    try:
+        user_id = int(subject)
+    except (TypeError, ValueError):
         raise credentials_exception
     
-    # Query user from database
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    # Route this user's reads to the primary right after their own writes
+    set_routing_key(f"user:{user_id}")
     
-    if user is None:
-        raise credentials_exception
+    principal = get_cached_principal(user_id)
+    if principal is None:
+        # Query user from database
+        in_transaction = db.in_transaction()
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        principal = cache_principal(user) if user is not None else None
+        if not in_transaction:
+            # Nothing else used the session yet: release the connection
+            # until the handler's first statement
+            await db.rollback()
+        
+        if principal is None:
+            raise credentials_exception
     
-    if not user.is_active:
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="User account is inactive"
         )
     
-    return user
+    return principal
 
 
 async def get_current_active_user(
-    current_user: Annotated[User, Depends(get_current_user)]
-) -> User:
+    current_user: Annotated[Principal, Depends(get_current_user)]
+) -> Principal:
     """
     Get current active user (shortcut for checking is_active).
     
@@ -82,7 +108,7 @@ def require_role(*allowed_roles: UserRole):
     Usage:
         @app.get("/admin-only")
         async def admin_endpoint(
-            user: Annotated[User, Depends(require_role(UserRole.ADMIN))]
+            user: Annotated[Principal, Depends(require_role(UserRole.ADMIN))]
         ):
             ...
     
@@ -90,8 +116,8 @@ def require_role(*allowed_roles: UserRole):
         HTTPException: 403 if user doesn't have required role
     """
     async def role_checker(
-        current_user: Annotated[User, Depends(get_current_active_user)]
-    ) -> User:
+        current_user: Annotated[Principal, Depends(get_current_active_user)]
+    ) -> Principal:
         if current_user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
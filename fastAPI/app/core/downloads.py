@@ -0,0 +1,229 @@
+"""
+File downloads.
+Serves stored files with single-range HTTP Range requests and
+conditional GET (If-None-Match / If-Modified-Since, answered with 304),
+so a client re-opening a file it already has gets no body at all.
+
+The body is handed to the server with the ASGI zero-copy send extension
+(sendfile) or path send extension when the server offers them; otherwise
+it is read in DOWNLOAD_CHUNK_SIZE_KB blocks in the default executor.
+Content-addressed blobs never change, so they are cached for a year;
+other files must be revalidated on every use.
+"""
+import asyncio
+import hashlib
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Mapping, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+from starlette.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+
+from app.core.config import settings
+
+
+# Cache-Control for content that can never change, and for content that can
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a Range header into (first, last) byte offsets, inclusive.
+
+    Returns None (serve the whole file) when there is no header, it is
+    malformed or asks for several ranges. Raises HTTPException 416 when
+    the range lies outside the file.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if not first:
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise ValueError
+            first_byte, last_byte = max(0, size - length), size - 1
+        else:
+            first_byte = int(first)
+            last_byte = min(int(last), size - 1) if last else size - 1
+            if last and int(last) < first_byte:
+                return None
+    except ValueError:
+        return None
+    if first_byte >= size or first_byte < 0:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return first_byte, last_byte
+
+
+def etag_matches(header: str, etag: str, weak: bool = True) -> bool:
+    """Whether an If-None-Match / If-Range value matches etag."""
+    if weak and header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if weak:
+            if candidate.removeprefix("W/") == etag.removeprefix("W/"):
+                return True
+        elif candidate == etag and not etag.startswith("W/"):
+            return True
+    return False
+
+
+def _not_modified_since(header: str, mtime: float) -> bool:
+    try:
+        return int(mtime) <= parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def is_not_modified(headers: Mapping[str, str], etag: str, mtime: float) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when there is none."""
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = headers.get("if-modified-since")
+    return if_modified_since is not None and _not_modified_since(if_modified_since, mtime)
+
+
+class RangedFileResponse(FileResponse):
+    """FileResponse for a whole file or one byte range of it (206)."""
+
+    def __init__(
+        self,
+        path: str,
+        stat_result: os.stat_result,
+        etag: str,
+        cache_control: str,
+        byte_range: Optional[Tuple[int, int]] = None,
+        **kwargs
+    ):
+        # Read by set_stat_headers(), which FileResponse.__init__ calls
+        self.etag = etag
+        self.cache_control = cache_control
+        self.byte_range = byte_range
+        super().__init__(
+            path,
+            status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+            stat_result=stat_result,
+            **kwargs
+        )
+        self.chunk_size = settings.DOWNLOAD_CHUNK_SIZE_KB * 1024
+
+    def set_stat_headers(self, stat_result: os.stat_result) -> None:
+        first, last = self.byte_range or (0, stat_result.st_size - 1)
+        self.offset = first
+        self.count = last - first + 1
+        self.headers.setdefault("content-length", str(self.count))
+        self.headers.setdefault("last-modified", formatdate(stat_result.st_mtime, usegmt=True))
+        self.headers.setdefault("etag", self.etag)
+        self.headers.setdefault("accept-ranges", "bytes")
+        self.headers.setdefault("cache-control", self.cache_control)
+        if self.byte_range:
+            self.headers.setdefault("content-range", f"bytes {first}-{last}/{stat_result.st_size}")
+
+    def _read(self, file, size: int) -> bytes:
+        return file.read(size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        extensions = scope.get("extensions") or {}
+        loop = asyncio.get_running_loop()
+
+        if scope["method"].upper() == "HEAD" or self.count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopysend" in extensions:
+            file = await loop.run_in_executor(None, open, self.path, "rb")
+            try:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": self.offset,
+                    "count": self.count,
+                    "more_body": False,
+                })
+            finally:
+                file.close()
+        elif "http.response.pathsend" in extensions and self.byte_range is None:
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+        else:
+            file = await loop.run_in_executor(None, open, self.path, "rb")
+            try:
+                if self.offset:
+                    file.seek(self.offset)
+                remaining = self.count
+                while remaining > 0:
+                    chunk = await loop.run_in_executor(None, self._read, file, min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                if remaining > 0:
+                    # The file shrank while being sent; end the response
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+            finally:
+                file.close()
+
+
+async def file_download(
+    request: Request,
+    path: str,
+    media_type: str,
+    filename: str,
+    checksum: Optional[str] = None,
+    immutable: bool = False
+) -> Response:
+    """
+    Build the response for a download of the file at path.
+
+    The ETag is the file's SHA-256 when checksum is given (strong), else a
+    weak tag from its size and modification time. Pass immutable=True only
+    for files whose content can never change at this URL.
+    """
+    try:
+        stat_result = await asyncio.get_running_loop().run_in_executor(None, os.stat, path)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found"
+        )
+
+    if checksum:
+        etag = f'"{checksum}"'
+    else:
+        tag = hashlib.md5(f"{stat_result.st_mtime}-{stat_result.st_size}".encode(), usedforsecurity=False)
+        etag = f'W/"{tag.hexdigest()}"'
+    cache_control = IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+
+    if is_not_modified(request.headers, etag, stat_result.st_mtime):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={
+                "ETag": etag,
+                "Cache-Control": cache_control,
+                "Last-Modified": formatdate(stat_result.st_mtime, usegmt=True),
+            }
+        )
+
+    byte_range = parse_range(request.headers.get("range"), stat_result.st_size)
+    if_range = request.headers.get("if-range")
+    if byte_range and if_range is not None and not etag_matches(if_range, etag, weak=False):
+        # The client's partial copy is stale: send the whole file
+        byte_range = None
+
+    return RangedFileResponse(
+        path,
+        stat_result=stat_result,
+        etag=etag,
+        cache_control=cache_control,
+        byte_range=byte_range,
+        media_type=media_type,
+        filename=filename,
+        content_disposition_type="inline"
+    )
@@ -0,0 +1,175 @@
+"""
+Asynchronous password hashing service.
+Runs bcrypt verification and hashing in a bounded worker pool so that
+password checks never block the event loop.
+"""
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+
+
+# Latency histogram bucket upper bounds (seconds)
+HASH_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _timed_call(func: Callable[..., Any], *args: Any) -> tuple[Any, float]:
+    """Run func in the worker and return (result, execution_seconds)."""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+class PasswordHashingService:
+    """
+    Bounded worker pool for bcrypt operations.
+
+    Requests beyond the queue depth limit are rejected with 503 instead of
+    piling up behind the pool, so a login burst cannot exhaust memory or
+    starve other traffic.
+    """
+
+    def __init__(
+        self,
+        pool_type: str = "thread",
+        max_workers: int = 4,
+        max_queue: int = 64
+    ):
+        if pool_type not in ("thread", "process"):
+            raise ValueError(f"Unsupported password hash pool type: {pool_type}")
+
+        self.pool_type = pool_type
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+
+        # Metrics
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_seconds = 0.0
+        self._total_wait_seconds = 0.0
+        self._latency_buckets = [0] * (len(HASH_LATENCY_BUCKETS) + 1)
+
+    def _get_executor(self) -> Executor:
+        """Create the worker pool on first use."""
+        if self._executor is None:
+            if self.pool_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    def _observe(self, elapsed: float) -> None:
+        """Record a per-hash latency sample."""
+        self._total_seconds += elapsed
+        for index, bound in enumerate(HASH_LATENCY_BUCKETS):
+            if elapsed <= bound:
+                self._latency_buckets[index] += 1
+                return
+        self._latency_buckets[-1] += 1
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Submit a hashing job to the pool, enforcing the queue limit."""
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self._rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy. Please retry shortly.",
+                headers={"Retry-After": "1"}
+            )
+
+        self._in_flight += 1
+        self._submitted += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        submitted_at = time.perf_counter()
+
+        try:
+            loop = asyncio.get_running_loop()
+            result, elapsed = await loop.run_in_executor(
+                self._get_executor(), _timed_call, func, *args
+            )
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+        self._completed += 1
+        self._observe(elapsed)
+        self._total_wait_seconds += max(0.0, time.perf_counter() - submitted_at - elapsed)
+        return result
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password against a bcrypt hash in the worker pool."""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash_password(self, password: str) -> str:
+        """Hash a password with bcrypt in the worker pool."""
+        return await self._run(get_password_hash, password)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get pool saturation and latency metrics."""
+        capacity = self.max_workers + self.max_queue
+        return {
+            "pool_type": self.pool_type,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queued": max(0, self._in_flight - self.max_workers),
+            "peak_in_flight": self._peak_in_flight,
+            "saturation": self._in_flight / capacity if capacity else 0.0,
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "hash_seconds_total": self._total_seconds,
+            "queue_wait_seconds_total": self._total_wait_seconds,
+            "hash_seconds_avg": (
+                self._total_seconds / self._completed if self._completed else 0.0
+            ),
+            "latency_buckets": dict(zip(
+                [str(bound) for bound in HASH_LATENCY_BUCKETS] + ["+Inf"],
+                self._latency_buckets
+            )),
+        }
+
+    def shutdown(self) -> None:
+        """Shut down the worker pool (called on application shutdown)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+# Global password hashing service instance
+_password_hasher = PasswordHashingService(
+    pool_type=settings.PASSWORD_HASH_POOL_TYPE,
+    max_workers=settings.PASSWORD_HASH_POOL_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+def get_password_hasher() -> PasswordHashingService:
+    """Get global password hashing service instance."""
+    return _password_hasher
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password off the event loop."""
+    return await _password_hasher.verify_password(plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password off the event loop."""
+    return await _password_hasher.hash_password(password)
@@ -0,0 +1,187 @@
+"""
+Stored item aggregates.
+purchase_requests.item_count / total_estimated_cost and supplier_quotations
+.item_count / items_total_amount are kept in step with their item rows so
+lists and dashboards can filter and sort by totals in SQL instead of loading
+every item and summing Decimals in Python.
+
+ORM flushes maintain them automatically. Core INSERT/UPDATE/DELETE
+statements on the item tables bypass the ORM and must set the aggregates
+themselves (as the bulk create does) or call refresh_totals afterwards;
+check_totals and scripts/backfill_item_totals.py find and repair drift.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session, attributes
+
+from app.models.pr_item import PRItem
+from app.models.purchase_request import PurchaseRequest
+from app.models.quotation_item import QuotationItem
+from app.models.supplier_quotation import SupplierQuotation
+
+CENT = Decimal("0.01")
+
+
+class _Aggregate:
+    """How one parent table's count/total columns derive from its items."""
+
+    def __init__(self, parent, item, foreign_key, count_column, total_column, amount):
+        self.parent = parent
+        self.item = item
+        self.foreign_key = foreign_key
+        self.count_column = count_column
+        self.total_column = total_column
+        self.amount = amount
+
+    def computed_count(self):
+        return (
+            select(func.count(self.item.id))
+            .where(self.foreign_key == self.parent.id)
+            .scalar_subquery()
+        )
+
+    def computed_total(self):
+        return (
+            select(func.coalesce(func.round(func.sum(self.amount), 2), 0))
+            .where(self.foreign_key == self.parent.id)
+            .scalar_subquery()
+        )
+
+    def refresh_statement(self, parent_ids: Optional[Iterable[int]] = None):
+        """UPDATE recomputing the aggregates (of the given parents, or all)."""
+        stmt = update(self.parent).values({
+            self.count_column.key: self.computed_count(),
+            self.total_column.key: self.computed_total(),
+            # Derived data, not an edit of the parent row
+            "updated_at": self.parent.updated_at,
+        })
+        if parent_ids is not None:
+            stmt = stmt.where(self.parent.id.in_(list(parent_ids)))
+        return stmt
+
+    def drift_query(self):
+        """SELECT parents whose stored aggregates differ from their items."""
+        computed_count = self.computed_count().label("computed_count")
+        computed_total = self.computed_total().label("computed_total")
+        return (
+            select(self.parent.id, self.count_column, computed_count, self.total_column, computed_total)
+            .where(
+                (self.count_column != self.computed_count())
+                | (self.total_column != self.computed_total())
+            )
+            .order_by(self.parent.id)
+        )
+
+
+PR_TOTALS = _Aggregate(
+    PurchaseRequest,
+    PRItem,
+    PRItem.purchase_request_id,
+    PurchaseRequest.item_count,
+    PurchaseRequest.total_estimated_cost,
+    PRItem.quantity * PRItem.estimated_price,
+)
+QUOTATION_TOTALS = _Aggregate(
+    SupplierQuotation,
+    QuotationItem,
+    QuotationItem.supplier_quotation_id,
+    SupplierQuotation.item_count,
+    SupplierQuotation.items_total_amount,
+    QuotationItem.total_price,
+)
+
+
+def sum_amounts(amounts: Iterable[Decimal]) -> Decimal:
+    """Sum item amounts rounded to cents, as the stored DECIMAL(15, 2) holds them."""
+    return sum(amounts, Decimal(0)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def check_totals(connection: Connection) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Find rows whose stored aggregates disagree with their items.
+    Run through AsyncConnection.run_sync; returns drifted rows per table.
+    """
+    return {
+        aggregate.parent.__tablename__: [
+            dict(row._mapping) for row in connection.execute(aggregate.drift_query())
+        ]
+        for aggregate in (PR_TOTALS, QUOTATION_TOTALS)
+    }
+
+
+def refresh_totals(
+    connection: Connection,
+    pr_ids: Optional[Iterable[int]] = None,
+    quotation_ids: Optional[Iterable[int]] = None
+) -> None:
+    """
+    Recompute stored aggregates from the item rows.
+    Pass None to refresh every row of that table, or an empty set to skip it.
+    """
+    if pr_ids is None or pr_ids:
+        connection.execute(PR_TOTALS.refresh_statement(pr_ids))
+    if quotation_ids is None or quotation_ids:
+        connection.execute(QUOTATION_TOTALS.refresh_statement(quotation_ids))
+
+
+def _parent_ids(session: Session, item_class, foreign_key: str, skip: Set[int]) -> Set[int]:
+    """Parents of items written in this flush, old and new parent for moved items."""
+    ids: Set[int] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(obj, item_class):
+            continue
+        history = inspect(obj).attrs[foreign_key].history
+        ids.update(history.added or history.unchanged or ())
+        ids.update(history.deleted or ())
+    ids.discard(None)
+    return ids - skip
+
+
+@event.listens_for(Session, "before_flush")
+def _totals_for_new_parents(session: Session, flush_context, instances) -> None:
+    """New parents get their aggregates from in-memory items, with no extra SQL."""
+    for obj in session.new:
+        if isinstance(obj, PurchaseRequest):
+            obj.item_count = len(obj.pr_items)
+            obj.total_estimated_cost = sum_amounts(
+                item.quantity * item.estimated_price for item in obj.pr_items
+            )
+        elif isinstance(obj, SupplierQuotation):
+            obj.item_count = len(obj.quotation_items)
+            obj.items_total_amount = sum_amounts(item.total_price for item in obj.quotation_items)
+
+
+@event.listens_for(Session, "after_flush")
+def _totals_for_changed_items(session: Session, flush_context) -> None:
+    """Recompute existing parents whose items were added, changed or removed."""
+    # new/dirty/deleted still hold the pre-flush state here
+    new_prs = {obj.id for obj in session.new if isinstance(obj, PurchaseRequest)}
+    new_quotations = {obj.id for obj in session.new if isinstance(obj, SupplierQuotation)}
+    pr_ids = _parent_ids(session, PRItem, "purchase_request_id", new_prs)
+    quotation_ids = _parent_ids(session, QuotationItem, "supplier_quotation_id", new_quotations)
+    if not pr_ids and not quotation_ids:
+        return
+
+    connection = session.connection()
+    refresh_totals(connection, pr_ids, quotation_ids)
+
+    # Keep already-loaded parents in step with the rows just updated
+    for aggregate, ids in ((PR_TOTALS, pr_ids), (QUOTATION_TOTALS, quotation_ids)):
+        loaded = {}
+        for parent_id in ids:
+            key = inspect(aggregate.parent).identity_key_from_primary_key((parent_id,))
+            obj = session.identity_map.get(key)
+            if obj is not None:
+                loaded[parent_id] = obj
+        if not loaded:
+            continue
+        rows = connection.execute(
+            select(aggregate.parent.id, aggregate.count_column, aggregate.total_column)
+            .where(aggregate.parent.id.in_(list(loaded)))
+        )
+        for parent_id, count, total in rows:
+            attributes.set_committed_value(loaded[parent_id], aggregate.count_column.key, count)
+            attributes.set_committed_value(loaded[parent_id], aggregate.total_column.key, total)
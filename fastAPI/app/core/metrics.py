@@ -0,0 +1,260 @@
+"""
+Prometheus-style application metrics.
+Request latency histograms by route template and status code, in-flight
+requests and per-request DB query count/time, rendered together with the
+hashing, cache, pool and rate-limit stats in the text exposition format.
+
+Recording happens on the event loop thread with plain dict and list
+updates, so no locks are needed. Each worker process keeps its own
+registry; scrape every worker (or aggregate in Prometheus) for totals.
+"""
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from app.core.db_stats import get_db_request_stats
+
+
+# Request latency bucket upper bounds (seconds)
+REQUEST_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Per-request DB query count and DB time bucket upper bounds
+DB_QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+DB_QUERY_SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Label for requests that matched no route (keeps label cardinality bounded)
+UNMATCHED_ROUTE = "__unmatched__"
+
+# Methods recorded by name; any other method token is recorded as OTHER_METHOD
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE", "CONNECT"})
+OTHER_METHOD = "OTHER"
+
+
+class Histogram:
+    """Fixed-bucket histogram; counts are per bucket and made cumulative on render."""
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+# Registries keyed by label values
+_request_latency: Dict[Tuple[str, str, str], Histogram] = {}
+_request_db_queries: Dict[Tuple[str, str], Histogram] = {}
+_request_db_seconds: Dict[Tuple[str, str], Histogram] = {}
+_in_flight = {"requests": 0}
+
+
+def _histogram(registry: dict, key: tuple, bounds: Sequence[float]) -> Histogram:
+    histogram = registry.get(key)
+    if histogram is None:
+        histogram = registry[key] = Histogram(bounds)
+    return histogram
+
+
+def observe_request(method: str, route: str, status: int, seconds: float) -> None:
+    """Record one completed request and its database usage."""
+    _histogram(_request_latency, (method, route, str(status)), REQUEST_LATENCY_BUCKETS).observe(seconds)
+
+    stats = get_db_request_stats()
+    _histogram(_request_db_queries, (method, route), DB_QUERY_COUNT_BUCKETS).observe(stats.queries)
+    _histogram(_request_db_seconds, (method, route), DB_QUERY_SECONDS_BUCKETS).observe(stats.query_seconds)
+
+
+def reset_metrics() -> None:
+    """Clear request metrics (used by tests)."""
+    _request_latency.clear()
+    _request_db_queries.clear()
+    _request_db_seconds.clear()
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that times every HTTP request.
+
+    Latency is labelled by route template (e.g. /api/v1/users/{user_id})
+    rather than the raw path, and by standard HTTP method (anything else
+    is OTHER), so label cardinality stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+        _in_flight["requests"] += 1
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _in_flight["requests"] -= 1
+            route = scope.get("route")
+            method = scope["method"].upper()
+            observe_request(
+                method if method in HTTP_METHODS else OTHER_METHOD,
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status_code,
+                time.perf_counter() - started
+            )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(names: Iterable[str], values: Iterable) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+def _render_histogram(
+    lines: List[str],
+    name: str,
+    label_names: Sequence[str],
+    label_values: Sequence,
+    bounds: Sequence[float],
+    counts: Sequence[int],
+    total: float
+) -> None:
+    cumulative = 0
+    for bound, count in zip(bounds, counts):
+        cumulative += count
+        le = _labels([*label_names, "le"], [*label_values, _format_bound(bound)])
+        lines.append(f"{name}_bucket{le} {cumulative}")
+    cumulative += counts[-1]
+    le = _labels([*label_names, "le"], [*label_values, "+Inf"])
+    lines.append(f"{name}_bucket{le} {cumulative}")
+    labels = _labels(label_names, label_values)
+    lines.append(f"{name}_sum{labels} {total}")
+    lines.append(f"{name}_count{labels} {cumulative}")
+
+
+def _header(lines: List[str], name: str, kind: str, help_text: str) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def render_metrics() -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    # Imported here: these modules import the database engine
+    from app.core.database import replica_set
+    from app.core.db_stats import get_checkout_wait_totals
+    from app.core.hashing import HASH_LATENCY_BUCKETS, get_password_hasher
+    from app.core.pool_monitor import CHECKOUT_LATENCY_BUCKETS, get_pool_stats
+    from app.core.principals import get_principal_cache
+    from app.core.rate_limiter import get_api_rate_limit_stats
+    from app.core.security import get_token_cache
+
+    lines: List[str] = []
+
+    # HTTP requests
+    _header(lines, "http_requests_in_flight", "gauge", "HTTP requests currently being served")
+    lines.append(f"http_requests_in_flight {_in_flight['requests']}")
+
+    _header(lines, "http_request_duration_seconds", "histogram", "HTTP request latency by route template")
+    for key, histogram in sorted(_request_latency.items()):
+        _render_histogram(
+            lines, "http_request_duration_seconds", ("method", "route", "status"), key,
+            histogram.bounds, histogram.counts, histogram.sum
+        )
+
+    _header(lines, "http_request_db_queries", "histogram", "Database statements executed per request")
+    for key, histogram in sorted(_request_db_queries.items()):
+        _render_histogram(
+            lines, "http_request_db_queries", ("method", "route"), key,
+            histogram.bounds, histogram.counts, histogram.sum
+        )
+
+    _header(lines, "http_request_db_seconds", "histogram", "Database statement time per request")
+    for key, histogram in sorted(_request_db_seconds.items()):
+        _render_histogram(
+            lines, "http_request_db_seconds", ("method", "route"), key,
+            histogram.bounds, histogram.counts, histogram.sum
+        )
+
+    # Database
+    totals = get_checkout_wait_totals()
+    _header(lines, "db_queries_total", "counter", "Database statements executed")
+    lines.append(f"db_queries_total {totals['queries']}")
+    _header(lines, "db_query_seconds_total", "counter", "Time spent executing database statements")
+    lines.append(f"db_query_seconds_total {totals['query_seconds_total']}")
+
+    pools = get_pool_stats()
+    for name, key, kind, help_text in (
+        ("db_pool_size", "pool_size", "gauge", "Configured pool size"),
+        ("db_pool_in_use", "in_use", "gauge", "Connections checked out"),
+        ("db_pool_idle", "idle", "gauge", "Idle pooled connections"),
+        ("db_pool_overflow", "overflow", "gauge", "Overflow connections open"),
+        ("db_pool_checkouts_total", "checkouts", "counter", "Connection checkouts"),
+        ("db_pool_timeouts_total", "timeouts", "counter", "Checkouts that timed out"),
+        ("db_pool_invalidations_total", "invalidations", "counter", "Invalidated connections"),
+        ("db_pool_pre_ping_failures_total", "pre_ping_failures", "counter", "Failed pre-ping checks"),
+        ("db_pool_liveness_failures_total", "liveness_failures", "counter", "Failed background liveness checks"),
+    ):
+        _header(lines, name, kind, help_text)
+        for pool in pools:
+            lines.append(f"{name}{_labels(['pool'], [pool['name']])} {pool[key]}")
+
+    _header(lines, "db_pool_checkout_seconds", "histogram", "Time waiting for a pooled connection")
+    for pool in pools:
+        _render_histogram(
+            lines, "db_pool_checkout_seconds", ("pool",), (pool["name"],),
+            CHECKOUT_LATENCY_BUCKETS, list(pool["checkout_latency_buckets"].values()),
+            pool["checkout_seconds_total"]
+        )
+
+    replicas = replica_set.get_stats()["replicas"]
+    _header(lines, "db_replica_healthy", "gauge", "Whether a read replica is in rotation")
+    for replica in replicas:
+        lines.append(f"db_replica_healthy{_labels(['replica'], [replica['name']])} {int(replica['healthy'])}")
+
+    # Password hashing
+    hashing = get_password_hasher().get_stats()
+    _header(lines, "password_hash_in_flight", "gauge", "Password hash operations running or queued")
+    lines.append(f"password_hash_in_flight {hashing['in_flight']}")
+    _header(lines, "password_hash_rejected_total", "counter", "Password hash operations rejected (pool saturated)")
+    lines.append(f"password_hash_rejected_total {hashing['rejected']}")
+    _header(lines, "password_hash_seconds", "histogram", "bcrypt hash/verify time")
+    _render_histogram(
+        lines, "password_hash_seconds", (), (),
+        HASH_LATENCY_BUCKETS, list(hashing["latency_buckets"].values()), hashing["hash_seconds_total"]
+    )
+
+    # Caches
+    caches = {"principal": get_principal_cache().get_stats(), "token": get_token_cache().get_stats()}
+    for name, key in (("cache_hits_total", "hits"), ("cache_misses_total", "misses"), ("cache_evictions_total", "evictions")):
+        _header(lines, name, "counter", f"Authentication cache {key}")
+        for cache, stats in caches.items():
+            lines.append(f"{name}{_labels(['cache'], [cache])} {stats[key]}")
+
+    # Rate limiting
+    _header(lines, "rate_limit_decisions_total", "counter", "API rate limit decisions by route group")
+    for group, outcomes in sorted(get_api_rate_limit_stats().items()):
+        for outcome, count in sorted(outcomes.items()):
+            lines.append(f"rate_limit_decisions_total{_labels(['group', 'outcome'], [group, outcome])} {count}")
+
+    return "\n".join(lines) + "\n"
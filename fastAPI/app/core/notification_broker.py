@@ -0,0 +1,281 @@
+"""
+Live notification broker.
+Fans notifications published through a PubSubBackend out to the
+Server-Sent Events connections open on this worker, so dashboards are
+pushed new notifications instead of polling the database. Recent
+messages are kept in a bounded replay buffer: a client reconnecting with
+Last-Event-ID is sent what it missed, or a resync event when the gap is
+no longer covered (it should then reload its unread count).
+"""
+import asyncio
+import json
+import logging
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.pubsub_backends import PubSubBackend, create_pubsub_backend
+
+logger = logging.getLogger(__name__)
+
+
+# Queued on a connection to tell the client to reload instead of resuming
+RESYNC = "resync"
+
+# Seconds between attempts to re-listen after the backend fails
+RELISTEN_DELAY_SECONDS = 1.0
+
+
+class StreamConnection:
+    """
+    One open event stream for a user.
+
+    Holds (message ID, notifications) pairs, or RESYNC, waiting to be
+    written. A connection that falls queue_size messages behind is closed;
+    its client reconnects with Last-Event-ID and catches up from the
+    replay buffer.
+    """
+
+    def __init__(self, broker: "NotificationBroker", user_id: int, queue_size: int):
+        self.broker = broker
+        self.user_id = user_id
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def offer(self, item: Any) -> bool:
+        """Queue item; False (and the connection is closed) if it is full."""
+        if self.closed:
+            return False
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            self.close()
+            return False
+
+    async def next(self, timeout: float) -> Any:
+        """
+        Next queued item; None when the connection is closed and drained.
+        Raises asyncio.TimeoutError if nothing arrives within timeout.
+        """
+        if self.closed and self._queue.empty():
+            return None
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+    def close(self) -> None:
+        """Stop receiving messages and wake the writer."""
+        if self.closed:
+            return
+        self.closed = True
+        self.broker._remove(self)
+        # Drop the backlog so the end-of-stream marker always fits
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+
+class NotificationBroker:
+    """
+    Per-worker hub between the pub/sub backend and open event streams.
+
+    Connections are capped per user on each worker. Replay covers the
+    last replay_size messages this worker has received.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[PubSubBackend] = None,
+        max_connections_per_user: int = 5,
+        replay_size: int = 1000,
+        queue_size: int = 100
+    ):
+        self.backend = backend or create_pubsub_backend()
+        self.max_connections_per_user = max_connections_per_user
+        self.queue_size = queue_size
+        self._connections: Dict[int, Set[StreamConnection]] = defaultdict(set)
+        # (message ID, {user_id: notifications}), oldest first
+        self._replay: Deque[Tuple[int, Dict[int, List[dict]]]] = deque(maxlen=replay_size)
+        # Lowest message ID from which every message is in (or was evicted from) the buffer
+        self._covered_from: Optional[int] = None
+        self._last_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.published = 0
+        self.publish_failures = 0
+        self.received = 0
+        self.delivered = 0
+        self.rejected_connections = 0
+        self.slow_disconnects = 0
+        self.replayed = 0
+        self.resyncs = 0
+        self.listen_failures = 0
+
+    async def publish(self, deliveries: Iterable[Tuple[Iterable[int], dict]]) -> Optional[int]:
+        """
+        Publish notifications to every worker's connections.
+
+        deliveries pairs the recipients' user IDs with a notification
+        payload. Returns the message ID, or None if the backend failed; the
+        notifications are already stored, so clients pick them up on their
+        next resync.
+        """
+        payload = [[sorted(user_ids), notification] for user_ids, notification in deliveries]
+        if not payload:
+            return None
+        try:
+            message_id = await self.backend.publish(json.dumps(payload))
+        except Exception:
+            self.publish_failures += 1
+            logger.exception("Notification publish failed")
+            return None
+        self.published += 1
+        return message_id
+
+    def connect(self, user_id: int, last_event_id: Optional[int] = None) -> StreamConnection:
+        """
+        Open a stream for user_id, first queuing what it missed after
+        last_event_id. Raises HTTPException 429 if the user already has
+        max_connections_per_user streams open on this worker.
+        """
+        if len(self._connections[user_id]) >= self.max_connections_per_user:
+            self.rejected_connections += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"At most {self.max_connections_per_user} notification streams per user"
+            )
+
+        connection = StreamConnection(self, user_id, self.queue_size)
+        self._connections[user_id].add(connection)
+        if last_event_id is not None:
+            self._queue_missed(connection, last_event_id)
+        return connection
+
+    def _queue_missed(self, connection: StreamConnection, last_event_id: int) -> None:
+        covered = (
+            self._covered_from is not None
+            and last_event_id <= self._last_id
+            and last_event_id + 1 >= self._covered_from
+        )
+        if not covered:
+            self.resyncs += 1
+            connection.offer(RESYNC)
+            return
+
+        missed = [
+            (message_id, recipients[connection.user_id])
+            for message_id, recipients in self._replay
+            if message_id > last_event_id and connection.user_id in recipients
+        ]
+        if len(missed) >= self.queue_size:
+            self.resyncs += 1
+            connection.offer(RESYNC)
+            return
+        for item in missed:
+            connection.offer(item)
+        self.replayed += len(missed)
+
+    def _remove(self, connection: StreamConnection) -> None:
+        connections = self._connections.get(connection.user_id)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del self._connections[connection.user_id]
+
+    def _dispatch(self, message_id: int, payload: str) -> None:
+        recipients: Dict[int, List[dict]] = defaultdict(list)
+        for user_ids, notification in json.loads(payload):
+            for user_id in user_ids:
+                recipients[user_id].append(notification)
+
+        self.received += 1
+        if self._covered_from is None:
+            self._covered_from = message_id
+        elif len(self._replay) == self._replay.maxlen:
+            self._covered_from = self._replay[0][0] + 1
+        self._replay.append((message_id, dict(recipients)))
+        self._last_id = message_id
+
+        for user_id, notifications in recipients.items():
+            for connection in list(self._connections.get(user_id, ())):
+                if connection.offer((message_id, notifications)):
+                    self.delivered += 1
+                else:
+                    self.slow_disconnects += 1
+
+    async def _run(self, messages) -> None:
+        while True:
+            try:
+                async for message_id, payload in messages:
+                    self._dispatch(message_id, payload)
+            except Exception:
+                self.listen_failures += 1
+                logger.exception("Notification stream listener failed")
+            # Messages published while re-listening are never seen here, so
+            # resuming from before the gap must resync
+            self._replay.clear()
+            self._covered_from = None
+            messages = None
+            while messages is None:
+                await asyncio.sleep(RELISTEN_DELAY_SECONDS)
+                try:
+                    messages = await self.backend.listen()
+                except Exception:
+                    self.listen_failures += 1
+                    logger.exception("Notification stream listener failed")
+
+    async def start(self) -> None:
+        """Start listening for published notifications."""
+        if self._task is None:
+            messages = await self.backend.listen()
+            self._task = asyncio.create_task(self._run(messages))
+
+    async def stop(self) -> None:
+        """Stop listening and end every open stream."""
+        for connections in list(self._connections.values()):
+            for connection in list(connections):
+                connection.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.backend.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get connection and delivery metrics."""
+        return {
+            **self.backend.get_stats(),
+            "running": self._task is not None,
+            "users_connected": len(self._connections),
+            "connections": sum(len(connections) for connections in self._connections.values()),
+            "max_connections_per_user": self.max_connections_per_user,
+            "replay_buffer": len(self._replay),
+            "last_id": self._last_id,
+            "published": self.published,
+            "publish_failures": self.publish_failures,
+            "received": self.received,
+            "delivered": self.delivered,
+            "rejected_connections": self.rejected_connections,
+            "slow_disconnects": self.slow_disconnects,
+            "replayed": self.replayed,
+            "resyncs": self.resyncs,
+            "listen_failures": self.listen_failures,
+        }
+
+
+# Global notification broker instance
+_notification_broker = NotificationBroker(
+    max_connections_per_user=settings.NOTIFICATION_STREAM_MAX_CONNECTIONS_PER_USER,
+    replay_size=settings.NOTIFICATION_STREAM_REPLAY_SIZE,
+    queue_size=settings.NOTIFICATION_STREAM_QUEUE_SIZE,
+)
+
+
+def get_notification_broker() -> NotificationBroker:
+    """Get global notification broker instance."""
+    return _notification_broker
@@ -0,0 +1,179 @@
+"""
+Document number allocation.
+Issues PR/RFQ/Canvass/BAC/PO numbers (PREFIX-YYYY-####) from a per-prefix,
+per-year sequence table. Each worker reserves a block of numbers in a short
+transaction of its own, then hands them out in-process without touching
+the database, so concurrent creators never queue on the sequence row for
+the length of their own transaction.
+"""
+import asyncio
+import heapq
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.number_sequence import NumberSequence, ReleasedNumber
+
+
+def format_number(prefix: str, year: int, value: int) -> str:
+    """Format a document number, e.g. PR-2025-0042."""
+    return f"{prefix}-{year}-{value:04d}"
+
+
+def parse_number(number: str) -> Tuple[str, int, int]:
+    """Split a document number into (prefix, year, value)."""
+    prefix, year, value = number.rsplit("-", 2)
+    return prefix, int(year), int(value)
+
+
+class NumberAllocator:
+    """
+    Block-reserving document number allocator.
+
+    Numbers stay contiguous within a year: numbers from a rolled-back
+    create are released and issued next, and on shutdown each worker
+    writes its unissued numbers to released_numbers, which every worker
+    drains (lowest first) before extending the sequence. Only a crashed
+    worker can leave a gap, of at most one block. Numbers from different
+    workers interleave, so a higher number is not always a later PR.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        block_size: int = 10,
+        clock: Callable[[], datetime] = datetime.utcnow
+    ):
+        self.engine = engine
+        self.block_size = max(1, block_size)
+        self._clock = clock
+        # Reserved, unissued values per (prefix, year), as min-heaps
+        self._available: Dict[Tuple[str, int], List[int]] = {}
+        self._refill_locks: Dict[Tuple[str, int], asyncio.Lock] = {}
+
+        # Metrics
+        self.issued = 0
+        self.reservations = 0
+        self.reservation_conflicts = 0
+        self.released = 0
+
+    async def allocate(self, prefix: str, count: int = 1) -> List[str]:
+        """Issue count numbers for prefix in the current year, lowest first."""
+        year = self._clock().year
+        key = (prefix, year)
+        available = self._available.setdefault(key, [])
+
+        if len(available) < count:
+            lock = self._refill_locks.setdefault(key, asyncio.Lock())
+            async with lock:
+                # Other coroutines may drain the heap while we wait on the database
+                while len(available) < count:
+                    needed = max(self.block_size, count - len(available))
+                    for value in await self._reserve(prefix, year, needed):
+                        heapq.heappush(available, value)
+
+        values = [heapq.heappop(available) for _ in range(count)]
+        self.issued += count
+        return [format_number(prefix, year, value) for value in values]
+
+    def release(self, numbers: List[str]) -> None:
+        """Return numbers whose create was rolled back; they are issued next."""
+        for number in numbers:
+            prefix, year, value = parse_number(number)
+            heapq.heappush(self._available.setdefault((prefix, year), []), value)
+        self.released += len(numbers)
+
+    async def _reserve(self, prefix: str, year: int, count: int) -> List[int]:
+        """Reserve count values: released numbers first, then from the sequence."""
+        while True:
+            try:
+                async with self.engine.begin() as conn:
+                    released = list((await conn.execute(
+                        select(ReleasedNumber.value)
+                        .where(ReleasedNumber.prefix == prefix, ReleasedNumber.year == year)
+                        .order_by(ReleasedNumber.value)
+                        .limit(count)
+                        .with_for_update(skip_locked=True)
+                    )).scalars())
+                    if released:
+                        await conn.execute(
+                            delete(ReleasedNumber).where(
+                                ReleasedNumber.prefix == prefix,
+                                ReleasedNumber.year == year,
+                                ReleasedNumber.value.in_(released)
+                            )
+                        )
+
+                    needed = count - len(released)
+                    if needed == 0:
+                        self.reservations += 1
+                        return released
+
+                    result = await conn.execute(
+                        update(NumberSequence)
+                        .where(NumberSequence.prefix == prefix, NumberSequence.year == year)
+                        .values(next_value=NumberSequence.next_value + needed)
+                    )
+                    if result.rowcount == 0:
+                        # First number of the year for this prefix
+                        await conn.execute(
+                            insert(NumberSequence).values(prefix=prefix, year=year, next_value=1 + needed)
+                        )
+                        start = 1
+                    else:
+                        next_value = (await conn.execute(
+                            select(NumberSequence.next_value)
+                            .where(NumberSequence.prefix == prefix, NumberSequence.year == year)
+                        )).scalar_one()
+                        start = next_value - needed
+            except IntegrityError:
+                # Another worker created the year's sequence row first
+                self.reservation_conflicts += 1
+                continue
+
+            self.reservations += 1
+            return released + list(range(start, start + needed))
+
+    async def release_unused(self) -> None:
+        """Write unissued numbers to released_numbers (call on shutdown)."""
+        rows = [
+            {"prefix": prefix, "year": year, "value": value}
+            for (prefix, year), values in self._available.items()
+            for value in values
+        ]
+        if not rows:
+            return
+        async with self.engine.begin() as conn:
+            await conn.execute(insert(ReleasedNumber), rows)
+        self._available.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get allocation counters and reserved-but-unissued counts."""
+        return {
+            "block_size": self.block_size,
+            "issued": self.issued,
+            "reservations": self.reservations,
+            "reservation_conflicts": self.reservation_conflicts,
+            "released": self.released,
+            "unissued": {
+                f"{prefix}-{year}": len(values)
+                for (prefix, year), values in self._available.items()
+            },
+        }
+
+
+# Global allocator instance
+_number_allocator: Optional[NumberAllocator] = None
+
+
+def get_number_allocator() -> NumberAllocator:
+    """Get global document number allocator."""
+    global _number_allocator
+    if _number_allocator is None:
+        _number_allocator = NumberAllocator(engine, block_size=settings.DOCUMENT_NUMBER_BLOCK_SIZE)
+    return _number_allocator
@@ -0,0 +1,173 @@
+"""
+Connection pool telemetry and liveness checks.
+Instruments SQLAlchemy pool events (checkout latency, in-use/overflow
+gauges, timeouts, pre-ping failures) and optionally replaces per-checkout
+pre-ping with a background ping of idle connections.
+"""
+import asyncio
+import math
+from typing import Any, Dict, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+# Checkout latency histogram bucket upper bounds (seconds)
+CHECKOUT_LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+class PoolTelemetry:
+    """Event counters and checkout latency histogram for one engine's pool."""
+
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.pool = engine.sync_engine.pool
+
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.pre_ping_failures = 0
+        self.liveness_checks = 0
+        self.liveness_failures = 0
+        self.peak_in_use = 0
+        self.checkout_seconds_total = 0.0
+        self._latency_buckets = [0] * (len(CHECKOUT_LATENCY_BUCKETS) + 1)
+
+    def observe_checkout(self, seconds: float) -> None:
+        """Record how long a checkout waited for a connection."""
+        self.checkout_seconds_total += seconds
+        for index, bound in enumerate(CHECKOUT_LATENCY_BUCKETS):
+            if seconds <= bound:
+                self._latency_buckets[index] += 1
+                return
+        self._latency_buckets[-1] += 1
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get counters, gauges and a pool size recommendation."""
+        size = self.pool.size() if hasattr(self.pool, "size") else 0
+        in_use = self.pool.checkedout() if hasattr(self.pool, "checkedout") else 0
+        overflow = self.pool.overflow() if hasattr(self.pool, "overflow") else 0
+        observed = sum(self._latency_buckets)
+
+        # Size the pool for observed peak concurrency plus 25% headroom
+        suggested_size = max(1, math.ceil(self.peak_in_use * 1.25)) if self.peak_in_use else size
+
+        return {
+            "name": self.name,
+            "pool_size": size,
+            "in_use": in_use,
+            "idle": self.pool.checkedin() if hasattr(self.pool, "checkedin") else 0,
+            "overflow": max(0, overflow),
+            "peak_in_use": self.peak_in_use,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "timeouts": self.timeouts,
+            "invalidations": self.invalidations,
+            "pre_ping_failures": self.pre_ping_failures,
+            "liveness_checks": self.liveness_checks,
+            "liveness_failures": self.liveness_failures,
+            "checkout_seconds_total": self.checkout_seconds_total,
+            "checkout_seconds_avg": self.checkout_seconds_total / observed if observed else 0.0,
+            "checkout_latency_buckets": dict(zip(
+                [str(bound) for bound in CHECKOUT_LATENCY_BUCKETS] + ["+Inf"],
+                self._latency_buckets
+            )),
+            "suggested_pool_size": suggested_size,
+        }
+
+
+# Registered pools: {name: telemetry}
+_telemetry: Dict[str, PoolTelemetry] = {}
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> PoolTelemetry:
+    """Attach pool and error event listeners to engine."""
+    telemetry = PoolTelemetry(name, engine)
+    pool = engine.sync_engine.pool
+    pool.telemetry = telemetry
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        telemetry.connects += 1
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        telemetry.checkouts += 1
+        telemetry.peak_in_use = max(telemetry.peak_in_use, pool.checkedout())
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        telemetry.checkins += 1
+
+    @event.listens_for(pool, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        telemetry.invalidations += 1
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def _on_error(context):
+        if context.is_pre_ping:
+            telemetry.pre_ping_failures += 1
+
+    _telemetry[name] = telemetry
+    return telemetry
+
+
+def get_pool_stats() -> list[dict[str, Any]]:
+    """Get telemetry for every instrumented pool."""
+    return [telemetry.get_stats() for telemetry in _telemetry.values()]
+
+
+class PoolLivenessMonitor:
+    """
+    Background liveness check for idle pooled connections.
+
+    Used instead of pool_pre_ping: rather than pinging on every checkout,
+    each idle connection is pinged once per interval. A connection killed
+    by MySQL wait_timeout fails the ping, and SQLAlchemy invalidates the
+    pool so requests get fresh connections.
+    """
+
+    def __init__(self, engine: AsyncEngine, interval_seconds: float):
+        self.engine = engine
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def check_idle_connections(self) -> None:
+        """Ping each currently idle connection once."""
+        pool = self.engine.sync_engine.pool
+        telemetry: Optional[PoolTelemetry] = getattr(pool, "telemetry", None)
+
+        # The queue is FIFO, so successive checkouts visit distinct idle connections
+        for _ in range(pool.checkedin()):
+            if telemetry is not None:
+                telemetry.liveness_checks += 1
+            try:
+                async with self.engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            except Exception:
+                if telemetry is not None:
+                    telemetry.liveness_failures += 1
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await self.check_idle_connections()
+
+    def start(self) -> None:
+        """Start the background liveness task."""
+        if self._task is None and self.interval_seconds > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background liveness task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
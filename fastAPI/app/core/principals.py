@@ -0,0 +1,93 @@
+"""
+Authenticated principal cache.
+Keeps a slim, immutable snapshot of recently authenticated users so that
+token-authenticated requests do not re-load the user row on every call.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event, inspect
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.roles import UserRole
+from app.models.user import User
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """Immutable snapshot of the fields needed for authorization checks."""
+
+    id: int
+    email: str
+    role: UserRole
+    is_active: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        """Build a principal snapshot from a User row."""
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=UserRole(user.role),
+            is_active=user.is_active,
+        )
+
+
+def can_view_all_purchase_requests(principal: Principal) -> bool:
+    """
+    Admins and procurement staff see every PR and the documents attached
+    to it; other roles only their own.
+    """
+    return principal.role == UserRole.ADMIN or principal.role.is_procurement_staff()
+
+
+# Global principal cache instance
+_principal_cache: TTLCache[Principal] = TTLCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    enabled=settings.PRINCIPAL_CACHE_ENABLED,
+)
+
+
+def get_principal_cache() -> TTLCache[Principal]:
+    """Get global principal cache instance."""
+    return _principal_cache
+
+
+def get_cached_principal(user_id: int) -> Optional[Principal]:
+    """Get a cached principal by user ID."""
+    return _principal_cache.get(user_id)
+
+
+def cache_principal(user: User) -> Principal:
+    """Snapshot a user row and store it in the cache."""
+    principal = Principal.from_user(user)
+    _principal_cache.set(principal.id, principal)
+    return principal
+
+
+def invalidate_principal(user_id: int) -> None:
+    """
+    Drop a cached principal.
+    Must be called whenever a user's password, role or active flag changes.
+    """
+    _principal_cache.invalidate(user_id)
+
+
+# Fields whose change must evict the cached principal
+_PRINCIPAL_FIELDS = ("password_hash", "role", "is_active", "email")
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_on_update(mapper, connection, target: User) -> None:
+    """Invalidate the principal when an ORM flush changes a security field."""
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in _PRINCIPAL_FIELDS):
+        invalidate_principal(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_on_delete(mapper, connection, target: User) -> None:
+    """Invalidate the principal when a user row is deleted."""
+    invalidate_principal(target.id)
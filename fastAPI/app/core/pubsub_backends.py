@@ -0,0 +1,129 @@
+"""
+Publish/subscribe backends for live notifications.
+Carry messages from the worker that publishes them to every worker's
+notification broker, either within one process or across uvicorn workers
+through Redis pub/sub. Each message gets an increasing integer ID, which
+clients send back as Last-Event-ID to resume a stream.
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, List, Tuple
+
+from app.core.config import settings
+
+
+class PubSubBackend(ABC):
+    """Interface implemented by all notification pub/sub backends."""
+
+    @abstractmethod
+    async def publish(self, payload: str) -> int:
+        """Publish payload to every listener and return its message ID."""
+
+    @abstractmethod
+    async def listen(self) -> AsyncIterator[Tuple[int, str]]:
+        """
+        Start listening and return an iterator of (message ID, payload).
+        Every message published after this returns is yielded, in ID order.
+        """
+
+    async def close(self) -> None:
+        """Release connections held by the backend."""
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get backend metrics."""
+        return {}
+
+
+class MemoryPubSubBackend(PubSubBackend):
+    """
+    In-process backend for a single worker (development and tests).
+
+    Message IDs restart from 1 with the process, so a client resuming
+    across a restart is sent a resync instead of a replay.
+    """
+
+    def __init__(self):
+        self._last_id = 0
+        self._listeners: List[asyncio.Queue] = []
+
+    async def publish(self, payload: str) -> int:
+        self._last_id += 1
+        for queue in self._listeners:
+            queue.put_nowait((self._last_id, payload))
+        return self._last_id
+
+    async def listen(self) -> AsyncIterator[Tuple[int, str]]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._listeners.append(queue)
+        return self._messages(queue)
+
+    async def _messages(self, queue: asyncio.Queue) -> AsyncIterator[Tuple[int, str]]:
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._listeners.remove(queue)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {"backend": "memory", "last_id": self._last_id, "listeners": len(self._listeners)}
+
+
+# Allocate the next message ID and publish in one atomic step, so every
+# listener sees messages in ID order whichever worker published them
+_PUBLISH_SCRIPT = """
+local id = redis.call('INCR', KEYS[1])
+redis.call('PUBLISH', KEYS[2], id .. ' ' .. ARGV[1])
+return id
+"""
+
+
+class RedisPubSubBackend(PubSubBackend):
+    """
+    Redis backend shared by all uvicorn workers.
+
+    Message IDs come from one Redis counter, so they are unique and
+    increasing across workers and restarts.
+    """
+
+    def __init__(self, redis: Any = None, prefix: str = "notifications"):
+        if redis is None:
+            from redis.asyncio import Redis
+            redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self.redis = redis
+        self.prefix = prefix
+        self.channel = f"{prefix}:channel"
+        self._publish = redis.register_script(_PUBLISH_SCRIPT)
+
+    async def publish(self, payload: str) -> int:
+        return int(await self._publish(keys=[f"{self.prefix}:last_id", self.channel], args=[payload]))
+
+    async def listen(self) -> AsyncIterator[Tuple[int, str]]:
+        pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.channel)
+        return self._messages(pubsub)
+
+    async def _messages(self, pubsub: Any) -> AsyncIterator[Tuple[int, str]]:
+        try:
+            async for message in pubsub.listen():
+                data = message["data"]
+                if isinstance(data, bytes):
+                    data = data.decode()
+                message_id, _, payload = data.partition(" ")
+                yield int(message_id), payload
+        finally:
+            await pubsub.aclose()
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {"backend": "redis", "channel": self.channel}
+
+
+def create_pubsub_backend() -> PubSubBackend:
+    """Create the backend selected by NOTIFICATION_STREAM_BACKEND."""
+    if settings.NOTIFICATION_STREAM_BACKEND == "redis":
+        return RedisPubSubBackend()
+    if settings.NOTIFICATION_STREAM_BACKEND == "memory":
+        return MemoryPubSubBackend()
+    raise ValueError(f"Unsupported notification stream backend: {settings.NOTIFICATION_STREAM_BACKEND}")
@@ -0,0 +1,168 @@
+"""
+Per-request SQL query profiler.
+Groups executed statements by shape (literals and IN-lists collapsed) and
+flags shapes repeated often enough to suggest an N+1 lazy-loading pattern.
+Results go to X-Query-* response headers and a structured log line.
+"""
+import json
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a SQL statement so executions differing only in values match."""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryProfile:
+    """Statements executed within one profiling scope, grouped by shape."""
+
+    def __init__(self, parent: Optional["QueryProfile"] = None):
+        self.parent = parent
+        self.query_count = 0
+        self.total_seconds = 0.0
+        # {shape: [count, seconds]}
+        self.shapes: Dict[str, List[Any]] = {}
+
+    def record(self, statement: str, seconds: float) -> None:
+        shape = statement_shape(statement)
+        profile: Optional[QueryProfile] = self
+        while profile is not None:
+            profile.query_count += 1
+            profile.total_seconds += seconds
+            entry = profile.shapes.get(shape)
+            if entry is None:
+                profile.shapes[shape] = [1, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+            profile = profile.parent
+
+    def repeated(self, threshold: int) -> List[Dict[str, Any]]:
+        """Shapes executed at least threshold times, most frequent first."""
+        return [
+            {"statement": shape, "count": count, "seconds": seconds}
+            for shape, (count, seconds) in sorted(
+                self.shapes.items(), key=lambda item: item[1][0], reverse=True
+            )
+            if count >= threshold
+        ]
+
+    def n_plus_one_suspects(self) -> List[Dict[str, Any]]:
+        """Repeated SELECT shapes that look like per-row lazy loads."""
+        return [
+            entry for entry in self.repeated(settings.QUERY_PROFILER_N_PLUS_ONE_THRESHOLD)
+            if entry["statement"].upper().startswith("SELECT")
+        ]
+
+
+_current_profile: ContextVar[Optional[QueryProfile]] = ContextVar("query_profile", default=None)
+
+
+def get_query_profile() -> Optional[QueryProfile]:
+    """Get the active profile for the current request, if profiling."""
+    return _current_profile.get()
+
+
+@contextmanager
+def profile_queries() -> Iterator[QueryProfile]:
+    """
+    Profile statements executed in this context.
+
+    Scopes nest: statements are also counted in any enclosing profile, so a
+    test can wrap a request that the middleware profiles on its own.
+    """
+    profile = QueryProfile(parent=_current_profile.get())
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _current_profile.reset(token)
+
+
+def instrument_profiler(engine: AsyncEngine) -> None:
+    """Feed statements executed through engine to the active profile."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_profile.get() is not None:
+            conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        profile = _current_profile.get()
+        started = conn.info.get("profile_started")
+        if profile is not None and started:
+            profile.record(statement, time.perf_counter() - started.pop())
+
+
+class QueryProfilerMiddleware:
+    """
+    ASGI middleware that profiles each request's SQL.
+
+    Adds X-Query-Count, X-Query-Time-Ms and (when flagged) X-N-Plus-One
+    headers, and logs one JSON line per request; N+1 suspects log at
+    WARNING. Intended for development and profiling, not production.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with profile_queries() as profile:
+            async def send_with_profile(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-query-count", str(profile.query_count).encode()))
+                    headers.append((b"x-query-time-ms", f"{profile.total_seconds * 1000:.2f}".encode()))
+                    suspects = profile.n_plus_one_suspects()
+                    if suspects:
+                        worst = suspects[0]
+                        headers.append((
+                            b"x-n-plus-one",
+                            f"{worst['count']}x {worst['statement'][:200]}".encode("ascii", "replace")
+                        ))
+                    message["headers"] = headers
+                await send(message)
+
+            await self.app(scope, receive, send_with_profile)
+
+        suspects = profile.n_plus_one_suspects()
+        route = scope.get("route")
+        logger.log(
+            logging.WARNING if suspects else logging.INFO,
+            json.dumps({
+                "event": "query_profile",
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(route, "path", None),
+                "query_count": profile.query_count,
+                "query_ms": round(profile.total_seconds * 1000, 2),
+                "distinct_statements": len(profile.shapes),
+                "n_plus_one": suspects,
+            })
+        )
@@ -0,0 +1,292 @@
+"""
+Storage backends for rate limiting.
+Provides O(1) sliding-window counters, lockouts and GCRA token buckets,
+either in process memory or shared across workers through Redis.
+"""
+import math
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+
+class RateLimitBackend(ABC):
+    """Interface implemented by all rate limit storage backends."""
+
+    @abstractmethod
+    async def increment(self, key: str, window_seconds: int) -> int:
+        """Record one event and return the sliding-window event count."""
+
+    @abstractmethod
+    async def count(self, key: str, window_seconds: int) -> int:
+        """Return the sliding-window event count without recording."""
+
+    @abstractmethod
+    async def lock(self, key: str, seconds: int) -> None:
+        """Lock out key for the given number of seconds."""
+
+    @abstractmethod
+    async def lockout_remaining(self, key: str) -> int:
+        """Return remaining lockout seconds (0 if not locked out)."""
+
+    @abstractmethod
+    async def acquire(self, key: str, rate_per_second: float, burst: int) -> tuple[bool, float]:
+        """
+        Take one token from key's bucket using GCRA.
+        Returns: (allowed, retry_after_seconds)
+        """
+
+    @abstractmethod
+    async def reset(self, key: str) -> None:
+        """Clear all counters, lockouts and buckets for key."""
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get backend metrics."""
+        return {}
+
+
+def _sliding_count(current: int, previous: int, elapsed_fraction: float) -> int:
+    """Weight the previous bucket by how much of it still overlaps the window."""
+    return current + int(previous * (1.0 - elapsed_fraction))
+
+
+class _WindowCounter:
+    """Two adjacent fixed buckets approximating a sliding window."""
+
+    __slots__ = ("bucket", "current", "previous")
+
+    def __init__(self, bucket: int):
+        self.bucket = bucket
+        self.current = 0
+        self.previous = 0
+
+    def roll(self, bucket: int) -> None:
+        """Advance to bucket, shifting or discarding old counts."""
+        if bucket == self.bucket:
+            return
+        self.previous = self.current if bucket == self.bucket + 1 else 0
+        self.current = 0
+        self.bucket = bucket
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    In-process backend using fixed-bucket counters and GCRA.
+
+    Every key costs a constant amount of memory, and keys that have gone
+    idle are swept out every eviction_interval seconds, so memory stays
+    bounded under traffic from many distinct identifiers.
+    """
+
+    def __init__(
+        self,
+        eviction_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.eviction_interval = eviction_interval
+        self._clock = clock
+
+        # Store: {key: (window_seconds, counter)}
+        self._counters: Dict[str, tuple[int, _WindowCounter]] = {}
+        # Store: {key: lockout_expires_at}
+        self._lockouts: Dict[str, float] = {}
+        # Store: {key: theoretical_arrival_time}
+        self._buckets: Dict[str, float] = {}
+
+        self._last_eviction = clock()
+        self.evicted_keys = 0
+
+    def _now(self) -> float:
+        """Get current time, sweeping idle keys when the interval has elapsed."""
+        now = self._clock()
+        if now - self._last_eviction >= self.eviction_interval:
+            self.evict_idle(now)
+        return now
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drop keys whose counters, lockouts and buckets have all drained."""
+        now = self._clock() if now is None else now
+        evicted = 0
+
+        for key in [
+            key for key, (window, counter) in self._counters.items()
+            if int(now // window) > counter.bucket + 1
+        ]:
+            del self._counters[key]
+            evicted += 1
+
+        for key in [key for key, expires_at in self._lockouts.items() if expires_at <= now]:
+            del self._lockouts[key]
+            evicted += 1
+
+        for key in [key for key, tat in self._buckets.items() if tat <= now]:
+            del self._buckets[key]
+            evicted += 1
+
+        self._last_eviction = now
+        self.evicted_keys += evicted
+        return evicted
+
+    def _counter(self, key: str, window_seconds: int, now: float) -> _WindowCounter:
+        bucket = int(now // window_seconds)
+        entry = self._counters.get(key)
+        if entry is None or entry[0] != window_seconds:
+            counter = _WindowCounter(bucket)
+            self._counters[key] = (window_seconds, counter)
+            return counter
+        counter = entry[1]
+        counter.roll(bucket)
+        return counter
+
+    async def increment(self, key: str, window_seconds: int) -> int:
+        now = self._now()
+        counter = self._counter(key, window_seconds, now)
+        counter.current += 1
+        return _sliding_count(counter.current, counter.previous, (now % window_seconds) / window_seconds)
+
+    async def count(self, key: str, window_seconds: int) -> int:
+        now = self._now()
+        entry = self._counters.get(key)
+        if entry is None or entry[0] != window_seconds:
+            return 0
+        counter = entry[1]
+        counter.roll(int(now // window_seconds))
+        return _sliding_count(counter.current, counter.previous, (now % window_seconds) / window_seconds)
+
+    async def lock(self, key: str, seconds: int) -> None:
+        self._lockouts[key] = self._now() + seconds
+
+    async def lockout_remaining(self, key: str) -> int:
+        expires_at = self._lockouts.get(key)
+        if expires_at is None:
+            return 0
+        remaining = expires_at - self._now()
+        if remaining <= 0:
+            # Lockout expired
+            del self._lockouts[key]
+            return 0
+        return math.ceil(remaining)
+
+    async def acquire(self, key: str, rate_per_second: float, burst: int) -> tuple[bool, float]:
+        now = self._now()
+        interval = 1.0 / rate_per_second
+        tat = max(self._buckets.get(key, now), now)
+        new_tat = tat + interval
+        allow_at = new_tat - burst * interval
+        if now < allow_at:
+            return False, allow_at - now
+        self._buckets[key] = new_tat
+        return True, 0.0
+
+    async def reset(self, key: str) -> None:
+        self._counters.pop(key, None)
+        self._lockouts.pop(key, None)
+        self._buckets.pop(key, None)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "backend": "memory",
+            "counter_keys": len(self._counters),
+            "lockout_keys": len(self._lockouts),
+            "bucket_keys": len(self._buckets),
+            "evicted_keys": self.evicted_keys,
+        }
+
+
+# GCRA check-and-update executed atomically inside Redis
+_GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1]) or ARGV[1])
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - burst * interval
+if now < allow_at then
+    return {0, tostring(allow_at - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, '0'}
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Redis backend shared by all uvicorn workers.
+
+    Counters live in one hash per key holding the current and previous
+    bucket; every key carries a TTL so idle identifiers expire on their own.
+    """
+
+    def __init__(
+        self,
+        redis: Any = None,
+        prefix: str = "ratelimit",
+        clock: Callable[[], float] = time.time
+    ):
+        if redis is None:
+            from redis.asyncio import Redis
+            redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self.redis = redis
+        self.prefix = prefix
+        self._clock = clock
+        self._gcra = redis.register_script(_GCRA_SCRIPT)
+
+    def _key(self, kind: str, key: str) -> str:
+        return f"{self.prefix}:{kind}:{key}"
+
+    async def increment(self, key: str, window_seconds: int) -> int:
+        now = self._clock()
+        bucket = int(now // window_seconds)
+        name = self._key("win", key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hincrby(name, str(bucket), 1)
+            pipe.hget(name, str(bucket - 1))
+            pipe.hdel(name, str(bucket - 2))
+            pipe.expire(name, window_seconds * 2)
+            current, previous, _, _ = await pipe.execute()
+        return _sliding_count(int(current), int(previous or 0), (now % window_seconds) / window_seconds)
+
+    async def count(self, key: str, window_seconds: int) -> int:
+        now = self._clock()
+        bucket = int(now // window_seconds)
+        current, previous = await self.redis.hmget(
+            self._key("win", key), [str(bucket), str(bucket - 1)]
+        )
+        return _sliding_count(int(current or 0), int(previous or 0), (now % window_seconds) / window_seconds)
+
+    async def lock(self, key: str, seconds: int) -> None:
+        await self.redis.set(self._key("lock", key), 1, ex=seconds)
+
+    async def lockout_remaining(self, key: str) -> int:
+        ttl = await self.redis.ttl(self._key("lock", key))
+        return max(0, int(ttl))
+
+    async def acquire(self, key: str, rate_per_second: float, burst: int) -> tuple[bool, float]:
+        allowed, retry_after = await self._gcra(
+            keys=[self._key("gcra", key)],
+            args=[self._clock(), 1.0 / rate_per_second, burst]
+        )
+        return bool(int(allowed)), float(retry_after)
+
+    async def reset(self, key: str) -> None:
+        await self.redis.delete(
+            self._key("win", key), self._key("lock", key), self._key("gcra", key)
+        )
+
+    def get_stats(self) -> dict[str, Any]:
+        return {"backend": "redis", "prefix": self.prefix}
+
+
+def create_rate_limit_backend() -> RateLimitBackend:
+    """Create the backend selected by RATE_LIMIT_BACKEND."""
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RedisRateLimitBackend()
+    if settings.RATE_LIMIT_BACKEND == "memory":
+        return MemoryRateLimitBackend(
+            eviction_interval=settings.RATE_LIMIT_EVICTION_INTERVAL_SECONDS
+        )
+    raise ValueError(f"Unsupported rate limit backend: {settings.RATE_LIMIT_BACKEND}")
@@ -1,97 +1,82 @@
 """
-Rate limiting middleware for authentication endpoints.
-Prevents brute force attacks by limiting login attempts.
+Rate limiting for authentication endpoints and the API as a whole.
+Prevents brute force attacks by limiting login attempts, and throttles
+abusive clients before they reach the database.
 """
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+import math
 from collections import defaultdict
-import asyncio
+from typing import Dict, Optional
 
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
 
+from app.core.config import settings
+from app.core.rate_limit_backends import RateLimitBackend, create_rate_limit_backend
+from app.core.security import decode_token
+
 
 class RateLimiter:
     """
-    In-memory rate limiter using sliding window algorithm.
-    For production, use Redis-based solution for distributed systems.
+    Login rate limiter using sliding-window failure counters.
+    Storage is delegated to a RateLimitBackend (in-memory or Redis).
     """
     
-    def __init__(self):
-        # Store: {identifier: [(timestamp, success)]}
-        self._attempts: Dict[str, list[tuple[datetime, bool]]] = defaultdict(list)
-        self._lockouts: Dict[str, datetime] = {}
+    def __init__(self, backend: Optional[RateLimitBackend] = None):
+        self.backend = backend or create_rate_limit_backend()
         
         # Configuration
-        self.max_attempts = 5  # Maximum failed attempts
+        self.max_attempts = settings.LOGIN_RATE_LIMIT  # Maximum failed attempts
         self.window_seconds = 60  # Time window in seconds
-        self.lockout_seconds = 900  # 15 minutes lockout
+        self.lockout_seconds = settings.LOGIN_LOCKOUT_MINUTES * 60
     
-    def _cleanup_old_attempts(self, identifier: str) -> None:
-        """Remove attempts outside the time window."""
-        cutoff = datetime.now() - timedelta(seconds=self.window_seconds)
-        self._attempts[identifier] = [
-            (ts, success) for ts, success in self._attempts[identifier]
-            if ts > cutoff
-        ]
+    @staticmethod
+    def _key(identifier: str) -> str:
+        return f"login:{identifier}"
     
-    def _get_failed_attempts(self, identifier: str) -> int:
+    async def _get_failed_attempts(self, identifier: str) -> int:
         """Count failed attempts within time window."""
-        self._cleanup_old_attempts(identifier)
-        return sum(1 for _, success in self._attempts[identifier] if not success)
+        return await self.backend.count(self._key(identifier), self.window_seconds)
     
-    def is_locked_out(self, identifier: str) -> bool:
+    async def is_locked_out(self, identifier: str) -> bool:
         """Check if identifier is currently locked out."""
-        if identifier in self._lockouts:
-            if datetime.now() < self._lockouts[identifier]:
-                return True
-            else:
-                # Lockout expired
-                del self._lockouts[identifier]
-        return False
-    
-    def get_lockout_remaining(self, identifier: str) -> int:
+        return await self.get_lockout_remaining(identifier) > 0
+    
+    async def get_lockout_remaining(self, identifier: str) -> int:
         """Get remaining lockout time in seconds."""
-        if identifier in self._lockouts:
-            remaining = (self._lockouts[identifier] - datetime.now()).total_seconds()
-            return max(0, int(remaining))
-        return 0
+        return await self.backend.lockout_remaining(self._key(identifier))
     
-    def record_attempt(self, identifier: str, success: bool) -> None:
+    async def record_attempt(self, identifier: str, success: bool) -> None:
         """Record a login attempt."""
-        self._attempts[identifier].append((datetime.now(), success))
+        if success:
+            return
         
         # If failed attempt, check if should lockout
-        if not success:
-            failed_count = self._get_failed_attempts(identifier)
-            if failed_count >= self.max_attempts:
-                # Lockout for specified duration
-                self._lockouts[identifier] = datetime.now() + timedelta(seconds=self.lockout_seconds)
+        failed_count = await self.backend.increment(self._key(identifier), self.window_seconds)
+        if failed_count >= self.max_attempts:
+            # Lockout for specified duration
+            await self.backend.lock(self._key(identifier), self.lockout_seconds)
     
-    def check_rate_limit(self, identifier: str) -> tuple[bool, Optional[int]]:
+    async def check_rate_limit(self, identifier: str) -> tuple[bool, Optional[int]]:
         """
         Check if request should be rate limited.
         Returns: (allowed, remaining_lockout_seconds)
         """
         # Check if locked out
-        if self.is_locked_out(identifier):
-            remaining = self.get_lockout_remaining(identifier)
+        remaining = await self.get_lockout_remaining(identifier)
+        if remaining > 0:
             return False, remaining
         
         # Check rate limit
-        failed_count = self._get_failed_attempts(identifier)
+        failed_count = await self._get_failed_attempts(identifier)
         if failed_count >= self.max_attempts:
-            self._lockouts[identifier] = datetime.now() + timedelta(seconds=self.lockout_seconds)
+            await self.backend.lock(self._key(identifier), self.lockout_seconds)
             return False, self.lockout_seconds
         
         return True, None
     
-    def reset(self, identifier: str) -> None:
+    async def reset(self, identifier: str) -> None:
         """Reset rate limit for identifier (e.g., after successful login)."""
-        if identifier in self._attempts:
-            del self._attempts[identifier]
-        if identifier in self._lockouts:
-            del self._lockouts[identifier]
+        await self.backend.reset(self._key(identifier))
 
 
 # Global rate limiter instance
@@ -126,7 +111,7 @@ async def check_auth_rate_limit(request: Request) -> None:
     identifier = get_client_identifier(request)
     limiter = get_rate_limiter()
     
-    allowed, lockout_remaining = limiter.check_rate_limit(identifier)
+    allowed, lockout_remaining = await limiter.check_rate_limit(identifier)
     
     if not allowed:
         raise HTTPException(
@@ -137,3 +122,106 @@ async def check_auth_rate_limit(request: Request) -> None:
                 "lockout_remaining_minutes": lockout_remaining // 60
             }
         )
+
+
+# API rate limit metrics: {(route_group, outcome): count}
+_middleware_counts: Dict[tuple[str, str], int] = defaultdict(int)
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware enforcing API-wide token-bucket limits.
+    
+    Every request is charged against a per-client bucket (keyed by
+    get_client_identifier) and, when it carries a valid bearer token, a
+    per-user bucket. Limits can be overridden per route group (path
+    prefix). Runs before routing, so rejected requests never open a
+    database session.
+    """
+    
+    def __init__(self, app, backend: Optional[RateLimitBackend] = None):
+        self.app = app
+        self._backend = backend
+        self.enabled = settings.RATE_LIMIT_ENABLED
+        self.burst = settings.RATE_LIMIT_BURST
+        self.exempt_paths = tuple(settings.RATE_LIMIT_EXEMPT_PATHS_LIST)
+        
+        # Longest prefix first so the most specific group wins
+        self.route_overrides = sorted(
+            settings.RATE_LIMIT_ROUTE_OVERRIDES_MAP.items(),
+            key=lambda item: len(item[0]),
+            reverse=True
+        )
+    
+    @property
+    def backend(self) -> RateLimitBackend:
+        # Share storage with the login limiter unless one was injected
+        return self._backend or get_rate_limiter().backend
+    
+    def _route_group(self, path: str) -> tuple[str, int, int]:
+        """Resolve (group, client_per_minute, user_per_minute) for a path."""
+        for prefix, per_minute in self.route_overrides:
+            if path.startswith(prefix):
+                return prefix, per_minute, per_minute
+        return "default", settings.RATE_LIMIT_PER_MINUTE, settings.RATE_LIMIT_USER_PER_MINUTE
+    
+    @staticmethod
+    def _user_id(request: Request) -> Optional[str]:
+        """Extract the user ID from a bearer token without touching the DB."""
+        authorization = request.headers.get("Authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        payload = decode_token(token)
+        if payload is None or payload.get("type") == "refresh":
+            return None
+        subject = payload.get("sub")
+        return str(subject) if subject is not None else None
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+        
+        path = scope["path"]
+        if scope["method"] == "OPTIONS" or path.startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+        
+        request = Request(scope)
+        group, client_limit, user_limit = self._route_group(path)
+        
+        checks = [("client", get_client_identifier(request), client_limit)]
+        user_id = self._user_id(request)
+        if user_id is not None:
+            checks.append(("user", user_id, user_limit))
+        
+        for kind, identifier, per_minute in checks:
+            allowed, retry_after = await self.backend.acquire(
+                f"api:{group}:{kind}:{identifier}",
+                rate_per_second=per_minute / 60.0,
+                burst=self.burst
+            )
+            if not allowed:
+                _middleware_counts[(group, f"rejected_{kind}")] += 1
+                response = JSONResponse(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    content={
+                        "detail": "Rate limit exceeded. Please slow down.",
+                        "retry_after_seconds": math.ceil(retry_after)
+                    },
+                    headers={"Retry-After": str(math.ceil(retry_after))}
+                )
+                await response(scope, receive, send)
+                return
+        
+        _middleware_counts[(group, "admitted")] += 1
+        await self.app(scope, receive, send)
+
+
+def get_api_rate_limit_stats() -> dict[str, dict[str, int]]:
+    """Get RateLimitMiddleware admitted/rejected counts per route group."""
+    stats: Dict[str, Dict[str, int]] = defaultdict(dict)
+    for (group, outcome), count in _middleware_counts.items():
+        stats[group][outcome] = count
+    return dict(stats)
@@ -0,0 +1,191 @@
+"""
+Read-replica routing.
+Tracks replica health and lag, picks a replica for read-only sessions and
+keeps recent writers on the primary (read-your-writes).
+"""
+import asyncio
+import itertools
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+# Identifies whose writes a read must observe (e.g. "user:42")
+_routing_key: ContextVar[Optional[str]] = ContextVar("db_routing_key", default=None)
+
+
+def set_routing_key(key: Optional[str]) -> None:
+    """Set the read-your-writes key for the current request."""
+    _routing_key.set(key)
+
+
+def get_routing_key() -> Optional[str]:
+    """Get the read-your-writes key for the current request."""
+    return _routing_key.get()
+
+
+async def mysql_replica_lag(engine: AsyncEngine) -> Optional[float]:
+    """
+    Probe replication lag in seconds.
+    Returns None when replication is broken; 0 for servers that are not replicas.
+    """
+    async with engine.connect() as conn:
+        if engine.dialect.name != "mysql":
+            await conn.execute(text("SELECT 1"))
+            return 0.0
+
+        result = await conn.execute(text("SHOW REPLICA STATUS"))
+        row = result.mappings().first()
+        if row is None:
+            return 0.0
+        lag = row.get("Seconds_Behind_Source")
+        return None if lag is None else float(lag)
+
+
+class Replica:
+    """A replica engine and its last observed health."""
+
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.lag_seconds: Optional[float] = 0.0
+        self.last_checked: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.reads = 0
+
+
+class ReplicaSet:
+    """
+    Routes read-only sessions to healthy replicas.
+
+    A replica is taken out of rotation when its lag exceeds max_lag_seconds
+    or the probe fails; reads then fall back to the primary. After a
+    commit, reads for the same routing key stay on the primary for
+    sticky_seconds so users always see their own writes.
+    """
+
+    def __init__(
+        self,
+        replicas: List[Replica],
+        max_lag_seconds: float = 5.0,
+        check_interval: float = 10.0,
+        sticky_seconds: float = 10.0,
+        lag_probe: Callable[[AsyncEngine], Awaitable[Optional[float]]] = mysql_replica_lag,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds
+        self.lag_probe = lag_probe
+        self._clock = clock
+        self._round_robin = itertools.cycle(range(len(replicas))) if replicas else None
+        self._sticky_until: Dict[str, float] = {}
+        self._monitor: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.primary_reads = 0
+        self.sticky_reads = 0
+
+    def mark_write(self, key: Optional[str] = None) -> None:
+        """Pin reads for key to the primary for the stickiness window."""
+        key = key or get_routing_key()
+        if key is None or not self.replicas:
+            return
+        now = self._clock()
+        self._sticky_until[key] = now + self.sticky_seconds
+
+        # Keep the map bounded by dropping expired pins
+        if len(self._sticky_until) > 10000:
+            self._sticky_until = {
+                k: until for k, until in self._sticky_until.items() if until > now
+            }
+
+    def _is_sticky(self, key: Optional[str]) -> bool:
+        if key is None:
+            return False
+        until = self._sticky_until.get(key)
+        if until is None:
+            return False
+        if until <= self._clock():
+            del self._sticky_until[key]
+            return False
+        return True
+
+    def choose_for_read(self) -> Optional[AsyncEngine]:
+        """Pick a replica engine for a read-only session, or None for the primary."""
+        if not self.replicas:
+            return None
+
+        if self._is_sticky(get_routing_key()):
+            self.sticky_reads += 1
+            return None
+
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._round_robin)]
+            if replica.healthy:
+                replica.reads += 1
+                return replica.engine
+
+        self.primary_reads += 1
+        return None
+
+    async def check_replicas(self) -> None:
+        """Probe every replica and update its health."""
+        for replica in self.replicas:
+            try:
+                lag = await self.lag_probe(replica.engine)
+                replica.lag_seconds = lag
+                replica.healthy = lag is not None and lag <= self.max_lag_seconds
+                replica.last_error = None if lag is not None else "replication stopped"
+            except Exception as exc:
+                replica.lag_seconds = None
+                replica.healthy = False
+                replica.last_error = str(exc)
+            replica.last_checked = self._clock()
+
+    async def _monitor_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check_replicas()
+
+    async def start(self) -> None:
+        """Run an initial health check and start the background lag monitor."""
+        if not self.replicas:
+            return
+        await self.check_replicas()
+        self._monitor = asyncio.create_task(self._monitor_loop())
+
+    async def stop(self) -> None:
+        """Stop the lag monitor and dispose replica engines."""
+        if self._monitor is not None:
+            self._monitor.cancel()
+            try:
+                await self._monitor
+            except asyncio.CancelledError:
+                pass
+            self._monitor = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get replica health and routing counters."""
+        return {
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag_seconds,
+                    "reads": replica.reads,
+                    "last_error": replica.last_error,
+                }
+                for replica in self.replicas
+            ],
+            "primary_fallback_reads": self.primary_reads,
+            "sticky_reads": self.sticky_reads,
+            "sticky_keys": len(self._sticky_until),
+        }
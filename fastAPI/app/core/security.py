@@ -1,15 +1,25 @@
 """Security utilities for authentication and authorization"""
 
+import hashlib
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Any
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Verified token payloads keyed by SHA-256 digest of the encoded token
+_token_cache: TTLCache[dict[str, Any]] = TTLCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS,
+    enabled=settings.TOKEN_CACHE_ENABLED,
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
@@ -69,17 +79,37 @@ def create_refresh_token(data: dict[str, Any]) -> str:
     return encoded_jwt
 
 
+def get_token_cache() -> TTLCache[dict[str, Any]]:
+    """Get the decoded-token cache instance."""
+    return _token_cache
+
+
 def decode_token(token: str) -> Optional[dict[str, Any]]:
-    """Decode and verify a JWT token"""
+    """
+    Decode and verify a JWT token.
+    
+    Verified payloads are cached by token digest until the token's exp
+    claim, so repeat tokens skip signature verification and parsing.
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = _token_cache.get(digest)
+    if cached is not None:
+        return dict(cached)
+    
     try:
         payload = jwt.decode(
             token,
             settings.SECRET_KEY,
             algorithms=[settings.ALGORITHM]
         )
-        return payload
     except JWTError:
         return None
+    
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        _token_cache.set(digest, payload, ttl_seconds=exp - time.time())
+    
+    return dict(payload)
 
 
 def validate_password_requirements(password: str) -> tuple[bool, list[str]]:
@@ -0,0 +1,202 @@
+"""
+Cached unread-notification counters.
+Keeps each user's unread count so the page-header badge does not run
+COUNT(*) over their notifications on every page load. The notification
+service adjusts a cached count as it inserts notifications and marks
+them read; a count not cached is left alone and computed from the table
+on its next read. Every count expires after
+NOTIFICATION_UNREAD_CACHE_TTL_SECONDS whatever adjustments it received,
+which reconciles any drift (a racing recount, or the memory backend
+missing other workers' changes) against the table.
+"""
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class UnreadCounterBackend(ABC):
+    """Interface implemented by all unread counter storage backends."""
+
+    @abstractmethod
+    async def get(self, user_id: int) -> Optional[int]:
+        """Cached unread count, or None if not cached."""
+
+    @abstractmethod
+    async def set(self, user_id: int, count: int) -> None:
+        """Cache a count freshly computed from the table."""
+
+    @abstractmethod
+    async def adjust(self, deltas: Dict[int, int]) -> None:
+        """Add each delta to that user's count if it is cached (never below 0)."""
+
+    @abstractmethod
+    async def invalidate(self, user_id: int) -> None:
+        """Drop a user's count so the next read recomputes it."""
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get backend metrics."""
+        return {}
+
+
+class MemoryUnreadCounterBackend(UnreadCounterBackend):
+    """
+    In-process counters for a single worker.
+
+    With several workers each keeps its own counts and sees only its own
+    adjustments, so a count can be off by what other workers did until
+    it expires; use the Redis backend there.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 300.0):
+        self._cache: TTLCache[int] = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+
+    async def get(self, user_id: int) -> Optional[int]:
+        return self._cache.get(user_id)
+
+    async def set(self, user_id: int, count: int) -> None:
+        self._cache.set(user_id, count)
+
+    async def adjust(self, deltas: Dict[int, int]) -> None:
+        for user_id, delta in deltas.items():
+            self._cache.update(user_id, lambda count, delta=delta: max(0, count + delta))
+
+    async def invalidate(self, user_id: int) -> None:
+        self._cache.invalidate(user_id)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {"backend": "memory", **self._cache.get_stats()}
+
+
+# Adjust only counts that exist; INCRBY keeps the key's expiry
+_ADJUST_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        if redis.call('INCRBY', key, ARGV[i]) < 0 then
+            redis.call('SET', key, 0, 'KEEPTTL')
+        end
+    end
+end
+return 0
+"""
+
+
+class RedisUnreadCounterBackend(UnreadCounterBackend):
+    """Redis counters shared by all uvicorn workers."""
+
+    def __init__(self, redis: Any = None, prefix: str = "unread", ttl_seconds: float = 300.0):
+        if redis is None:
+            from redis.asyncio import Redis
+            redis = Redis.from_url(settings.REDIS_URL, decode_responses=True)
+        self.redis = redis
+        self.prefix = prefix
+        self.ttl_seconds = ttl_seconds
+        self._adjust = redis.register_script(_ADJUST_SCRIPT)
+
+    def _key(self, user_id: int) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    async def get(self, user_id: int) -> Optional[int]:
+        value = await self.redis.get(self._key(user_id))
+        return None if value is None else int(value)
+
+    async def set(self, user_id: int, count: int) -> None:
+        await self.redis.set(self._key(user_id), count, ex=max(1, int(self.ttl_seconds)))
+
+    async def adjust(self, deltas: Dict[int, int]) -> None:
+        deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+        if deltas:
+            await self._adjust(keys=[self._key(user_id) for user_id in deltas], args=list(deltas.values()))
+
+    async def invalidate(self, user_id: int) -> None:
+        await self.redis.delete(self._key(user_id))
+
+    def get_stats(self) -> dict[str, Any]:
+        return {"backend": "redis", "prefix": self.prefix, "ttl_seconds": self.ttl_seconds}
+
+
+class UnreadCounter:
+    """
+    Unread counts backed by an UnreadCounterBackend.
+    Backend errors are counted and treated as a cache miss, so the badge
+    falls back to the table rather than failing the request.
+    """
+
+    def __init__(self, backend: Optional[UnreadCounterBackend] = None):
+        self.backend = backend or create_unread_counter_backend()
+
+        # Metrics
+        self.hits = 0
+        self.recounts = 0
+        self.adjustments = 0
+        self.errors = 0
+
+    async def get(self, user_id: int) -> Optional[int]:
+        try:
+            count = await self.backend.get(user_id)
+        except Exception:
+            self.errors += 1
+            logger.exception("Unread counter read failed for user %s", user_id)
+            return None
+        if count is not None:
+            self.hits += 1
+        return count
+
+    async def set(self, user_id: int, count: int) -> None:
+        self.recounts += 1
+        try:
+            await self.backend.set(user_id, count)
+        except Exception:
+            self.errors += 1
+            logger.exception("Unread counter write failed for user %s", user_id)
+
+    async def adjust(self, deltas: Dict[int, int]) -> None:
+        if not deltas:
+            return
+        self.adjustments += len(deltas)
+        try:
+            await self.backend.adjust(deltas)
+        except Exception:
+            self.errors += 1
+            logger.exception("Unread counter adjust failed for %d users", len(deltas))
+            # A count that missed this change must not outlive it
+            for user_id in deltas:
+                try:
+                    await self.backend.invalidate(user_id)
+                except Exception:
+                    pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get counter metrics."""
+        return {
+            **self.backend.get_stats(),
+            "counter_hits": self.hits,
+            "recounts": self.recounts,
+            "adjustments": self.adjustments,
+            "errors": self.errors,
+        }
+
+
+def create_unread_counter_backend() -> UnreadCounterBackend:
+    """Create the backend selected by NOTIFICATION_UNREAD_CACHE_BACKEND."""
+    if settings.NOTIFICATION_UNREAD_CACHE_BACKEND == "redis":
+        return RedisUnreadCounterBackend(ttl_seconds=settings.NOTIFICATION_UNREAD_CACHE_TTL_SECONDS)
+    if settings.NOTIFICATION_UNREAD_CACHE_BACKEND == "memory":
+        return MemoryUnreadCounterBackend(
+            max_size=settings.NOTIFICATION_UNREAD_CACHE_SIZE,
+            ttl_seconds=settings.NOTIFICATION_UNREAD_CACHE_TTL_SECONDS
+        )
+    raise ValueError(f"Unsupported unread counter backend: {settings.NOTIFICATION_UNREAD_CACHE_BACKEND}")
+
+
+# Global unread counter instance
+_unread_counter = UnreadCounter()
+
+
+def get_unread_counter() -> UnreadCounter:
+    """Get global unread counter instance."""
+    return _unread_counter
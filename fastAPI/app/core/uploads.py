@@ -0,0 +1,322 @@
+"""
+Streaming file uploads.
+Reads a multipart/form-data request body as it arrives and writes the
+file part to a staging file in UPLOAD_CHUNK_SIZE_KB blocks, so an upload
+never holds more than about one block in worker memory whatever the file
+size. The SHA-256 checksum is computed block by block and the content
+type is sniffed from the first bytes. The upload is aborted with 413 as
+soon as it passes the size limit. Disk writes run in the default
+executor, off the event loop. The caller moves the completed staging
+file into place (see BlobStore.adopt) or removes it.
+"""
+import asyncio
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+from fastapi import HTTPException, Request, status
+from multipart.multipart import MultipartParser, parse_options_header
+
+from app.core.config import settings
+
+
+# Content type per allowed extension
+EXTENSION_MIME_TYPES = {
+    "pdf": "application/pdf",
+    "doc": "application/msword",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "xls": "application/vnd.ms-excel",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+}
+
+# Leading bytes each extension's files must start with. doc/xls are OLE2
+# compound files and docx/xlsx are ZIP packages.
+FILE_SIGNATURES = {
+    "pdf": (b"%PDF-",),
+    "doc": (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",),
+    "xls": (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",),
+    "docx": (b"PK\x03\x04",),
+    "xlsx": (b"PK\x03\x04",),
+    "png": (b"\x89PNG\r\n\x1a\n",),
+    "jpg": (b"\xff\xd8\xff",),
+    "jpeg": (b"\xff\xd8\xff",),
+}
+
+# Bytes needed to check any signature
+SNIFF_BYTES = max(len(signature) for signatures in FILE_SIGNATURES.values() for signature in signatures)
+
+# Multipart boundaries and part headers allowed on top of the file size
+MULTIPART_OVERHEAD_BYTES = 16 * 1024
+
+
+@dataclass(frozen=True, slots=True)
+class StoredFile:
+    """A completed upload, staged under the upload directory."""
+
+    file_path: str  # relative to the upload directory
+    original_filename: str
+    file_size: int
+    mime_type: str
+    checksum: str  # SHA-256, hex
+
+
+def file_extension(filename: str) -> str:
+    return os.path.splitext(filename)[1].lstrip(".").lower()
+
+
+def sniff_mime_type(extension: str, head: bytes) -> Optional[str]:
+    """Content type for extension if head starts with one of its signatures."""
+    signatures = FILE_SIGNATURES.get(extension)
+    if signatures is None:
+        return None
+    if any(head.startswith(signature) for signature in signatures):
+        return EXTENSION_MIME_TYPES[extension]
+    return None
+
+
+class UploadWriter:
+    """
+    Writes one file to a staging file in fixed-size blocks.
+
+    Incoming data is buffered until a block is full, then hashed and
+    written in the executor. finish() writes the rest and closes the file;
+    abort() removes it. Raises HTTPException 413 when the file
+    grows past max_bytes and 415 when its extension is not allowed or its
+    content does not match the extension.
+    """
+
+    def __init__(
+        self,
+        upload_dir: str,
+        subdir: str,
+        original_filename: str,
+        max_bytes: int,
+        allowed_extensions: Iterable[str],
+        chunk_size: int
+    ):
+        # Browsers may send a client-side path; keep the base name only
+        self.original_filename = os.path.basename(original_filename.replace("\\", "/"))[:255]
+        self.extension = file_extension(self.original_filename)
+        if self.extension not in set(allowed_extensions) or self.extension not in FILE_SIGNATURES:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"File type .{self.extension} is not allowed"
+            )
+
+        self.upload_dir = upload_dir
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        file_name = f"{uuid.uuid4().hex}.upload"
+        self.relative_path = f"{subdir}/{file_name}" if subdir else file_name
+        self._temp_path = os.path.join(upload_dir, self.relative_path)
+
+        self.size = 0
+        self.mime_type: Optional[str] = None
+        self._buffer = bytearray()
+        self._hash = hashlib.sha256()
+        self._file = None
+        self.finished = False
+
+    async def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File exceeds the {self.max_bytes // (1024 * 1024)} MB limit"
+            )
+        self._buffer += data
+        if self.mime_type is None and len(self._buffer) >= SNIFF_BYTES:
+            self._sniff()
+        if len(self._buffer) >= self.chunk_size and self.mime_type is not None:
+            await self._flush()
+
+    def _sniff(self) -> None:
+        self.mime_type = sniff_mime_type(self.extension, bytes(self._buffer[:SNIFF_BYTES]))
+        if self.mime_type is None:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"File content is not a valid .{self.extension} file"
+            )
+
+    async def _flush(self) -> None:
+        block, self._buffer = self._buffer, bytearray()
+        await asyncio.get_running_loop().run_in_executor(None, self._write_block, block)
+
+    def _write_block(self, block: bytearray) -> None:
+        if self._file is None:
+            os.makedirs(os.path.dirname(self._temp_path), exist_ok=True)
+            self._file = open(self._temp_path, "xb")
+        self._hash.update(block)
+        self._file.write(block)
+
+    async def finish(self) -> StoredFile:
+        """Write the rest and close the file."""
+        if self.size == 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File is empty")
+        if self.mime_type is None:
+            self._sniff()
+        await self._flush()
+        await asyncio.get_running_loop().run_in_executor(None, self._file.close)
+        self.finished = True
+        return StoredFile(
+            file_path=self.relative_path,
+            original_filename=self.original_filename,
+            file_size=self.size,
+            mime_type=self.mime_type,
+            checksum=self._hash.hexdigest(),
+        )
+
+    def _discard(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        try:
+            os.remove(self._temp_path)
+        except FileNotFoundError:
+            pass
+
+    async def abort(self) -> None:
+        """Remove the partial file."""
+        if not self.finished:
+            await asyncio.get_running_loop().run_in_executor(None, self._discard)
+
+
+def _part_name_and_filename(headers: List[tuple]) -> tuple[Optional[str], Optional[str]]:
+    for field, value in headers:
+        if field.lower() == b"content-disposition":
+            _, options = parse_options_header(value)
+            name = options.get(b"name")
+            filename = options.get(b"filename")
+            return (
+                name.decode("utf-8", "replace") if name is not None else None,
+                filename.decode("utf-8", "replace") if filename is not None else None,
+            )
+    return None, None
+
+
+async def receive_upload(
+    request: Request,
+    subdir: str = "",
+    field_name: str = "file",
+    max_bytes: Optional[int] = None,
+    upload_dir: Optional[str] = None,
+    allowed_extensions: Optional[Iterable[str]] = None,
+    chunk_size: Optional[int] = None
+) -> StoredFile:
+    """
+    Stream the file part field_name of a multipart/form-data request to
+    disk under upload_dir/subdir (defaults from settings). Other parts
+    are ignored. Raises HTTPException 413 without reading the body when
+    Content-Length already exceeds the limit.
+    """
+    max_bytes = settings.MAX_FILE_SIZE_MB * 1024 * 1024 if max_bytes is None else max_bytes
+    upload_dir = upload_dir or settings.UPLOAD_DIR
+    allowed_extensions = settings.ALLOWED_FILE_EXTENSIONS if allowed_extensions is None else allowed_extensions
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE_KB * 1024
+    body_limit = max_bytes + MULTIPART_OVERHEAD_BYTES
+
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Expected a multipart/form-data upload"
+        )
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > body_limit:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File exceeds the {max_bytes // (1024 * 1024)} MB limit"
+        )
+
+    # The parser's callbacks are synchronous; they queue events that are
+    # handled (with awaits) after each chunk is fed
+    events: List[tuple] = []
+    header: List[bytes] = [b"", b""]
+    headers: List[tuple] = []
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header[0] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header[1] += data[start:end]
+
+    def on_header_end() -> None:
+        headers.append((header[0], header[1]))
+        header[0] = header[1] = b""
+
+    def on_headers_finished() -> None:
+        events.append(("part", _part_name_and_filename(headers)))
+        headers.clear()
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        # The parser reports data byte by byte around every CR it meets
+        # (common in binary files); merge consecutive pieces
+        if events and events[-1][0] == "data":
+            events[-1][1].extend(data[start:end])
+        else:
+            events.append(("data", bytearray(data[start:end])))
+
+    parser = MultipartParser(boundary, {
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": lambda: events.append(("end", None)),
+    })
+
+    writer: Optional[UploadWriter] = None
+    stored: Optional[StoredFile] = None
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > body_limit:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"File exceeds the {max_bytes // (1024 * 1024)} MB limit"
+                )
+            parser.write(chunk)
+            for kind, value in events:
+                if kind == "part":
+                    name, filename = value
+                    if name == field_name and filename and stored is None and writer is None:
+                        writer = UploadWriter(
+                            upload_dir, subdir, filename, max_bytes, allowed_extensions, chunk_size
+                        )
+                elif writer is not None and not writer.finished:
+                    if kind == "data":
+                        await writer.write(value)
+                    else:
+                        stored = await writer.finish()
+            events.clear()
+        parser.finalize()
+    except BaseException:
+        if stored is not None:
+            await remove_stored_file(stored, upload_dir)
+        elif writer is not None:
+            await writer.abort()
+        raise
+
+    if stored is None:
+        if writer is not None:
+            await writer.abort()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Expected a file in form field '{field_name}'"
+        )
+    return stored
+
+
+async def remove_stored_file(stored: StoredFile, upload_dir: Optional[str] = None) -> None:
+    """Delete a staged upload that was not moved into place."""
+    path = os.path.join(upload_dir or settings.UPLOAD_DIR, stored.file_path)
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, os.remove, path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,96 @@
+"""
+Purchase request status workflow.
+Declares which role may move a PR from which status to which, and
+precomputes per role the statuses each target can be reached from, so a
+transition is a single UPDATE ... WHERE status IN (...) with no per-row
+checks in Python.
+"""
+from typing import Dict, FrozenSet, List
+
+from fastapi import HTTPException, status as http_status
+
+from app.core.roles import UserRole
+from app.core.status import NotificationType, PurchaseRequestStatus as PRStatus
+
+
+# (from, to) -> roles allowed to make the move (ADMIN may make any move)
+PR_TRANSITIONS: Dict[tuple, FrozenSet[UserRole]] = {
+    (PRStatus.PR_UNDER_REVIEW, PRStatus.RFQ_READY): frozenset({UserRole.PROCUREMENT_OFFICER}),
+    (PRStatus.RFQ_READY, PRStatus.RFQ_DISSEMINATED): frozenset({UserRole.PROCUREMENT_OFFICER}),
+    (PRStatus.RFQ_DISSEMINATED, PRStatus.CANVASS_COMPLETE): frozenset({
+        UserRole.PROCUREMENT_OFFICER, UserRole.CANVASSER
+    }),
+    (PRStatus.CANVASS_COMPLETE, PRStatus.BAC_DOCS_READY): frozenset({UserRole.BAC_SECRETARIAT}),
+    (PRStatus.BAC_DOCS_READY, PRStatus.BAC_APPROVED): frozenset({UserRole.BAC_CHAIR}),
+    (PRStatus.BAC_APPROVED, PRStatus.PO_APPROVED): frozenset({UserRole.PROCUREMENT_OFFICER}),
+    (PRStatus.PO_APPROVED, PRStatus.AWAITING_CONFORME): frozenset({UserRole.PROCUREMENT_OFFICER}),
+    (PRStatus.AWAITING_CONFORME, PRStatus.PO_COMPLETE): frozenset({UserRole.PROCUREMENT_OFFICER}),
+    (PRStatus.PO_COMPLETE, PRStatus.COA_STAMPED): frozenset({UserRole.PROCUREMENT_OFFICER}),
+    # Returned for revision at any review stage
+    (PRStatus.RFQ_READY, PRStatus.PR_UNDER_REVIEW): frozenset({UserRole.PROCUREMENT_OFFICER}),
+    (PRStatus.BAC_DOCS_READY, PRStatus.CANVASS_COMPLETE): frozenset({
+        UserRole.BAC_CHAIR, UserRole.BAC_SECRETARIAT
+    }),
+    # End users may withdraw their own PR while it is still under review
+    (PRStatus.PR_UNDER_REVIEW, PRStatus.CANCELLED): frozenset({
+        UserRole.END_USER, UserRole.PROCUREMENT_OFFICER
+    }),
+    **{
+        (source, PRStatus.CANCELLED): frozenset({UserRole.PROCUREMENT_OFFICER})
+        for source in (
+            PRStatus.RFQ_READY,
+            PRStatus.RFQ_DISSEMINATED,
+            PRStatus.CANVASS_COMPLETE,
+            PRStatus.BAC_DOCS_READY,
+            PRStatus.BAC_APPROVED,
+        )
+    },
+}
+
+
+# Status reached -> who must act next, notified on every PR that reaches it
+# (the PR's end user is always told its status changed)
+STATUS_NOTIFICATIONS: Dict[PRStatus, tuple] = {
+    PRStatus.RFQ_DISSEMINATED: (NotificationType.CANVASS_ASSIGNED, frozenset({UserRole.CANVASSER})),
+    PRStatus.CANVASS_COMPLETE: (NotificationType.APPROVAL_REQUIRED, frozenset({UserRole.BAC_SECRETARIAT})),
+    PRStatus.BAC_DOCS_READY: (NotificationType.APPROVAL_REQUIRED, frozenset({
+        UserRole.BAC_CHAIR, UserRole.BAC_MEMBER
+    })),
+}
+
+
+def _build_role_table() -> Dict[UserRole, Dict[PRStatus, FrozenSet[PRStatus]]]:
+    table: Dict[UserRole, Dict[PRStatus, set]] = {role: {} for role in UserRole}
+    for (source, target), roles in PR_TRANSITIONS.items():
+        for role in roles | {UserRole.ADMIN}:
+            table[role].setdefault(target, set()).add(source)
+    return {
+        role: {target: frozenset(sources) for target, sources in targets.items()}
+        for role, targets in table.items()
+    }
+
+
+# role -> target status -> statuses it may be reached from
+TRANSITIONS_BY_ROLE = _build_role_table()
+
+
+def allowed_sources(role: UserRole, target: PRStatus) -> FrozenSet[PRStatus]:
+    """
+    Statuses from which role may move a PR to target.
+    Raises HTTPException 403 if role can never make that move.
+    """
+    sources = TRANSITIONS_BY_ROLE[role].get(target)
+    if not sources:
+        raise HTTPException(
+            status_code=http_status.HTTP_403_FORBIDDEN,
+            detail=f"Role {role.value} cannot move purchase requests to {target.value}"
+        )
+    return sources
+
+
+def allowed_targets(role: UserRole, source: PRStatus) -> List[PRStatus]:
+    """Statuses role may move a PR in source to, in workflow order."""
+    return [
+        target for target in PRStatus
+        if source in TRANSITIONS_BY_ROLE[role].get(target, ())
+    ]
@@ -2,10 +2,20 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 
+from app.core.audit_log import get_audit_log_writer
 from app.core.config import settings
+from app.core.database import pool_liveness_monitors, replica_set
+from app.core.db_stats import DBStatsMiddleware
+from app.core.hashing import get_password_hasher
+from app.core.metrics import CONTENT_TYPE, MetricsMiddleware, render_metrics
+from app.core.notification_broker import get_notification_broker
+from app.core.numbering import get_number_allocator
+from app.core.query_profiler import QueryProfilerMiddleware
+from app.core.rate_limiter import RateLimitMiddleware
+from app.services.notification_service import get_notification_dispatcher
 from app.api.v1.api import api_router
 # from app.core.database import init_db  # Commented out - will initialize manually
 
@@ -25,10 +35,33 @@ async def lifespan(app: FastAPI):
     print("Database initialization skipped - use Alembic migrations")
     print("Run: alembic upgrade head")
     
+    # Start replica lag monitoring (no-op without DATABASE_REPLICA_URLS)
+    await replica_set.start()
+    
+    # Background idle-connection pings on the primary and each replica
+    # (only when DATABASE_POOL_PRE_PING is off)
+    for monitor in pool_liveness_monitors:
+        monitor.start()
+    
+    # Batched activity log writes (replays entries spooled by the last shutdown)
+    await get_audit_log_writer().start()
+    
+    # Live notification streams, then workflow fan-out off the request path
+    await get_notification_broker().start()
+    get_notification_dispatcher().start()
+    
     yield
     
     # Shutdown
     print("Shutting down DICT Procurement Management System...")
+    await get_notification_dispatcher().stop()
+    await get_notification_broker().stop()
+    await get_audit_log_writer().stop()
+    await get_number_allocator().release_unused()
+    for monitor in pool_liveness_monitors:
+        await monitor.stop()
+    await replica_set.stop()
+    get_password_hasher().shutdown()
 
 
 # Create FastAPI application
@@ -48,6 +81,10 @@ app = FastAPI(
 )
 
 
+# API-wide rate limiting (added before CORS so 429 responses still carry CORS headers)
+app.add_middleware(RateLimitMiddleware)
+
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -58,6 +95,20 @@ app.add_middleware(
 )
 
 
+# SQL query profiling and N+1 detection (development only)
+if settings.QUERY_PROFILER_ENABLED:
+    app.add_middleware(QueryProfilerMiddleware)
+
+
+# Request latency metrics (outside rate limiting so 429s are counted too)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+
+# Per-request database usage tracking (Server-Timing header)
+app.add_middleware(DBStatsMiddleware)
+
+
 # Root endpoint
 @app.get("/", tags=["Root"])
 async def root():
@@ -83,6 +134,14 @@ async def health_check():
         "environment": settings.ENVIRONMENT
     }
 
+# Prometheus metrics endpoint
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Metrics for this worker in the Prometheus text exposition format"""
+        return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+
 # Global exception handlers
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
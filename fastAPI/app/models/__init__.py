@@ -1,36 +1,40 @@
 """Models package initialization"""
 
 from app.models.user import User
-# Temporarily disable other models due to relationship issues
-# from app.models.purchase_request import PurchaseRequest
-# from app.models.pr_item import PRItem
-# from app.models.rfq import RFQ
-# from app.models.supplier import Supplier
-# from app.models.canvass import Canvass
-# from app.models.supplier_quotation import SupplierQuotation
-# from app.models.quotation_item import QuotationItem
-# from app.models.quotation_image import QuotationImage
-# from app.models.bac_document import BACDocument
-# from app.models.approval_routing import ApprovalRouting
-# from app.models.purchase_order import PurchaseOrder
-# from app.models.document import Document
-# from app.models.activity_log import ActivityLog
-# from app.models.notification import Notification
+from app.models.purchase_request import PurchaseRequest
+from app.models.pr_item import PRItem
+from app.models.rfq import RFQ
+from app.models.supplier import Supplier
+from app.models.canvass import Canvass
+from app.models.supplier_quotation import SupplierQuotation
+from app.models.quotation_item import QuotationItem
+from app.models.quotation_image import QuotationImage
+from app.models.bac_document import BACDocument
+from app.models.approval_routing import ApprovalRouting
+from app.models.purchase_order import PurchaseOrder
+from app.models.document import Document
+from app.models.document_blob import DocumentBlob
+from app.models.activity_log import ActivityLog
+from app.models.notification import Notification
+from app.models.number_sequence import NumberSequence, ReleasedNumber
 
 __all__ = [
     "User",
-    # "PurchaseRequest",
-    # "PRItem",
-    # "RFQ",
-    # "Supplier",
-    # "Canvass",
-    # "SupplierQuotation",
-    # "QuotationItem",
-    # "QuotationImage",
-    # "BACDocument",
-    # "ApprovalRouting",
-    # "PurchaseOrder",
-    # "Document",
-    # "ActivityLog",
-    # "Notification",
+    "PurchaseRequest",
+    "PRItem",
+    "RFQ",
+    "Supplier",
+    "Canvass",
+    "SupplierQuotation",
+    "QuotationItem",
+    "QuotationImage",
+    "BACDocument",
+    "ApprovalRouting",
+    "PurchaseOrder",
+    "Document",
+    "DocumentBlob",
+    "ActivityLog",
+    "Notification",
+    "NumberSequence",
+    "ReleasedNumber",
 ]
@@ -19,13 +19,12 @@ class ActivityLog(Base):
     user_id = Column(
         Integer,
         ForeignKey("users.id", ondelete="SET NULL"),
-        nullable=True,
-        index=True
+        nullable=True
     )
     
     # Action Details
-    action = Column(SQLEnum(ActivityAction), nullable=False, index=True)
-    entity_type = Column(String(100), nullable=False, index=True, comment="User, PR, RFQ, etc.")
+    action = Column(SQLEnum(ActivityAction), nullable=False)
+    entity_type = Column(String(100), nullable=False, comment="User, PR, RFQ, etc.")
     entity_id = Column(Integer, nullable=True, index=True, comment="ID of the entity")
     
     # Change Tracking (JSON for flexible old/new values)
@@ -40,16 +39,20 @@ class ActivityLog(Base):
     user_agent = Column(String(500), nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
     
     # Relationships
     user = relationship("User", back_populates="activity_logs", foreign_keys=[user_id])
-    purchase_request = relationship("PurchaseRequest", back_populates="activity_logs", foreign_keys=[entity_id], primaryjoin="and_(ActivityLog.entity_id==PurchaseRequest.id, ActivityLog.entity_type=='PurchaseRequest')")
+    purchase_request = relationship("PurchaseRequest", back_populates="activity_logs", foreign_keys=[entity_id], primaryjoin="and_(ActivityLog.entity_id==PurchaseRequest.id, ActivityLog.entity_type=='PurchaseRequest')", viewonly=True)
     
-    # Indexes
+    # Indexes: one per audit query path, each ending in created_at so a
+    # filtered page is read in (created_at, id) order without a sort. On
+    # MySQL the table is partitioned by month of created_at, see
+    # app/core/audit_retention.py
     __table_args__ = (
-        Index("ix_activity_logs_user_action", "user_id", "action"),
-        Index("ix_activity_logs_entity", "entity_type", "entity_id"),
+        Index("ix_activity_logs_entity_created", "entity_type", "entity_id", "created_at"),
+        Index("ix_activity_logs_user_created", "user_id", "created_at"),
+        Index("ix_activity_logs_action_created", "action", "created_at"),
         Index("ix_activity_logs_created", "created_at"),
     )
     
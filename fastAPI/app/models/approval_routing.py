@@ -60,13 +60,15 @@ class ApprovalRouting(Base):
         "PurchaseRequest",
         back_populates="approval_routings",
         foreign_keys=[document_id],
-        primaryjoin="and_(ApprovalRouting.document_id==PurchaseRequest.id, ApprovalRouting.document_type=='PURCHASE_REQUEST')"
+        primaryjoin="and_(ApprovalRouting.document_id==PurchaseRequest.id, ApprovalRouting.document_type=='PURCHASE_REQUEST')",
+        viewonly=True
     )
     bac_document = relationship(
         "BACDocument",
         back_populates="approval_routings",
         foreign_keys=[document_id],
-        primaryjoin="and_(ApprovalRouting.document_id==BACDocument.id, ApprovalRouting.document_type=='BAC_DOCUMENT')"
+        primaryjoin="and_(ApprovalRouting.document_id==BACDocument.id, ApprovalRouting.document_type=='BAC_DOCUMENT')",
+        viewonly=True
     )
     
     # Constraints and Indexes
@@ -74,7 +76,7 @@ class ApprovalRouting(Base):
         UniqueConstraint("document_type", "document_id", "sequence", name="uq_approval_routing_sequence"),
         Index("ix_approval_routings_document_status", "document_type", "document_id", "status"),
         Index("ix_approval_routings_approver_status", "approver_id", "status"),
-        Index("ix_approval_routings_sequence", "document_type", "document_id", "sequence"),
+        Index("ix_approval_routings_document_sequence", "document_type", "document_id", "sequence"),
     )
     
     def __repr__(self) -> str:
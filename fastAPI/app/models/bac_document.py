@@ -63,14 +63,19 @@ class BACDocument(Base):
         "ApprovalRouting",
         back_populates="bac_document",
         foreign_keys="ApprovalRouting.document_id",
-        primaryjoin="and_(ApprovalRouting.document_id==BACDocument.id, ApprovalRouting.document_type=='BAC_DOCUMENT')"
+        primaryjoin="and_(ApprovalRouting.document_id==BACDocument.id, ApprovalRouting.document_type=='BAC_DOCUMENT')",
+        viewonly=True
+    )
+    documents = relationship(
+        "Document",
+        foreign_keys="Document.reference_id",
+        primaryjoin="and_(Document.reference_id==BACDocument.id, Document.document_type=='BAC_DOCUMENT')",
+        viewonly=True
     )
-    documents = relationship("Document", back_populates="bac_document", foreign_keys="Document.bac_document_id")
     
     # Indexes
     __table_args__ = (
         Index("ix_bac_documents_pr_type", "purchase_request_id", "document_type"),
-        Index("ix_bac_documents_status", "status"),
     )
     
     def __repr__(self) -> str:
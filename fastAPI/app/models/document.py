@@ -26,6 +26,7 @@ class Document(Base):
     original_filename = Column(String(255), nullable=False)
     file_size = Column(BigInteger, nullable=False, comment="Size in bytes")
     mime_type = Column(String(100), nullable=False)
+    checksum = Column(String(64), nullable=True, index=True, comment="SHA-256 of the file, hex")
     
     # Upload Tracking
     uploaded_by = Column(
@@ -0,0 +1,30 @@
+"""Document blob SQLAlchemy model"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger, Index
+
+from app.core.database import Base
+
+
+class DocumentBlob(Base):
+    """Document Blob model - one stored file shared by every document with the same content"""
+    
+    __tablename__ = "document_blobs"
+    
+    checksum = Column(String(64), primary_key=True, comment="SHA-256 of the content, hex")
+    file_path = Column(String(500), nullable=False, comment="Relative to UPLOAD_DIR")
+    file_size = Column(BigInteger, nullable=False, comment="Size in bytes")
+    ref_count = Column(Integer, nullable=False, default=0, comment="Documents pointing at this blob")
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    # Indexes
+    __table_args__ = (
+        # Garbage collection: unreferenced blobs, oldest first
+        Index("ix_document_blobs_gc", "ref_count", "updated_at"),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<DocumentBlob(checksum={self.checksum}, ref_count={self.ref_count})>"
@@ -47,6 +47,8 @@ class Notification(Base):
     __table_args__ = (
         Index("ix_notifications_user_read", "user_id", "is_read"),
         Index("ix_notifications_user_created", "user_id", "created_at"),
+        # Duplicate check when fanning out an event for a batch of entities
+        Index("ix_notifications_entity_type_created", "entity_type", "entity_id", "type", "created_at"),
     )
     
     def __repr__(self) -> str:
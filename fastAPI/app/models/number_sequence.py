@@ -0,0 +1,35 @@
+"""Document number sequence SQLAlchemy models"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime
+
+from app.core.database import Base
+
+
+class NumberSequence(Base):
+    """Number Sequence model - next unreserved document number per prefix and year"""
+    
+    __tablename__ = "number_sequences"
+    
+    prefix = Column(String(20), primary_key=True, comment="PR, RFQ, CANVASS, BAC, PO")
+    year = Column(Integer, primary_key=True)
+    next_value = Column(Integer, nullable=False, default=1)
+    
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def __repr__(self) -> str:
+        return f"<NumberSequence(prefix={self.prefix}, year={self.year}, next_value={self.next_value})>"
+
+
+class ReleasedNumber(Base):
+    """Released Number model - reserved numbers a worker returned unused, reissued first"""
+    
+    __tablename__ = "released_numbers"
+    
+    prefix = Column(String(20), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    value = Column(Integer, primary_key=True)
+    
+    def __repr__(self) -> str:
+        return f"<ReleasedNumber(prefix={self.prefix}, year={self.year}, value={self.value})>"
@@ -62,7 +62,12 @@ class PurchaseOrder(Base):
     # Relationships
     purchase_request = relationship("PurchaseRequest", back_populates="purchase_order")
     supplier = relationship("Supplier", back_populates="purchase_orders")
-    documents = relationship("Document", back_populates="purchase_order", foreign_keys="Document.purchase_order_id")
+    documents = relationship(
+        "Document",
+        foreign_keys="Document.reference_id",
+        primaryjoin="and_(Document.reference_id==PurchaseOrder.id, Document.document_type=='PO_DOCUMENT')",
+        viewonly=True
+    )
     
     # Constraints and Indexes
     __table_args__ = (
@@ -25,7 +25,7 @@ class PurchaseRequest(Base):
     purpose = Column(Text, nullable=False)
     
     # User Reference
-    end_user_id = Column(Integer, ForeignKey("users.id", ondelete="RESTRICT"), nullable=False, index=True)
+    end_user_id = Column(Integer, ForeignKey("users.id", ondelete="RESTRICT"), nullable=False)
     
     # Department Information
     end_user_department = Column(String(255), nullable=False)
@@ -34,13 +34,17 @@ class PurchaseRequest(Base):
     responsibility_center = Column(String(100), nullable=True)
     
     # Financial Information
-    fund_source = Column(String(255), nullable=False, index=True)
+    fund_source = Column(String(255), nullable=False)
     estimated_budget = Column(DECIMAL(15, 2), nullable=False)
     
     # Urgency
-    urgency_level = Column(SQLEnum(UrgencyLevel), nullable=False, index=True, default=UrgencyLevel.MEDIUM)
+    urgency_level = Column(SQLEnum(UrgencyLevel), nullable=False, default=UrgencyLevel.MEDIUM)
     urgency_timeline = Column(Text, nullable=True)
     
+    # Item aggregates, maintained on item writes (app.core.item_totals)
+    item_count = Column(Integer, nullable=False, default=0, server_default="0")
+    total_estimated_cost = Column(DECIMAL(15, 2), nullable=False, default=0, server_default="0")
+    
     # Approval Date
     approval_date = Column(DateTime(timezone=True), nullable=True)
     
@@ -48,7 +52,6 @@ class PurchaseRequest(Base):
     status = Column(
         SQLEnum(PurchaseRequestStatus),
         nullable=False,
-        index=True,
         default=PurchaseRequestStatus.PR_UNDER_REVIEW
     )
     
@@ -62,6 +65,11 @@ class PurchaseRequest(Base):
     has_technical_specs = Column(Boolean, default=False, nullable=True)
     has_approved_plan = Column(Boolean, default=False, nullable=True)
     
+    # Section 4: Document Completeness
+    has_signatures = Column(Boolean, default=False, nullable=True)
+    has_quantity = Column(Boolean, default=False, nullable=True)
+    deficiency_notes = Column(Text, nullable=True)
+    
     # Section 3: Procurement Mode Justification
     procurement_mode_justification = Column(Text, nullable=True)
     
@@ -72,13 +80,18 @@ class PurchaseRequest(Base):
     approved_by_position = Column(String(255), nullable=True)
     noted_by_name = Column(String(255), nullable=True)
     noted_by_position = Column(String(255), nullable=True)
+    budget_officer_name = Column(String(255), nullable=True)
+    budget_officer_position = Column(String(255), nullable=True)
+    
+    # Optimistic concurrency: bumped by every status transition and ORM update
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
     # Relationships
-    end_user = relationship("User", foreign_keys=[end_user_id])
+    end_user = relationship("User", back_populates="created_prs", foreign_keys=[end_user_id])
     pr_items = relationship("PRItem", back_populates="purchase_request", cascade="all, delete-orphan")
     rfq = relationship(
         "RFQ",
@@ -101,8 +114,29 @@ class PurchaseRequest(Base):
         "ApprovalRouting",
         back_populates="purchase_request",
         foreign_keys="ApprovalRouting.document_id",
-        primaryjoin="and_(ApprovalRouting.document_id==PurchaseRequest.id, ApprovalRouting.document_type=='PURCHASE_REQUEST')"
+        primaryjoin="and_(ApprovalRouting.document_id==PurchaseRequest.id, ApprovalRouting.document_type=='PURCHASE_REQUEST')",
+        viewonly=True
+    )
+    activity_logs = relationship(
+        "ActivityLog",
+        back_populates="purchase_request",
+        foreign_keys="ActivityLog.entity_id",
+        primaryjoin="and_(ActivityLog.entity_id==PurchaseRequest.id, ActivityLog.entity_type=='PurchaseRequest')",
+        viewonly=True
+    )
+    
+    # Indexes - each list filter leads a composite index ending in the
+    # keyset ordering (created_at, id) so filtered pages are index range scans
+    __table_args__ = (
+        Index("ix_purchase_requests_created_id", "created_at", "id"),
+        Index("ix_purchase_requests_status_created", "status", "created_at", "id"),
+        Index("ix_purchase_requests_urgency_created", "urgency_level", "created_at", "id"),
+        Index("ix_purchase_requests_fund_source_created", "fund_source", "created_at", "id"),
+        Index("ix_purchase_requests_department_created", "end_user_department", "created_at", "id"),
+        Index("ix_purchase_requests_end_user_created", "end_user_id", "created_at", "id"),
     )
     
+    __mapper_args__ = {"version_id_col": version}
+    
     def __repr__(self) -> str:
         return f"<PurchaseRequest(id={self.id}, pr_number={self.pr_number}, status={self.status})>"
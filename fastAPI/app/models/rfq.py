@@ -60,7 +60,12 @@ class RFQ(Base):
         cascade="all, delete-orphan",
         foreign_keys="Canvass.rfq_id"
     )
-    documents = relationship("Document", back_populates="rfq", foreign_keys="Document.rfq_id")
+    documents = relationship(
+        "Document",
+        foreign_keys="Document.reference_id",
+        primaryjoin="and_(Document.reference_id==RFQ.id, Document.document_type=='RFQ_DOCUMENT')",
+        viewonly=True
+    )
     
     # Constraints and Indexes
     __table_args__ = (
@@ -47,6 +47,10 @@ class SupplierQuotation(Base):
     )
     total_amount = Column(DECIMAL(15, 2), nullable=False)
     
+    # Item aggregates, maintained on item writes (app.core.item_totals)
+    item_count = Column(Integer, nullable=False, default=0, server_default="0")
+    items_total_amount = Column(DECIMAL(15, 2), nullable=False, default=0, server_default="0")
+    
     # Selection
     is_selected = Column(Boolean, default=False, nullable=False, index=True)
     
@@ -24,57 +24,55 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
-    # Relationships - Temporarily disabled to avoid SQLAlchemy mapper errors
-    # These will be enabled when all related models are properly imported
-    # For now, authentication works without these relationships
-    # created_prs = relationship(
-    #     "PurchaseRequest",
-    #     back_populates="end_user",
-    #     foreign_keys="PurchaseRequest.end_user_id",
-    #     lazy="select"
-    # )
-    # managed_rfqs = relationship(
-    #     "RFQ",
-    #     back_populates="procurement_officer",
-    #     foreign_keys="RFQ.procurement_officer_id",
-    #     lazy="select"
-    # )
-    # assigned_canvasses = relationship(
-    #     "Canvass",
-    #     back_populates="canvasser",
-    #     foreign_keys="Canvass.canvasser_id",
-    #     lazy="select"
-    # )
-    # uploaded_documents = relationship(
-    #     "Document",
-    #     back_populates="uploaded_by_user",
-    #     foreign_keys="Document.uploaded_by",
-    #     lazy="select"
-    # )
-    # approval_routings_received = relationship(
-    #     "ApprovalRouting",
-    #     back_populates="approver",
-    #     foreign_keys="ApprovalRouting.approver_id",
-    #     lazy="select"
-    # )
-    # approval_routings_created = relationship(
-    #     "ApprovalRouting",
-    #     back_populates="routed_by_user",
-    #     foreign_keys="ApprovalRouting.routed_by",
-    #     lazy="select"
-    # )
-    # activity_logs = relationship(
-    #     "ActivityLog",
-    #     back_populates="user",
-    #     foreign_keys="ActivityLog.user_id",
-    #     lazy="select"
-    # )
-    # notifications = relationship(
-    #     "Notification",
-    #     back_populates="user",
-    #     foreign_keys="Notification.user_id",
-    #     lazy="select"
-    # )
+    # Relationships
+    created_prs = relationship(
+        "PurchaseRequest",
+        back_populates="end_user",
+        foreign_keys="PurchaseRequest.end_user_id",
+        lazy="select"
+    )
+    managed_rfqs = relationship(
+        "RFQ",
+        back_populates="procurement_officer",
+        foreign_keys="RFQ.procurement_officer_id",
+        lazy="select"
+    )
+    assigned_canvasses = relationship(
+        "Canvass",
+        back_populates="canvasser",
+        foreign_keys="Canvass.canvasser_id",
+        lazy="select"
+    )
+    uploaded_documents = relationship(
+        "Document",
+        back_populates="uploaded_by_user",
+        foreign_keys="Document.uploaded_by",
+        lazy="select"
+    )
+    approval_routings_received = relationship(
+        "ApprovalRouting",
+        back_populates="approver",
+        foreign_keys="ApprovalRouting.approver_id",
+        lazy="select"
+    )
+    approval_routings_created = relationship(
+        "ApprovalRouting",
+        back_populates="routed_by_user",
+        foreign_keys="ApprovalRouting.routed_by",
+        lazy="select"
+    )
+    activity_logs = relationship(
+        "ActivityLog",
+        back_populates="user",
+        foreign_keys="ActivityLog.user_id",
+        lazy="select"
+    )
+    notifications = relationship(
+        "Notification",
+        back_populates="user",
+        foreign_keys="Notification.user_id",
+        lazy="select"
+    )
     
     # Indexes
     __table_args__ = (
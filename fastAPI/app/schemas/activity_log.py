@@ -0,0 +1,33 @@
+"""Pydantic schemas for Activity Log model"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict
+
+from app.core.status import ActivityAction
+
+
+class ActivityLogResponse(BaseModel):
+    """Schema for Activity Log entries, live or archived"""
+    id: int
+    user_id: Optional[int] = None
+    action: ActivityAction
+    entity_type: str
+    entity_id: Optional[int] = None
+    old_values: Optional[Dict[str, Any]] = None
+    new_values: Optional[Dict[str, Any]] = None
+    description: str
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+    created_at: datetime
+    archived: bool = False
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ActivityLogPage(BaseModel):
+    """Schema for keyset-paginated Activity Log list response"""
+    items: List[ActivityLogResponse]
+    limit: int
+    has_more: bool
+    next_cursor: Optional[str] = None
@@ -0,0 +1,26 @@
+"""Pydantic schemas for Document model"""
+
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, ConfigDict
+
+from app.core.status import DocumentCategory
+
+
+class DocumentResponse(BaseModel):
+    """Schema for an uploaded document"""
+    id: int
+    document_type: DocumentCategory
+    reference_id: Optional[int] = None
+    category: Optional[str] = None
+    file_path: str
+    file_name: str
+    original_filename: str
+    file_size: int
+    mime_type: str
+    checksum: Optional[str] = None
+    uploaded_by: Optional[int] = None
+    description: Optional[str] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,31 @@
+"""Pydantic schemas for Notification model"""
+
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from app.core.roles import UserRole
+from app.core.status import NotificationType
+
+
+class NotificationSubject(BaseModel):
+    """One entity an event is about, with its own text and extra recipients"""
+    entity_id: int
+    title: str = Field(..., max_length=255)
+    message: str
+    link: Optional[str] = Field(None, max_length=500)
+    user_ids: List[int] = Field(default_factory=list, description="Recipients for this entity only, e.g. its end user")
+
+
+class NotificationEvent(BaseModel):
+    """One workflow event, fanned out to every recipient of every subject"""
+    type: NotificationType
+    entity_type: str
+    subjects: List[NotificationSubject]
+    roles: List[UserRole] = Field(default_factory=list, description="Every active user with one of these roles")
+    user_ids: List[int] = Field(default_factory=list, description="Recipients for every subject")
+
+
+class NotificationFanOutResult(BaseModel):
+    """Outcome of fanning out one event"""
+    created: int
+    coalesced: int
@@ -2,10 +2,21 @@
 
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional, List
-from pydantic import BaseModel, Field, ConfigDict
+from typing import Any, Dict, Optional, List
+from pydantic import BaseModel, Field, ConfigDict, model_validator
 
-from app.core.status import PurchaseRequestStatus, UrgencyLevel
+from app.core.status import (
+    ApprovalStatus,
+    BACDocumentStatus,
+    BACDocumentType,
+    CanvassStatus,
+    ComplianceStatus,
+    ProcurementMode,
+    PurchaseOrderStatus,
+    PurchaseRequestStatus,
+    RFQStatus,
+    UrgencyLevel,
+)
 
 
 class PRItemBase(BaseModel):
@@ -61,6 +72,12 @@ class PurchaseRequestCreate(PurchaseRequestBase):
     pr_items: List[PRItemCreate] = Field(..., min_length=1, max_length=100)
 
 
+class PurchaseRequestBulkCreate(BaseModel):
+    """Schema for bulk Purchase Request creation (e.g. procurement plan imports)"""
+    # Entries are validated one by one so a bad row does not reject the batch
+    purchase_requests: List[Dict[str, Any]] = Field(..., min_length=1, max_length=1000)
+
+
 class PurchaseRequestUpdate(BaseModel):
     """Schema for updating Purchase Request"""
     project_title: Optional[str] = Field(None, min_length=10, max_length=500)
@@ -95,6 +112,206 @@ class PurchaseRequestList(BaseModel):
     total_pages: int
 
 
+class PurchaseRequestSummary(BaseModel):
+    """Schema for Purchase Request list rows"""
+    id: int
+    pr_number: str
+    project_title: str
+    end_user_id: int
+    end_user_department: str
+    fund_source: str
+    estimated_budget: Decimal
+    item_count: int
+    total_estimated_cost: Decimal
+    urgency_level: UrgencyLevel
+    status: PurchaseRequestStatus
+    version: int
+    created_at: datetime
+    updated_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PurchaseRequestPage(BaseModel):
+    """Schema for keyset-paginated Purchase Request list response"""
+    items: List[PurchaseRequestSummary]
+    limit: int
+    has_more: bool
+    next_cursor: Optional[str] = None
+
+
+class PurchaseRequestBulkItemResult(BaseModel):
+    """Outcome for one entry of a bulk create request"""
+    index: int
+    success: bool
+    id: Optional[int] = None
+    pr_number: Optional[str] = None
+    errors: Optional[List[Dict[str, Any]]] = None
+
+
+class PurchaseRequestBulkResult(BaseModel):
+    """Schema for bulk Purchase Request creation response"""
+    created: int
+    failed: int
+    results: List[PurchaseRequestBulkItemResult]
+
+
+class QuotationItemResponse(BaseModel):
+    """Schema for supplier quotation line in PR detail"""
+    id: int
+    pr_item_id: int
+    item_code: str
+    item_name: str
+    quantity: Decimal
+    unit_price: Decimal
+    total_price: Decimal
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SupplierQuotationResponse(BaseModel):
+    """Schema for supplier quotation in PR detail"""
+    id: int
+    supplier_id: int
+    supplier_name: str
+    delivery_days: int
+    compliance_status: ComplianceStatus
+    total_amount: Decimal
+    item_count: int
+    items_total_amount: Decimal
+    is_selected: bool
+    quotation_items: List[QuotationItemResponse] = []
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CanvassResponse(BaseModel):
+    """Schema for canvass in PR detail"""
+    id: int
+    canvass_number: str
+    canvasser_id: int
+    deadline: datetime
+    status: CanvassStatus
+    completed_at: Optional[datetime] = None
+    supplier_quotations: List[SupplierQuotationResponse] = []
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
+class RFQResponse(BaseModel):
+    """Schema for RFQ in PR detail"""
+    id: int
+    rfq_number: str
+    procurement_officer_id: int
+    delivery_schedule: datetime
+    payment_terms: str
+    canvassing_deadline: datetime
+    notes: Optional[str] = None
+    status: RFQStatus
+    canvasses: List[CanvassResponse] = []
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BACDocumentResponse(BaseModel):
+    """Schema for BAC document in PR detail"""
+    id: int
+    bac_document_number: str
+    document_type: BACDocumentType
+    procurement_mode: ProcurementMode
+    selected_supplier_id: Optional[int] = None
+    contract_amount: Decimal
+    status: BACDocumentStatus
+    approved_at: Optional[datetime] = None
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
+class SupplierBrief(BaseModel):
+    """Schema for supplier reference"""
+    id: int
+    name: str
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PurchaseOrderResponse(BaseModel):
+    """Schema for purchase order in PR detail"""
+    id: int
+    po_number: str
+    supplier: Optional[SupplierBrief] = None
+    contract_amount: Decimal
+    delivery_deadline: datetime
+    status: PurchaseOrderStatus
+    conforme_status: Optional[str] = None
+    completed_at: Optional[datetime] = None
+    created_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ApprovalRoutingResponse(BaseModel):
+    """Schema for approval routing step"""
+    id: int
+    approver_id: int
+    sequence: int
+    status: ApprovalStatus
+    routed_at: datetime
+    approved_at: Optional[datetime] = None
+    rejected_at: Optional[datetime] = None
+    comments: Optional[str] = None
+    rejection_reason: Optional[str] = None
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PurchaseRequestDetail(BaseModel):
+    """Schema for Purchase Request detail view (PR with its procurement trail)"""
+    # Field names follow the model columns so it validates from the loaded graph
+    id: int
+    pr_number: str
+    project_title: str
+    project_description: str
+    purpose: str
+    end_user_id: int
+    end_user_department: str
+    office_name: Optional[str] = None
+    office_address: Optional[str] = None
+    responsibility_center: Optional[str] = None
+    fund_source: str
+    estimated_budget: Decimal
+    item_count: int
+    total_estimated_cost: Decimal
+    urgency_level: UrgencyLevel
+    urgency_timeline: Optional[str] = None
+    status: PurchaseRequestStatus
+    version: int
+    approval_date: Optional[datetime] = None
+    has_signatures: Optional[bool] = None
+    has_technical_specs: Optional[bool] = None
+    has_quantity: Optional[bool] = None
+    has_market_study: Optional[bool] = None
+    deficiency_notes: Optional[str] = None
+    requested_by_name: Optional[str] = None
+    requested_by_position: Optional[str] = None
+    approved_by_name: Optional[str] = None
+    approved_by_position: Optional[str] = None
+    budget_officer_name: Optional[str] = None
+    budget_officer_position: Optional[str] = None
+    pr_items: List[PRItemResponse] = []
+    rfq: Optional[RFQResponse] = None
+    bac_documents: List[BACDocumentResponse] = []
+    purchase_order: Optional[PurchaseOrderResponse] = None
+    approval_routings: List[ApprovalRoutingResponse] = []
+    created_at: datetime
+    updated_at: datetime
+    
+    model_config = ConfigDict(from_attributes=True)
+
+
 class ApprovalRoutingCreate(BaseModel):
     """Schema for creating approval routing"""
     approver_ids: List[int] = Field(..., min_length=1, max_length=10)
@@ -111,3 +328,36 @@ class PRStatusUpdate(BaseModel):
     """Schema for manual PR status update"""
     status: PurchaseRequestStatus
     notes: Optional[str] = None
+    # Version the client last saw; the update is refused if the PR has changed since
+    expected_version: Optional[int] = None
+
+
+class PRStatusTransitionResult(BaseModel):
+    """Schema for single PR status transition response"""
+    id: int
+    previous_status: PurchaseRequestStatus
+    status: PurchaseRequestStatus
+    version: int
+
+
+class PRBulkStatusUpdate(BaseModel):
+    """Schema for moving many PRs to one status"""
+    status: PurchaseRequestStatus
+    notes: Optional[str] = None
+    pr_ids: Optional[List[int]] = Field(None, min_length=1, max_length=1000)
+    fund_source: Optional[str] = Field(None, max_length=255)
+    from_statuses: Optional[List[PurchaseRequestStatus]] = None
+    
+    @model_validator(mode="after")
+    def require_selector(self):
+        """Refuse to match every PR by accident."""
+        if self.pr_ids is None and self.fund_source is None:
+            raise ValueError("Either pr_ids or fund_source is required")
+        return self
+
+
+class PRBulkStatusResult(BaseModel):
+    """Schema for bulk PR status transition response"""
+    status: PurchaseRequestStatus
+    updated: int
+    ids: List[int]
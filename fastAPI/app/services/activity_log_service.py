@@ -0,0 +1,265 @@
+"""
+Activity log service.
+Lists audit entries from the live activity_logs table and, for history
+past the retention period, from the monthly archive files written by the
+retention job, as one keyset-ordered stream. Every filter combination
+maps onto an index that ends in created_at, so a page is a short index
+range scan in (created_at, id) order rather than a sort. Archive files
+are read and decompressed in the default executor, in batches, so a
+history query never blocks the event loop.
+"""
+import asyncio
+from datetime import datetime, timezone
+from functools import partial
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.audit_retention import iter_archived
+from app.core.config import settings
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.status import ActivityAction
+from app.models.activity_log import ActivityLog
+from app.schemas.activity_log import ActivityLogPage, ActivityLogResponse
+
+
+# Columns returned unless the caller asks for the old/new value blobs
+SUMMARY_COLUMNS = (
+    ActivityLog.id,
+    ActivityLog.user_id,
+    ActivityLog.action,
+    ActivityLog.entity_type,
+    ActivityLog.entity_id,
+    ActivityLog.description,
+    ActivityLog.ip_address,
+    ActivityLog.user_agent,
+    ActivityLog.created_at,
+)
+CHANGE_COLUMNS = (ActivityLog.old_values, ActivityLog.new_values)
+
+# Rows per keyset query while streaming
+STREAM_CHUNK_SIZE = 1000
+
+
+def _utc_naive(moment: Optional[datetime]) -> Optional[datetime]:
+    """Stored timestamps are naive UTC; compare archived rows the same way."""
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _sort_key(entry: ActivityLogResponse) -> Tuple[datetime, int]:
+    return entry.created_at, entry.id
+
+
+class ActivityLogFilter:
+    """One set of activity log filters, applied to SQL and to archived rows alike."""
+
+    def __init__(
+        self,
+        user_id: Optional[int] = None,
+        action: Optional[ActivityAction] = None,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[int] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None
+    ):
+        self.equals = {
+            "user_id": user_id,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+        }
+        self.created_from = _utc_naive(created_from)
+        self.created_to = _utc_naive(created_to)
+
+    def apply(self, query, after: Optional[Tuple[datetime, int]]):
+        for column, value in self.equals.items():
+            if value is not None:
+                query = query.where(getattr(ActivityLog, column) == value)
+        if self.created_from is not None:
+            query = query.where(ActivityLog.created_at >= self.created_from)
+        if self.created_to is not None:
+            query = query.where(ActivityLog.created_at < self.created_to)
+        if after is not None:
+            last_created_at, last_id = after
+            # The redundant created_at <= bound gives the planner an index
+            # range to seek into; the OR alone degrades to a filtered scan
+            query = query.where(
+                ActivityLog.created_at <= last_created_at,
+                or_(ActivityLog.created_at < last_created_at, ActivityLog.id < last_id)
+            )
+        return query
+
+    def matches(self, row: Dict[str, Any], after: Optional[Tuple[datetime, int]]) -> bool:
+        for column, value in self.equals.items():
+            if value is not None and row.get(column) != (value.value if column == "action" else value):
+                return False
+        created_at = row["created_at"]
+        if self.created_from is not None and created_at < self.created_from:
+            return False
+        if self.created_to is not None and created_at >= self.created_to:
+            return False
+        return after is None or (created_at, row["id"]) < after
+
+
+def _next_archived(
+    rows: Iterator[Dict[str, Any]],
+    filters: ActivityLogFilter,
+    after: Optional[Tuple[datetime, int]],
+    include_changes: bool,
+    count: int
+) -> List[ActivityLogResponse]:
+    """Up to count matching archived entries (runs in the executor)."""
+    entries = []
+    for row in islice((row for row in rows if filters.matches(row, after)), count):
+        if not include_changes:
+            row["old_values"] = row["new_values"] = None
+        entries.append(ActivityLogResponse(**row, archived=True))
+    return entries
+
+
+class ActivityLogService:
+    """Service for querying the activity log."""
+
+    def __init__(self, db: AsyncSession, archive_dir: Optional[str] = None):
+        self.db = db
+        self.archive_dir = archive_dir or settings.AUDIT_LOG_ARCHIVE_DIR
+
+    async def _live(
+        self,
+        filters: ActivityLogFilter,
+        after: Optional[Tuple[datetime, int]],
+        limit: int,
+        include_changes: bool
+    ) -> List[ActivityLogResponse]:
+        columns = SUMMARY_COLUMNS + CHANGE_COLUMNS if include_changes else SUMMARY_COLUMNS
+        query = filters.apply(select(*columns), after)
+        query = query.order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc()).limit(limit)
+        result = await self.db.execute(query)
+        return [ActivityLogResponse.model_validate(row) for row in result]
+
+    async def _archived(
+        self,
+        filters: ActivityLogFilter,
+        after: Optional[Tuple[datetime, int]],
+        include_changes: bool,
+        batch_size: int,
+        newer_than: Optional[datetime] = None
+    ) -> AsyncIterator[ActivityLogResponse]:
+        """Matching archived entries newest first, read batch_size at a time."""
+        loop = asyncio.get_running_loop()
+        rows = await loop.run_in_executor(None, partial(
+            iter_archived,
+            self.archive_dir,
+            newer_than=newer_than,
+            created_from=filters.created_from,
+            created_to=filters.created_to,
+            equals=filters.equals,
+            until=after[0] if after is not None else None
+        ))
+        while True:
+            batch = await loop.run_in_executor(
+                None, _next_archived, rows, filters, after, include_changes, batch_size
+            )
+            for entry in batch:
+                yield entry
+            if len(batch) < batch_size:
+                return
+
+    async def list_activity_logs(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        include_changes: bool = False,
+        **filters: Any
+    ) -> ActivityLogPage:
+        """
+        List one page of activity log entries newest first, live and archived.
+
+        Pages are ordered by (created_at, id) descending, as for purchase
+        requests. old_values/new_values are only read when include_changes
+        is set. An archive file is only opened once a page reaches back to
+        the newest row it holds, and never when its index shows it holds no
+        matching rows; archived rows are filtered while the file is read.
+        """
+        activity_filter = ActivityLogFilter(**filters)
+        after = decode_cursor(cursor) if cursor is not None else None
+        # Fetch one extra row to know whether another page exists
+        live = await self._live(activity_filter, after, limit + 1, include_changes)
+
+        # A full page of live rows only needs archives that could hold newer rows
+        archived = self._archived(
+            activity_filter, after, include_changes, limit + 1,
+            newer_than=live[-1].created_at if len(live) > limit else None
+        )
+
+        items: List[ActivityLogResponse] = []
+        live_entries = iter(live)
+        entry = next(live_entries, None)
+        pending, pending_read = None, False
+        while len(items) <= limit:
+            # Read the next archived entry only once it is needed
+            if not pending_read:
+                pending, pending_read = await anext(archived, None), True
+            if entry is None and pending is None:
+                break
+            if pending is None or (entry is not None and _sort_key(entry) >= _sort_key(pending)):
+                candidate, entry = entry, next(live_entries, None)
+            else:
+                candidate, pending_read = pending, False
+            # A month archived but not yet dropped when a run was interrupted
+            if items and items[-1].id == candidate.id:
+                continue
+            items.append(candidate)
+
+        has_more = len(items) > limit
+        items = items[:limit]
+        return ActivityLogPage(
+            items=items,
+            limit=limit,
+            has_more=has_more,
+            next_cursor=encode_cursor(items[-1].created_at, items[-1].id) if has_more else None
+        )
+
+    async def stream_activity_logs(
+        self,
+        cursor: Optional[str] = None,
+        include_changes: bool = False,
+        **filters: Any
+    ) -> AsyncIterator[ActivityLogResponse]:
+        """
+        Yield every matching entry newest first, live and archived.
+
+        Live rows are read in keyset chunks of STREAM_CHUNK_SIZE, so no
+        cursor or transaction stays open between chunks and memory stays
+        flat however many rows match. The archive files are read once,
+        merged in as the live rows pass their timestamps.
+        """
+        activity_filter = ActivityLogFilter(**filters)
+        after = decode_cursor(cursor) if cursor is not None else None
+        archived = self._archived(activity_filter, after, include_changes, STREAM_CHUNK_SIZE)
+        pending = await anext(archived, None)
+        last_id = None
+
+        while True:
+            chunk = await self._live(activity_filter, after, STREAM_CHUNK_SIZE, include_changes)
+            for entry in chunk:
+                while pending is not None and _sort_key(pending) >= _sort_key(entry):
+                    if pending.id != last_id and pending.id != entry.id:
+                        last_id = pending.id
+                        yield pending
+                    pending = await anext(archived, None)
+                last_id = entry.id
+                yield entry
+            if len(chunk) < STREAM_CHUNK_SIZE:
+                break
+            after = _sort_key(chunk[-1])
+
+        while pending is not None:
+            if pending.id != last_id:
+                last_id = pending.id
+                yield pending
+            pending = await anext(archived, None)
@@ -7,8 +7,8 @@ from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.hashing import verify_password_async
 from app.core.security import (
-    verify_password,
     create_access_token,
     create_refresh_token,
     decode_token
@@ -44,7 +44,7 @@ class AuthService:
         if not user.is_active:
             return None
         
-        if not verify_password(password, user.password_hash):
+        if not await verify_password_async(password, user.password_hash):
             return None
         
         return user
@@ -0,0 +1,286 @@
+"""
+Document service.
+Records uploads streamed to a staging file by app.core.uploads in the
+content-addressed blob store. Documents with the same content share one
+blob; document_blobs counts the documents pointing at each blob, and
+collect_garbage() frees blobs no document points at any more. Also looks
+up downloadable documents and quotation images.
+
+Locking: adding a reference updates (or inserts) the blob's row before
+the file is touched, and the row stays locked until commit. Garbage
+collection locks the rows it frees and removes their files before it
+commits, so an upload and a collection of the same blob never interleave.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, case, delete, exists, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.blob_store import STAGING_DIR, BlobStore, blob_path, is_blob_path
+from app.core.principals import Principal, can_view_all_purchase_requests
+from app.core.status import DocumentCategory
+from app.core.uploads import StoredFile, remove_stored_file
+from app.models.document import Document
+from app.models.document_blob import DocumentBlob
+from app.models.purchase_request import PurchaseRequest
+from app.models.quotation_image import QuotationImage
+
+# Unreferenced blobs freed per garbage collection transaction
+GC_BATCH_SIZE = 500
+
+
+class DocumentService:
+    """Service for document uploads and their shared blobs."""
+
+    def __init__(self, db: AsyncSession, blob_store: Optional[BlobStore] = None):
+        self.db = db
+        self.blob_store = blob_store or BlobStore()
+
+    async def _reference_blob(self, stored: StoredFile) -> str:
+        """Count one more reference to stored's blob, creating its row if needed."""
+        while True:
+            result = await self.db.execute(
+                update(DocumentBlob)
+                .where(DocumentBlob.checksum == stored.checksum)
+                .values(ref_count=DocumentBlob.ref_count + 1)
+            )
+            if result.rowcount:
+                return blob_path(stored.checksum)
+            try:
+                async with self.db.begin_nested():
+                    await self.db.execute(insert(DocumentBlob).values(
+                        checksum=stored.checksum,
+                        file_path=blob_path(stored.checksum),
+                        file_size=stored.file_size,
+                        ref_count=1
+                    ))
+                return blob_path(stored.checksum)
+            except IntegrityError:
+                # Another upload of the same content created the row first
+                continue
+
+    async def create_document(
+        self,
+        stored: StoredFile,
+        document_type: DocumentCategory,
+        uploaded_by: int,
+        reference_id: Optional[int] = None,
+        category: Optional[str] = None,
+        description: Optional[str] = None
+    ) -> Document:
+        """
+        Insert the row for a staged upload and commit.
+
+        If a blob with the same checksum exists the staged file is
+        deleted instead of stored again. If the insert fails, a blob this
+        call created is left for collect_garbage() to remove: another
+        upload of the same content may already have found it.
+        """
+        try:
+            path = await self._reference_blob(stored)
+            await self.blob_store.adopt(stored.file_path, stored.checksum)
+            document = Document(
+                document_type=document_type,
+                reference_id=reference_id,
+                category=category,
+                file_path=path,
+                file_name=stored.checksum,
+                original_filename=stored.original_filename,
+                file_size=stored.file_size,
+                mime_type=stored.mime_type,
+                checksum=stored.checksum,
+                uploaded_by=uploaded_by,
+                description=description,
+                created_at=datetime.utcnow(),
+            )
+            self.db.add(document)
+            await self.db.commit()
+        except BaseException:
+            await self.db.rollback()
+            await remove_stored_file(stored, self.blob_store.upload_dir)
+            raise
+        return document
+
+    async def get_download(self, document_id: int, principal: Principal) -> Optional[Row]:
+        """
+        File details of a document principal may download, or None.
+
+        Admins and procurement staff may download every document; other
+        users the documents they uploaded and those attached to their own
+        PRs. Checked in the same single query that loads the row (primary
+        key lookup, plus a primary key probe into purchase_requests).
+        """
+        stmt = (
+            select(
+                Document.file_path,
+                Document.original_filename,
+                Document.mime_type,
+                Document.checksum
+            )
+            .where(Document.id == document_id)
+        )
+        if not can_view_all_purchase_requests(principal):
+            stmt = stmt.where(or_(
+                Document.uploaded_by == principal.id,
+                and_(
+                    Document.document_type == DocumentCategory.PR_DOCUMENT,
+                    exists().where(
+                        PurchaseRequest.id == Document.reference_id,
+                        PurchaseRequest.end_user_id == principal.id
+                    )
+                )
+            ))
+        return (await self.db.execute(stmt)).first()
+
+    async def get_quotation_image_download(self, image_id: int, principal: Principal) -> Optional[Row]:
+        """
+        File details of a quotation image principal may download, or None.
+        Admins and procurement staff may download every image, other users
+        the images they uploaded; one primary key lookup.
+        """
+        stmt = (
+            select(
+                QuotationImage.image_path,
+                QuotationImage.original_filename,
+                QuotationImage.mime_type
+            )
+            .where(QuotationImage.id == image_id)
+        )
+        if not can_view_all_purchase_requests(principal):
+            stmt = stmt.where(QuotationImage.uploaded_by == principal.id)
+        return (await self.db.execute(stmt)).first()
+
+    async def delete_document(self, document: Document) -> None:
+        """
+        Delete a document and drop its blob reference.
+        The blob itself is freed by collect_garbage() once unreferenced;
+        a file stored before blobs existed is removed right away.
+        """
+        shared = is_blob_path(document.file_path, document.checksum)
+        await self.db.delete(document)
+        if shared:
+            await self.db.execute(
+                update(DocumentBlob)
+                .where(DocumentBlob.checksum == document.checksum, DocumentBlob.ref_count > 0)
+                .values(ref_count=DocumentBlob.ref_count - 1)
+            )
+        await self.db.commit()
+        if not shared:
+            await self.blob_store.remove(document.file_path)
+
+    async def collect_garbage(self, grace_seconds: float, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Free storage no document uses any more:
+        - blobs unreferenced for more than grace_seconds (file and row)
+        - files under the blob directory older than grace_seconds without
+          a row: staged uploads that never finished, and blobs whose
+          document insert was rolled back
+
+        Returns counts and bytes freed (or that would be freed).
+        """
+        freed = {"blobs": 0, "blob_bytes": 0, "orphan_files": 0, "orphan_bytes": 0}
+        cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+        unreferenced = and_(DocumentBlob.ref_count == 0, DocumentBlob.updated_at < cutoff)
+
+        if dry_run:
+            count, size = (await self.db.execute(
+                select(func.count(), func.coalesce(func.sum(DocumentBlob.file_size), 0)).where(unreferenced)
+            )).one()
+            freed["blobs"], freed["blob_bytes"] = count, int(size)
+        else:
+            while True:
+                # Blobs being referenced right now are locked: skip them
+                rows = (await self.db.execute(
+                    select(DocumentBlob.checksum, DocumentBlob.file_path, DocumentBlob.file_size)
+                    .where(unreferenced)
+                    .order_by(DocumentBlob.updated_at)
+                    .limit(GC_BATCH_SIZE)
+                    .with_for_update(skip_locked=True)
+                )).all()
+                for row in rows:
+                    await self.blob_store.remove(row.file_path)
+                if rows:
+                    await self.db.execute(
+                        delete(DocumentBlob).where(DocumentBlob.checksum.in_([row.checksum for row in rows]))
+                    )
+                await self.db.commit()
+                freed["blobs"] += len(rows)
+                freed["blob_bytes"] += sum(row.file_size for row in rows)
+                if len(rows) < GC_BATCH_SIZE:
+                    break
+
+        staged: List[tuple] = []
+        blobs: Dict[str, tuple] = {}
+        for path, size in await self.blob_store.list_files(older_than_seconds=grace_seconds):
+            if path.startswith(STAGING_DIR + "/"):
+                staged.append((path, size))
+            else:
+                blobs[path.rsplit("/", 1)[-1]] = (path, size)
+
+        orphans = list(staged)
+        names = list(blobs)
+        for start in range(0, len(names), GC_BATCH_SIZE):
+            checksums = names[start:start + GC_BATCH_SIZE]
+            # Locks the rows (and, on MySQL, the gaps of missing ones) so
+            # an upload cannot claim a file while it is being removed
+            known = set((await self.db.execute(
+                select(DocumentBlob.checksum)
+                .where(DocumentBlob.checksum.in_(checksums))
+                .with_for_update()
+            )).scalars())
+            batch = [blobs[checksum] for checksum in checksums if checksum not in known]
+            if not dry_run:
+                for path, _ in batch:
+                    await self.blob_store.remove(path)
+            await self.db.commit()
+            orphans.extend(batch)
+        if not dry_run:
+            for path, _ in staged:
+                await self.blob_store.remove(path)
+        freed["orphan_files"] = len(orphans)
+        freed["orphan_bytes"] = sum(size for _, size in orphans)
+        return freed
+
+    async def storage_stats(self) -> Dict[str, Any]:
+        """
+        Report what deduplication saves: bytes uploaded across all
+        documents against bytes actually stored.
+        """
+        documents, logical_bytes = (await self.db.execute(
+            select(func.count(Document.id), func.coalesce(func.sum(Document.file_size), 0))
+        )).one()
+        blobs, blob_bytes, unreferenced, unreferenced_bytes = (await self.db.execute(
+            select(
+                func.count(DocumentBlob.checksum),
+                func.coalesce(func.sum(DocumentBlob.file_size), 0),
+                func.coalesce(func.sum(case((DocumentBlob.ref_count == 0, 1), else_=0)), 0),
+                func.coalesce(func.sum(case((DocumentBlob.ref_count == 0, DocumentBlob.file_size), else_=0)), 0),
+            )
+        )).one()
+        # Documents stored before blobs existed keep their own file
+        unshared, unshared_bytes = (await self.db.execute(
+            select(func.count(Document.id), func.coalesce(func.sum(Document.file_size), 0))
+            .select_from(Document)
+            .outerjoin(DocumentBlob, and_(
+                DocumentBlob.checksum == Document.checksum,
+                DocumentBlob.file_path == Document.file_path
+            ))
+            .where(DocumentBlob.checksum.is_(None))
+        )).one()
+
+        stored_bytes = int(blob_bytes) + int(unshared_bytes)
+        referenced_bytes = stored_bytes - int(unreferenced_bytes)
+        return {
+            "documents": documents,
+            "logical_bytes": int(logical_bytes),
+            "blobs": blobs,
+            "unreferenced_blobs": int(unreferenced),
+            "unreferenced_bytes": int(unreferenced_bytes),
+            "unshared_files": unshared,
+            "stored_bytes": stored_bytes,
+            "saved_bytes": int(logical_bytes) - referenced_bytes,
+            "dedup_ratio": int(logical_bytes) / referenced_bytes if referenced_bytes else 1.0,
+        }
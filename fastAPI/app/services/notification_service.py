@@ -0,0 +1,350 @@
+"""
+Notification service.
+Fans a workflow event out to its recipients with a fixed number of
+statements however many entities and recipients it has: one query
+resolves every recipient (by role and by id), one finds recipients
+already notified about the same entity within the coalescing window,
+and one multi-row INSERT writes the rest. The dispatcher runs fan-out in
+a background task so the request that raised the event does not wait.
+New notifications are then pushed to open event streams through the
+notification broker. Users' cached unread counts are adjusted on every
+insert and mark-read, so the header badge is read without a COUNT(*).
+"""
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.notification_broker import NotificationBroker, get_notification_broker
+from app.core.unread_counters import UnreadCounter, get_unread_counter
+from app.models.notification import Notification
+from app.models.user import User
+from app.schemas.notification import NotificationEvent, NotificationFanOutResult
+
+logger = logging.getLogger(__name__)
+
+# Longest wait between fan-out attempts while the database is failing
+MAX_RETRY_DELAY_SECONDS = 30.0
+
+class NotificationService:
+    """Service for creating notifications."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        broker: Optional[NotificationBroker] = None,
+        unread_counter: Optional[UnreadCounter] = None
+    ):
+        self.db = db
+        self.broker = broker
+        self.unread_counter = unread_counter or get_unread_counter()
+
+    async def fan_out(
+        self,
+        event: NotificationEvent,
+        coalesce_seconds: int = 0,
+        now: Optional[datetime] = None
+    ) -> NotificationFanOutResult:
+        """
+        Create event's notifications and commit.
+
+        Recipients are active users with one of event.roles, plus
+        event.user_ids and each subject's user_ids (inactive users are
+        skipped). A recipient already sent a notification of the same type
+        about the same entity in the last coalesce_seconds is not sent
+        another; a recipient reached several ways gets one. After commit
+        the new notifications are published to broker, if one was given.
+        """
+        if not event.subjects:
+            return NotificationFanOutResult(created=0, coalesced=0)
+        now = now or datetime.utcnow()
+
+        explicit_ids = set(event.user_ids).union(*(subject.user_ids for subject in event.subjects))
+        conditions = []
+        if event.roles:
+            conditions.append(User.role.in_(event.roles))
+        if explicit_ids:
+            conditions.append(User.id.in_(explicit_ids))
+        if not conditions:
+            return NotificationFanOutResult(created=0, coalesced=0)
+
+        users = (await self.db.execute(
+            select(User.id, User.role).where(User.is_active.is_(True), or_(*conditions))
+        )).all()
+        active = {user.id for user in users}
+        broadcast = {user.id for user in users if user.role in event.roles} | (active & set(event.user_ids))
+
+        recipients = {
+            subject.entity_id: broadcast | (active & set(subject.user_ids))
+            for subject in event.subjects
+        }
+
+        already_sent = set()
+        if coalesce_seconds > 0:
+            already_sent = set((await self.db.execute(
+                select(Notification.entity_id, Notification.user_id).where(
+                    Notification.entity_type == event.entity_type,
+                    Notification.entity_id.in_(recipients),
+                    Notification.type == event.type,
+                    Notification.created_at >= now - timedelta(seconds=coalesce_seconds)
+                )
+            )).tuples())
+
+        rows = []
+        deliveries = []
+        coalesced = 0
+        for subject in event.subjects:
+            user_ids: List[int] = []
+            for user_id in sorted(recipients[subject.entity_id]):
+                if (subject.entity_id, user_id) in already_sent:
+                    coalesced += 1
+                    continue
+                # Counts a subject listed twice in one event as a duplicate too
+                already_sent.add((subject.entity_id, user_id))
+                user_ids.append(user_id)
+                rows.append({
+                    "user_id": user_id,
+                    "type": event.type,
+                    "title": subject.title,
+                    "message": subject.message,
+                    "link": subject.link,
+                    "entity_type": event.entity_type,
+                    "entity_id": subject.entity_id,
+                    "is_read": False,
+                    "created_at": now,
+                })
+            if user_ids:
+                deliveries.append((user_ids, {
+                    "type": event.type.value,
+                    "title": subject.title,
+                    "message": subject.message,
+                    "link": subject.link,
+                    "entity_type": event.entity_type,
+                    "entity_id": subject.entity_id,
+                    "created_at": now.isoformat(),
+                }))
+
+        if rows:
+            await self.db.execute(insert(Notification), rows)
+            await self.db.commit()
+            await self.unread_counter.adjust(Counter(row["user_id"] for row in rows))
+            if self.broker is not None:
+                await self.broker.publish(deliveries)
+        return NotificationFanOutResult(created=len(rows), coalesced=coalesced)
+
+    async def unread_count(self, user_id: int) -> int:
+        """
+        User's unread notification count, from the counter cache when
+        possible. A recount is cached, so db must read the primary.
+        """
+        count = await self.unread_counter.get(user_id)
+        if count is not None:
+            return count
+        count = (await self.db.execute(
+            select(func.count()).select_from(Notification).where(
+                Notification.user_id == user_id,
+                Notification.is_read.is_(False)
+            )
+        )).scalar_one()
+        await self.unread_counter.set(user_id, count)
+        return count
+
+    async def mark_read(self, user_id: int, notification_ids: Optional[List[int]] = None) -> int:
+        """
+        Mark the user's notifications read with one UPDATE and commit.
+        None marks every unread notification. Returns how many changed.
+        """
+        query = (
+            update(Notification)
+            .where(Notification.user_id == user_id, Notification.is_read.is_(False))
+            .values(is_read=True, read_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        if notification_ids is not None:
+            if not notification_ids:
+                return 0
+            query = query.where(Notification.id.in_(notification_ids))
+        result = await self.db.execute(query)
+        await self.db.commit()
+        if result.rowcount:
+            await self.unread_counter.adjust({user_id: -result.rowcount})
+        return result.rowcount
+
+
+class NotificationDispatcher:
+    """
+    Bounded queue of notification events with a background fan-out task.
+
+    publish() returns as soon as the event is queued. When the queue is
+    full it waits up to enqueue_timeout_seconds for room and then fans the
+    event out itself, and when the dispatcher is not running (scripts,
+    tests) it always does. stop() fans out whatever is still queued when
+    shutdown_timeout_seconds runs out itself.
+
+    The background task retries a failed fan-out with backoff until it
+    succeeds, holding up the events behind it. An event is only dropped
+    (logged and counted in failed) when the database rejects it outright
+    (IntegrityError, DataError), when a fan-out made inline fails, or
+    when it still fails once shutdown has run out of time.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        broker: Optional[NotificationBroker] = None,
+        max_queue: int = 1000,
+        coalesce_seconds: int = 3600,
+        enqueue_timeout_seconds: float = 0.5,
+        shutdown_timeout_seconds: float = 10.0,
+        retry_delay_seconds: float = 1.0
+    ):
+        self.session_factory = session_factory
+        self.broker = broker
+        self.max_queue = max_queue
+        self.coalesce_seconds = coalesce_seconds
+        self.enqueue_timeout_seconds = enqueue_timeout_seconds
+        self.shutdown_timeout_seconds = shutdown_timeout_seconds
+        self.retry_delay_seconds = retry_delay_seconds
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        # Set once stop() runs out of time: retries give up
+        self._closing = asyncio.Event()
+
+        # Metrics
+        self.published = 0
+        self.delivered = 0
+        self.inline = 0
+        self.failed = 0
+        self.retries = 0
+        self.delivered_on_shutdown = 0
+        self.notifications_created = 0
+        self.notifications_coalesced = 0
+
+    async def publish(self, event: NotificationEvent) -> None:
+        """Queue event for fan-out."""
+        self.published += 1
+        if self._task is None or self._task.done():
+            self.inline += 1
+            await self._deliver(event)
+            return
+
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(event), self.enqueue_timeout_seconds)
+            except asyncio.TimeoutError:
+                self.inline += 1
+                await self._deliver(event)
+
+    async def _deliver(self, event: NotificationEvent, retry: bool = False) -> None:
+        """Fan event out; with retry, keep trying with backoff until closing."""
+        delay = self.retry_delay_seconds
+        while True:
+            try:
+                async with self.session_factory() as session:
+                    result = await NotificationService(session, self.broker).fan_out(event, self.coalesce_seconds)
+                break
+            except (IntegrityError, DataError):
+                self.failed += 1
+                logger.exception("Notification fan-out rejected for %s on %s", event.type.value, event.entity_type)
+                return
+            except Exception:
+                if not retry or self._closing.is_set():
+                    self.failed += 1
+                    logger.exception("Notification fan-out failed for %s on %s", event.type.value, event.entity_type)
+                    return
+                self.retries += 1
+                logger.warning(
+                    "Notification fan-out failed for %s on %s, retrying in %.1fs",
+                    event.type.value, event.entity_type, delay, exc_info=True
+                )
+            # Nothing was committed: fan_out writes in one transaction
+            try:
+                await asyncio.wait_for(self._closing.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, MAX_RETRY_DELAY_SECONDS)
+        self.delivered += 1
+        self.notifications_created += result.created
+        self.notifications_coalesced += result.coalesced
+
+    async def _run(self) -> None:
+        while True:
+            event = await self._queue.get()
+            try:
+                await self._deliver(event, retry=True)
+            finally:
+                self._queue.task_done()
+
+    def start(self) -> None:
+        """Start the background fan-out task."""
+        if self._task is None:
+            self._closing.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop the background task once the queue is empty. Events still
+        queued after shutdown_timeout_seconds are fanned out inline.
+        """
+        if self._task is None:
+            return
+        remaining: List[NotificationEvent] = []
+        try:
+            await asyncio.wait_for(self._queue.join(), self.shutdown_timeout_seconds)
+        except asyncio.TimeoutError:
+            # Take back the events the task has not started; it finishes
+            # the one in hand (one last attempt if it is retrying) rather
+            # than being cancelled part-way through
+            self._closing.set()
+            while not self._queue.empty():
+                remaining.append(self._queue.get_nowait())
+                self._queue.task_done()
+            await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        for event in remaining:
+            self.delivered_on_shutdown += 1
+            await self._deliver(event)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and fan-out metrics."""
+        return {
+            "running": self._task is not None,
+            "max_queue": self.max_queue,
+            "queued": self._queue.qsize(),
+            "published": self.published,
+            "delivered": self.delivered,
+            "inline": self.inline,
+            "failed": self.failed,
+            "retries": self.retries,
+            "delivered_on_shutdown": self.delivered_on_shutdown,
+            "notifications_created": self.notifications_created,
+            "notifications_coalesced": self.notifications_coalesced,
+        }
+
+
+# Global notification dispatcher instance
+_notification_dispatcher = NotificationDispatcher(
+    AsyncSessionLocal,
+    broker=get_notification_broker(),
+    max_queue=settings.NOTIFICATION_QUEUE_SIZE,
+    coalesce_seconds=settings.NOTIFICATION_COALESCE_SECONDS,
+)
+
+
+def get_notification_dispatcher() -> NotificationDispatcher:
+    """Get global notification dispatcher instance."""
+    return _notification_dispatcher
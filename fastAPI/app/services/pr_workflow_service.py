@@ -0,0 +1,262 @@
+"""
+Purchase Request workflow service.
+Moves one or many purchase requests between statuses with set-based
+UPDATEs guarded by the role's transition table and each row's version,
+and records every move in the activity log with one batched INSERT in
+the same transaction, so a status change and its audit row commit together.
+After commit, the moved PRs' end users and the roles that must act next
+are notified through the notification dispatcher, off the request path.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status as http_status
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.audit_log import audit_entry, record_in_transaction
+from app.core.principals import Principal
+from app.core.status import ActivityAction, NotificationType, PurchaseRequestStatus
+from app.core.workflow import STATUS_NOTIFICATIONS, allowed_sources
+from app.models.purchase_request import PurchaseRequest
+from app.schemas.notification import NotificationEvent, NotificationSubject
+from app.schemas.purchase_request import PRBulkStatusResult, PRStatusTransitionResult
+from app.services.notification_service import NotificationDispatcher, get_notification_dispatcher
+
+
+# Max (id, version) pairs per guarded UPDATE
+TRANSITION_CHUNK_SIZE = 500
+
+# Bulk transitions re-read and retry this many times when rows change under them
+TRANSITION_ATTEMPTS = 3
+
+
+class PRWorkflowService:
+    """Service for purchase request status transitions."""
+
+    def __init__(self, db: AsyncSession, notifier: Optional[NotificationDispatcher] = None):
+        self.db = db
+        self.notifier = notifier or get_notification_dispatcher()
+
+    def _log_rows(
+        self,
+        actor: Principal,
+        moved: List[Tuple[int, PurchaseRequestStatus]],
+        target: PurchaseRequestStatus,
+        notes: Optional[str],
+        now: datetime
+    ) -> List[Dict]:
+        """Activity log rows for (id, previous status) pairs."""
+        return [
+            audit_entry(
+                ActivityAction.STATUS_CHANGED,
+                "PurchaseRequest",
+                (
+                    f"Status changed from {previous.value} to {target.value}"
+                    + (f": {notes}" if notes else "")
+                ),
+                user_id=actor.id,
+                entity_id=pr_id,
+                old_values={"status": previous.value},
+                new_values={"status": target.value},
+                created_at=now,
+            )
+            for pr_id, previous in moved
+        ]
+
+    async def _notify(self, moved, target: PurchaseRequestStatus, actor: Principal) -> None:
+        """Publish notifications for moved rows (id, pr_number, end_user_id)."""
+        if not moved:
+            return
+        # The end user is not told about a move they made themselves
+        await self.notifier.publish(NotificationEvent(
+            type=NotificationType.STATUS_UPDATED,
+            entity_type="PurchaseRequest",
+            subjects=[
+                NotificationSubject(
+                    entity_id=row.id,
+                    title=f"{row.pr_number} is now {target.value}",
+                    message=f"Purchase request {row.pr_number} moved to {target.value}.",
+                    link=f"/purchase-requests/{row.id}",
+                    user_ids=[row.end_user_id] if row.end_user_id != actor.id else [],
+                )
+                for row in moved
+            ],
+        ))
+
+        if target not in STATUS_NOTIFICATIONS:
+            return
+        notification_type, roles = STATUS_NOTIFICATIONS[target]
+        await self.notifier.publish(NotificationEvent(
+            type=notification_type,
+            entity_type="PurchaseRequest",
+            roles=sorted(roles),
+            subjects=[
+                NotificationSubject(
+                    entity_id=row.id,
+                    title=f"{row.pr_number} needs your action",
+                    message=f"Purchase request {row.pr_number} is {target.value} and awaits your action.",
+                    link=f"/purchase-requests/{row.id}",
+                )
+                for row in moved
+            ],
+        ))
+
+    async def transition(
+        self,
+        pr_id: int,
+        target: PurchaseRequestStatus,
+        actor: Principal,
+        expected_version: Optional[int] = None,
+        notes: Optional[str] = None,
+        end_user_id: Optional[int] = None
+    ) -> PRStatusTransitionResult:
+        """
+        Move one purchase request to target.
+
+        The UPDATE only matches if the PR is still at the version read here
+        (or expected_version, when the client sends the one it saw) and in a
+        status the actor may move from; otherwise nothing is written and
+        409 is raised. end_user_id limits the move to that user's own PRs.
+        """
+        sources = allowed_sources(actor.role, target)
+        row = (await self.db.execute(
+            select(
+                PurchaseRequest.id,
+                PurchaseRequest.pr_number,
+                PurchaseRequest.status,
+                PurchaseRequest.version,
+                PurchaseRequest.end_user_id
+            )
+            .where(PurchaseRequest.id == pr_id)
+        )).one_or_none()
+        if row is None or (end_user_id is not None and row.end_user_id != end_user_id):
+            raise HTTPException(
+                status_code=http_status.HTTP_404_NOT_FOUND,
+                detail="Purchase request not found"
+            )
+        if expected_version is not None and row.version != expected_version:
+            raise HTTPException(
+                status_code=http_status.HTTP_409_CONFLICT,
+                detail="Purchase request was modified by someone else; reload and retry"
+            )
+        if row.status not in sources:
+            raise HTTPException(
+                status_code=http_status.HTTP_409_CONFLICT,
+                detail=f"Cannot move purchase request from {row.status.value} to {target.value}"
+            )
+
+        now = datetime.utcnow()
+        result = await self.db.execute(
+            update(PurchaseRequest)
+            .where(
+                PurchaseRequest.id == pr_id,
+                PurchaseRequest.version == row.version,
+                PurchaseRequest.status.in_(sources)
+            )
+            .values(status=target, version=PurchaseRequest.version + 1, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            await self.db.rollback()
+            raise HTTPException(
+                status_code=http_status.HTTP_409_CONFLICT,
+                detail="Purchase request was modified by someone else; reload and retry"
+            )
+
+        await record_in_transaction(self.db, self._log_rows(actor, [(pr_id, row.status)], target, notes, now))
+        await self.db.commit()
+        await self._notify([row], target, actor)
+        return PRStatusTransitionResult(
+            id=pr_id,
+            previous_status=row.status,
+            status=target,
+            version=row.version + 1
+        )
+
+    async def bulk_transition(
+        self,
+        target: PurchaseRequestStatus,
+        actor: Principal,
+        pr_ids: Optional[List[int]] = None,
+        fund_source: Optional[str] = None,
+        from_statuses: Optional[List[PurchaseRequestStatus]] = None,
+        notes: Optional[str] = None,
+        end_user_id: Optional[int] = None
+    ) -> PRBulkStatusResult:
+        """
+        Move every matching purchase request the actor may move to target.
+
+        Reads only the key columns of the candidates, then moves them
+        with UPDATE ... WHERE (id, version) IN (...) AND status IN (...), one
+        statement per chunk. If any row changed after the read, its chunk
+        matches short; the whole operation is rolled back and re-read, so
+        every PR is judged on its current status. Raises 409 if the PRs keep
+        changing for TRANSITION_ATTEMPTS attempts.
+        """
+        sources = allowed_sources(actor.role, target)
+        if from_statuses is not None:
+            sources = sources & frozenset(from_statuses)
+        if not sources:
+            return PRBulkStatusResult(status=target, updated=0, ids=[])
+
+        query = (
+            select(
+                PurchaseRequest.id,
+                PurchaseRequest.pr_number,
+                PurchaseRequest.status,
+                PurchaseRequest.version,
+                PurchaseRequest.end_user_id
+            )
+            .where(PurchaseRequest.status.in_(sources))
+            .order_by(PurchaseRequest.id)
+        )
+        if pr_ids is not None:
+            query = query.where(PurchaseRequest.id.in_(pr_ids))
+        if fund_source is not None:
+            query = query.where(PurchaseRequest.fund_source == fund_source)
+        if end_user_id is not None:
+            query = query.where(PurchaseRequest.end_user_id == end_user_id)
+
+        for _ in range(TRANSITION_ATTEMPTS):
+            candidates = (await self.db.execute(query)).all()
+            now = datetime.utcnow()
+            if await self._move_all(candidates, sources, target, now):
+                break
+            await self.db.rollback()
+        else:
+            raise HTTPException(
+                status_code=http_status.HTTP_409_CONFLICT,
+                detail="Purchase requests kept changing during the update; retry"
+            )
+
+        if candidates:
+            moved = [(row.id, row.status) for row in candidates]
+            await record_in_transaction(self.db, self._log_rows(actor, moved, target, notes, now))
+        await self.db.commit()
+        await self._notify(candidates, target, actor)
+
+        return PRBulkStatusResult(
+            status=target,
+            updated=len(candidates),
+            ids=[row.id for row in candidates]
+        )
+
+    async def _move_all(self, candidates, sources, target: PurchaseRequestStatus, now: datetime) -> bool:
+        """Move candidates still at the version read; False if any had changed."""
+        for start in range(0, len(candidates), TRANSITION_CHUNK_SIZE):
+            chunk = candidates[start:start + TRANSITION_CHUNK_SIZE]
+            result = await self.db.execute(
+                update(PurchaseRequest)
+                .where(
+                    tuple_(PurchaseRequest.id, PurchaseRequest.version).in_(
+                        [(row.id, row.version) for row in chunk]
+                    ),
+                    PurchaseRequest.status.in_(sources)
+                )
+                .values(status=target, version=PurchaseRequest.version + 1, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != len(chunk):
+                return False
+        return True
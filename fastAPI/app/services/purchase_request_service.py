@@ -0,0 +1,304 @@
+"""
+Purchase Request service layer.
+Handles business logic for creating, listing and querying purchase requests.
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
+
+from app.core.config import settings
+from app.core.item_totals import sum_amounts
+from app.core.numbering import NumberAllocator, get_number_allocator
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.status import PurchaseRequestStatus, UrgencyLevel
+from app.models.canvass import Canvass
+from app.models.pr_item import PRItem
+from app.models.purchase_order import PurchaseOrder
+from app.models.purchase_request import PurchaseRequest
+from app.models.rfq import RFQ
+from app.models.supplier_quotation import SupplierQuotation
+from app.schemas.purchase_request import (
+    PurchaseRequestBulkItemResult,
+    PurchaseRequestBulkResult,
+    PurchaseRequestCreate,
+    PurchaseRequestPage,
+    PurchaseRequestSummary,
+)
+
+
+# Columns needed for list rows (skips the large Text columns)
+SUMMARY_COLUMNS = (
+    PurchaseRequest.id,
+    PurchaseRequest.pr_number,
+    PurchaseRequest.project_title,
+    PurchaseRequest.end_user_id,
+    PurchaseRequest.end_user_department,
+    PurchaseRequest.fund_source,
+    PurchaseRequest.estimated_budget,
+    PurchaseRequest.item_count,
+    PurchaseRequest.total_estimated_cost,
+    PurchaseRequest.urgency_level,
+    PurchaseRequest.status,
+    PurchaseRequest.version,
+    PurchaseRequest.created_at,
+    PurchaseRequest.updated_at,
+)
+
+# Loader strategy for the PR detail graph. To-one relationships are joined
+# into the parent query; collections each get one SELECT ... IN query, so the
+# number of statements is fixed however many items or quotations there are
+# (joining collections would instead multiply the rows of the result).
+DETAIL_LOAD_OPTIONS = (
+    selectinload(PurchaseRequest.pr_items),
+    joinedload(PurchaseRequest.rfq)
+        .selectinload(RFQ.canvasses)
+        .selectinload(Canvass.supplier_quotations)
+        .selectinload(SupplierQuotation.quotation_items),
+    selectinload(PurchaseRequest.bac_documents),
+    joinedload(PurchaseRequest.purchase_order).joinedload(PurchaseOrder.supplier),
+    selectinload(PurchaseRequest.approval_routings),
+    # Anything else would be a lazy load per row; fail loudly instead
+    raiseload("*"),
+)
+
+# Max bound parameters per id lookup after a bulk insert
+BULK_LOOKUP_CHUNK_SIZE = 500
+
+
+def purchase_request_values(data: PurchaseRequestCreate) -> Dict[str, Any]:
+    """Map a create schema onto PurchaseRequest column values (items excluded)."""
+    return {
+        "project_title": data.project_title,
+        "project_description": data.project_description,
+        "purpose": data.purpose,
+        "end_user_department": data.end_user_department,
+        "office_name": data.office_name,
+        "office_address": data.office_address,
+        "responsibility_center": data.responsibility_center,
+        "fund_source": data.fund_source,
+        "estimated_budget": data.estimated_budget,
+        "urgency_level": data.urgency_level,
+        "urgency_timeline": data.urgency_timeline,
+        "has_signatures": data.has_signatures,
+        "has_technical_specs": data.has_specs,
+        "has_quantity": data.has_quantity,
+        "has_market_study": data.has_market_survey,
+        "requested_by_name": data.requested_by_name,
+        "requested_by_position": data.requested_by_designation,
+        "approved_by_name": data.approved_by_name,
+        "approved_by_position": data.approved_by_designation,
+        "budget_officer_name": data.budget_officer_name,
+        "budget_officer_position": data.budget_officer_designation,
+        "deficiency_notes": data.deficiency_notes,
+    }
+
+
+class PurchaseRequestService:
+    """Service for purchase request operations."""
+
+    def __init__(self, db: AsyncSession, number_allocator: Optional[NumberAllocator] = None):
+        self.db = db
+        self.number_allocator = number_allocator or get_number_allocator()
+
+    async def create_purchase_request(
+        self,
+        data: PurchaseRequestCreate,
+        end_user_id: int
+    ) -> PurchaseRequest:
+        """Create one purchase request and its items through the ORM."""
+        pr_numbers = await self.number_allocator.allocate(settings.PR_NUMBER_PREFIX)
+        purchase_request = PurchaseRequest(
+            pr_number=pr_numbers[0],
+            end_user_id=end_user_id,
+            status=PurchaseRequestStatus.PR_UNDER_REVIEW,
+            pr_items=[PRItem(**item.model_dump()) for item in data.pr_items],
+            **purchase_request_values(data)
+        )
+        self.db.add(purchase_request)
+        try:
+            await self.db.commit()
+        except Exception:
+            # Hand the number back so the year's sequence stays gap-free
+            await self.db.rollback()
+            self.number_allocator.release(pr_numbers)
+            raise
+        return purchase_request
+
+    async def get_purchase_request_detail(self, pr_id: int) -> Optional[PurchaseRequest]:
+        """
+        Get a purchase request with its items, RFQ (canvasses, quotations and
+        quotation items), BAC documents, purchase order and approval routing.
+
+        The graph is loaded in a fixed number of queries (see
+        DETAIL_LOAD_OPTIONS), ready for PurchaseRequestDetail.
+        """
+        result = await self.db.execute(
+            select(PurchaseRequest)
+            .where(PurchaseRequest.id == pr_id)
+            .options(*DETAIL_LOAD_OPTIONS)
+        )
+        return result.unique().scalar_one_or_none()
+
+    async def bulk_create_purchase_requests(
+        self,
+        entries: List[Dict[str, Any]],
+        end_user_id: int
+    ) -> PurchaseRequestBulkResult:
+        """
+        Create many purchase requests in one transaction.
+
+        Each entry is validated on its own; invalid entries are reported and
+        skipped. Valid PRs are written with one multi-row INSERT, their ids
+        read back by PR number, and all their items written with a second
+        multi-row INSERT, instead of one INSERT (and id fetch) per row.
+        """
+        results: List[Optional[PurchaseRequestBulkItemResult]] = [None] * len(entries)
+        valid: List[tuple[int, PurchaseRequestCreate]] = []
+        for index, entry in enumerate(entries):
+            try:
+                valid.append((index, PurchaseRequestCreate.model_validate(entry)))
+            except ValidationError as exc:
+                results[index] = PurchaseRequestBulkItemResult(
+                    index=index,
+                    success=False,
+                    errors=exc.errors(include_url=False, include_context=False, include_input=False)
+                )
+
+        if valid:
+            pr_numbers = await self.number_allocator.allocate(settings.PR_NUMBER_PREFIX, len(valid))
+            try:
+                now = datetime.utcnow()
+                await self.db.execute(
+                    insert(PurchaseRequest),
+                    [
+                        {
+                            "pr_number": pr_number,
+                            "end_user_id": end_user_id,
+                            "status": PurchaseRequestStatus.PR_UNDER_REVIEW,
+                            "created_at": now,
+                            "updated_at": now,
+                            # Core inserts skip the ORM flush hooks that maintain these
+                            "item_count": len(data.pr_items),
+                            "total_estimated_cost": sum_amounts(
+                                item.quantity * item.estimated_price for item in data.pr_items
+                            ),
+                            **purchase_request_values(data),
+                        }
+                        for (_, data), pr_number in zip(valid, pr_numbers)
+                    ]
+                )
+
+                # MySQL has no INSERT ... RETURNING; look ids up by unique PR number
+                ids: Dict[str, int] = {}
+                for start in range(0, len(pr_numbers), BULK_LOOKUP_CHUNK_SIZE):
+                    chunk = pr_numbers[start:start + BULK_LOOKUP_CHUNK_SIZE]
+                    rows = await self.db.execute(
+                        select(PurchaseRequest.pr_number, PurchaseRequest.id)
+                        .where(PurchaseRequest.pr_number.in_(chunk))
+                    )
+                    ids.update(rows.tuples().all())
+
+                await self.db.execute(
+                    insert(PRItem),
+                    [
+                        {"purchase_request_id": ids[pr_number], **item.model_dump()}
+                        for (_, data), pr_number in zip(valid, pr_numbers)
+                        for item in data.pr_items
+                    ]
+                )
+                await self.db.commit()
+            except Exception:
+                await self.db.rollback()
+                self.number_allocator.release(pr_numbers)
+                raise
+
+            for (index, _), pr_number in zip(valid, pr_numbers):
+                results[index] = PurchaseRequestBulkItemResult(
+                    index=index,
+                    success=True,
+                    id=ids[pr_number],
+                    pr_number=pr_number
+                )
+
+        return PurchaseRequestBulkResult(
+            created=len(valid),
+            failed=len(entries) - len(valid),
+            results=results
+        )
+
+    async def list_purchase_requests(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        status: Optional[PurchaseRequestStatus] = None,
+        urgency_level: Optional[UrgencyLevel] = None,
+        fund_source: Optional[str] = None,
+        department: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        min_total: Optional[Decimal] = None,
+        max_total: Optional[Decimal] = None,
+        end_user_id: Optional[int] = None
+    ) -> PurchaseRequestPage:
+        """
+        List purchase requests newest first using keyset pagination.
+
+        Pages are ordered by (created_at, id) descending; the cursor holds
+        the last row's key and the next page starts strictly after it, so
+        the cost of a page does not grow with its depth.
+        """
+        query = select(PurchaseRequest).options(load_only(*SUMMARY_COLUMNS))
+
+        if status is not None:
+            query = query.where(PurchaseRequest.status == status)
+        if urgency_level is not None:
+            query = query.where(PurchaseRequest.urgency_level == urgency_level)
+        if fund_source is not None:
+            query = query.where(PurchaseRequest.fund_source == fund_source)
+        if department is not None:
+            query = query.where(PurchaseRequest.end_user_department == department)
+        if end_user_id is not None:
+            query = query.where(PurchaseRequest.end_user_id == end_user_id)
+        if created_from is not None:
+            query = query.where(PurchaseRequest.created_at >= created_from)
+        if created_to is not None:
+            query = query.where(PurchaseRequest.created_at < created_to)
+        if min_total is not None:
+            query = query.where(PurchaseRequest.total_estimated_cost >= min_total)
+        if max_total is not None:
+            query = query.where(PurchaseRequest.total_estimated_cost <= max_total)
+
+        if cursor is not None:
+            last_created_at, last_id = decode_cursor(cursor)
+            # The redundant created_at <= bound gives the planner an index
+            # range to seek into; the OR alone degrades to a filtered scan
+            query = query.where(
+                PurchaseRequest.created_at <= last_created_at,
+                or_(
+                    PurchaseRequest.created_at < last_created_at,
+                    PurchaseRequest.id < last_id
+                )
+            )
+
+        # Fetch one extra row to know whether another page exists
+        query = query.order_by(
+            PurchaseRequest.created_at.desc(),
+            PurchaseRequest.id.desc()
+        ).limit(limit + 1)
+
+        result = await self.db.execute(query)
+        rows = list(result.scalars().all())
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        return PurchaseRequestPage(
+            items=[PurchaseRequestSummary.model_validate(row) for row in rows],
+            limit=limit,
+            has_more=has_more,
+            next_cursor=encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+        )
@@ -0,0 +1,87 @@
+"""Archive and drop activity log months past AUDIT_LOG_RETENTION_DAYS
+
+Run daily (e.g. from cron) on one host:
+    python scripts/activity_log_retention.py
+    python scripts/activity_log_retention.py --dry-run
+
+Each expired month is written to a gzipped JSON-lines file under
+AUDIT_LOG_ARCHIVE_DIR with its index, then its partition is dropped.
+Archive files written without an index are indexed. The run also adds
+monthly partitions up to AUDIT_LOG_PARTITION_MONTHS_AHEAD so inserts never
+fall into the catch-all partition. On MySQL, convert the table once with:
+    python scripts/activity_log_retention.py --enable-partitioning
+which rebuilds activity_logs (primary key (id, created_at), no foreign key
+on user_id); schedule it for a quiet window. --sync-indexes only creates the
+model's query-path indexes and drops the ones they replace.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.core.audit_retention import (
+    archive_and_drop,
+    enable_partitioning,
+    ensure_future_partitions,
+    expired_months,
+    index_archives,
+    sync_indexes,
+)
+from app.core.config import settings
+from app.core.database import engine
+
+
+async def main(retention_days: int, dry_run: bool, partition: bool, indexes: bool) -> int:
+    now = datetime.utcnow()
+    months_ahead = settings.AUDIT_LOG_PARTITION_MONTHS_AHEAD
+    try:
+        if partition and not dry_run:
+            async with engine.begin() as conn:
+                partitions = await conn.run_sync(enable_partitioning, now, months_ahead)
+            print(f"activity_logs: {len(partitions)} partitions")
+        elif indexes and not dry_run:
+            async with engine.begin() as conn:
+                changes = await conn.run_sync(sync_indexes)
+            print(f"activity_logs: {'; '.join(changes) or 'indexes up to date'}")
+
+        async with engine.connect() as conn:
+            months = await conn.run_sync(expired_months, now, retention_days)
+        for month in months:
+            label = month.strftime("%Y-%m")
+            if dry_run:
+                print(f"{label}: would archive and drop")
+                continue
+            async with engine.begin() as conn:
+                path, count = await conn.run_sync(archive_and_drop, month, settings.AUDIT_LOG_ARCHIVE_DIR)
+            print(f"{label}: archived {count} rows" + (f" to {path}" if path else ""))
+
+        if not dry_run:
+            indexed = await asyncio.get_running_loop().run_in_executor(
+                None, index_archives, settings.AUDIT_LOG_ARCHIVE_DIR
+            )
+            if indexed:
+                print(f"indexed {len(indexed)} archive files")
+            async with engine.begin() as conn:
+                added = await conn.run_sync(ensure_future_partitions, now, months_ahead)
+            if added:
+                print(f"activity_logs: added partitions {', '.join(added)}")
+        return 0
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--retention-days", type=int, default=settings.AUDIT_LOG_RETENTION_DAYS)
+    parser.add_argument("--dry-run", action="store_true", help="Only list the months that would be dropped")
+    parser.add_argument("--enable-partitioning", action="store_true",
+                        help="Partition activity_logs by month first (MySQL, one-time)")
+    parser.add_argument("--sync-indexes", action="store_true",
+                        help="Create missing and drop obsolete activity_logs indexes first (MySQL)")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.retention_days, args.dry_run, args.enable_partitioning, args.sync_indexes)))
@@ -0,0 +1,68 @@
+"""Backfill or verify the stored item aggregates on purchase requests and quotations
+
+Recomputes purchase_requests.item_count / total_estimated_cost and
+supplier_quotations.item_count / items_total_amount from the item rows,
+one batch of parents per transaction:
+    python scripts/backfill_item_totals.py
+    python scripts/backfill_item_totals.py --check
+
+--check only reports rows whose stored aggregates have drifted and exits
+with status 1 if there are any. Existing databases need the columns added
+first (ALTER TABLE ... ADD COLUMN, see app/models).
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import select
+
+from app.core.database import engine
+from app.core.item_totals import PR_TOTALS, QUOTATION_TOTALS, check_totals
+
+
+async def backfill(batch_size: int) -> None:
+    for aggregate in (PR_TOTALS, QUOTATION_TOTALS):
+        async with engine.connect() as conn:
+            ids = list((await conn.execute(
+                select(aggregate.parent.id).order_by(aggregate.parent.id)
+            )).scalars())
+
+        for start in range(0, len(ids), batch_size):
+            async with engine.begin() as conn:
+                await conn.execute(aggregate.refresh_statement(ids[start:start + batch_size]))
+        print(f"{aggregate.parent.__tablename__}: refreshed {len(ids)} rows")
+
+
+async def check() -> int:
+    async with engine.connect() as conn:
+        drift = await conn.run_sync(check_totals)
+
+    drifted = 0
+    for table, rows in drift.items():
+        print(f"{table}: {len(rows)} rows out of step")
+        for row in rows[:20]:
+            print(f"  {row}")
+        drifted += len(rows)
+    return drifted
+
+
+async def main(check_only: bool, batch_size: int) -> int:
+    try:
+        if not check_only:
+            await backfill(batch_size)
+        return 1 if await check() else 0
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--check", action="store_true", help="Only report drifted rows")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.check, args.batch_size)))
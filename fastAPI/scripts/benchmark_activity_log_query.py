@@ -0,0 +1,145 @@
+"""Benchmark: audit-trail queries over a synthetic activity log
+
+Seeds a SQLite database with synthetic activity log entries (10M by
+default; seeding takes a while), then times the audit query service for
+the two auditor questions, "all changes to PR #X" and "everything user Y
+did in a month", at increasing page depth against the equivalent OFFSET
+query, and with and without the old/new value blobs:
+    python scripts/benchmark_activity_log_query.py --rows 10000000
+    python scripts/benchmark_activity_log_query.py --rows 1000000 --repeat 3
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.pagination import encode_cursor
+from app.core.status import ActivityAction
+from app.models import ActivityLog, User
+from app.services.activity_log_service import SUMMARY_COLUMNS, ActivityLogService
+
+PAGE_SIZE = 50
+PAGES = (1, 10, 100, 1_000)
+ACTIONS = [ActivityAction.CREATE, ActivityAction.UPDATE, ActivityAction.STATUS_CHANGED, ActivityAction.LOGIN]
+PURCHASE_REQUESTS = 20_000
+USERS = 500
+BASE_TIME = datetime(2022, 1, 1)
+
+
+async def seed(engine, rows: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+        await conn.run_sync(ActivityLog.__table__.create)
+
+        # Three years of entries, evenly spaced
+        step = timedelta(days=3 * 365) / rows
+        batch = []
+        for i in range(rows):
+            batch.append({
+                "user_id": i % USERS + 1,
+                "action": ACTIONS[i % len(ACTIONS)].name,
+                "entity_type": "PurchaseRequest",
+                "entity_id": (i * 7919) % PURCHASE_REQUESTS,
+                "old_values": {"status": "PR_UNDER_REVIEW", "notes": "x" * 200},
+                "new_values": {"status": "RFQ_READY", "notes": "y" * 200},
+                "description": f"Synthetic benchmark entry {i}",
+                "ip_address": "10.0.0.1",
+                "user_agent": "benchmark",
+                "created_at": BASE_TIME + step * i,
+            })
+            if len(batch) == 50_000:
+                await conn.execute(insert(ActivityLog), batch)
+                batch = []
+        if batch:
+            await conn.execute(insert(ActivityLog), batch)
+
+
+async def timed(factory, run, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        async with factory() as session:
+            started = time.perf_counter()
+            await run(session)
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+async def compare(factory, label: str, filters: dict, repeat: int, archive_dir: str) -> None:
+    def offset_query(offset: int, columns):
+        query = select(*columns)
+        for column, value in filters.items():
+            if column == "created_from":
+                query = query.where(ActivityLog.created_at >= value)
+            elif column == "created_to":
+                query = query.where(ActivityLog.created_at < value)
+            else:
+                query = query.where(getattr(ActivityLog, column) == value)
+        return query.order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc()).offset(offset).limit(PAGE_SIZE + 1)
+
+    print(f"\n{label}")
+    print(f"{'page':>8} {'offset+blobs (ms)':>18} {'offset (ms)':>12} {'keyset (ms)':>12} {'keyset+blobs (ms)':>18}")
+    for page in PAGES:
+        offset = (page - 1) * PAGE_SIZE
+        async with factory() as session:
+            anchor = (await session.execute(offset_query(offset, SUMMARY_COLUMNS).limit(1))).first()
+        if anchor is None:
+            break
+        # Cursor whose next page starts at the anchor row, as a client would hold it
+        cursor = encode_cursor(anchor.created_at, anchor.id + 1) if offset else None
+
+        full_columns = (ActivityLog,)
+        offset_blobs = await timed(factory, lambda s: s.execute(offset_query(offset, full_columns)), repeat)
+        offset_summary = await timed(factory, lambda s: s.execute(offset_query(offset, SUMMARY_COLUMNS)), repeat)
+        keyset = await timed(factory, lambda s: ActivityLogService(s, archive_dir).list_activity_logs(
+            limit=PAGE_SIZE, cursor=cursor, **filters
+        ), repeat)
+        keyset_blobs = await timed(factory, lambda s: ActivityLogService(s, archive_dir).list_activity_logs(
+            limit=PAGE_SIZE, cursor=cursor, include_changes=True, **filters
+        ), repeat)
+        print(f"{page:>8} {offset_blobs * 1000:>18.2f} {offset_summary * 1000:>12.2f} "
+              f"{keyset * 1000:>12.2f} {keyset_blobs * 1000:>18.2f}")
+
+
+async def main(rows: int, repeat: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        print(f"Seeding {rows} activity log entries...")
+        started = time.perf_counter()
+        await seed(engine, rows)
+        print(f"Seeded in {time.perf_counter() - started:.1f}s")
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        archive_dir = os.path.join(tmp, "archive")
+
+        print("=" * 72)
+        print(f"Audit query benchmark: {rows} rows, page size {PAGE_SIZE}")
+        print("=" * 72)
+        await compare(factory, "All changes to one purchase request", {
+            "entity_type": "PurchaseRequest", "entity_id": 42,
+        }, repeat, archive_dir)
+        await compare(factory, "Everything one user did in March 2023", {
+            "user_id": 7, "created_from": datetime(2023, 3, 1), "created_to": datetime(2023, 4, 1),
+        }, repeat, archive_dir)
+        await compare(factory, "All status changes", {
+            "action": ActivityAction.STATUS_CHANGED,
+        }, repeat, archive_dir)
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
@@ -0,0 +1,83 @@
+"""Microbenchmark: get_current_user throughput with and without auth caches
+
+Runs against an in-memory SQLite database so it can be executed anywhere:
+    python scripts/benchmark_auth_cache.py --iterations 5000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.deps import get_current_user
+from app.core.principals import get_principal_cache
+from app.core.roles import UserRole
+from app.core.security import create_access_token, get_token_cache
+from app.models.user import User
+
+
+async def run_case(factory, token: str, iterations: int, token_cache: bool, principal_cache: bool) -> float:
+    """Run get_current_user repeatedly and return calls per second."""
+    get_token_cache().enabled = token_cache
+    get_principal_cache().enabled = principal_cache
+    get_token_cache().clear()
+    get_principal_cache().clear()
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        async with factory() as session:
+            await get_current_user(token, session)
+    return iterations / (time.perf_counter() - started)
+
+
+async def main(iterations: int):
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with factory() as session:
+        user = User(
+            name="Benchmark User",
+            email="benchmark@dict.gov.ph",
+            password_hash="not-a-real-hash",
+            role=UserRole.END_USER,
+            is_active=True,
+        )
+        session.add(user)
+        await session.commit()
+
+    token = create_access_token({"sub": str(user.id), "email": user.email, "role": user.role})
+
+    cases = [
+        ("uncached (verify + SELECT)", False, False),
+        ("token cache only", True, False),
+        ("principal cache only", False, True),
+        ("token + principal cache", True, True),
+    ]
+
+    print("=" * 60)
+    print(f"get_current_user throughput ({iterations} calls per case)")
+    print("=" * 60)
+    baseline = None
+    for label, token_cache, principal_cache in cases:
+        rate = await run_case(factory, token, iterations, token_cache, principal_cache)
+        baseline = baseline or rate
+        print(f"{label:<30} {rate:>10.0f} calls/s  ({rate / baseline:.1f}x)")
+
+    print(f"\nToken cache:     {get_token_cache().get_stats()}")
+    print(f"Principal cache: {get_principal_cache().get_stats()}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
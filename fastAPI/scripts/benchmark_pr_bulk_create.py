@@ -0,0 +1,123 @@
+"""Benchmark: bulk vs single purchase request creation (rows/second)
+
+Creates the same synthetic PRs through the single-PR ORM path and through
+the bulk path, and reports PR and item rows written per second:
+    python scripts/benchmark_pr_bulk_create.py --prs 5000 --items 10
+    python scripts/benchmark_pr_bulk_create.py --url "mysql+aiomysql://root:pw@localhost/bench"
+
+SQLite runs in-process, so it understates the win; against MySQL every
+avoided statement is also an avoided network round-trip.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.numbering import NumberAllocator
+from app.core.roles import UserRole
+from app.models import NumberSequence, PRItem, PurchaseRequest, ReleasedNumber, User
+from app.schemas.purchase_request import PurchaseRequestCreate
+from app.services.purchase_request_service import PurchaseRequestService
+
+BULK_BATCH_SIZE = 1000
+
+
+def payload(n: int, items: int) -> dict:
+    return {
+        "project_title": f"Planned procurement {n:06d}",
+        "project_description": "Synthetic procurement plan entry",
+        "purpose": "Benchmark import",
+        "end_user_department": f"Department {n % 25}",
+        "fund_source": "GAA",
+        "estimated_budget": "100000.00",
+        "urgency_level": "MEDIUM",
+        "requested_by_name": "Benchmark",
+        "requested_by_designation": "Engineer",
+        "budget_officer_name": "Benchmark",
+        "budget_officer_designation": "Budget Officer",
+        "pr_items": [
+            {
+                "item_code": f"IT-{i:03d}",
+                "item_name": f"Item {i}",
+                "quantity": "1.00",
+                "unit_of_measure": "unit",
+                "estimated_price": "1000.00",
+            }
+            for i in range(items)
+        ],
+    }
+
+
+async def reset(factory) -> None:
+    async with factory() as session:
+        for model in (PRItem, PurchaseRequest, NumberSequence, ReleasedNumber):
+            await session.execute(delete(model))
+        await session.commit()
+
+
+async def run_single(factory, allocator, entries) -> float:
+    started = time.perf_counter()
+    for entry in entries:
+        async with factory() as session:
+            data = PurchaseRequestCreate.model_validate(entry)
+            await PurchaseRequestService(session, allocator).create_purchase_request(data, end_user_id=1)
+    return time.perf_counter() - started
+
+
+async def run_bulk(factory, allocator, entries) -> float:
+    started = time.perf_counter()
+    for start in range(0, len(entries), BULK_BATCH_SIZE):
+        async with factory() as session:
+            await PurchaseRequestService(session, allocator).bulk_create_purchase_requests(
+                entries[start:start + BULK_BATCH_SIZE], end_user_id=1
+            )
+    return time.perf_counter() - started
+
+
+async def main(prs: int, items: int, url: str):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(url or f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        async with engine.begin() as conn:
+            for model in (User, PurchaseRequest, PRItem, NumberSequence, ReleasedNumber):
+                await conn.run_sync(model.__table__.create, checkfirst=True)
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with factory() as session:
+            if await session.get(User, 1) is None:
+                session.add(User(id=1, name="Benchmark", email="bench@dict.gov.ph",
+                                 password_hash="x", role=UserRole.END_USER, is_active=True))
+                await session.commit()
+
+        entries = [payload(n, items) for n in range(prs)]
+        rows = prs * (items + 1)
+
+        await reset(factory)
+        single_seconds = await run_single(factory, NumberAllocator(engine), entries)
+        await reset(factory)
+        bulk_seconds = await run_bulk(factory, NumberAllocator(engine), entries)
+        await reset(factory)
+        await engine.dispose()
+
+    print("=" * 60)
+    print(f"PR creation benchmark: {prs} PRs x {items} items ({rows} rows), {engine.dialect.name}")
+    print("=" * 60)
+    print(f"Single-PR path: {single_seconds:8.2f}s  {rows / single_seconds:10.0f} rows/s  {prs / single_seconds:8.0f} PRs/s")
+    print(f"Bulk path:      {bulk_seconds:8.2f}s  {rows / bulk_seconds:10.0f} rows/s  {prs / bulk_seconds:8.0f} PRs/s")
+    print(f"Speedup:        {single_seconds / bulk_seconds:8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prs", type=int, default=2000)
+    parser.add_argument("--items", type=int, default=10)
+    parser.add_argument("--url", default=None, help="async database URL (default: temporary SQLite file)")
+    args = parser.parse_args()
+    asyncio.run(main(args.prs, args.items, args.url))
@@ -0,0 +1,132 @@
+"""Benchmark: keyset vs OFFSET pagination of purchase requests at increasing depth
+
+Seeds a SQLite database with synthetic purchase requests, then times the
+service's keyset query against the equivalent OFFSET query for page 1 up
+to page 10,000:
+    python scripts/benchmark_pr_pagination.py --rows 1000000
+    python scripts/benchmark_pr_pagination.py --rows 1000000 --status RFQ_READY
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import load_only
+
+from app.core.pagination import encode_cursor
+from app.core.status import PurchaseRequestStatus, UrgencyLevel
+from app.models import PurchaseRequest, User
+from app.services.purchase_request_service import SUMMARY_COLUMNS, PurchaseRequestService
+
+PAGE_SIZE = 20
+PAGES = (1, 10, 100, 1_000, 10_000)
+STATUSES = list(PurchaseRequestStatus)
+
+
+async def seed(engine, rows: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+        await conn.run_sync(PurchaseRequest.__table__.create)
+        await conn.execute(insert(User), [{
+            "id": 1, "name": "Benchmark", "email": "bench@dict.gov.ph",
+            "password_hash": "x", "role": "END_USER", "is_active": True,
+            "created_at": datetime(2020, 1, 1), "updated_at": datetime(2020, 1, 1),
+        }])
+
+        base = datetime(2020, 1, 1)
+        batch = []
+        for i in range(rows):
+            batch.append({
+                "pr_number": f"PR-{i:08d}",
+                "project_title": f"Project {i}",
+                "project_description": "Synthetic benchmark row",
+                "purpose": "Benchmark",
+                "end_user_id": 1,
+                "end_user_department": f"Department {i % 25}",
+                "fund_source": f"Fund {i % 10}",
+                "estimated_budget": 1000,
+                "urgency_level": list(UrgencyLevel)[i % 4].name,
+                "status": STATUSES[i % len(STATUSES)].name,
+                "created_at": base + timedelta(seconds=i * 30),
+                "updated_at": base,
+            })
+            if len(batch) == 50_000:
+                await conn.execute(insert(PurchaseRequest), batch)
+                batch = []
+        if batch:
+            await conn.execute(insert(PurchaseRequest), batch)
+
+
+async def time_query(factory, make_query, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        async with factory() as session:
+            started = time.perf_counter()
+            await session.execute(make_query())
+            samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+async def main(rows: int, status_name: str, repeat: int):
+    status = PurchaseRequestStatus[status_name] if status_name else None
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}")
+        print(f"Seeding {rows} purchase requests...")
+        await seed(engine, rows)
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        def base_query():
+            query = select(PurchaseRequest).options(load_only(*SUMMARY_COLUMNS))
+            if status is not None:
+                query = query.where(PurchaseRequest.status == status)
+            return query.order_by(PurchaseRequest.created_at.desc(), PurchaseRequest.id.desc())
+
+        print("=" * 60)
+        print(f"Pagination benchmark: {rows} rows, page size {PAGE_SIZE}, status={status_name or 'any'}")
+        print("=" * 60)
+        print(f"{'page':>8} {'offset (ms)':>14} {'keyset (ms)':>14}")
+
+        for page in PAGES:
+            offset = (page - 1) * PAGE_SIZE
+            async with factory() as session:
+                anchor = (await session.execute(base_query().offset(offset).limit(1))).scalar_one_or_none()
+            if anchor is None:
+                break
+
+            offset_seconds = await time_query(
+                factory, lambda: base_query().offset(offset).limit(PAGE_SIZE + 1), repeat
+            )
+
+            # Cursor whose next page starts at the anchor row, as a client would hold it
+            cursor = encode_cursor(anchor.created_at, anchor.id + 1)
+            samples = []
+            for _ in range(repeat):
+                async with factory() as session:
+                    started = time.perf_counter()
+                    await PurchaseRequestService(session).list_purchase_requests(
+                        limit=PAGE_SIZE, cursor=cursor if offset else None, status=status
+                    )
+                    samples.append(time.perf_counter() - started)
+
+            print(f"{page:>8} {offset_seconds * 1000:>14.2f} {statistics.median(samples) * 1000:>14.2f}")
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--status", choices=[s.name for s in PurchaseRequestStatus], default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.status, args.repeat))
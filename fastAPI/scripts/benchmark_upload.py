@@ -0,0 +1,111 @@
+"""Microbenchmark: peak memory and throughput of streamed vs buffered uploads
+
+Sends multipart uploads through an in-process ASGI app, both to
+receive_upload (streamed to disk in UPLOAD_CHUNK_SIZE_KB blocks) and to a
+handler that reads the UploadFile whole before writing it, and reports the
+tracemalloc peak and MB/s of each:
+    python scripts/benchmark_upload.py --sizes 1,10,50 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import httpx
+from fastapi import FastAPI, Request
+
+from app.core.uploads import receive_upload
+
+BOUNDARY = "benchmarkboundary"
+CLIENT_CHUNK = 64 * 1024
+
+
+def build_app(upload_dir: str, max_bytes: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/streamed")
+    async def streamed(request: Request):
+        stored = await receive_upload(request, upload_dir=upload_dir, max_bytes=max_bytes)
+        os.remove(os.path.join(upload_dir, stored.file_path))
+        return {"size": stored.file_size}
+
+    @app.post("/buffered")
+    async def buffered(request: Request):
+        form = await request.form()
+        data = await form["file"].read()
+        path = os.path.join(upload_dir, "buffered.pdf")
+        with open(path, "wb") as f:
+            f.write(data)
+        os.remove(path)
+        return {"size": len(data)}
+
+    return app
+
+
+async def body(size: int):
+    yield (
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"report.pdf\"\r\n"
+        f"Content-Type: application/pdf\r\n\r\n%PDF-"
+    ).encode()
+    block = b"x" * CLIENT_CHUNK
+    remaining = size - 5
+    while remaining > 0:
+        yield block[:remaining]
+        remaining -= CLIENT_CHUNK
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def upload(client, path: str, size: int, concurrency: int) -> None:
+    responses = await asyncio.gather(*(
+        client.post(path, content=body(size), headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"})
+        for _ in range(concurrency)
+    ))
+    for response in responses:
+        response.raise_for_status()
+
+
+async def run_case(client, path: str, size: int, concurrency: int):
+    """
+    Upload concurrency files of size bytes at once; return (peak bytes, MB/s).
+    Throughput is timed in a separate pass without tracemalloc, whose
+    allocation hook slows the multipart parser by an order of magnitude.
+    """
+    started = time.perf_counter()
+    await upload(client, path, size, concurrency)
+    rate = size * concurrency / (1024 * 1024) / (time.perf_counter() - started)
+
+    tracemalloc.start()
+    await upload(client, path, size, concurrency)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, rate
+
+
+async def main(sizes_mb, concurrency: int):
+    with tempfile.TemporaryDirectory() as upload_dir:
+        app = build_app(upload_dir, max(sizes_mb) * 1024 * 1024)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            print("=" * 70)
+            print(f"Upload peak memory and throughput ({concurrency} concurrent uploads)")
+            print("=" * 70)
+            for size_mb in sizes_mb:
+                size = size_mb * 1024 * 1024
+                for label, path in (("buffered", "/buffered"), ("streamed", "/streamed")):
+                    peak, rate = await run_case(client, path, size, concurrency)
+                    print(f"{size_mb:>4} MB  {label:<10} peak {peak / (1024 * 1024):>8.2f} MB  {rate:>8.1f} MB/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,10,50", help="comma-separated file sizes in MB")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main([int(s) for s in args.sizes.split(",")], args.concurrency))
@@ -0,0 +1,55 @@
+"""Free document blobs no document references any more
+
+Run daily (e.g. from cron) on one host:
+    python scripts/document_blob_gc.py
+    python scripts/document_blob_gc.py --dry-run
+
+Deletes blobs unreferenced for longer than DOCUMENT_BLOB_GC_GRACE_HOURS,
+then walks UPLOAD_DIR/blobs for files that have no document_blobs row
+(abandoned staged uploads, blobs of rolled-back inserts) and are older
+than the same grace period. Prints storage usage afterwards.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+# Add parent directory to path so we can import app modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.services.document_service import DocumentService
+
+
+def megabytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+async def main(grace_hours: int, dry_run: bool) -> int:
+    try:
+        async with AsyncSessionLocal() as session:
+            service = DocumentService(session)
+            freed = await service.collect_garbage(grace_hours * 3600, dry_run=dry_run)
+            verb = "would free" if dry_run else "freed"
+            print(f"unreferenced blobs: {verb} {freed['blobs']} ({megabytes(freed['blob_bytes'])})")
+            print(f"orphaned files: {verb} {freed['orphan_files']} ({megabytes(freed['orphan_bytes'])})")
+
+            stats = await service.storage_stats()
+            print(
+                f"storage: {stats['documents']} documents, {megabytes(stats['logical_bytes'])} uploaded, "
+                f"{megabytes(stats['stored_bytes'])} stored, {megabytes(stats['saved_bytes'])} saved "
+                f"({stats['dedup_ratio']:.2f}x)"
+            )
+        return 0
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--grace-hours", type=int, default=settings.DOCUMENT_BLOB_GC_GRACE_HOURS)
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be freed")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.grace_hours, args.dry_run)))
@@ -0,0 +1,37 @@
+"""Shared pytest fixtures"""
+
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.query_profiler import profile_queries
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    Fail if a block executes more SQL statements than allowed.
+
+    Usage:
+        async def test_list(client, assert_max_queries):
+            with assert_max_queries(3):
+                await client.get("/api/v1/purchase-requests")
+    """
+
+    @contextmanager
+    def _assert_max_queries(limit: int):
+        with profile_queries() as profile:
+            yield profile
+        statements = "\n".join(
+            f"  {count}x {shape}" for shape, (count, _) in profile.shapes.items()
+        )
+        assert profile.query_count <= limit, (
+            f"Expected at most {limit} queries, got {profile.query_count}:\n{statements}"
+        )
+
+    return _assert_max_queries
@@ -0,0 +1,157 @@
+"""Tests for the audit-trail query paths over the activity log"""
+
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.api.v1.endpoints import admin
+from app.core.audit_log import audit_entry
+from app.core.audit_retention import archive_and_drop
+from app.core.config import settings
+from app.core.database import get_read_db
+from app.core.deps import require_admin
+from app.core.principals import Principal
+from app.core.roles import UserRole
+from app.core.status import ActivityAction
+from app.models import ActivityLog, User
+from app.services import activity_log_service
+from app.services.activity_log_service import ActivityLogService
+
+BASE_TIME = datetime(2023, 1, 1, 8, 0, 0)
+ADMIN = Principal(id=1, email="admin@dict.gov.ph", role=UserRole.ADMIN, is_active=True)
+ACTIONS = [ActivityAction.CREATE, ActivityAction.UPDATE, ActivityAction.STATUS_CHANGED]
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'audit.db'}")
+    async with engine.begin() as conn:
+        for model in (User, ActivityLog):
+            await conn.run_sync(model.__table__.create)
+        # 300 entries, one every 2 days from January 2023: 10 PRs, 3 users
+        await conn.execute(insert(ActivityLog), [
+            audit_entry(
+                ACTIONS[n % 3],
+                "PurchaseRequest",
+                f"Entry {n}",
+                user_id=n % 3 + 1,
+                entity_id=n % 10,
+                old_values={"status": "PR_UNDER_REVIEW"},
+                new_values={"status": "RFQ_READY", "n": n},
+                created_at=BASE_TIME + timedelta(days=2 * n)
+            )
+            for n in range(300)
+        ])
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def statements(engine):
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    yield captured
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+def _client(engine, archive_dir, monkeypatch) -> httpx.AsyncClient:
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/admin")
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_db():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_read_db] = override_db
+    app.dependency_overrides[require_admin] = lambda: ADMIN
+    monkeypatch.setattr(settings, "AUDIT_LOG_ARCHIVE_DIR", archive_dir)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filters, index", [
+    ({"entity_type": "PurchaseRequest", "entity_id": 4}, "ix_activity_logs_entity_created"),
+    ({"user_id": 2, "created_from": datetime(2023, 3, 1), "created_to": datetime(2023, 4, 1)},
+     "ix_activity_logs_user_created"),
+    ({"action": ActivityAction.UPDATE}, "ix_activity_logs_action_created"),
+])
+async def test_filters_are_index_range_scans(engine, statements, tmp_path, filters, index):
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        page = await ActivityLogService(session, archive_dir=str(tmp_path)).list_activity_logs(
+            limit=5, **filters
+        )
+        second = await ActivityLogService(session, archive_dir=str(tmp_path)).list_activity_logs(
+            limit=5, cursor=page.next_cursor, **filters
+        )
+    assert page.items and second.items
+
+    # The keyset page is read straight off the filter's index, with no sort step
+    assert len(statements) == 2
+    for statement, parameters in statements:
+        assert "old_values" not in statement
+        async with engine.connect() as conn:
+            plan = (await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)).all()
+        details = " ".join(row[-1] for row in plan)
+        assert index in details
+        assert "TEMP B-TREE" not in details
+
+
+@pytest.mark.asyncio
+async def test_changes_are_only_returned_on_request(engine, tmp_path):
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        service = ActivityLogService(session, archive_dir=str(tmp_path))
+        summary = await service.list_activity_logs(limit=2, entity_type="PurchaseRequest", entity_id=9)
+        full = await service.list_activity_logs(
+            limit=2, include_changes=True, entity_type="PurchaseRequest", entity_id=9
+        )
+
+    assert [item.description for item in summary.items] == ["Entry 299", "Entry 289"]
+    assert all(item.old_values is None and item.new_values is None for item in summary.items)
+    assert full.items[0].new_values == {"status": "RFQ_READY", "n": 299}
+
+
+@pytest.mark.asyncio
+async def test_export_streams_live_and_archived_in_order(engine, tmp_path, monkeypatch):
+    archive_dir = str(tmp_path / "archive")
+    for month in range(6):
+        async with engine.begin() as conn:
+            await conn.run_sync(archive_and_drop, datetime(2023, month + 1, 1), archive_dir)
+    # Small chunks so the stream crosses several keyset reads and the archive boundary
+    monkeypatch.setattr(activity_log_service, "STREAM_CHUNK_SIZE", 7)
+
+    async with _client(engine, archive_dir, monkeypatch) as client:
+        export = await client.get("/admin/activity-logs/export", params={"entity_id": 3})
+        page = await client.get("/admin/activity-logs", params={"entity_id": 3, "limit": 25})
+        resumed = await client.get(
+            "/admin/activity-logs/export",
+            params={"entity_id": 3, "cursor": page.json()["next_cursor"], "include_changes": True}
+        )
+
+    assert export.headers["content-type"] == "application/x-ndjson"
+    exported = [json.loads(line) for line in export.text.splitlines()]
+    assert [row["description"] for row in exported] == [f"Entry {n}" for n in range(293, -1, -10)]
+    assert [row["archived"] for row in exported].count(True) == 9
+    assert exported[:25] == page.json()["items"]
+
+    rest = [json.loads(line) for line in resumed.text.splitlines()]
+    assert [row["id"] for row in rest] == [row["id"] for row in exported[25:]]
+    assert all(row["new_values"]["n"] == int(row["description"].split()[1]) for row in rest)
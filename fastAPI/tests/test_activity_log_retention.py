@@ -0,0 +1,224 @@
+"""Tests for activity log retention and archived history queries"""
+
+import gzip
+import json
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.api.v1.endpoints import admin
+from app.core.audit_log import audit_entry
+from app.core import audit_retention
+from app.core.audit_retention import (
+    archive_and_drop,
+    archive_month,
+    expired_months,
+    index_archives,
+    index_path,
+    partition_clauses,
+    read_index,
+)
+from app.core.config import settings
+from app.core.database import get_read_db
+from app.core.deps import require_admin
+from app.core.principals import Principal
+from app.core.roles import UserRole
+from app.core.status import ActivityAction
+from app.models import ActivityLog, User
+from app.services.activity_log_service import ActivityLogService
+
+NOW = datetime(2024, 3, 15, 12, 0, 0)
+ADMIN = Principal(id=1, email="admin@dict.gov.ph", role=UserRole.ADMIN, is_active=True)
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'retention.db'}")
+    async with engine.begin() as conn:
+        for model in (User, ActivityLog):
+            await conn.run_sync(model.__table__.create)
+        # Three entries on the 10th of each month, January 2023 through March 2024
+        await conn.execute(insert(ActivityLog), [
+            audit_entry(
+                ActivityAction.LOGIN if n % 3 else ActivityAction.STATUS_CHANGED,
+                "PurchaseRequest",
+                f"Entry {month}-{n}",
+                entity_id=month,
+                created_at=datetime(2023 + month // 12, month % 12 + 1, 10, 8, n)
+            )
+            for month in range(15)
+            for n in range(3)
+        ])
+    yield engine
+    await engine.dispose()
+
+
+async def _live_count(engine) -> int:
+    async with engine.connect() as conn:
+        return (await conn.execute(select(func.count()).select_from(ActivityLog))).scalar_one()
+
+
+async def _page_through(engine, archive_dir, limit: int, **filters) -> list:
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    entries, cursor = [], None
+    async with factory() as session:
+        service = ActivityLogService(session, archive_dir=archive_dir)
+        while True:
+            page = await service.list_activity_logs(limit=limit, cursor=cursor, **filters)
+            entries.extend(page.items)
+            if not page.has_more:
+                return entries
+            cursor = page.next_cursor
+
+
+def test_partition_clauses_span_year_end():
+    assert partition_clauses(datetime(2024, 11, 1), datetime(2025, 1, 1)) == [
+        "PARTITION p202411 VALUES LESS THAN (TO_DAYS('2024-12-01'))",
+        "PARTITION p202412 VALUES LESS THAN (TO_DAYS('2025-01-01'))",
+        "PARTITION p202501 VALUES LESS THAN (TO_DAYS('2025-02-01'))",
+        "PARTITION pfuture VALUES LESS THAN MAXVALUE",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_expired_months_are_archived_then_dropped(engine, tmp_path):
+    archive_dir = str(tmp_path / "archive")
+    async with engine.connect() as conn:
+        months = await conn.run_sync(expired_months, NOW, 365)
+    # Cutoff is 2023-03-16, so only January and February have fully expired
+    assert months == [datetime(2023, 1, 1), datetime(2023, 2, 1)]
+
+    for month in months:
+        async with engine.begin() as conn:
+            path, count = await conn.run_sync(archive_and_drop, month, archive_dir)
+        assert count == 3
+
+    assert await _live_count(engine) == 39
+    with gzip.open(Path(archive_dir) / "activity_logs_2023_02.jsonl.gz", "rt") as archive:
+        rows = [json.loads(line) for line in archive]
+    assert [row["description"] for row in rows] == ["Entry 1-2", "Entry 1-1", "Entry 1-0"]
+    assert (rows[0]["action"], rows[0]["created_at"]) == ("LOGIN", "2023-02-10T08:02:00")
+
+    async with engine.connect() as conn:
+        assert await conn.run_sync(expired_months, NOW, 365) == []
+
+
+@pytest.mark.asyncio
+async def test_history_pages_across_live_and_archived(engine, tmp_path):
+    archive_dir = str(tmp_path / "archive")
+    everything = await _page_through(engine, archive_dir, limit=100)
+
+    for month in (datetime(2023, 1, 1), datetime(2023, 2, 1), datetime(2023, 3, 1)):
+        async with engine.begin() as conn:
+            await conn.run_sync(archive_and_drop, month, archive_dir)
+
+    paged = await _page_through(engine, archive_dir, limit=4)
+    assert [(entry.id, entry.created_at) for entry in paged] == [
+        (entry.id, entry.created_at) for entry in everything
+    ]
+    assert [entry.archived for entry in paged].count(True) == 9
+
+    # Filters apply to archived rows too
+    february = await _page_through(
+        engine, archive_dir, limit=2, action=ActivityAction.LOGIN,
+        created_from=datetime(2023, 2, 1), created_to=datetime(2023, 4, 1)
+    )
+    assert [entry.description for entry in february] == ["Entry 2-2", "Entry 2-1", "Entry 1-2", "Entry 1-1"]
+
+
+@pytest.mark.asyncio
+async def test_interrupted_run_does_not_duplicate_or_overwrite(engine, tmp_path, monkeypatch):
+    archive_dir = str(tmp_path / "archive")
+    # Archived but never dropped, then archived again by the next run
+    async with engine.begin() as conn:
+        await conn.run_sync(archive_month, datetime(2023, 1, 1), archive_dir)
+        await conn.run_sync(archive_and_drop, datetime(2023, 1, 1), archive_dir)
+    assert sorted(p.name for p in Path(archive_dir).iterdir()) == [
+        "activity_logs_2023_01.1.index.json", "activity_logs_2023_01.1.jsonl.gz",
+        "activity_logs_2023_01.index.json", "activity_logs_2023_01.jsonl.gz",
+    ]
+
+    app = FastAPI()
+    app.include_router(admin.router, prefix="/admin")
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_db():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_read_db] = override_db
+    app.dependency_overrides[require_admin] = lambda: ADMIN
+    monkeypatch.setattr(settings, "AUDIT_LOG_ARCHIVE_DIR", archive_dir)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/admin/activity-logs", params={"entity_id": 0, "limit": 10})
+
+    body = response.json()
+    assert [item["description"] for item in body["items"]] == ["Entry 0-2", "Entry 0-1", "Entry 0-0"]
+    assert all(item["archived"] for item in body["items"])
+
+
+@pytest.mark.asyncio
+async def test_history_queries_open_only_archives_that_can_match(engine, tmp_path, monkeypatch):
+    archive_dir = str(tmp_path / "archive")
+    for month in range(6):
+        async with engine.begin() as conn:
+            await conn.run_sync(archive_and_drop, datetime(2023, month + 1, 1), archive_dir)
+
+    opened = []
+    on_event_loop = []
+    read_archive = audit_retention._read_archive
+
+    def tracking_read_archive(path):
+        opened.append(Path(path).name[len("activity_logs_"):-len(".jsonl.gz")])
+        on_event_loop.append(threading.current_thread() is threading.main_thread())
+        return read_archive(path)
+
+    monkeypatch.setattr(audit_retention, "_read_archive", tracking_read_archive)
+
+    # Entity 2 only appears in March 2023
+    entries = await _page_through(engine, archive_dir, limit=2, entity_id=2)
+    assert [entry.description for entry in entries] == ["Entry 2-2", "Entry 2-1", "Entry 2-0"]
+    assert set(opened) == {"2023_03"}
+
+    # A window ending in February skips the later months
+    opened.clear()
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        service = ActivityLogService(session, archive_dir=archive_dir)
+        first = await service.list_activity_logs(limit=2, created_to=datetime(2023, 3, 1))
+        assert opened == ["2023_02"]
+
+        # Resuming from a February cursor without the window skips them too,
+        # and January is only opened once February runs out
+        opened.clear()
+        second = await service.list_activity_logs(limit=2, cursor=first.next_cursor)
+    assert [entry.description for entry in first.items + second.items] == [
+        "Entry 1-2", "Entry 1-1", "Entry 1-0", "Entry 0-2"
+    ]
+    assert opened == ["2023_02", "2023_01"]
+    # Files are read in the executor, never on the event loop
+    assert on_event_loop and not any(on_event_loop)
+
+    # Indexes are parsed once, until the index file changes
+    february = str(Path(archive_dir) / "activity_logs_2023_02.jsonl.gz")
+    index = read_index(february)
+    assert read_index(february) is index
+
+    # Archives written before indexes existed are indexed on the next run
+    Path(index_path(february)).unlink()
+    assert read_index(february) is None
+    assert index_archives(archive_dir) == [february]
+    assert index_archives(archive_dir) == []
+    assert read_index(february) is not index
+    assert read_index(february) == index
@@ -0,0 +1,226 @@
+"""Tests for the batched activity log writer"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.audit_log import AuditLogWriter, audit_entry, record_in_transaction
+from app.core.status import ActivityAction
+from app.models import ActivityLog, User
+
+BASE_TIME = datetime(2024, 1, 1, 8, 0, 0)
+
+
+def entry(n: int, **overrides) -> dict:
+    fields = {"entity_id": n, "created_at": BASE_TIME, **overrides}
+    return audit_entry(ActivityAction.LOGIN, "User", fields.pop("description", f"User {n} logged in"), **fields)
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'audit.db'}")
+    async with engine.begin() as conn:
+        for model in (User, ActivityLog):
+            await conn.run_sync(model.__table__.create)
+    yield engine
+    await engine.dispose()
+
+
+async def _logged(engine) -> list:
+    async with engine.connect() as conn:
+        rows = await conn.execute(select(ActivityLog.entity_id).order_by(ActivityLog.entity_id))
+        return list(rows.scalars())
+
+
+def _gate_flusher(writer: AuditLogWriter, gate: asyncio.Event) -> None:
+    """Hold the background flusher's inserts until gate is set."""
+    insert = writer._insert
+
+    async def gated_insert(entries):
+        if asyncio.current_task() is writer._task:
+            await gate.wait()
+        await insert(entries)
+
+    writer._insert = gated_insert
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_batch_size_and_interval(engine):
+    writer = AuditLogWriter(engine, batch_size=5, flush_interval_seconds=0.5)
+    await writer.start()
+
+    for n in range(12):
+        await writer.record(entry(n))
+    await asyncio.sleep(0.1)
+    # Two full batches went out at once; the last two wait for the interval
+    assert (writer.written, writer.batches) == (10, 2)
+
+    await asyncio.sleep(0.6)
+    assert (writer.written, writer.batches) == (12, 3)
+    await writer.stop()
+
+    assert await _logged(engine) == list(range(12))
+    assert writer.get_stats()["direct_writes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_waits_then_writes_inline(engine):
+    writer = AuditLogWriter(engine, max_queue=2, batch_size=1, flush_interval_seconds=0.01,
+                            enqueue_timeout_seconds=0.05)
+    gate = asyncio.Event()
+    _gate_flusher(writer, gate)
+    await writer.start()
+
+    # One entry held by the stalled flusher, two filling the queue
+    for n in range(3):
+        await writer.record(entry(n))
+        await asyncio.sleep(0.02)
+    assert writer.get_stats()["queued"] == 2
+
+    await writer.record(entry(3))
+    assert (writer.backpressure_waits, writer.direct_writes) == (1, 1)
+    assert await _logged(engine) == [3]
+
+    gate.set()
+    await writer.stop()
+    assert await _logged(engine) == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_unwritten_entries_are_spooled_and_replayed(engine, tmp_path):
+    spool_path = str(tmp_path / "spool" / "audit.jsonl")
+    writer = AuditLogWriter(engine, batch_size=10, flush_interval_seconds=0.01,
+                            spool_path=spool_path, shutdown_timeout_seconds=0.2)
+
+    async def database_down(entries):
+        raise ConnectionError("database unavailable")
+
+    writer._insert = database_down
+    await writer.start()
+    for n in range(3):
+        await writer.record(entry(n, old_values={"ip": "10.0.0.1"}))
+    await writer.stop()
+
+    with open(spool_path, encoding="utf-8") as spool:
+        spooled = [json.loads(line) for line in spool]
+    assert [row["entity_id"] for row in spooled] == [0, 1, 2]
+    assert writer.spooled == 3
+
+    # The next startup writes the spooled entries and removes the file
+    replayer = AuditLogWriter(engine, spool_path=spool_path)
+    await replayer.start()
+    await replayer.stop()
+    assert replayer.replayed == 3
+    assert not Path(spool_path).exists()
+
+    async with engine.connect() as conn:
+        rows = (await conn.execute(select(ActivityLog).order_by(ActivityLog.entity_id))).all()
+    assert [(row.action, row.old_values, row.created_at.replace(tzinfo=None)) for row in rows] == [
+        (ActivityAction.LOGIN, {"ip": "10.0.0.1"}, BASE_TIME)
+    ] * 3
+
+
+@pytest.mark.asyncio
+async def test_rejected_row_does_not_block_batch(engine, tmp_path):
+    spool_path = str(tmp_path / "audit.jsonl")
+    writer = AuditLogWriter(engine, batch_size=3, flush_interval_seconds=1.0, spool_path=spool_path)
+    await writer.start()
+
+    await writer.record(entry(0))
+    await writer.record(entry(1, description=None))
+    await writer.record(entry(2))
+    await writer.stop()
+
+    assert await _logged(engine) == [0, 2]
+    assert writer.rejected == 1
+    # Dead-lettered, not spooled: replaying it would only fail again
+    assert not Path(spool_path).exists()
+    with open(spool_path + ".rejected", encoding="utf-8") as rejected:
+        assert [json.loads(line)["entity_id"] for line in rejected] == [1]
+
+
+@pytest.mark.asyncio
+async def test_rejected_spooled_row_is_not_replayed_again(engine, tmp_path):
+    spool_path = str(tmp_path / "audit.jsonl")
+    writer = AuditLogWriter(engine, spool_path=spool_path)
+
+    async def database_down(entries):
+        raise ConnectionError("database unavailable")
+
+    writer._insert = database_down
+    await writer.record(entry(0))
+    await writer.record(entry(1, description=None))
+    await writer.record(entry(2))
+    assert writer.spooled == 3
+
+    # First restart writes the good rows and dead-letters the bad one
+    first = AuditLogWriter(engine, batch_size=10, spool_path=spool_path)
+    await first.start()
+    await first.stop()
+    assert (first.replayed, first.rejected, first.spooled) == (2, 1, 0)
+    assert not Path(spool_path).exists()
+
+    # Second restart has nothing left to replay
+    second = AuditLogWriter(engine, batch_size=10, spool_path=spool_path)
+    await second.start()
+    await second.stop()
+    assert (second.replayed, second.rejected) == (0, 0)
+
+    assert await _logged(engine) == [0, 2]
+    with open(spool_path + ".rejected", encoding="utf-8") as rejected:
+        assert [json.loads(line)["entity_id"] for line in rejected] == [1]
+
+
+@pytest.mark.asyncio
+async def test_replay_cut_short_is_replayed_on_next_start(engine, tmp_path):
+    spool_path = str(tmp_path / "audit.jsonl")
+    writer = AuditLogWriter(engine, spool_path=spool_path)
+
+    async def database_down(entries):
+        raise ConnectionError("database unavailable")
+
+    writer._insert = database_down
+    for n in range(3):
+        await writer.record(entry(n))
+
+    # A worker claimed the spool, then was killed before it finished
+    dead_worker = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead_worker.wait()
+    os.rename(spool_path, f"{spool_path}.{dead_worker.pid}.replay")
+    # A worker still replaying its claim is left alone
+    live_claim = Path(f"{spool_path}.{os.getppid()}.replay")
+    live_claim.write_text("", encoding="utf-8")
+
+    replayer = AuditLogWriter(engine, spool_path=spool_path)
+    await replayer.start()
+    await replayer.stop()
+    assert (replayer.recovered, replayer.replayed) == (3, 3)
+    assert await _logged(engine) == [0, 1, 2]
+    assert sorted(path.name for path in tmp_path.iterdir() if path.name.startswith("audit.jsonl")) == [
+        live_claim.name
+    ]
+
+
+@pytest.mark.asyncio
+async def test_transactional_entries_roll_back_with_caller(engine):
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        await record_in_transaction(session, [entry(1), entry(2)])
+        await session.rollback()
+        await record_in_transaction(session, [entry(3)])
+        await session.commit()
+
+    async with engine.connect() as conn:
+        assert (await conn.execute(select(func.count()).select_from(ActivityLog))).scalar_one() == 1
@@ -0,0 +1,87 @@
+"""Tests for write tracking, read-only sessions and checkout wait recording"""
+
+import sys
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import ReadOnlySession, TimedAsyncQueuePool, WriteTrackingSession
+from app.core.db_stats import DBRequestStats, _request_stats
+from app.core.roles import UserRole
+from app.models.user import User
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'test.db'}",
+        poolclass=TimedAsyncQueuePool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+    yield engine
+    await engine.dispose()
+
+
+def _user() -> User:
+    return User(
+        name="Test User",
+        email="user@dict.gov.ph",
+        password_hash="not-a-real-hash",
+        role=UserRole.END_USER,
+        is_active=True,
+    )
+
+
+@pytest.mark.asyncio
+async def test_write_tracking(engine):
+    factory = async_sessionmaker(engine, class_=AsyncSession, sync_session_class=WriteTrackingSession)
+
+    async with factory() as session:
+        await session.execute(select(User))
+        assert not session.sync_session.has_writes
+
+        session.add(_user())
+        assert session.sync_session.has_writes
+        await session.commit()
+        assert not session.sync_session.has_writes
+
+        await session.execute(update(User).values(department="ITS"))
+        assert session.sync_session.has_writes
+
+
+@pytest.mark.asyncio
+async def test_read_only_session_refuses_writes(engine):
+    factory = async_sessionmaker(
+        engine.execution_options(isolation_level="AUTOCOMMIT"),
+        class_=AsyncSession,
+        sync_session_class=ReadOnlySession,
+    )
+
+    async with factory() as session:
+        assert (await session.execute(select(User))).all() == []
+        session.add(_user())
+        with pytest.raises(RuntimeError):
+            await session.flush()
+
+
+@pytest.mark.asyncio
+async def test_checkout_wait_is_recorded_per_request(engine):
+    factory = async_sessionmaker(engine, class_=AsyncSession, sync_session_class=WriteTrackingSession)
+    stats = DBRequestStats()
+    token = _request_stats.set(stats)
+    try:
+        async with factory() as session:
+            # No statement executed yet: no connection checked out
+            assert stats.checkouts == 0
+            await session.execute(select(User))
+        assert stats.checkouts == 1
+        assert stats.checkout_wait_seconds >= 0
+    finally:
+        _request_stats.reset(token)
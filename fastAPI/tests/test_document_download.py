@@ -0,0 +1,196 @@
+"""Tests for ranged, conditional document downloads"""
+
+import hashlib
+import os
+import sys
+from email.utils import formatdate
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.api.v1.endpoints import documents, quotation_images
+from app.core.blob_store import blob_path
+from app.core.config import settings
+from app.core.database import get_read_db
+from app.core.deps import get_current_active_user
+from app.core.downloads import RangedFileResponse
+from app.core.principals import Principal
+from app.core.query_profiler import instrument_profiler
+from app.core.roles import UserRole
+from app.core.status import DocumentCategory, PurchaseRequestStatus
+from app.models import Document, PurchaseRequest, QuotationImage, User
+
+ABSTRACT = b"%PDF-1.7\n" + bytes(range(256)) * 40
+CHECKSUM = hashlib.sha256(ABSTRACT).hexdigest()
+IMAGE = b"\x89PNG\r\n\x1a\n" + b"\x07" * 500
+
+STAFF = Principal(id=1, email="officer@dict.gov.ph", role=UserRole.PROCUREMENT_OFFICER, is_active=True)
+REQUESTER = Principal(id=2, email="requester@dict.gov.ph", role=UserRole.END_USER, is_active=True)
+OTHER = Principal(id=3, email="other@dict.gov.ph", role=UserRole.END_USER, is_active=True)
+CANVASSER = Principal(id=4, email="canvasser@dict.gov.ph", role=UserRole.CANVASSER, is_active=True)
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path, monkeypatch):
+    upload_dir = tmp_path / "uploads"
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(upload_dir))
+    # Several read blocks per download
+    monkeypatch.setattr(settings, "DOWNLOAD_CHUNK_SIZE_KB", 1)
+    for path, content in ((blob_path(CHECKSUM), ABSTRACT), ("quotations/1.png", IMAGE)):
+        (upload_dir / path).parent.mkdir(parents=True, exist_ok=True)
+        (upload_dir / path).write_bytes(content)
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'downloads.db'}")
+    instrument_profiler(engine)
+    async with engine.begin() as conn:
+        for model in (User, PurchaseRequest, Document, QuotationImage):
+            await conn.run_sync(model.__table__.create)
+        await conn.execute(insert(User), [
+            {"id": p.id, "name": p.email, "email": p.email, "password_hash": "x", "role": p.role, "is_active": True}
+            for p in (STAFF, REQUESTER, OTHER, CANVASSER)
+        ])
+        await conn.execute(insert(PurchaseRequest), [{
+            "id": 10, "pr_number": "PR-2024-0001", "project_title": "Laptops", "project_description": "d",
+            "purpose": "p", "end_user_id": REQUESTER.id, "end_user_department": "ICT", "fund_source": "GAA",
+            "estimated_budget": 1000, "status": PurchaseRequestStatus.PR_UNDER_REVIEW,
+        }])
+        # The abstract is attached to the requester's PR (uploaded by staff)
+        await conn.execute(insert(Document), [{
+            "id": 1, "document_type": DocumentCategory.PR_DOCUMENT, "reference_id": 10,
+            "file_path": blob_path(CHECKSUM), "file_name": CHECKSUM, "original_filename": "Abstract of Quotations.pdf",
+            "file_size": len(ABSTRACT), "mime_type": "application/pdf", "checksum": CHECKSUM, "uploaded_by": STAFF.id,
+        }])
+        await conn.execute(insert(QuotationImage), [{
+            "id": 1, "supplier_quotation_id": 1, "image_path": "quotations/1.png", "original_filename": "quote.png",
+            "mime_type": "image/png", "file_size": len(IMAGE), "uploaded_by": CANVASSER.id,
+        }])
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def client(session_factory):
+    app = FastAPI()
+    app.include_router(documents.router, prefix="/documents")
+    app.include_router(quotation_images.router, prefix="/quotation-images")
+
+    async def override_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_read_db] = override_db
+    app.dependency_overrides[get_current_active_user] = lambda: client.user
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        client.user = STAFF
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_download_is_cacheable_and_revalidated_without_a_body(client, assert_max_queries):
+    with assert_max_queries(1):
+        response = await client.get("/documents/1/download")
+
+    assert response.status_code == 200
+    assert response.content == ABSTRACT
+    assert response.headers["etag"] == f'"{CHECKSUM}"'
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["cache-control"] == "private, max-age=31536000, immutable"
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["content-disposition"].startswith("inline; filename")
+
+    by_etag = await client.get("/documents/1/download", headers={"If-None-Match": f'W/"x", "{CHECKSUM}"'})
+    by_date = await client.get("/documents/1/download", headers={"If-Modified-Since": response.headers["last-modified"]})
+    changed = await client.get("/documents/1/download", headers={"If-None-Match": '"something-else"'})
+    head = await client.head("/documents/1/download")
+
+    assert (by_etag.status_code, by_etag.content) == (304, b"")
+    assert by_etag.headers["etag"] == f'"{CHECKSUM}"'
+    assert (by_date.status_code, by_date.content) == (304, b"")
+    assert changed.status_code == 200
+    assert (head.status_code, head.content, head.headers["content-length"]) == (200, b"", str(len(ABSTRACT)))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("header,first,last", [
+    ("bytes=100-199", 100, 199),
+    ("bytes=10000-", 10000, len(ABSTRACT) - 1),
+    ("bytes=-16", len(ABSTRACT) - 16, len(ABSTRACT) - 1),
+    ("bytes=0-999999", 0, len(ABSTRACT) - 1),
+])
+async def test_range_requests(client, header, first, last):
+    response = await client.get("/documents/1/download", headers={"Range": header})
+
+    assert response.status_code == 206
+    assert response.content == ABSTRACT[first:last + 1]
+    assert response.headers["content-range"] == f"bytes {first}-{last}/{len(ABSTRACT)}"
+    assert response.headers["content-length"] == str(last - first + 1)
+
+
+@pytest.mark.asyncio
+async def test_unusable_ranges(client):
+    beyond = await client.get("/documents/1/download", headers={"Range": f"bytes={len(ABSTRACT)}-"})
+    several = await client.get("/documents/1/download", headers={"Range": "bytes=0-1,5-6"})
+    stale = await client.get("/documents/1/download", headers={"Range": "bytes=0-9", "If-Range": '"old"'})
+    fresh = await client.get("/documents/1/download", headers={"Range": "bytes=0-9", "If-Range": f'"{CHECKSUM}"'})
+
+    assert beyond.status_code == 416
+    assert beyond.headers["content-range"] == f"bytes */{len(ABSTRACT)}"
+    # Served whole rather than as multipart/byteranges
+    assert (several.status_code, several.content) == (200, ABSTRACT)
+    assert (stale.status_code, stale.content) == (200, ABSTRACT)
+    assert (fresh.status_code, fresh.content) == (206, ABSTRACT[:10])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("user,document_status,image_status", [
+    (STAFF, 200, 200),
+    (REQUESTER, 200, 404),  # owns the PR the abstract is attached to
+    (OTHER, 404, 404),
+    (CANVASSER, 404, 200),  # uploaded the quotation image
+])
+async def test_download_authorization_is_one_query(client, assert_max_queries, user, document_status, image_status):
+    client.user = user
+    with assert_max_queries(2):
+        document = await client.get("/documents/1/download")
+        image = await client.get("/quotation-images/1/download")
+
+    assert (document.status_code, image.status_code) == (document_status, image_status)
+    if image_status == 200:
+        # No stored checksum: weak tag, revalidated on every use
+        assert image.content == IMAGE
+        assert image.headers["etag"].startswith('W/"')
+        assert image.headers["cache-control"] == "private, no-cache"
+
+
+@pytest.mark.asyncio
+async def test_zero_copy_send_when_the_server_supports_it(tmp_path):
+    path = tmp_path / "abstract.pdf"
+    path.write_bytes(ABSTRACT)
+    response = RangedFileResponse(
+        str(path), stat_result=os.stat(path), etag=f'"{CHECKSUM}"',
+        cache_control="private, no-cache", byte_range=(100, 199), media_type="application/pdf"
+    )
+    messages = []
+
+    async def send(message):
+        if message["type"] == "http.response.zerocopysend":
+            message = {**message, "data": os.pread(message["file"].fileno(), message["count"], message["offset"])}
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "extensions": {"http.response.zerocopysend": {}}}
+    await response(scope, None, send)
+
+    assert messages[0]["status"] == 206
+    assert [m["type"] for m in messages] == ["http.response.start", "http.response.zerocopysend"]
+    assert (messages[1]["offset"], messages[1]["count"]) == (100, 100)
+    assert messages[1]["data"] == ABSTRACT[100:200]
+    assert formatdate(os.stat(path).st_mtime, usegmt=True).encode() in dict(messages[0]["headers"]).values()
@@ -0,0 +1,177 @@
+"""Tests for deduplicated document storage"""
+
+import asyncio
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.blob_store import BlobStore, STAGING_DIR, blob_path
+from app.core.roles import UserRole
+from app.core.status import DocumentCategory
+from app.core.uploads import StoredFile
+from app.models import Document, DocumentBlob, User
+from app.services.document_service import DocumentService
+
+CERTIFICATE = b"%PDF-1.7\nPhilGEPS certificate" + b"\x00" * 4000
+BROCHURE = b"%PDF-1.7\nSupplier brochure" + b"\x01" * 6000
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'storage.db'}")
+    async with engine.begin() as conn:
+        for model in (User, Document, DocumentBlob):
+            await conn.run_sync(model.__table__.create)
+        await conn.execute(insert(User), [
+            {"id": 1, "name": "User 1", "email": "user1@dict.gov.ph", "password_hash": "x",
+             "role": UserRole.END_USER, "is_active": True}
+        ])
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(str(tmp_path / "uploads"))
+
+
+def stage(store: BlobStore, content: bytes, name: str) -> StoredFile:
+    """Write content as receive_upload leaves it: a complete staging file."""
+    path = f"{STAGING_DIR}/{name}.upload"
+    os.makedirs(os.path.join(store.upload_dir, STAGING_DIR), exist_ok=True)
+    with open(os.path.join(store.upload_dir, path), "wb") as f:
+        f.write(content)
+    return StoredFile(
+        file_path=path,
+        original_filename=f"{name}.pdf",
+        file_size=len(content),
+        mime_type="application/pdf",
+        checksum=hashlib.sha256(content).hexdigest(),
+    )
+
+
+def files(store: BlobStore):
+    root = Path(store.upload_dir)
+    return sorted(p.relative_to(root).as_posix() for p in root.rglob("*") if p.is_file())
+
+
+async def upload(session_factory, store, content: bytes, name: str, reference_id: int) -> Document:
+    async with session_factory() as session:
+        return await DocumentService(session, blob_store=store).create_document(
+            stage(store, content, name), DocumentCategory.PR_DOCUMENT, uploaded_by=1, reference_id=reference_id
+        )
+
+
+async def blobs(session_factory):
+    async with session_factory() as session:
+        rows = (await session.execute(select(DocumentBlob.checksum, DocumentBlob.ref_count))).all()
+    return dict(rows)
+
+
+@pytest.mark.asyncio
+async def test_duplicate_uploads_share_one_blob(session_factory, store):
+    certificate = hashlib.sha256(CERTIFICATE).hexdigest()
+    brochure = hashlib.sha256(BROCHURE).hexdigest()
+
+    first = await upload(session_factory, store, CERTIFICATE, "cert-pr-1", 1)
+    blob_file = Path(store.upload_dir) / first.file_path
+    written = blob_file.stat()
+    second = await upload(session_factory, store, CERTIFICATE, "cert-pr-2", 2)
+    await upload(session_factory, store, BROCHURE, "brochure", 2)
+
+    assert first.file_path == second.file_path == blob_path(certificate)
+    assert first.file_path == f"blobs/{certificate[:2]}/{certificate[2:4]}/{certificate}"
+    # The duplicate's staging file was dropped, not written over the blob
+    assert blob_file.stat().st_ino == written.st_ino
+    assert blob_file.stat().st_mtime_ns == written.st_mtime_ns
+    assert files(store) == sorted([blob_path(certificate), blob_path(brochure)])
+    assert await blobs(session_factory) == {certificate: 2, brochure: 1}
+
+    async with session_factory() as session:
+        stats = await DocumentService(session, blob_store=store).storage_stats()
+    assert stats["documents"] == 3
+    assert stats["logical_bytes"] == 2 * len(CERTIFICATE) + len(BROCHURE)
+    assert stats["stored_bytes"] == len(CERTIFICATE) + len(BROCHURE)
+    assert stats["saved_bytes"] == len(CERTIFICATE)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_uploads_count_every_reference(session_factory, store):
+    checksum = hashlib.sha256(CERTIFICATE).hexdigest()
+
+    await asyncio.gather(*(
+        upload(session_factory, store, CERTIFICATE, f"cert-{n}", n) for n in range(5)
+    ))
+
+    assert await blobs(session_factory) == {checksum: 5}
+    assert files(store) == [blob_path(checksum)]
+
+
+@pytest.mark.asyncio
+async def test_garbage_collection_frees_only_unreferenced_storage(session_factory, store):
+    certificate = hashlib.sha256(CERTIFICATE).hexdigest()
+    brochure = hashlib.sha256(BROCHURE).hexdigest()
+    kept = await upload(session_factory, store, CERTIFICATE, "cert-1", 1)
+    dropped = await upload(session_factory, store, CERTIFICATE, "cert-2", 2)
+    only = await upload(session_factory, store, BROCHURE, "brochure", 3)
+    # Left behind by an interrupted upload and a rolled-back insert
+    abandoned = stage(store, b"%PDF-1.7\nabandoned", "abandoned")
+    orphan = os.path.join(store.upload_dir, blob_path("ab" * 32))
+    os.makedirs(os.path.dirname(orphan))
+    Path(orphan).write_bytes(b"%PDF-1.7\norphan")
+
+    async with session_factory() as session:
+        service = DocumentService(session, blob_store=store)
+        for document in (dropped, only):
+            await service.delete_document(await session.get(Document, document.id))
+    assert await blobs(session_factory) == {certificate: 1, brochure: 0}
+
+    async with session_factory() as session:
+        service = DocumentService(session, blob_store=store)
+        # Everything is still inside the grace period
+        assert await service.collect_garbage(3600) == {
+            "blobs": 0, "blob_bytes": 0, "orphan_files": 0, "orphan_bytes": 0
+        }
+        expected = {"blobs": 1, "blob_bytes": len(BROCHURE), "orphan_files": 2, "orphan_bytes": 33}
+        assert await service.collect_garbage(0, dry_run=True) == expected
+        assert len(files(store)) == 4
+        assert await service.collect_garbage(0) == expected
+
+    assert files(store) == [kept.file_path]
+    assert await blobs(session_factory) == {certificate: 1}
+    assert not os.path.exists(os.path.join(store.upload_dir, abandoned.file_path))
+
+
+@pytest.mark.asyncio
+async def test_document_stored_before_blobs_keeps_its_own_file(session_factory, store):
+    legacy_path = os.path.join(store.upload_dir, "documents", "2024", "01", "legacy.pdf")
+    os.makedirs(os.path.dirname(legacy_path))
+    Path(legacy_path).write_bytes(CERTIFICATE)
+    async with session_factory() as session:
+        legacy = Document(
+            document_type=DocumentCategory.PR_DOCUMENT, file_path="documents/2024/01/legacy.pdf",
+            file_name="legacy.pdf", original_filename="certificate.pdf", file_size=len(CERTIFICATE),
+            mime_type="application/pdf", checksum=hashlib.sha256(CERTIFICATE).hexdigest(), uploaded_by=1
+        )
+        session.add(legacy)
+        await session.commit()
+    await upload(session_factory, store, CERTIFICATE, "cert", 1)
+
+    async with session_factory() as session:
+        service = DocumentService(session, blob_store=store)
+        stats = await service.storage_stats()
+        assert (stats["unshared_files"], stats["saved_bytes"]) == (1, 0)
+
+        await service.delete_document(await session.get(Document, legacy.id))
+
+    assert not os.path.exists(legacy_path)
+    assert await blobs(session_factory) == {hashlib.sha256(CERTIFICATE).hexdigest(): 1}
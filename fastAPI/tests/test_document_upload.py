@@ -0,0 +1,177 @@
+"""Tests for streaming document uploads"""
+
+import hashlib
+import sys
+import tracemalloc
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.api.v1.endpoints import documents
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.deps import get_current_active_user
+from app.core.principals import Principal
+from app.core.roles import UserRole
+from app.core.status import DocumentCategory
+from app.models import Document, DocumentBlob, User
+
+BOUNDARY = "testboundary"
+CHUNK = 64 * 1024
+USER = Principal(id=1, email="user1@dict.gov.ph", role=UserRole.END_USER, is_active=True)
+PDF = b"%PDF-1.7\n"
+PNG = b"\x89PNG\r\n\x1a\n"
+# Binary data with a CRLF every 244 bytes, which the parser splits around
+FILLER = (bytes(range(14, 256)) + b"\r\n") * (CHUNK // 244 + 2)
+
+
+class Body:
+    """Multipart body sent in CHUNK-sized pieces, counting pieces sent."""
+
+    def __init__(self, filename: str, head: bytes, size: int):
+        self.filename = filename
+        self.head = head
+        self.size = size
+        self.chunks_sent = 0
+        self.sha256 = hashlib.sha256()
+
+    async def __aiter__(self):
+        yield (
+            f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"note\"\r\n\r\nignored\r\n"
+            f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{self.filename}\"\r\n"
+            f"Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+        sent = 0
+        while sent < self.size:
+            block = (self.head if sent == 0 else b"") + FILLER[self.chunks_sent % 256:][:CHUNK]
+            block = block[:self.size - sent]
+            self.sha256.update(block)
+            sent += len(block)
+            self.chunks_sent += 1
+            yield block
+        yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def upload_files(upload_dir: Path):
+    return sorted(p.relative_to(upload_dir).as_posix() for p in upload_dir.rglob("*") if p.is_file())
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'documents.db'}")
+    async with engine.begin() as conn:
+        for model in (User, Document, DocumentBlob):
+            await conn.run_sync(model.__table__.create)
+        await conn.execute(insert(User), [
+            {"id": 1, "name": "User 1", "email": "user1@dict.gov.ph", "password_hash": "x",
+             "role": UserRole.END_USER, "is_active": True}
+        ])
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def client(session_factory, tmp_path, monkeypatch):
+    upload_dir = tmp_path / "uploads"
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(upload_dir))
+    monkeypatch.setattr(settings, "MAX_FILE_SIZE_MB", 1)
+
+    app = FastAPI()
+    app.include_router(documents.router, prefix="/documents")
+
+    async def override_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_current_active_user] = lambda: USER
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        client.upload_dir = upload_dir
+        yield client
+
+
+async def post(client, body: Body, **headers):
+    return await client.post(
+        "/documents",
+        params={"document_type": DocumentCategory.PR_DOCUMENT.value, "reference_id": 7},
+        content=body,
+        headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}", **headers},
+    )
+
+
+@pytest.mark.asyncio
+async def test_upload_is_streamed_to_disk_with_checksum(client, session_factory):
+    # Warm up first: SQLAlchemy's first insert builds its caches
+    assert (await post(client, Body("warmup.pdf", PDF, 100))).status_code == 201
+    body = Body("C:\\scans\\Quarterly Report.PDF", PDF, 1024 * 1024 - 100)
+
+    tracemalloc.start()
+    response = await post(client, body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert response.status_code == 201, response.text
+    data = response.json()
+    assert data["original_filename"] == "Quarterly Report.PDF"
+    assert data["mime_type"] == "application/pdf"
+    assert data["file_size"] == body.size
+    assert data["checksum"] == body.sha256.hexdigest()
+    assert data["uploaded_by"] == 1
+
+    # Stored under its checksum; nothing is left in staging
+    stored = client.upload_dir / data["file_path"]
+    assert data["file_path"] == f"blobs/{data['checksum'][:2]}/{data['checksum'][2:4]}/{data['checksum']}"
+    assert not any(name.startswith("blobs/staging/") for name in upload_files(client.upload_dir))
+    assert hashlib.sha256(stored.read_bytes()).hexdigest() == data["checksum"]
+
+    # A few blocks in flight, not the whole 1 MB body
+    assert peak < 512 * 1024
+
+    async with session_factory() as session:
+        document = await session.get(Document, data["id"])
+    assert (document.checksum, document.reference_id) == (data["checksum"], 7)
+
+
+@pytest.mark.asyncio
+async def test_oversize_upload_is_aborted_early(client, session_factory):
+    body = Body("report.pdf", PDF, 50 * 1024 * 1024)
+
+    response = await post(client, body)
+
+    assert response.status_code == 413
+    # Stopped just past the 1 MB limit, not after reading all 50 MB
+    assert body.chunks_sent <= 1024 * 1024 // CHUNK + 2
+    assert upload_files(client.upload_dir) == []
+    async with session_factory() as session:
+        assert (await session.execute(select(Document))).first() is None
+
+
+@pytest.mark.asyncio
+async def test_declared_oversize_body_is_rejected_unread(client):
+    body = Body("report.pdf", PDF, 1024)
+
+    response = await post(client, body, **{"Content-Length": str(50 * 1024 * 1024)})
+
+    assert response.status_code == 413
+    assert body.chunks_sent == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filename,head", [
+    ("report.pdf", PNG),  # content does not match the extension
+    ("setup.exe", b"MZ\x90\x00"),  # extension not allowed
+])
+async def test_unsupported_content_is_rejected(client, filename, head):
+    response = await post(client, Body(filename, head, 300 * 1024))
+
+    assert response.status_code == 415
+    assert upload_files(client.upload_dir) == []
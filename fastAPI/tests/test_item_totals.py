@@ -0,0 +1,207 @@
+"""Tests for the stored item aggregates on purchase requests and quotations"""
+
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import Base
+from app.core.item_totals import check_totals, refresh_totals
+from app.core.numbering import NumberAllocator
+from app.core.roles import UserRole
+from app.models import (
+    RFQ,
+    Canvass,
+    PRItem,
+    PurchaseRequest,
+    QuotationItem,
+    SupplierQuotation,
+    Supplier,
+    User,
+)
+from app.schemas.purchase_request import PurchaseRequestCreate
+from app.services.purchase_request_service import PurchaseRequestService
+
+BASE_TIME = datetime(2024, 1, 1, 8, 0, 0)
+
+
+def pr_payload(*prices: str) -> dict:
+    return {
+        "project_title": "Procurement of laptops",
+        "project_description": "Procurement of laptops for field offices",
+        "purpose": "Field operations support",
+        "end_user_department": "ITMS",
+        "fund_source": "GAA 2024",
+        "estimated_budget": "150000.00",
+        "urgency_level": "MEDIUM",
+        "requested_by_name": "Juan Dela Cruz",
+        "requested_by_designation": "Engineer II",
+        "budget_officer_name": "Maria Santos",
+        "budget_officer_designation": "Budget Officer III",
+        "pr_items": [
+            {"item_code": f"IT-{n}", "item_name": f"Item {n}", "quantity": "1.50",
+             "unit_of_measure": "unit", "estimated_price": price}
+            for n, price in enumerate(prices)
+        ],
+    }
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'totals.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def session_factory(engine):
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(User(id=1, name="Juan Dela Cruz", email="user@dict.gov.ph",
+                         password_hash="not-a-real-hash", role=UserRole.END_USER, is_active=True))
+        session.add(Supplier(id=1, name="Acme Trading", address="Quezon City",
+                             contact_person="Juan Dela Cruz", contact_number="09170000000"))
+        await session.commit()
+    return factory
+
+
+async def _create_pr(factory, engine, *prices: str) -> int:
+    async with factory() as session:
+        service = PurchaseRequestService(session, number_allocator=NumberAllocator(engine))
+        purchase_request = await service.create_purchase_request(
+            PurchaseRequestCreate.model_validate(pr_payload(*prices)), end_user_id=1
+        )
+        return purchase_request.id
+
+
+async def _stored_totals(factory, pr_id: int) -> tuple:
+    async with factory() as session:
+        row = await session.execute(
+            select(PurchaseRequest.item_count, PurchaseRequest.total_estimated_cost)
+            .where(PurchaseRequest.id == pr_id)
+        )
+        return row.one()
+
+
+@pytest.mark.asyncio
+async def test_create_sets_totals(session_factory, engine):
+    pr_id = await _create_pr(session_factory, engine, "100.00", "33.33")
+
+    # 1.5 x 100.00 + 1.5 x 33.33 = 199.995, stored to the cent
+    assert await _stored_totals(session_factory, pr_id) == (2, Decimal("200.00"))
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_sets_totals(session_factory, engine):
+    async with session_factory() as session:
+        service = PurchaseRequestService(session, number_allocator=NumberAllocator(engine))
+        result = await service.bulk_create_purchase_requests(
+            [pr_payload("100.00"), pr_payload("10.00", "20.00", "30.00")], end_user_id=1
+        )
+
+    totals = [await _stored_totals(session_factory, item.id) for item in result.results]
+    assert totals == [(1, Decimal("150.00")), (3, Decimal("90.00"))]
+
+
+@pytest.mark.asyncio
+async def test_item_insert_update_delete_keep_totals(session_factory, engine):
+    pr_id = await _create_pr(session_factory, engine, "100.00", "200.00")
+    other_id = await _create_pr(session_factory, engine, "10.00")
+
+    async with session_factory() as session:
+        purchase_request = (await session.execute(
+            select(PurchaseRequest)
+            .where(PurchaseRequest.id == pr_id)
+            .options(selectinload(PurchaseRequest.pr_items))
+        )).scalar_one()
+        first, second = purchase_request.pr_items
+
+        purchase_request.pr_items.append(PRItem(
+            item_code="IT-9", item_name="Item 9", quantity=Decimal("1.00"),
+            unit_of_measure="unit", estimated_price=Decimal("5.00")
+        ))
+        await session.flush()
+        # The loaded parent is refreshed along with its row
+        assert (purchase_request.item_count, purchase_request.total_estimated_cost) == (3, Decimal("455.00"))
+
+        first.quantity = Decimal("2.00")
+        await session.delete(second)
+        await session.commit()
+
+    assert await _stored_totals(session_factory, pr_id) == (2, Decimal("205.00"))
+
+    async with session_factory() as session:
+        item = (await session.execute(
+            select(PRItem).where(PRItem.purchase_request_id == pr_id, PRItem.item_code == "IT-9")
+        )).scalar_one()
+        item.purchase_request_id = other_id
+        await session.commit()
+
+    assert await _stored_totals(session_factory, pr_id) == (1, Decimal("200.00"))
+    assert await _stored_totals(session_factory, other_id) == (2, Decimal("20.00"))
+
+
+@pytest.mark.asyncio
+async def test_quotation_totals_follow_items(session_factory, engine):
+    pr_id = await _create_pr(session_factory, engine, "100.00", "200.00")
+
+    async with session_factory() as session:
+        pr_items = list((await session.execute(
+            select(PRItem).where(PRItem.purchase_request_id == pr_id).order_by(PRItem.id)
+        )).scalars())
+        rfq = RFQ(rfq_number="RFQ-2024-0001", purchase_request_id=pr_id, procurement_officer_id=1,
+                  delivery_schedule=BASE_TIME, payment_terms="30 days", canvassing_deadline=BASE_TIME)
+        canvass = Canvass(canvass_number="CAN-2024-0001", rfq=rfq, canvasser_id=1,
+                          task_description="Canvass suppliers", deadline=BASE_TIME + timedelta(days=5))
+        quotation = SupplierQuotation(
+            canvass=canvass, supplier_id=1, supplier_name="Acme Trading", supplier_address="Quezon City",
+            supplier_contact_person="Juan Dela Cruz", supplier_contact_number="09170000000",
+            delivery_days=7, total_amount=Decimal("270.00"),
+            quotation_items=[
+                QuotationItem(pr_item_id=pr_item.id, item_code=pr_item.item_code, item_name=pr_item.item_name,
+                              quantity=pr_item.quantity, unit_price=price, total_price=pr_item.quantity * price)
+                for pr_item, price in zip(pr_items, (Decimal("80.00"), Decimal("100.00")))
+            ],
+        )
+        session.add_all([rfq, canvass, quotation])
+        await session.commit()
+        assert (quotation.item_count, quotation.items_total_amount) == (2, Decimal("270.00"))
+
+        await session.delete(quotation.quotation_items[0])
+        await session.commit()
+
+    async with session_factory() as session:
+        stored = (await session.execute(
+            select(SupplierQuotation.item_count, SupplierQuotation.items_total_amount)
+        )).one()
+    assert stored == (1, Decimal("150.00"))
+
+
+@pytest.mark.asyncio
+async def test_check_finds_and_refresh_repairs_drift(session_factory, engine):
+    pr_id = await _create_pr(session_factory, engine, "100.00")
+
+    async with engine.connect() as conn:
+        assert await conn.run_sync(check_totals) == {"purchase_requests": [], "supplier_quotations": []}
+
+    # Core statements bypass the ORM hooks
+    async with engine.begin() as conn:
+        await conn.execute(update(PRItem).values(estimated_price=Decimal("120.00")))
+        drift = await conn.run_sync(check_totals)
+    assert [row["id"] for row in drift["purchase_requests"]] == [pr_id]
+
+    async with engine.begin() as conn:
+        await conn.run_sync(refresh_totals)
+        assert (await conn.run_sync(check_totals))["purchase_requests"] == []
+    assert await _stored_totals(session_factory, pr_id) == (1, Decimal("180.00"))
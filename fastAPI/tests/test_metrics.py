@@ -0,0 +1,87 @@
+"""Tests for request metrics and the Prometheus text exposition"""
+
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.db_stats import DBStatsMiddleware, instrument_queries
+from app.core.metrics import MetricsMiddleware, render_metrics, reset_metrics
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'metrics.db'}")
+    instrument_queries(engine)
+    return engine
+
+
+def build_app(engine) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(DBStatsMiddleware)
+
+    @app.get("/api/v1/items/{item_id}")
+    async def item(item_id: int):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT 2"))
+        return {"id": item_id}
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_requests_recorded_by_route_template(engine):
+    reset_metrics()
+    transport = httpx.ASGITransport(app=build_app(engine))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for item_id in range(3):
+            response = await client.get(f"/api/v1/items/{item_id}")
+            assert response.status_code == 200
+        assert (await client.get("/api/v1/items/abc")).status_code == 422
+        assert (await client.get("/nowhere")).status_code == 404
+        for n in range(3):
+            await client.request(f"BREW{n}", "/nowhere")
+    await engine.dispose()
+
+    output = render_metrics()
+    route = 'method="GET",route="/api/v1/items/{item_id}"'
+    assert f'http_request_duration_seconds_count{{{route},status="200"}} 3' in output
+    assert f'http_request_duration_seconds_count{{{route},status="422"}} 1' in output
+    assert 'route="__unmatched__",status="404"' in output
+    # Arbitrary method tokens share one label
+    assert 'method="OTHER",route="__unmatched__"' in output
+    assert "BREW" not in output
+    assert "/api/v1/items/0" not in output
+    assert "http_requests_in_flight 0" in output
+
+    # Two statements per successful request, none for the 422
+    assert f'http_request_db_queries_sum{{{route}}} 6.0' in output
+    assert f'http_request_db_queries_bucket{{{route},le="0.0"}} 1' in output
+
+
+@pytest.mark.asyncio
+async def test_histogram_buckets_are_cumulative(engine):
+    reset_metrics()
+    transport = httpx.ASGITransport(app=build_app(engine))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/api/v1/items/1")
+    await engine.dispose()
+
+    lines = [
+        line for line in render_metrics().splitlines()
+        if line.startswith("http_request_duration_seconds_bucket")
+    ]
+    counts = [int(line.rsplit(" ", 1)[1]) for line in lines]
+    assert counts == sorted(counts)
+    assert lines[-1].endswith('le="+Inf"} 1')
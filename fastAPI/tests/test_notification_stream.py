@@ -0,0 +1,150 @@
+"""Tests for live notification streams"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI, HTTPException
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.api.v1.endpoints import notifications
+from app.core.config import settings
+from app.core.deps import get_current_active_user
+from app.core.notification_broker import RESYNC, NotificationBroker
+from app.core.principals import Principal
+from app.core.pubsub_backends import MemoryPubSubBackend, RedisPubSubBackend
+from app.core.roles import UserRole
+
+USER = Principal(id=6, email="user@dict.gov.ph", role=UserRole.END_USER, is_active=True)
+
+
+def note(n: int) -> dict:
+    return {"type": "STATUS_UPDATED", "title": f"PR {n} updated", "entity_type": "PurchaseRequest", "entity_id": n}
+
+
+async def _until(predicate, timeout: float = 2.0) -> None:
+    async def poll():
+        while not predicate():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(poll(), timeout)
+
+
+@pytest_asyncio.fixture(params=["memory", "redis"])
+async def workers(request):
+    """Two brokers sharing one backend, like two uvicorn workers."""
+    if request.param == "memory":
+        shared = MemoryPubSubBackend()
+        backends = [shared, shared]
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        backends = [
+            RedisPubSubBackend(redis=fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+            for _ in range(2)
+        ]
+    brokers = [NotificationBroker(backend=backend) for backend in backends]
+    for broker in brokers:
+        await broker.start()
+    yield brokers
+    for broker in brokers:
+        await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_published_notifications_reach_connections_on_every_worker(workers):
+    first, second = workers
+    mine = [second.connect(6), second.connect(6)]
+    other = first.connect(7)
+
+    message_id = await first.publish([([6, 7], note(1)), ([6], note(2))])
+    await _until(lambda: second.get_stats()["received"] == 1 and first.get_stats()["received"] == 1)
+
+    for connection in mine:
+        assert await connection.next(1) == (message_id, [note(1), note(2)])
+    assert await other.next(1) == (message_id, [note(1)])
+    assert second.get_stats()["connections"] == 2
+
+
+@pytest.mark.asyncio
+async def test_resume_replays_missed_messages_or_resyncs():
+    broker = NotificationBroker(backend=MemoryPubSubBackend(), replay_size=3)
+    await broker.start()
+    try:
+        for n in range(1, 5):
+            await broker.publish([([6], note(n))])
+        await broker.publish([([7], note(5))])
+        await _until(lambda: broker.get_stats()["received"] == 5)
+
+        # Messages 3-5 are buffered; user 6 missed 3 and 4 (5 was not for them)
+        resumed = broker.connect(6, last_event_id=2)
+        assert [await resumed.next(1), await resumed.next(1)] == [(3, [note(3)]), (4, [note(4)])]
+        with pytest.raises(asyncio.TimeoutError):
+            await resumed.next(0.05)
+
+        # Message 2 has left the buffer; an ID from another server run is unknown
+        for last_event_id in (1, 99):
+            assert await broker.connect(6, last_event_id=last_event_id).next(1) == RESYNC
+    finally:
+        await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_connection_cap_and_slow_clients():
+    broker = NotificationBroker(backend=MemoryPubSubBackend(), max_connections_per_user=2, queue_size=2)
+    await broker.start()
+    try:
+        slow = broker.connect(6)
+        broker.connect(6)
+        with pytest.raises(HTTPException) as exc_info:
+            broker.connect(6)
+        assert exc_info.value.status_code == 429
+
+        # A connection that falls queue_size messages behind is closed, freeing its slot
+        for n in range(3):
+            await broker.publish([([6], note(n))])
+        await _until(lambda: broker.get_stats()["received"] == 3)
+        assert await slow.next(1) is None
+        assert broker.get_stats()["slow_disconnects"] == 2
+        broker.connect(6)
+    finally:
+        await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_stream_endpoint_sends_events_heartbeats_and_resumes(monkeypatch):
+    broker = NotificationBroker(backend=MemoryPubSubBackend())
+    await broker.start()
+    monkeypatch.setattr(notifications, "get_notification_broker", lambda: broker)
+    monkeypatch.setattr(settings, "NOTIFICATION_STREAM_HEARTBEAT_SECONDS", 0.05)
+
+    app = FastAPI()
+    app.include_router(notifications.router, prefix="/notifications")
+    app.dependency_overrides[get_current_active_user] = lambda: USER
+
+    for n in (1, 2):
+        await broker.publish([([USER.id], note(n))])
+    await _until(lambda: broker.get_stats()["received"] == 2)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        request = asyncio.create_task(
+            client.get("/notifications/stream", headers={"Last-Event-ID": "1"})
+        )
+        await _until(lambda: broker.get_stats()["connections"] == 1)
+        await broker.publish([([USER.id], note(3))])
+        await asyncio.sleep(0.2)
+        # Shutting down ends every open stream
+        await broker.stop()
+        response = await request
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    body = response.text
+    assert body.startswith("retry: 3000\n\n")
+    assert "id: 1\n" not in body
+    assert 'id: 2\nevent: notification\ndata: {"notifications": [{"type": "STATUS_UPDATED"' in body
+    assert body.index("id: 2\n") < body.index("id: 3\n")
+    assert ": heartbeat\n\n" in body
@@ -0,0 +1,206 @@
+"""Tests for notification fan-out"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.notification_broker import NotificationBroker
+from app.core.pubsub_backends import MemoryPubSubBackend
+from app.core.query_profiler import instrument_profiler
+from app.core.roles import UserRole
+from app.core.status import NotificationType
+from app.models import Notification, User
+from app.schemas.notification import NotificationEvent, NotificationSubject
+from app.services.notification_service import NotificationDispatcher, NotificationService
+
+BASE_TIME = datetime(2024, 1, 1, 8, 0, 0)
+
+# id -> (role, is_active)
+USERS = {
+    1: (UserRole.BAC_CHAIR, True),
+    2: (UserRole.BAC_MEMBER, True),
+    3: (UserRole.BAC_MEMBER, True),
+    4: (UserRole.BAC_MEMBER, False),
+    5: (UserRole.CANVASSER, True),
+    6: (UserRole.END_USER, True),
+    7: (UserRole.END_USER, True),
+}
+
+
+def bac_event(entity_ids, **overrides) -> NotificationEvent:
+    fields = {
+        "type": NotificationType.APPROVAL_REQUIRED,
+        "entity_type": "PurchaseRequest",
+        "roles": [UserRole.BAC_CHAIR, UserRole.BAC_MEMBER],
+        "subjects": [
+            NotificationSubject(
+                entity_id=entity_id,
+                title=f"PR {entity_id} needs your action",
+                message="Resolution ready for signature.",
+                user_ids=[6 if entity_id % 2 else 7],
+            )
+            for entity_id in entity_ids
+        ],
+        **overrides,
+    }
+    return NotificationEvent(**fields)
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'notifications.db'}")
+    instrument_profiler(engine)
+    async with engine.begin() as conn:
+        for model in (User, Notification):
+            await conn.run_sync(model.__table__.create)
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add_all([
+            User(id=user_id, name=f"User {user_id}", email=f"user{user_id}@dict.gov.ph",
+                 password_hash="not-a-real-hash", role=role, is_active=active)
+            for user_id, (role, active) in USERS.items()
+        ])
+        await session.commit()
+    yield factory
+    await engine.dispose()
+
+
+async def _sent(factory) -> list:
+    async with factory() as session:
+        rows = await session.execute(
+            select(Notification.entity_id, Notification.user_id, Notification.type)
+            .order_by(Notification.entity_id, Notification.user_id)
+        )
+        return rows.all()
+
+
+@pytest.mark.asyncio
+async def test_fan_out_resolves_roles_set_wise_in_one_insert(session_factory, assert_max_queries):
+    async with session_factory() as session:
+        # Recipient lookup, duplicate check, one multi-row INSERT
+        with assert_max_queries(3):
+            result = await NotificationService(session).fan_out(
+                bac_event(range(1, 201)), coalesce_seconds=3600, now=BASE_TIME
+            )
+
+    # Chair and two active members on every PR, plus the PR's own end user
+    assert (result.created, result.coalesced) == (800, 0)
+    sent = await _sent(session_factory)
+    assert [(entity_id, user_id) for entity_id, user_id, _ in sent[:8]] == [
+        (1, 1), (1, 2), (1, 3), (1, 6), (2, 1), (2, 2), (2, 3), (2, 7)
+    ]
+    assert {user_id for _, user_id, _ in sent}.isdisjoint({4, 5})
+
+
+@pytest.mark.asyncio
+async def test_duplicates_within_window_are_coalesced(session_factory):
+    async with session_factory() as session:
+        service = NotificationService(session)
+        await service.fan_out(bac_event([1, 2]), coalesce_seconds=3600, now=BASE_TIME)
+
+        # Same PRs again within the hour (PR 2 listed twice), plus a new one
+        repeat = await service.fan_out(bac_event([1, 2, 2, 3]), coalesce_seconds=3600,
+                                       now=BASE_TIME + timedelta(minutes=30))
+        # A different type about the same PR is not a duplicate
+        other_type = await service.fan_out(
+            bac_event([1], type=NotificationType.STATUS_UPDATED, roles=[]),
+            coalesce_seconds=3600, now=BASE_TIME + timedelta(minutes=30)
+        )
+        # Past the window the same notification is sent again
+        later = await service.fan_out(bac_event([1]), coalesce_seconds=3600, now=BASE_TIME + timedelta(hours=2))
+
+    assert (repeat.created, repeat.coalesced) == (4, 12)
+    assert (other_type.created, other_type.coalesced) == (1, 0)
+    assert (later.created, later.coalesced) == (4, 0)
+    async with session_factory() as session:
+        total = (await session.execute(select(func.count()).select_from(Notification))).scalar_one()
+    assert total == 8 + 4 + 1 + 4
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_fans_out_in_background(session_factory):
+    broker = NotificationBroker(backend=MemoryPubSubBackend())
+    await broker.start()
+    canvasser = broker.connect(5)
+    dispatcher = NotificationDispatcher(session_factory, broker=broker, max_queue=2)
+
+    # Not running: delivered inline so nothing is lost
+    await dispatcher.publish(bac_event([1]))
+    assert len(await _sent(session_factory)) == 4
+
+    dispatcher.start()
+    for entity_id in range(2, 7):
+        await dispatcher.publish(bac_event([entity_id], roles=[UserRole.CANVASSER]))
+    await dispatcher.stop()
+
+    stats = dispatcher.get_stats()
+    assert stats["published"] == 6
+    assert stats["delivered"] == 6
+    assert stats["notifications_created"] == 4 + 5 * 2
+    assert stats["failed"] == 0
+    sent = await _sent(session_factory)
+    assert {(entity_id, user_id) for entity_id, user_id, _ in sent if entity_id > 1} == {
+        (entity_id, user_id) for entity_id in range(2, 7) for user_id in (5, 6 if entity_id % 2 else 7)
+    }
+
+    # Each committed fan-out is pushed to the recipients' open streams
+    pushed = [await canvasser.next(1) for _ in range(5)]
+    assert [notifications[0]["entity_id"] for _, notifications in pushed] == [2, 3, 4, 5, 6]
+    await broker.stop()
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_stop_delivers_queue_left_at_timeout(session_factory):
+    dispatcher = NotificationDispatcher(session_factory, max_queue=10, shutdown_timeout_seconds=0)
+    dispatcher.start()
+    for entity_id in range(1, 6):
+        await dispatcher.publish(bac_event([entity_id], roles=[UserRole.CANVASSER]))
+    await dispatcher.stop()
+
+    # The queue could not drain in time: what was left is fanned out inline
+    stats = dispatcher.get_stats()
+    assert stats["delivered_on_shutdown"] >= 1
+    assert (stats["delivered"], stats["queued"], stats["failed"]) == (5, 0, 0)
+    sent = await _sent(session_factory)
+    assert {entity_id for entity_id, _, _ in sent} == set(range(1, 6))
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_retries_failed_fan_out(session_factory):
+    failures = []
+
+    def flaky_factory():
+        if len(failures) < 2:
+            failures.append(1)
+            raise ConnectionError("database unavailable")
+        return session_factory()
+
+    dispatcher = NotificationDispatcher(flaky_factory, retry_delay_seconds=0.01)
+    dispatcher.start()
+    await dispatcher.publish(bac_event([1]))
+    await dispatcher.publish(bac_event([2]))
+    await dispatcher.stop()
+
+    stats = dispatcher.get_stats()
+    assert (stats["delivered"], stats["retries"], stats["failed"]) == (2, 2, 0)
+    assert {entity_id for entity_id, _, _ in await _sent(session_factory)} == {1, 2}
+
+    # A database that stays down gives up once shutdown runs out of time
+    def broken_factory():
+        raise ConnectionError("database unavailable")
+
+    dispatcher = NotificationDispatcher(broken_factory, retry_delay_seconds=0.01, shutdown_timeout_seconds=0.05)
+    dispatcher.start()
+    await dispatcher.publish(bac_event([3]))
+    await asyncio.wait_for(dispatcher.stop(), 1)
+    assert dispatcher.get_stats()["failed"] == 1
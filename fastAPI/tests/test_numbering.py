@@ -0,0 +1,134 @@
+"""Tests for block-reserving document number allocation under concurrency"""
+
+import asyncio
+import random
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.numbering import NumberAllocator, format_number, parse_number
+from app.core.roles import UserRole
+from app.models import NumberSequence, PRItem, PurchaseRequest, ReleasedNumber, User
+from app.services.purchase_request_service import PurchaseRequestService
+
+YEAR = datetime.utcnow().year
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'numbers.db'}")
+    async with engine.begin() as conn:
+        for model in (User, PurchaseRequest, PRItem, NumberSequence, ReleasedNumber):
+            await conn.run_sync(model.__table__.create)
+    yield engine
+    await engine.dispose()
+
+
+async def _released_values(engine, prefix: str) -> set:
+    async with engine.connect() as conn:
+        rows = await conn.execute(select(ReleasedNumber.value).where(ReleasedNumber.prefix == prefix))
+        return set(rows.scalars())
+
+
+def test_format_and_parse_round_trip():
+    assert format_number("PR", 2025, 42) == "PR-2025-0042"
+    assert parse_number("BAC-2025-12345") == ("BAC", 2025, 12345)
+
+
+@pytest.mark.asyncio
+async def test_simultaneous_creators_across_workers_get_unique_contiguous_numbers(engine):
+    # Four "workers", each with its own in-process block of numbers
+    workers = [NumberAllocator(engine, block_size=7) for _ in range(4)]
+    rng = random.Random(13)
+
+    async def creator(index: int) -> list:
+        await asyncio.sleep(rng.random() / 100)
+        return await workers[index % len(workers)].allocate("PR", count=rng.randint(1, 3))
+
+    batches = await asyncio.gather(*(creator(i) for i in range(200)))
+    issued = [parse_number(number)[2] for batch in batches for number in batch]
+
+    assert len(issued) == len(set(issued))
+    # Far fewer database round-trips than allocations
+    assert sum(worker.reservations for worker in workers) < len(issued) / 3
+
+    # Unissued numbers are handed back on shutdown; together nothing is missing
+    for worker in workers:
+        await worker.release_unused()
+    released = await _released_values(engine, "PR")
+    assert set(issued) | released == set(range(1, len(issued) + len(released) + 1))
+    assert not set(issued) & released
+
+    # The next worker reissues the released numbers first, lowest first
+    successor = NumberAllocator(engine, block_size=len(released))
+    assert [parse_number(n)[2] for n in await successor.allocate("PR", count=len(released))] == sorted(released)
+    assert await _released_values(engine, "PR") == set()
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_numbers_are_reissued_first(engine):
+    allocator = NumberAllocator(engine, block_size=5)
+    first = await allocator.allocate("RFQ", count=3)
+    assert first == [f"RFQ-{YEAR}-0001", f"RFQ-{YEAR}-0002", f"RFQ-{YEAR}-0003"]
+
+    allocator.release([first[1]])
+    assert await allocator.allocate("RFQ") == [f"RFQ-{YEAR}-0002"]
+    assert await allocator.allocate("RFQ") == [f"RFQ-{YEAR}-0004"]
+
+
+@pytest.mark.asyncio
+async def test_prefixes_and_years_are_independent(engine):
+    clock_year = [2024]
+    allocator = NumberAllocator(engine, block_size=2, clock=lambda: datetime(clock_year[0], 12, 31))
+
+    assert await allocator.allocate("PO") == ["PO-2024-0001"]
+    assert await allocator.allocate("CANVASS") == ["CANVASS-2024-0001"]
+    clock_year[0] = 2025
+    assert await allocator.allocate("PO") == ["PO-2025-0001"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_purchase_request_creates(engine):
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(User(id=1, name="Juan Dela Cruz", email="user@dict.gov.ph",
+                         password_hash="not-a-real-hash", role=UserRole.END_USER, is_active=True))
+        await session.commit()
+
+    workers = [NumberAllocator(engine, block_size=4) for _ in range(3)]
+    entry = {
+        "project_title": "Concurrent procurement",
+        "project_description": "Procurement created by many simultaneous users",
+        "purpose": "Concurrency test",
+        "end_user_department": "ITMS",
+        "fund_source": "GAA",
+        "estimated_budget": "1000.00",
+        "urgency_level": "LOW",
+        "requested_by_name": "Juan Dela Cruz",
+        "requested_by_designation": "Engineer II",
+        "budget_officer_name": "Maria Santos",
+        "budget_officer_designation": "Budget Officer III",
+        "pr_items": [{"item_code": "IT-1", "item_name": "Mouse", "quantity": "1",
+                      "unit_of_measure": "unit", "estimated_price": "1000.00"}],
+    }
+
+    async def create(index: int) -> str:
+        async with factory() as session:
+            service = PurchaseRequestService(session, workers[index % len(workers)])
+            result = await service.bulk_create_purchase_requests([entry], end_user_id=1)
+            return result.results[0].pr_number
+
+    numbers = await asyncio.gather(*(create(i) for i in range(30)))
+
+    assert len(set(numbers)) == 30
+    async with factory() as session:
+        stored = set((await session.execute(select(PurchaseRequest.pr_number))).scalars())
+    assert stored == set(numbers)
@@ -0,0 +1,48 @@
+"""Tests for the asynchronous password hashing service"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.hashing import PasswordHashingService
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify_round_trip():
+    hasher = PasswordHashingService(max_workers=2, max_queue=4)
+    try:
+        hashed = await hasher.hash_password("TestPassword123!")
+        assert await hasher.verify_password("TestPassword123!", hashed)
+        assert not await hasher.verify_password("WrongPassword123!", hashed)
+
+        stats = hasher.get_stats()
+        assert stats["completed"] == 3
+        assert stats["in_flight"] == 0
+        assert sum(stats["latency_buckets"].values()) == 3
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full():
+    hasher = PasswordHashingService(max_workers=1, max_queue=1)
+    try:
+        hashed = await hasher.hash_password("TestPassword123!")
+        results = await asyncio.gather(
+            *[hasher.verify_password("TestPassword123!", hashed) for _ in range(4)],
+            return_exceptions=True
+        )
+
+        rejected = [r for r in results if isinstance(r, HTTPException)]
+        assert len(rejected) == 2
+        assert all(r.status_code == 503 for r in rejected)
+        assert hasher.get_stats()["rejected"] == 2
+        assert hasher.get_stats()["peak_in_flight"] == 2
+    finally:
+        hasher.shutdown()
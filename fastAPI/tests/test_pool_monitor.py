@@ -0,0 +1,75 @@
+"""Tests for connection pool telemetry and idle-connection liveness checks"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import TimedAsyncQueuePool
+from app.core.pool_monitor import PoolLivenessMonitor, instrument_engine
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedAsyncQueuePool,
+        pool_size=2,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_checkout_latency_and_gauges(engine):
+    telemetry = instrument_engine(engine, "test")
+
+    async with engine.connect() as first, engine.connect() as second:
+        await first.execute(text("SELECT 1"))
+        await second.execute(text("SELECT 1"))
+        assert telemetry.get_stats()["in_use"] == 2
+
+    stats = telemetry.get_stats()
+    assert stats["checkouts"] == 2
+    assert stats["peak_in_use"] == 2
+    assert stats["in_use"] == 0
+    assert sum(stats["checkout_latency_buckets"].values()) == 2
+
+
+@pytest.mark.asyncio
+async def test_checkout_timeout_is_counted(engine):
+    telemetry = instrument_engine(engine, "test")
+
+    async with engine.connect(), engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            async with engine.connect():
+                pass
+
+    assert telemetry.get_stats()["timeouts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_liveness_monitor_pings_idle_connections(engine):
+    telemetry = instrument_engine(engine, "test")
+
+    async with engine.connect(), engine.connect():
+        pass
+    assert telemetry.get_stats()["idle"] == 2
+
+    monitor = PoolLivenessMonitor(engine, interval_seconds=0.01)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    stats = telemetry.get_stats()
+    assert stats["liveness_checks"] >= 2
+    assert stats["liveness_failures"] == 0
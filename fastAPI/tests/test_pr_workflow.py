@@ -0,0 +1,250 @@
+"""Tests for the purchase request status workflow"""
+
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI, HTTPException
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.api.v1.endpoints import purchase_requests
+from app.core.database import get_db
+from app.core.deps import get_current_active_user
+from app.core.principals import Principal
+from app.core.query_profiler import instrument_profiler
+from app.core.roles import UserRole
+from app.core.status import PurchaseRequestStatus as PRStatus, UrgencyLevel
+from app.core.workflow import allowed_sources, allowed_targets
+from app.models import ActivityLog, Notification, PurchaseRequest, User
+from app.services import pr_workflow_service
+from app.services.notification_service import NotificationDispatcher
+from app.services.pr_workflow_service import PRWorkflowService
+
+BASE_TIME = datetime(2024, 1, 1, 8, 0, 0)
+SEEDED = [PRStatus.PR_UNDER_REVIEW, PRStatus.RFQ_READY, PRStatus.BAC_APPROVED, PRStatus.PO_COMPLETE]
+
+OFFICER = Principal(id=1, email="po@dict.gov.ph", role=UserRole.PROCUREMENT_OFFICER, is_active=True)
+END_USER = Principal(id=2, email="user@dict.gov.ph", role=UserRole.END_USER, is_active=True)
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'workflow.db'}")
+    instrument_profiler(engine)
+    async with engine.begin() as conn:
+        for model in (User, PurchaseRequest, ActivityLog, Notification):
+            await conn.run_sync(model.__table__.create)
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add_all([
+            User(id=principal.id, name=f"User {principal.id}", email=principal.email,
+                 password_hash="not-a-real-hash", role=principal.role, is_active=True)
+            for principal in (OFFICER, END_USER)
+        ])
+        # 40 PRs: statuses cycle through SEEDED, funds alternate GAA/SAGF
+        session.add_all([
+            PurchaseRequest(
+                id=i + 1,
+                pr_number=f"PR-2024-{i + 1:04d}",
+                project_title=f"Project {i}",
+                project_description="Procurement of office equipment",
+                purpose="Operations",
+                end_user_id=END_USER.id,
+                end_user_department="ITMS",
+                fund_source="GAA 2024" if i % 2 == 0 else "SAGF 2024",
+                estimated_budget=Decimal("1000.00"),
+                urgency_level=UrgencyLevel.MEDIUM,
+                status=SEEDED[i % 4],
+                created_at=BASE_TIME + timedelta(minutes=i),
+            )
+            for i in range(40)
+        ])
+        await session.commit()
+
+    # Notifications fan out in the background against the test database
+    dispatcher = NotificationDispatcher(factory)
+    dispatcher.start()
+    monkeypatch.setattr(pr_workflow_service, "get_notification_dispatcher", lambda: dispatcher)
+    yield factory
+    await dispatcher.stop()
+    await engine.dispose()
+
+
+async def _statuses(factory) -> dict:
+    async with factory() as session:
+        rows = await session.execute(select(PurchaseRequest.id, PurchaseRequest.status, PurchaseRequest.version))
+        return {row.id: (row.status, row.version) for row in rows}
+
+
+def test_transition_table_per_role():
+    assert allowed_sources(UserRole.END_USER, PRStatus.CANCELLED) == {PRStatus.PR_UNDER_REVIEW}
+    assert PRStatus.BAC_APPROVED in allowed_sources(UserRole.PROCUREMENT_OFFICER, PRStatus.CANCELLED)
+    assert PRStatus.PO_COMPLETE not in allowed_sources(UserRole.ADMIN, PRStatus.CANCELLED)
+    assert allowed_targets(UserRole.BAC_CHAIR, PRStatus.BAC_DOCS_READY) == [
+        PRStatus.CANVASS_COMPLETE, PRStatus.BAC_APPROVED
+    ]
+
+    with pytest.raises(HTTPException) as exc_info:
+        allowed_sources(UserRole.CANVASSER, PRStatus.PO_APPROVED)
+    assert exc_info.value.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_single_transition_checks_status_and_version(session_factory):
+    async with session_factory() as session:
+        result = await PRWorkflowService(session).transition(1, PRStatus.RFQ_READY, OFFICER, expected_version=1)
+    assert (result.previous_status, result.status, result.version) == (PRStatus.PR_UNDER_REVIEW, PRStatus.RFQ_READY, 2)
+
+    # Stale version, then a move the workflow does not allow from RFQ_READY
+    for kwargs, code in (({"expected_version": 1}, 409), ({}, 409)):
+        target = PRStatus.RFQ_DISSEMINATED if kwargs else PRStatus.PO_APPROVED
+        async with session_factory() as session:
+            with pytest.raises(HTTPException) as exc_info:
+                await PRWorkflowService(session).transition(1, target, OFFICER, **kwargs)
+        assert exc_info.value.status_code == code
+
+    # End users only see their own PRs
+    async with session_factory() as session:
+        with pytest.raises(HTTPException) as exc_info:
+            await PRWorkflowService(session).transition(5, PRStatus.CANCELLED, END_USER, end_user_id=99)
+    assert exc_info.value.status_code == 404
+
+    assert (await _statuses(session_factory))[1] == (PRStatus.RFQ_READY, 2)
+    async with session_factory() as session:
+        logs = (await session.execute(select(ActivityLog))).scalars().all()
+    assert [(log.entity_id, log.old_values, log.new_values) for log in logs] == [
+        (1, {"status": "PR_UNDER_REVIEW"}, {"status": "RFQ_READY"})
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bulk_cancel_by_fund_source_is_set_based(session_factory, assert_max_queries):
+    async with session_factory() as session:
+        # Candidate read, one UPDATE, one activity log INSERT
+        with assert_max_queries(3):
+            result = await PRWorkflowService(session).bulk_transition(
+                PRStatus.CANCELLED, OFFICER, fund_source="GAA 2024", notes="Fund withdrawn"
+            )
+
+    # GAA PRs are the even indexes: PR_UNDER_REVIEW and BAC_APPROVED can be
+    # cancelled; RFQ_READY/PO_COMPLETE fall on odd indexes (SAGF)
+    expected = [i + 1 for i in range(40) if i % 2 == 0]
+    assert result.updated == 20
+    assert result.ids == expected
+
+    statuses = await _statuses(session_factory)
+    assert all(statuses[pr_id] == (PRStatus.CANCELLED, 2) for pr_id in expected)
+    assert all(statuses[pr_id][0] != PRStatus.CANCELLED for pr_id in statuses if pr_id not in expected)
+
+    async with session_factory() as session:
+        logged = (await session.execute(
+            select(func.count()).select_from(ActivityLog).where(ActivityLog.description.like("%Fund withdrawn"))
+        )).scalar_one()
+    assert logged == 20
+
+
+@pytest.mark.asyncio
+async def test_bulk_respects_role_and_owner(session_factory):
+    async with session_factory() as session:
+        result = await PRWorkflowService(session).bulk_transition(
+            PRStatus.CANCELLED, END_USER, pr_ids=list(range(1, 41)), end_user_id=END_USER.id
+        )
+
+    # End users may only withdraw PRs still under review
+    assert result.ids == [i + 1 for i in range(40) if SEEDED[i % 4] == PRStatus.PR_UNDER_REVIEW]
+
+    async with session_factory() as session:
+        result = await PRWorkflowService(session).bulk_transition(
+            PRStatus.CANCELLED, OFFICER, pr_ids=[1, 2, 3], end_user_id=OFFICER.id
+        )
+    assert result.updated == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_retries_when_rows_change_concurrently(session_factory):
+    async with session_factory() as session:
+        execute = session.execute
+
+        async def interfere_then_execute(statement, *args, **kwargs):
+            if getattr(statement, "is_update", False) and not session.info.get("interfered"):
+                session.info["interfered"] = True
+                # Another user edits PR 3 between the candidate read and the UPDATE
+                await execute(
+                    update(PurchaseRequest).where(PurchaseRequest.id == 3)
+                    .values(version=PurchaseRequest.version + 1)
+                )
+                await session.commit()
+            return await execute(statement, *args, **kwargs)
+
+        session.execute = interfere_then_execute
+        result = await PRWorkflowService(session).bulk_transition(
+            PRStatus.CANCELLED, OFFICER, pr_ids=[1, 2, 3, 5]
+        )
+
+    # The first attempt matched short and was rolled back; the re-read moved all four
+    assert result.ids == [1, 2, 3, 5]
+    statuses = await _statuses(session_factory)
+    assert statuses[3] == (PRStatus.CANCELLED, 3)
+    assert statuses[1] == (PRStatus.CANCELLED, 2)
+    async with session_factory() as session:
+        logged = (await session.execute(select(func.count()).select_from(ActivityLog))).scalar_one()
+    assert logged == 4
+
+
+@pytest.mark.asyncio
+async def test_bulk_gives_up_when_rows_keep_changing(session_factory):
+    async with session_factory() as session:
+        execute = session.execute
+
+        async def always_interfere(statement, *args, **kwargs):
+            if getattr(statement, "is_update", False) and not session.info.get("interfering"):
+                session.info["interfering"] = True
+                await execute(
+                    update(PurchaseRequest).where(PurchaseRequest.id == 3)
+                    .values(version=PurchaseRequest.version + 1)
+                )
+                await session.commit()
+                session.info["interfering"] = False
+            return await execute(statement, *args, **kwargs)
+
+        session.execute = always_interfere
+        with pytest.raises(HTTPException) as exc_info:
+            await PRWorkflowService(session).bulk_transition(PRStatus.CANCELLED, OFFICER, pr_ids=[1, 3])
+    assert exc_info.value.status_code == 409
+
+    statuses = await _statuses(session_factory)
+    assert statuses[1] == (PRStatus.PR_UNDER_REVIEW, 1)
+
+
+@pytest.mark.asyncio
+async def test_status_endpoints(session_factory):
+    app = FastAPI()
+    app.include_router(purchase_requests.router, prefix="/purchase-requests")
+
+    async def override_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_current_active_user] = lambda: END_USER
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        unscoped = await client.post("/purchase-requests/bulk/status", json={"status": "CANCELLED"})
+        bulk = await client.post("/purchase-requests/bulk/status", json={"status": "CANCELLED", "pr_ids": [1, 2]})
+        forbidden = await client.post("/purchase-requests/5/status", json={"status": "RFQ_READY"})
+        single = await client.post("/purchase-requests/5/status", json={"status": "CANCELLED", "expected_version": 1})
+
+    assert unscoped.status_code == 422
+    assert bulk.json() == {"status": "CANCELLED", "updated": 1, "ids": [1]}
+    assert forbidden.status_code == 403
+    assert single.json() == {"id": 5, "previous_status": "PR_UNDER_REVIEW", "status": "CANCELLED", "version": 2}
@@ -0,0 +1,141 @@
+"""Tests for the authenticated principal cache"""
+
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import Depends, FastAPI
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import get_db
+from app.core.deps import get_current_user
+from app.core.principals import Principal, get_principal_cache
+from app.core.roles import UserRole
+from app.core.security import create_access_token
+from app.models.user import User
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+
+    statements = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    factory.statements = statements
+    get_principal_cache().clear()
+    yield factory
+    get_principal_cache().clear()
+    await engine.dispose()
+
+
+async def _create_user(session: AsyncSession) -> User:
+    user = User(
+        name="Test Officer",
+        email="officer@dict.gov.ph",
+        password_hash="not-a-real-hash",
+        role=UserRole.PROCUREMENT_OFFICER,
+        is_active=True,
+    )
+    session.add(user)
+    await session.commit()
+    return user
+
+
+@pytest.mark.asyncio
+async def test_second_request_is_served_from_cache(session_factory):
+    async with session_factory() as session:
+        user = await _create_user(session)
+    token = create_access_token({"sub": str(user.id)})
+
+    cache = get_principal_cache()
+    session_factory.statements.clear()
+
+    async with session_factory() as session:
+        first = await get_current_user(token, session)
+    async with session_factory() as session:
+        second = await get_current_user(token, session)
+
+    assert isinstance(first, Principal)
+    assert first == second
+    assert first.role == UserRole.PROCUREMENT_OFFICER
+    assert len([s for s in session_factory.statements if s.startswith("SELECT")]) == 1
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_role_change_invalidates_cached_principal(session_factory):
+    async with session_factory() as session:
+        user = await _create_user(session)
+    token = create_access_token({"sub": str(user.id)})
+
+    async with session_factory() as session:
+        await get_current_user(token, session)
+    assert len(get_principal_cache()) == 1
+
+    async with session_factory() as session:
+        db_user = await session.get(User, user.id)
+        db_user.role = UserRole.ADMIN
+        await session.commit()
+    assert len(get_principal_cache()) == 0
+
+    async with session_factory() as session:
+        principal = await get_current_user(token, session)
+    assert principal.role == UserRole.ADMIN
+
+
+@pytest.mark.asyncio
+async def test_cache_miss_holds_one_connection_with_the_handler(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'auth.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        user = await _create_user(session)
+    get_principal_cache().clear()
+
+    checked_out = []
+    peak = []
+    event.listen(engine.sync_engine.pool, "checkout", lambda *args: checked_out.append(1))
+    event.listen(engine.sync_engine.pool, "checkin", lambda *args: checked_out.pop())
+
+    app = FastAPI()
+
+    @app.get("/me")
+    async def me(principal: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+        peak.append(len(checked_out))
+        await db.execute(select(User.id))
+        peak.append(len(checked_out))
+        return {"id": principal.id}
+
+    async def override_db():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_db
+    token = create_access_token({"sub": str(user.id)})
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/me", headers={"Authorization": f"Bearer {token}"})
+    finally:
+        get_principal_cache().clear()
+        await engine.dispose()
+
+    # The lookup's connection is back in the pool before the handler runs,
+    # and the handler's query needs only one
+    assert response.json() == {"id": user.id}
+    assert peak == [0, 1]
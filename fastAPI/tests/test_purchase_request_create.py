@@ -0,0 +1,139 @@
+"""Tests for single and bulk purchase request creation"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.numbering import NumberAllocator
+from app.core.query_profiler import instrument_profiler
+from app.core.roles import UserRole
+from app.models import NumberSequence, PRItem, PurchaseRequest, ReleasedNumber, User
+from app.schemas.purchase_request import PurchaseRequestCreate
+from app.services.purchase_request_service import PurchaseRequestService
+
+YEAR = datetime.utcnow().year
+
+
+def pr_payload(title: str, items: int = 3) -> dict:
+    return {
+        "project_title": title,
+        "project_description": "Procurement of laptops for field offices",
+        "purpose": "Field operations support",
+        "end_user_department": "ITMS",
+        "fund_source": "GAA 2024",
+        "estimated_budget": "150000.00",
+        "urgency_level": "MEDIUM",
+        "has_specs": True,
+        "requested_by_name": "Juan Dela Cruz",
+        "requested_by_designation": "Engineer II",
+        "budget_officer_name": "Maria Santos",
+        "budget_officer_designation": "Budget Officer III",
+        "pr_items": [
+            {
+                "item_code": f"IT-{n:03d}",
+                "item_name": f"Laptop model {n}",
+                "quantity": "2.00",
+                "unit_of_measure": "unit",
+                "estimated_price": "50000.00",
+            }
+            for n in range(items)
+        ],
+    }
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'create.db'}")
+    instrument_profiler(engine)
+    async with engine.begin() as conn:
+        for model in (User, PurchaseRequest, PRItem, NumberSequence, ReleasedNumber):
+            await conn.run_sync(model.__table__.create)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def allocator(engine):
+    return NumberAllocator(engine, block_size=10)
+
+
+@pytest_asyncio.fixture
+async def session_factory(engine):
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(User(id=1, name="Juan Dela Cruz", email="user@dict.gov.ph",
+                         password_hash="not-a-real-hash", role=UserRole.END_USER, is_active=True))
+        await session.commit()
+
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_single_create_maps_schema_fields(session_factory, allocator):
+    async with session_factory() as session:
+        data = PurchaseRequestCreate.model_validate(pr_payload("Laptop procurement"))
+        pr = await PurchaseRequestService(session, allocator).create_purchase_request(data, end_user_id=1)
+
+    assert pr.pr_number == f"PR-{YEAR}-0001"
+    assert pr.has_technical_specs is True
+    assert pr.requested_by_position == "Engineer II"
+    assert pr.budget_officer_position == "Budget Officer III"
+
+    async with session_factory() as session:
+        count = await session.scalar(select(func.count()).select_from(PRItem).where(PRItem.purchase_request_id == pr.id))
+    assert count == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_reports_per_entry_results(session_factory, allocator, assert_max_queries):
+    entries = [pr_payload(f"Planned procurement {n:03d}", items=n % 4 + 1) for n in range(50)]
+    entries[7]["pr_items"] = []
+    entries[20]["estimated_budget"] = "-1"
+
+    async with session_factory() as session:
+        # Statement count is independent of batch size: three for the batch,
+        # up to three more for the allocator to reserve a block of numbers
+        with assert_max_queries(6):
+            result = await PurchaseRequestService(session, allocator).bulk_create_purchase_requests(entries, end_user_id=1)
+
+    assert (result.created, result.failed) == (48, 2)
+    assert [r.index for r in result.results] == list(range(50))
+    assert not result.results[7].success and result.results[7].errors[0]["loc"] == ("pr_items",)
+    assert not result.results[20].success
+    created = [r for r in result.results if r.success]
+    assert [r.pr_number for r in created] == [f"PR-{YEAR}-{n:04d}" for n in range(1, 49)]
+
+    async with session_factory() as session:
+        rows = await session.execute(
+            select(PurchaseRequest.id, PurchaseRequest.project_title, func.count(PRItem.id))
+            .join(PRItem)
+            .group_by(PurchaseRequest.id)
+        )
+        by_id = {pr_id: (title, items) for pr_id, title, items in rows}
+
+    assert len(by_id) == 48
+    for r in created:
+        title, items = by_id[r.id]
+        assert title == f"Planned procurement {r.index:03d}"
+        assert items == r.index % 4 + 1
+
+
+@pytest.mark.asyncio
+async def test_pr_numbers_continue_after_existing(session_factory, allocator):
+    async with session_factory() as session:
+        service = PurchaseRequestService(session, allocator)
+        await service.bulk_create_purchase_requests([pr_payload("First batch entry")], end_user_id=1)
+        result = await service.bulk_create_purchase_requests(
+            [pr_payload("Second batch entry"), pr_payload("Third batch entry")], end_user_id=1
+        )
+
+    assert [r.pr_number for r in result.results] == [f"PR-{YEAR}-0002", f"PR-{YEAR}-0003"]
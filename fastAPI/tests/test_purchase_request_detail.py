@@ -0,0 +1,212 @@
+"""Tests for the eager-loaded purchase request detail view"""
+
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.api.v1.endpoints import purchase_requests
+from app.core.database import Base, get_read_db
+from app.core.deps import get_current_active_user
+from app.core.principals import Principal
+from app.core.query_profiler import instrument_profiler
+from app.core.roles import UserRole
+from app.core.status import BACDocumentType, ProcurementMode, PurchaseRequestStatus, UrgencyLevel
+from app.models import (
+    ApprovalRouting,
+    BACDocument,
+    Canvass,
+    PRItem,
+    PurchaseOrder,
+    PurchaseRequest,
+    QuotationItem,
+    RFQ,
+    Supplier,
+    SupplierQuotation,
+    User,
+)
+from app.schemas.purchase_request import PurchaseRequestDetail
+from app.services.purchase_request_service import PurchaseRequestService
+
+BASE_TIME = datetime(2024, 1, 1, 8, 0, 0)
+
+# PR id -> (items, canvasses, quotations per canvass)
+GRAPH_SIZES = {1: (1, 1, 1), 2: (25, 3, 6)}
+
+
+def _build_graph(pr_id: int, items: int, canvasses: int, quotations: int) -> list:
+    """A PR with an RFQ, canvasses, quotations priced per item, BAC docs, a PO and routing."""
+    pr_items = [
+        PRItem(item_code=f"IT-{i}", item_name=f"Item {i}", quantity=Decimal("2.00"),
+               unit_of_measure="pc", estimated_price=Decimal("100.00"))
+        for i in range(items)
+    ]
+    purchase_request = PurchaseRequest(
+        id=pr_id,
+        pr_number=f"PR-2024-{pr_id:04d}",
+        project_title=f"Project {pr_id}",
+        project_description="Procurement of office equipment",
+        purpose="Operations",
+        end_user_id=1,
+        end_user_department="ITMS",
+        fund_source="GAA 2024",
+        estimated_budget=Decimal("1000.00"),
+        urgency_level=UrgencyLevel.MEDIUM,
+        status=PurchaseRequestStatus.PO_APPROVED,
+        pr_items=pr_items,
+    )
+    rfq = RFQ(
+        rfq_number=f"RFQ-2024-{pr_id:04d}",
+        purchase_request=purchase_request,
+        procurement_officer_id=1,
+        delivery_schedule=BASE_TIME + timedelta(days=30),
+        payment_terms="30 days",
+        canvassing_deadline=BASE_TIME + timedelta(days=7),
+    )
+    for c in range(canvasses):
+        canvass = Canvass(
+            canvass_number=f"CAN-2024-{pr_id:02d}{c:02d}",
+            rfq=rfq,
+            canvasser_id=1,
+            task_description="Canvass suppliers",
+            deadline=BASE_TIME + timedelta(days=5),
+        )
+        for q in range(quotations):
+            SupplierQuotation(
+                canvass=canvass,
+                supplier_id=1,
+                supplier_name="Acme Trading",
+                supplier_address="Quezon City",
+                supplier_contact_person="Juan Dela Cruz",
+                supplier_contact_number="09170000000",
+                delivery_days=7,
+                total_amount=Decimal("200.00") * items,
+                is_selected=(c == 0 and q == 0),
+                quotation_items=[
+                    QuotationItem(pr_item=pr_item, item_code=pr_item.item_code, item_name=pr_item.item_name,
+                                  quantity=Decimal("2.00"), unit_price=Decimal("100.00"),
+                                  total_price=Decimal("200.00"))
+                    for pr_item in pr_items
+                ],
+            )
+    bac_documents = [
+        BACDocument(
+            bac_document_number=f"BAC-2024-{pr_id:02d}{d:02d}",
+            purchase_request=purchase_request,
+            selected_supplier_id=1,
+            procurement_mode=ProcurementMode.SHOPPING,
+            document_type=document_type,
+            contract_amount=Decimal("200.00") * items,
+            delivery_schedule=BASE_TIME + timedelta(days=30),
+            payment_terms="30 days",
+        )
+        for d, document_type in enumerate(list(BACDocumentType)[:2])
+    ]
+    purchase_order = PurchaseOrder(
+        po_number=f"PO-2024-{pr_id:04d}",
+        purchase_request=purchase_request,
+        supplier_id=1,
+        contract_amount=Decimal("200.00") * items,
+        delivery_instructions="Deliver to ITMS",
+        payment_terms="30 days",
+        delivery_deadline=BASE_TIME + timedelta(days=30),
+    )
+    routings = [
+        ApprovalRouting(document_type="PURCHASE_REQUEST", document_id=pr_id, approver_id=1, sequence=s)
+        for s in range(1, 3)
+    ]
+    return [purchase_request, rfq, *bac_documents, purchase_order, *routings]
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'detail.db'}")
+    instrument_profiler(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add_all([
+            User(id=user_id, name=f"User {user_id}", email=f"user{user_id}@dict.gov.ph",
+                 password_hash="not-a-real-hash", role=UserRole.END_USER, is_active=True)
+            for user_id in (1, 2)
+        ])
+        session.add(Supplier(id=1, name="Acme Trading", address="Quezon City",
+                             contact_person="Juan Dela Cruz", contact_number="09170000000"))
+        await session.flush()
+        for pr_id, sizes in GRAPH_SIZES.items():
+            session.add_all(_build_graph(pr_id, *sizes))
+        await session.commit()
+
+    yield factory
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_detail_loads_whole_graph(session_factory):
+    async with session_factory() as session:
+        purchase_request = await PurchaseRequestService(session).get_purchase_request_detail(2)
+        detail = PurchaseRequestDetail.model_validate(purchase_request)
+
+    assert detail.pr_number == "PR-2024-0002"
+    assert len(detail.pr_items) == 25
+    assert len(detail.rfq.canvasses) == 3
+    assert all(len(canvass.supplier_quotations) == 6 for canvass in detail.rfq.canvasses)
+    assert len(detail.rfq.canvasses[0].supplier_quotations[0].quotation_items) == 25
+    assert len(detail.bac_documents) == 2
+    assert detail.purchase_order.supplier.name == "Acme Trading"
+    assert [routing.sequence for routing in sorted(detail.approval_routings, key=lambda r: r.sequence)] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_detail_query_count_does_not_grow_with_graph(session_factory, assert_max_queries):
+    counts = []
+    for pr_id in GRAPH_SIZES:
+        async with session_factory() as session:
+            # PR with its to-one joins, then one query per eager-loaded collection
+            with assert_max_queries(7) as profile:
+                purchase_request = await PurchaseRequestService(session).get_purchase_request_detail(pr_id)
+                PurchaseRequestDetail.model_validate(purchase_request)
+        counts.append(profile.query_count)
+
+    assert counts[0] == counts[1] == 7
+
+
+@pytest.mark.asyncio
+async def test_detail_endpoint_hides_other_users_requests(session_factory):
+    app = FastAPI()
+    app.include_router(purchase_requests.router, prefix="/purchase-requests")
+
+    async def override_read_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_read_db] = override_read_db
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        app.dependency_overrides[get_current_active_user] = lambda: Principal(
+            id=1, email="user1@dict.gov.ph", role=UserRole.END_USER, is_active=True
+        )
+        owner_response = await client.get("/purchase-requests/1")
+        missing_response = await client.get("/purchase-requests/999")
+
+        app.dependency_overrides[get_current_active_user] = lambda: Principal(
+            id=2, email="user2@dict.gov.ph", role=UserRole.END_USER, is_active=True
+        )
+        other_response = await client.get("/purchase-requests/1")
+
+    assert owner_response.status_code == 200
+    assert owner_response.json()["rfq"]["canvasses"][0]["supplier_quotations"][0]["quotation_items"][0]["item_code"] == "IT-0"
+    assert missing_response.status_code == 404
+    assert other_response.status_code == 404
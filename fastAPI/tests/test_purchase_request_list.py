@@ -0,0 +1,160 @@
+"""Tests for keyset-paginated purchase request listing"""
+
+import sys
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI, HTTPException
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.api.v1.endpoints import purchase_requests
+from app.core.database import get_read_db
+from app.core.deps import get_current_active_user
+from app.core.principals import Principal
+from app.core.query_profiler import instrument_profiler
+from app.core.roles import UserRole
+from app.core.status import PurchaseRequestStatus, UrgencyLevel
+from app.models import PurchaseRequest, User
+from app.services.purchase_request_service import PurchaseRequestService
+
+BASE_TIME = datetime(2024, 1, 1, 8, 0, 0)
+STATUSES = [PurchaseRequestStatus.PR_UNDER_REVIEW, PurchaseRequestStatus.RFQ_READY, PurchaseRequestStatus.CANCELLED]
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'prs.db'}")
+    instrument_profiler(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+        await conn.run_sync(PurchaseRequest.__table__.create)
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add_all([
+            User(id=user_id, name=f"User {user_id}", email=f"user{user_id}@dict.gov.ph",
+                 password_hash="not-a-real-hash", role=UserRole.END_USER, is_active=True)
+            for user_id in (1, 2)
+        ])
+        session.add_all([
+            PurchaseRequest(
+                pr_number=f"PR-2024-{i:04d}",
+                project_title=f"Project {i}",
+                project_description="Procurement of office equipment",
+                purpose="Operations",
+                end_user_id=1 + i % 2,
+                end_user_department="ITMS" if i % 4 else "Finance",
+                fund_source="GAA 2024",
+                estimated_budget=Decimal("1000.00"),
+                urgency_level=UrgencyLevel.HIGH if i % 5 == 0 else UrgencyLevel.MEDIUM,
+                status=STATUSES[i % 3],
+                # Pairs of rows share a timestamp to exercise the id tie-breaker
+                created_at=BASE_TIME + timedelta(minutes=i // 2),
+                updated_at=BASE_TIME,
+            )
+            for i in range(101)
+        ])
+        await session.commit()
+
+    yield factory
+    await engine.dispose()
+
+
+async def _collect(factory, limit: int, **filters) -> list:
+    rows, cursor = [], None
+    while True:
+        async with factory() as session:
+            page = await PurchaseRequestService(session).list_purchase_requests(
+                limit=limit, cursor=cursor, **filters
+            )
+        rows.extend(page.items)
+        assert len(page.items) <= limit
+        if not page.has_more:
+            assert page.next_cursor is None
+            return rows
+        cursor = page.next_cursor
+
+
+@pytest.mark.asyncio
+async def test_pages_cover_every_row_once_in_order(session_factory):
+    rows = await _collect(session_factory, limit=7)
+
+    assert len(rows) == 101
+    assert len({row.id for row in rows}) == 101
+    keys = [(row.created_at, row.id) for row in rows]
+    assert keys == sorted(keys, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_filters_apply_across_pages(session_factory):
+    rows = await _collect(
+        session_factory,
+        limit=4,
+        status=PurchaseRequestStatus.RFQ_READY,
+        department="ITMS",
+        created_from=BASE_TIME + timedelta(minutes=10),
+        created_to=BASE_TIME + timedelta(minutes=40),
+    )
+
+    expected = {
+        f"PR-2024-{i:04d}" for i in range(101)
+        if i % 3 == 1 and i % 4 and 10 <= i // 2 < 40
+    }
+    assert {row.pr_number for row in rows} == expected
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected(session_factory):
+    async with session_factory() as session:
+        with pytest.raises(HTTPException) as exc_info:
+            await PurchaseRequestService(session).list_purchase_requests(limit=10, cursor="not-a-cursor")
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_filtered_page_uses_composite_index(session_factory):
+    async with session_factory() as session:
+        plan = await session.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM purchase_requests "
+            "WHERE status = 'RFQ_READY' AND created_at <= :created_at AND (created_at < :created_at OR id < :id) "
+            "ORDER BY created_at DESC, id DESC LIMIT 21"
+        ), {"created_at": BASE_TIME + timedelta(minutes=30), "id": 60})
+        details = " ".join(row[-1] for row in plan)
+
+    assert "ix_purchase_requests_status_created" in details
+    assert "TEMP B-TREE" not in details
+
+
+@pytest.mark.asyncio
+async def test_end_user_only_sees_own_requests(session_factory, assert_max_queries):
+    app = FastAPI()
+    app.include_router(purchase_requests.router, prefix="/purchase-requests")
+
+    async def override_read_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_read_db] = override_read_db
+    app.dependency_overrides[get_current_active_user] = lambda: Principal(
+        id=2, email="user2@dict.gov.ph", role=UserRole.END_USER, is_active=True
+    )
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        with assert_max_queries(1) as profile:
+            response = await client.get("/purchase-requests", params={"limit": 100})
+    assert profile.query_count == 1
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["items"]) == 50
+    assert all(item["end_user_id"] == 2 for item in body["items"])
+    assert body["has_more"] is False
@@ -0,0 +1,107 @@
+"""Tests for the SQL query profiler and N+1 detection"""
+
+import logging
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.query_profiler import QueryProfilerMiddleware, instrument_profiler, statement_shape
+from app.core.roles import UserRole
+from app.models.user import User
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'profiler.db'}")
+    instrument_profiler(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add_all([
+            User(
+                name=f"User {i}",
+                email=f"user{i}@dict.gov.ph",
+                password_hash="not-a-real-hash",
+                role=UserRole.END_USER,
+                is_active=True,
+            )
+            for i in range(8)
+        ])
+        await session.commit()
+
+    yield factory
+    await engine.dispose()
+
+
+def build_app(session_factory) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(QueryProfilerMiddleware)
+
+    @app.get("/users/n-plus-one")
+    async def n_plus_one():
+        async with session_factory() as session:
+            ids = (await session.execute(select(User.id))).scalars().all()
+            # One query per row: the pattern the profiler should flag
+            for user_id in ids:
+                await session.execute(select(User.email).where(User.id == user_id))
+        return {"count": len(ids)}
+
+    @app.get("/users/batched")
+    async def batched():
+        async with session_factory() as session:
+            users = (await session.execute(select(User))).scalars().all()
+        return {"count": len(users)}
+
+    return app
+
+
+def test_statement_shape_collapses_values():
+    assert statement_shape("SELECT * FROM users WHERE id = 42 AND name = 'x'") == (
+        "SELECT * FROM users WHERE id = ? AND name = ?"
+    )
+    assert statement_shape("SELECT id FROM t WHERE id IN (?, ?, ?)") == statement_shape(
+        "SELECT id FROM t\n  WHERE id IN (?)"
+    )
+
+
+@pytest.mark.asyncio
+async def test_flags_n_plus_one_in_header_and_log(session_factory, caplog):
+    transport = httpx.ASGITransport(app=build_app(session_factory))
+
+    with caplog.at_level(logging.INFO, logger="app.core.query_profiler"):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            flagged = await client.get("/users/n-plus-one")
+            clean = await client.get("/users/batched")
+
+    assert flagged.headers["x-query-count"] == "9"
+    assert flagged.headers["x-n-plus-one"].startswith("8x SELECT users.email")
+    assert clean.headers["x-query-count"] == "1"
+    assert "x-n-plus-one" not in clean.headers
+
+    warnings = [r for r in caplog.records if r.levelno == logging.WARNING]
+    assert len(warnings) == 1
+    assert '"path": "/users/n-plus-one"' in warnings[0].getMessage()
+
+
+@pytest.mark.asyncio
+async def test_assert_max_queries_fixture(session_factory, assert_max_queries):
+    transport = httpx.ASGITransport(app=build_app(session_factory))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        with assert_max_queries(1):
+            await client.get("/users/batched")
+
+        with pytest.raises(AssertionError, match="at most 3 queries, got 9"):
+            with assert_max_queries(3):
+                await client.get("/users/n-plus-one")
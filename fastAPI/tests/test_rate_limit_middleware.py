@@ -0,0 +1,69 @@
+"""Tests for the API-wide rate limiting middleware"""
+
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.rate_limit_backends import MemoryRateLimitBackend
+from app.core.rate_limiter import RateLimitMiddleware, get_api_rate_limit_stats
+from app.core.security import create_access_token
+
+
+def build_app(opened_sessions: list) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, backend=MemoryRateLimitBackend())
+
+    @app.get("/api/v1/items")
+    async def items():
+        opened_sessions.append(1)
+        return {"ok": True}
+
+    @app.get("/api/v1/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
+
+
+@pytest.mark.asyncio
+async def test_rejects_over_limit_client_before_handler(monkeypatch):
+    from app.core import rate_limiter
+    monkeypatch.setattr(rate_limiter.settings, "RATE_LIMIT_BURST", 3)
+    opened_sessions = []
+    transport = httpx.ASGITransport(app=build_app(opened_sessions))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = [await client.get("/api/v1/items") for _ in range(5)]
+        health = [await client.get("/api/v1/health") for _ in range(5)]
+
+    assert [r.status_code for r in responses] == [200, 200, 200, 429, 429]
+    assert int(responses[-1].headers["Retry-After"]) >= 1
+    assert len(opened_sessions) == 3
+    assert all(r.status_code == 200 for r in health)
+    assert get_api_rate_limit_stats()["default"]["rejected_client"] >= 2
+
+
+@pytest.mark.asyncio
+async def test_authenticated_user_has_own_bucket(monkeypatch):
+    from app.core import rate_limiter
+    monkeypatch.setattr(rate_limiter.settings, "RATE_LIMIT_BURST", 2)
+    monkeypatch.setattr(rate_limiter.settings, "RATE_LIMIT_PER_MINUTE", 6000)
+    transport = httpx.ASGITransport(app=build_app([]))
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '7'})}"}
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        statuses = []
+        for i in range(3):
+            response = await client.get(
+                "/api/v1/items",
+                headers={**headers, "X-Forwarded-For": f"10.0.0.{i}"}
+            )
+            statuses.append(response.status_code)
+
+    assert statuses == [200, 200, 429]
@@ -0,0 +1,100 @@
+"""Tests for rate limiter backends (in-memory and fake Redis)"""
+
+import sys
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.rate_limit_backends import MemoryRateLimitBackend, RedisRateLimitBackend
+from app.core.rate_limiter import RateLimiter
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self, now: float = 999_960.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest_asyncio.fixture(params=["memory", "redis"])
+async def backend_and_clock(request):
+    clock = FakeClock()
+    if request.param == "memory":
+        yield MemoryRateLimitBackend(eviction_interval=60, clock=clock), clock
+        return
+
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    yield RedisRateLimitBackend(redis=redis, clock=clock), clock
+    await redis.flushall()
+    await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_counts(backend_and_clock):
+    backend, clock = backend_and_clock
+
+    for _ in range(4):
+        await backend.increment("login:1.2.3.4", 60)
+    assert await backend.count("login:1.2.3.4", 60) == 4
+
+    # Halfway into the next window, half of the previous bucket still counts
+    clock.now += 90
+    assert await backend.count("login:1.2.3.4", 60) == 2
+
+    clock.now += 120
+    assert await backend.count("login:1.2.3.4", 60) == 0
+
+
+@pytest.mark.asyncio
+async def test_gcra_allows_burst_then_throttles(backend_and_clock):
+    backend, clock = backend_and_clock
+
+    results = [await backend.acquire("api:1.2.3.4", rate_per_second=1.0, burst=3) for _ in range(4)]
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    assert 0 < results[-1][1] <= 1.0
+
+    clock.now += 1.0
+    assert (await backend.acquire("api:1.2.3.4", rate_per_second=1.0, burst=3))[0]
+
+
+@pytest.mark.asyncio
+async def test_login_limiter_locks_out_and_resets(backend_and_clock):
+    backend, clock = backend_and_clock
+    limiter = RateLimiter(backend)
+
+    for _ in range(limiter.max_attempts):
+        assert (await limiter.check_rate_limit("1.2.3.4"))[0]
+        await limiter.record_attempt("1.2.3.4", success=False)
+
+    allowed, remaining = await limiter.check_rate_limit("1.2.3.4")
+    assert not allowed
+    assert remaining == limiter.lockout_seconds
+
+    await limiter.reset("1.2.3.4")
+    assert (await limiter.check_rate_limit("1.2.3.4")) == (True, None)
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_evicts_idle_keys():
+    clock = FakeClock()
+    backend = MemoryRateLimitBackend(eviction_interval=60, clock=clock)
+
+    for i in range(1000):
+        await backend.increment(f"login:10.0.{i // 256}.{i % 256}", 60)
+        await backend.acquire(f"api:10.0.{i // 256}.{i % 256}", 1.0, 5)
+    assert backend.get_stats()["counter_keys"] == 1000
+
+    clock.now += 180
+    await backend.count("login:other", 60)
+    stats = backend.get_stats()
+    assert stats["counter_keys"] == 0
+    assert stats["bucket_keys"] == 0
+    assert stats["evicted_keys"] == 2000
@@ -0,0 +1,127 @@
+"""Tests for read-replica routing using two SQLite databases"""
+
+import sys
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import ReadOnlySession, WriteTrackingSession
+from app.core.replicas import Replica, ReplicaSet, set_routing_key
+from app.core.roles import UserRole
+from app.models.user import User
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _create_db(path: Path, marker: str):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+    async with async_sessionmaker(engine)() as session:
+        session.add(User(
+            name=marker,
+            email=f"{marker}@dict.gov.ph",
+            password_hash="not-a-real-hash",
+            role=UserRole.END_USER,
+            is_active=True,
+        ))
+        await session.commit()
+    return engine
+
+
+@pytest_asyncio.fixture
+async def databases(tmp_path):
+    primary = await _create_db(tmp_path / "primary.db", "primary")
+    replica = await _create_db(tmp_path / "replica.db", "replica")
+    lag = {"seconds": 0.0}
+
+    async def lag_probe(engine):
+        return lag["seconds"]
+
+    clock = FakeClock()
+    replica_set = ReplicaSet(
+        [Replica("replica", replica.execution_options(isolation_level="AUTOCOMMIT"))],
+        max_lag_seconds=5,
+        sticky_seconds=10,
+        lag_probe=lag_probe,
+        clock=clock,
+    )
+    write_factory = async_sessionmaker(
+        primary,
+        class_=AsyncSession,
+        sync_session_class=WriteTrackingSession,
+        info={"replica_set": replica_set},
+    )
+    read_factory = async_sessionmaker(
+        primary.execution_options(isolation_level="AUTOCOMMIT"),
+        class_=AsyncSession,
+        sync_session_class=ReadOnlySession,
+        info={"replica_set": replica_set},
+    )
+    yield write_factory, read_factory, replica_set, lag, clock
+    await primary.dispose()
+    await replica.dispose()
+
+
+async def _read_marker(read_factory) -> str:
+    async with read_factory() as session:
+        return (await session.execute(select(User.name))).scalars().first()
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_replica_and_writes_to_primary(databases):
+    write_factory, read_factory, replica_set, _, _ = databases
+    set_routing_key(None)
+
+    assert await _read_marker(read_factory) == "replica"
+
+    async with write_factory() as session:
+        user = (await session.execute(select(User))).scalars().first()
+        assert user.name == "primary"
+
+
+@pytest.mark.asyncio
+async def test_read_your_writes_stickiness(databases):
+    write_factory, read_factory, replica_set, _, clock = databases
+    set_routing_key("user:1")
+
+    async with write_factory() as session:
+        user = (await session.execute(select(User))).scalars().first()
+        user.department = "ITS"
+        await session.commit()
+
+    # Writer reads from the primary within the window; others still use the replica
+    assert await _read_marker(read_factory) == "primary"
+    set_routing_key("user:2")
+    assert await _read_marker(read_factory) == "replica"
+
+    set_routing_key("user:1")
+    clock.now += 11
+    assert await _read_marker(read_factory) == "replica"
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_falls_back_to_primary(databases):
+    _, read_factory, replica_set, lag, _ = databases
+    set_routing_key(None)
+
+    lag["seconds"] = 30
+    await replica_set.check_replicas()
+    assert await _read_marker(read_factory) == "primary"
+    assert replica_set.get_stats()["replicas"][0]["healthy"] is False
+
+    lag["seconds"] = 1
+    await replica_set.check_replicas()
+    assert await _read_marker(read_factory) == "replica"
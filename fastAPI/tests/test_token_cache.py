@@ -0,0 +1,44 @@
+"""Tests for the decoded-JWT verification cache"""
+
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.security import create_access_token, decode_token, get_token_cache
+
+
+def test_repeat_token_is_served_from_cache():
+    cache = get_token_cache()
+    cache.clear()
+    token = create_access_token({"sub": "42"})
+
+    hits_before = cache.hits
+    first = decode_token(token)
+    second = decode_token(token)
+
+    assert first == second
+    assert first["sub"] == "42"
+    assert cache.hits == hits_before + 1
+    assert len(cache) == 1
+
+
+def test_cached_payload_is_not_shared():
+    cache = get_token_cache()
+    cache.clear()
+    token = create_access_token({"sub": "42"})
+
+    decode_token(token)["sub"] = "tampered"
+    assert decode_token(token)["sub"] == "42"
+
+
+def test_expired_and_invalid_tokens_are_not_cached():
+    cache = get_token_cache()
+    cache.clear()
+
+    expired = create_access_token({"sub": "42"}, expires_delta=timedelta(seconds=-1))
+    assert decode_token(expired) is None
+    assert decode_token("not-a-token") is None
+    assert len(cache) == 0
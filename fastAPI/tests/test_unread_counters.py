@@ -0,0 +1,155 @@
+"""Tests for cached unread-notification counters"""
+
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.api.v1.endpoints import notifications
+from app.core.database import get_db, get_read_db
+from app.core.deps import get_current_active_user
+from app.core.principals import Principal
+from app.core.query_profiler import instrument_profiler
+from app.core.roles import UserRole
+from app.core.status import NotificationType
+from app.core.unread_counters import MemoryUnreadCounterBackend, RedisUnreadCounterBackend, UnreadCounter
+from app.models import Notification, User
+from app.schemas.notification import NotificationEvent, NotificationSubject
+from app.services import notification_service
+from app.services.notification_service import NotificationService
+
+BASE_TIME = datetime(2024, 1, 1, 8, 0, 0)
+USER = Principal(id=1, email="user1@dict.gov.ph", role=UserRole.BAC_MEMBER, is_active=True)
+
+
+def event(*entity_ids: int) -> NotificationEvent:
+    return NotificationEvent(
+        type=NotificationType.APPROVAL_REQUIRED,
+        entity_type="PurchaseRequest",
+        roles=[UserRole.BAC_MEMBER],
+        subjects=[NotificationSubject(entity_id=n, title=f"PR {n}", message="Needs action") for n in entity_ids],
+    )
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'unread.db'}")
+    instrument_profiler(engine)
+    async with engine.begin() as conn:
+        for model in (User, Notification):
+            await conn.run_sync(model.__table__.create)
+        await conn.execute(insert(User), [
+            {"id": n, "name": f"User {n}", "email": f"user{n}@dict.gov.ph", "password_hash": "x",
+             "role": UserRole.BAC_MEMBER, "is_active": True}
+            for n in (1, 2)
+        ])
+        # User 1: ids 1-5 unread, 6-7 read; user 2: ids 8-10 unread
+        await conn.execute(insert(Notification), [
+            {"user_id": user_id, "type": NotificationType.STATUS_UPDATED, "title": "t", "message": "m",
+             "entity_type": "PurchaseRequest", "entity_id": n, "is_read": n >= 5, "created_at": BASE_TIME}
+            for user_id, total in ((1, 7), (2, 3))
+            for n in range(total)
+        ])
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture(params=["memory", "redis"])
+async def counter(request):
+    if request.param == "memory":
+        yield UnreadCounter(MemoryUnreadCounterBackend())
+        return
+
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    yield UnreadCounter(RedisUnreadCounterBackend(redis=redis))
+    await redis.flushall()
+    await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_counts_are_maintained_without_recounting(session_factory, counter, assert_max_queries):
+    async with session_factory() as session:
+        service = NotificationService(session, unread_counter=counter)
+        with assert_max_queries(1):
+            assert await service.unread_count(1) == 5
+            assert await service.unread_count(1) == 5
+
+        # Two new notifications for every BAC member
+        await service.fan_out(event(100, 101))
+        with assert_max_queries(0):
+            assert await service.unread_count(1) == 7
+
+        # Already read or someone else's: no change
+        assert await service.mark_read(1, [6, 7, 8]) == 0
+        assert await service.mark_read(1, [1, 2]) == 2
+        with assert_max_queries(0):
+            assert await service.unread_count(1) == 5
+
+        # One set-based UPDATE
+        with assert_max_queries(1):
+            assert await service.mark_read(1) == 5
+        with assert_max_queries(0):
+            assert await service.unread_count(1) == 0
+
+        # User 2 was never counted, so their fan-out did not cache a guess
+        assert await counter.get(2) is None
+        assert await service.unread_count(2) == 5
+
+    assert counter.get_stats()["recounts"] == 2
+
+
+@pytest.mark.asyncio
+async def test_counts_expire_and_reconcile_with_the_table(session_factory):
+    counter = UnreadCounter(MemoryUnreadCounterBackend(ttl_seconds=0.1))
+    async with session_factory() as session:
+        service = NotificationService(session, unread_counter=counter)
+        assert await service.unread_count(1) == 5
+
+        # A change the counter never heard about (e.g. made by another worker)
+        await counter.adjust({1: 10})
+        assert await service.unread_count(1) == 15
+        await asyncio.sleep(0.15)
+        assert await service.unread_count(1) == 5
+
+
+@pytest.mark.asyncio
+async def test_read_endpoints(session_factory, monkeypatch):
+    counter = UnreadCounter(MemoryUnreadCounterBackend())
+    monkeypatch.setattr(notification_service, "get_unread_counter", lambda: counter)
+
+    app = FastAPI()
+    app.include_router(notifications.router, prefix="/notifications")
+
+    async def override_db():
+        async with session_factory() as session:
+            yield session
+
+    async def replica_db():
+        raise AssertionError("a recount is cached, so it must not read a lagging replica")
+        yield
+
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_read_db] = replica_db
+    app.dependency_overrides[get_current_active_user] = lambda: USER
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        before = await client.get("/notifications/unread-count")
+        one = await client.post("/notifications/3/read")
+        theirs = await client.post("/notifications/8/read")
+        everything = await client.post("/notifications/read-all")
+
+    assert before.json() == {"unread": 5}
+    assert one.json() == {"marked_read": 1, "unread": 4}
+    assert theirs.json() == {"marked_read": 0, "unread": 4}
+    assert everything.json() == {"marked_read": 4, "unread": 0}